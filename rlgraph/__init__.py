@@ -71,27 +71,6 @@ if os.path.exists(config_path):
     if distributed_backend is not None:
         DISTRIBUTED_BACKEND = distributed_backend
 
-# Create dir if necessary:
-if not os.path.exists(rl_graph_dir):
-    try:
-        os.makedirs(rl_graph_dir)
-    except OSError:
-        pass
-
-
-# Write to file if there was none:
-if not os.path.exists(config_path):
-    _config = {
-        "BACKEND": BACKEND,
-        "DISTRIBUTED_BACKEND": DISTRIBUTED_BACKEND,
-    }
-    try:
-        with open(config_path, 'w') as f:
-            f.write(json.dumps(_config, indent=4))
-    except IOError:
-        # Except permission denied.
-        pass
-
 # Overwrite backend if set in ENV.
 if 'RLGRAPH_BACKEND' in os.environ:
     backend = os.environ.get('RLGRAPH_BACKEND', None)
@@ -116,25 +95,43 @@ if DISTRIBUTED_BACKEND not in distributed_compatible_backends[BACKEND]:
                      "are: {}".format(DISTRIBUTED_BACKEND, BACKEND, distributed_compatible_backends[BACKEND]))
 
 
+def _module_available(name):
+    """
+    Checks whether a (top-level) module can be imported, without actually importing it. Importing the backends is
+    deferred until they are used (see `rlgraph.utils.lazy_import`).
+
+    Args:
+        name (str): The name of the top-level module, e.g. "tensorflow".
+
+    Returns:
+        bool: Whether the module is importable.
+    """
+    try:
+        import importlib.util
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        # Python 2.
+        import imp
+        try:
+            imp.find_module(name)
+            return True
+        except ImportError:
+            return False
+
+
 # Test imports.
 if DISTRIBUTED_BACKEND == 'distributed_tf':
     assert BACKEND == "tf"
-    try:
-        import tensorflow
-    except ImportError as e:
+    if not _module_available("tensorflow"):
         raise ImportError(
             "INIT ERROR: Cannot run distributed_tf without backend (tensorflow)! Please install tensorflow first "
             "via `pip install tensorflow` or `pip install tensorflow-gpu`."
         )
 elif DISTRIBUTED_BACKEND == "horovod":
-    try:
-        import horovod
-    except ImportError as e:
+    if not _module_available("horovod"):
         raise ValueError("INIT ERROR: Cannot run RLGraph with distributed backend Horovod.")
 elif DISTRIBUTED_BACKEND == "ray":
-    try:
-        import ray
-    except ImportError as e:
+    if not _module_available("ray"):
         raise ValueError("INIT ERROR: Cannot run RLGraph with distributed backend Ray.")
 else:
     raise ValueError("Distributed backend {} not supported".format(DISTRIBUTED_BACKEND))
@@ -34,9 +34,10 @@ from rlgraph.utils.input_parsing import parse_execution_spec, parse_observe_spec
     parse_value_function_spec
 from rlgraph.utils.ops import flatten_op
 from rlgraph.utils.specifiable import Specifiable
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class Agent(Specifiable):
@@ -383,9 +384,10 @@ class Agent(Specifiable):
             terminals (Union[bool,List[bool]]): Boolean indicating terminal.
             next_states (Union[dict,ndarray]): Preprocessed next states dict or array.
 
-            env_id (Optional[str]): Environment id to observe for. When using vectorized execution and
-                buffering, using environment ids is necessary to ensure correct trajectories are inserted.
-                See `SingleThreadedWorker` for example usage.
+            env_id (Optional[Union[str,List[str]]]): Environment id to observe for. When using vectorized execution
+                and buffering, using environment ids is necessary to ensure correct trajectories are inserted.
+                If `batched` is True, this may be a list with one environment id per batch item (one step of
+                several environments). See `SingleThreadedWorker` for example usage.
 
             batched (bool): Whether given data (states, actions, etc..) is already batched or not.
         """
@@ -393,82 +395,20 @@ class Agent(Specifiable):
         if internals is None:
             internals = []
 
+        # One step of several environments: Split into the environments' trajectories.
+        if batched and isinstance(env_id, (list, tuple)) and self.observe_spec["buffer_enabled"] is True:
+            self._observe_env_batches(
+                preprocessed_states, actions, internals, rewards, next_states, terminals, env_id
+            )
+            return
+
         if self.observe_spec["buffer_enabled"] is True:
             if env_id is None:
                 env_id = self.default_env
-
-            # If data is already batched, just have to extend our buffer lists.
-            if batched:
-                if self.flat_state_space is not None:
-                    for i, flat_key in enumerate(self.flat_state_space.keys()):
-                        self.states_buffer[env_id][i].extend(preprocessed_states[flat_key])
-                        self.next_states_buffer[env_id][i].extend(next_states[flat_key])
-                else:
-                    self.states_buffer[env_id].extend(preprocessed_states)
-                    self.next_states_buffer[env_id].extend(next_states)
-                if self.flat_action_space is not None:
-                    flat_action = flatten_op(actions)
-                    for i, flat_key in enumerate(self.flat_action_space.keys()):
-                        self.actions_buffer[env_id][i].append(flat_action[flat_key])
-                else:
-                    self.actions_buffer[env_id].extend(actions)
-                self.internals_buffer[env_id].extend(internals)
-                self.rewards_buffer[env_id].extend(rewards)
-                self.terminals_buffer[env_id].extend(terminals)
-            # Data is not batched, append single items (without creating new lists first!) to buffer lists.
-            else:
-                if self.flat_state_space is not None:
-                    for i, flat_key in enumerate(self.flat_state_space.keys()):
-                        self.states_buffer[env_id][i].append(preprocessed_states[flat_key])
-                        self.next_states_buffer[env_id][i].append(next_states[flat_key])
-                else:
-                    self.states_buffer[env_id].append(preprocessed_states)
-                    self.next_states_buffer[env_id].append(next_states)
-                if self.flat_action_space is not None:
-                    flat_action = flatten_op(actions)
-                    for i, flat_key in enumerate(self.flat_action_space.keys()):
-                        self.actions_buffer[env_id][i].append(flat_action[flat_key])
-                else:
-                    self.actions_buffer[env_id].append(actions)
-                self.internals_buffer[env_id].append(internals)
-                self.rewards_buffer[env_id].append(rewards)
-                self.terminals_buffer[env_id].append(terminals)
-
-            buffer_is_full = len(self.rewards_buffer[env_id]) >= self.observe_spec["buffer_size"]
-
-            # If the buffer (per environment) is full OR the episode was aborted:
-            # Change terminal of last record artificially to True (also give warning "buffer too small"),
-            # insert and flush the buffer.
-            if buffer_is_full or self.terminals_buffer[env_id][-1]:
-                # Warn if full and last terminal is False.
-                if buffer_is_full and not self.terminals_buffer[env_id][-1]:
-                    self.logger.warning(
-                        "Buffer of size {} of Agent '{}' may be too small! Had to add artificial terminal=True "
-                        "to end.".format(self.observe_spec["buffer_size"], self)
-                    )
-                    self.terminals_buffer[env_id][-1] = True
-
-                # TODO: Apply n-step post-processing if necessary.
-                if self.flat_action_space is not None:
-                    actions_ = {}
-                    for i, key in enumerate(self.flat_action_space.keys()):
-                        actions_[key] = np.asarray(self.actions_buffer[env_id][i])
-                        # Squeeze, but do not squeeze (1,) to ().
-                        if len(actions_[key]) > 1:
-                            actions_[key] = np.squeeze(actions_[key])
-                        else:
-                            actions_[key] = np.reshape(actions_[key], (1,))
-                else:
-                    actions_ = np.asarray(self.actions_buffer[env_id])
-                self._observe_graph(
-                    preprocessed_states=np.asarray(self.states_buffer[env_id]),
-                    actions=actions_,
-                    internals=np.asarray(self.internals_buffer[env_id]),
-                    rewards=np.asarray(self.rewards_buffer[env_id]),
-                    next_states=np.asarray(self.next_states_buffer[env_id]),
-                    terminals=np.asarray(self.terminals_buffer[env_id])
-                )
-                self.reset_env_buffers(env_id)
+            self._add_to_env_buffers(
+                env_id, preprocessed_states, actions, internals, rewards, next_states, terminals, batched
+            )
+            self._flush_env_buffers_if_done(env_id)
         else:
             if not batched:
                 preprocessed_states = self.preprocessed_state_space.force_batch(preprocessed_states)
@@ -479,6 +419,133 @@ class Agent(Specifiable):
 
             self._observe_graph(preprocessed_states, actions, internals, rewards, next_states, terminals)
 
+    def _observe_env_batches(self, preprocessed_states, actions, internals, rewards, next_states, terminals,
+                             env_ids):
+        """
+        Scatters a batch holding records of several environments (e.g. one step of all environments) into the
+        environments' buffers: The rows are grouped by environment in one pass and each buffer is extended once.
+        Buffers are only flushed for environments that terminated (or whose buffers are full).
+
+        Args:
+            env_ids (List[str]): The environment id of each row.
+
+        For all other args, see `observe`.
+        """
+        terminals = np.asarray(terminals)
+        rewards = np.asarray(rewards)
+        # Stable sort keeps each environment's rows in time order.
+        order = np.argsort(np.asarray(env_ids), kind="stable")
+        _, starts = np.unique(np.asarray(env_ids)[order], return_index=True)
+        for rows in np.split(order, starts[1:]):
+            env_id = env_ids[rows[0]]
+            # Flush at each terminal (a terminal can only be followed by rows of the env's next episode).
+            for segment in np.split(rows, np.nonzero(terminals[rows[:-1]])[0] + 1):
+                # Do not overfill the buffer: Flush whenever it is full.
+                while len(segment) > 0:
+                    capacity = self.observe_spec["buffer_size"] - len(self.rewards_buffer[env_id])
+                    chunk, segment = segment[:capacity], segment[capacity:]
+                    self._add_to_env_buffers(
+                        env_id, self._slice_batch(preprocessed_states, chunk), self._slice_batch(actions, chunk),
+                        [internals[i] for i in chunk] if len(internals) > 0 else [], rewards[chunk],
+                        self._slice_batch(next_states, chunk), terminals[chunk], batched=True
+                    )
+                    self._flush_env_buffers_if_done(env_id)
+
+    def _add_to_env_buffers(self, env_id, preprocessed_states, actions, internals, rewards, next_states, terminals,
+                            batched):
+        """
+        Appends a record (or extends by a batch of records) to the buffers of the given environment.
+        See `observe` for the args.
+        """
+        # If data is already batched, just have to extend our buffer lists.
+        if batched:
+            if self.flat_state_space is not None:
+                for i, flat_key in enumerate(self.flat_state_space.keys()):
+                    self.states_buffer[env_id][i].extend(preprocessed_states[flat_key])
+                    self.next_states_buffer[env_id][i].extend(next_states[flat_key])
+            else:
+                self.states_buffer[env_id].extend(preprocessed_states)
+                self.next_states_buffer[env_id].extend(next_states)
+            if self.flat_action_space is not None:
+                flat_action = flatten_op(actions)
+                for i, flat_key in enumerate(self.flat_action_space.keys()):
+                    self.actions_buffer[env_id][i].extend(flat_action[flat_key])
+            else:
+                self.actions_buffer[env_id].extend(actions)
+            self.internals_buffer[env_id].extend(internals)
+            self.rewards_buffer[env_id].extend(rewards)
+            self.terminals_buffer[env_id].extend(terminals)
+        # Data is not batched, append single items (without creating new lists first!) to buffer lists.
+        else:
+            if self.flat_state_space is not None:
+                for i, flat_key in enumerate(self.flat_state_space.keys()):
+                    self.states_buffer[env_id][i].append(preprocessed_states[flat_key])
+                    self.next_states_buffer[env_id][i].append(next_states[flat_key])
+            else:
+                self.states_buffer[env_id].append(preprocessed_states)
+                self.next_states_buffer[env_id].append(next_states)
+            if self.flat_action_space is not None:
+                flat_action = flatten_op(actions)
+                for i, flat_key in enumerate(self.flat_action_space.keys()):
+                    self.actions_buffer[env_id][i].append(flat_action[flat_key])
+            else:
+                self.actions_buffer[env_id].append(actions)
+            self.internals_buffer[env_id].append(internals)
+            self.rewards_buffer[env_id].append(rewards)
+            self.terminals_buffer[env_id].append(terminals)
+
+    def _flush_env_buffers_if_done(self, env_id):
+        """
+        Inserts (via `_observe_graph`) and resets the buffers of the given environment if full or if its episode
+        ended.
+        """
+        buffer_is_full = len(self.rewards_buffer[env_id]) >= self.observe_spec["buffer_size"]
+
+        # If the buffer (per environment) is full OR the episode was aborted:
+        # Change terminal of last record artificially to True (also give warning "buffer too small"),
+        # insert and flush the buffer.
+        if buffer_is_full or self.terminals_buffer[env_id][-1]:
+            # Warn if full and last terminal is False.
+            if buffer_is_full and not self.terminals_buffer[env_id][-1]:
+                self.logger.warning(
+                    "Buffer of size {} of Agent '{}' may be too small! Had to add artificial terminal=True "
+                    "to end.".format(self.observe_spec["buffer_size"], self)
+                )
+                self.terminals_buffer[env_id][-1] = True
+
+            # TODO: Apply n-step post-processing if necessary.
+            if self.flat_action_space is not None:
+                actions_ = {}
+                for i, key in enumerate(self.flat_action_space.keys()):
+                    actions_[key] = np.asarray(self.actions_buffer[env_id][i])
+                    # Squeeze, but do not squeeze (1,) to ().
+                    if len(actions_[key]) > 1:
+                        actions_[key] = np.squeeze(actions_[key])
+                    else:
+                        actions_[key] = np.reshape(actions_[key], (1,))
+            else:
+                actions_ = np.asarray(self.actions_buffer[env_id])
+            self._observe_graph(
+                preprocessed_states=np.asarray(self.states_buffer[env_id]),
+                actions=actions_,
+                internals=np.asarray(self.internals_buffer[env_id]),
+                rewards=np.asarray(self.rewards_buffer[env_id]),
+                next_states=np.asarray(self.next_states_buffer[env_id]),
+                terminals=np.asarray(self.terminals_buffer[env_id])
+            )
+            self.reset_env_buffers(env_id)
+
+    @staticmethod
+    def _slice_batch(data, index):
+        """
+        Returns the item at `index` of (possibly container) batched data.
+        """
+        if isinstance(data, dict):
+            return {key: Agent._slice_batch(value, index) for key, value in data.items()}
+        elif isinstance(data, tuple):
+            return tuple(Agent._slice_batch(value, index) for value in data)
+        return data[index]
+
     def _observe_graph(self, preprocessed_states, actions, internals, rewards, next_states, terminals):
         """
         This methods defines the actual call to the computational graph by executing
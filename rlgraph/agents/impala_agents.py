@@ -19,8 +19,6 @@ from __future__ import print_function
 
 import copy
 
-import tensorflow as tf
-
 from rlgraph.agents.agent import Agent
 from rlgraph.components.common.container_merger import ContainerMerger
 from rlgraph.components.common.environment_stepper import EnvironmentStepper
@@ -37,8 +35,11 @@ from rlgraph.components.policies.dynamic_batching_policy import DynamicBatchingP
 from rlgraph.spaces import FloatBox, Dict, Tuple
 from rlgraph.utils import RLGraphError
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 from rlgraph.utils.util import default_dict
 
+tf = lazy_import("tensorflow")
+
 
 class IMPALAAgent(Agent):
     """
@@ -58,7 +59,7 @@ class IMPALAAgent(Agent):
     def __init__(self, discount=0.99, fifo_queue_spec=None, architecture="large", environment_spec=None,
                  feed_previous_action_through_nn=True, feed_previous_reward_through_nn=True,
                  weight_pg=None, weight_baseline=None, weight_entropy=None, worker_sample_size=100,
-                 **kwargs):
+                 num_environments=1, environment_server_shared_memory=False, **kwargs):
         """
         Args:
             discount (float): The discount factor gamma.
@@ -76,6 +77,11 @@ class IMPALAAgent(Agent):
             weight_baseline (float): See IMPALALossFunction Component.
             weight_entropy (float): See IMPALALossFunction Component.
             worker_sample_size (int): How many steps the actor will perform in the environment each sample-run.
+            num_environments (int): How many environments an actor-type agent steps through in parallel (with one
+                batched policy forward pass per step). Each environment's sample-run is inserted as a separate
+                record into the FIFOQueue. Default: 1.
+            environment_server_shared_memory (bool): Whether an actor-type agent's environment server returns
+                observations through shared memory (instead of pickling them through a pipe). Default: False.
 
         Keyword Args:
             type (str): One of "single", "actor" or "learner". Default: "single".
@@ -84,6 +90,8 @@ class IMPALAAgent(Agent):
         assert type_ in ["single", "actor", "learner"]
         self.type = type_
         self.worker_sample_size = worker_sample_size
+        self.num_environments = num_environments
+        self.environment_server_shared_memory = environment_server_shared_memory
 
         # Network-spec by default is a "large architecture" IMPALA network.
         self.network_spec = kwargs.pop(
@@ -221,7 +229,8 @@ class IMPALAAgent(Agent):
         self.fifo_queue = FIFOQueue.from_spec(
             fifo_queue_spec or dict(capacity=1),
             reuse_variable_scope="shared-fifo-queue",
-            only_insert_single_records=True,
+            # Vectorized actors insert one record per environment at once.
+            only_insert_single_records=self.type != "actor" or self.num_environments == 1,
             record_space=self.fifo_record_space,
             device="/job:learner/task:0/cpu" if self.execution_spec["mode"] == "distributed" and
             self.execution_spec["distributed_spec"]["cluster_spec"] else None
@@ -244,6 +253,12 @@ class IMPALAAgent(Agent):
 
             # Slice some data from the EnvStepper (e.g only first internal states are needed).
             self.internal_states_slicer = Slice(scope="internal-states-slicer", squeeze=True)
+            # Vectorized EnvStepper outputs are time-major: Flip them to batch-major (one record per environment).
+            self.env_output_transposer = None
+            if self.num_environments > 1:
+                self.env_output_transposer = Transpose(
+                    output_is_time_major=False, scope="env-output-transposer"
+                )
             # Merge back to insert into FIFO.
             self.fifo_input_merger = ContainerMerger(*self.fifo_queue_keys)
 
@@ -259,13 +274,17 @@ class IMPALAAgent(Agent):
                 add_previous_action_to_state=True,
                 add_previous_reward_to_state=True,
                 add_action_probs=True,
-                action_probs_space=dummy_flattener.get_preprocessed_space(self.action_space)
+                action_probs_space=dummy_flattener.get_preprocessed_space(self.action_space),
+                num_environments=self.num_environments,
+                shared_memory=self.environment_server_shared_memory
             )
             sub_components = [
                 self.environment_stepper, self.env_output_splitter,
                 self.internal_states_slicer, self.fifo_input_merger,
                 self.fifo_queue
             ]
+            if self.env_output_transposer is not None:
+                sub_components.append(self.env_output_transposer)
         # Learner.
         else:
             self.environment_stepper = None
@@ -362,7 +381,8 @@ class IMPALAAgent(Agent):
         else:
             self.define_graph_api_learner(*sub_components)
 
-    def define_graph_api_actor(self, env_stepper, env_output_splitter, internal_states_slicer, merger, fifo_queue):
+    def define_graph_api_actor(self, env_stepper, env_output_splitter, internal_states_slicer, merger, fifo_queue,
+                               env_output_transposer=None):
         """
         Defines the API-methods used by an IMPALA actor. Actors only step through an environment (n-steps at
         a time), collect the results and push them into the FIFO queue. Results include: The actions actually
@@ -374,6 +394,9 @@ class IMPALAAgent(Agent):
                 in a single op call.
 
             fifo_queue (FIFOQueue): The FIFOQueue Component used to enqueue env sample runs (n-step).
+
+            env_output_transposer (Optional[Transpose]): The Transpose Component to make the outputs of a vectorized
+                EnvironmentStepper batch-major (one FIFO record per environment). None if not vectorized.
         """
         # Perform n-steps in the env and insert the results into our FIFO-queue.
         @rlgraph_api(component=self.root_component)
@@ -384,7 +407,10 @@ class IMPALAAgent(Agent):
             split_output = env_output_splitter.call(step_results)
             # Slice off the initial internal state (so the learner can re-feed-forward from that internal-state).
             initial_internal_states = internal_states_slicer.slice(split_output[-1], 0)  # -1=internal states
-            to_merge = split_output[:-1] + (initial_internal_states,)
+            to_merge = split_output[:-1]
+            if env_output_transposer is not None:
+                to_merge = tuple(env_output_transposer.call(o) for o in to_merge)
+            to_merge = to_merge + (initial_internal_states,)
             record = merger.merge(*to_merge)
 
             # Insert results into the FIFOQueue.
@@ -392,6 +418,10 @@ class IMPALAAgent(Agent):
 
             return insert_op, split_output[0]  # 0=terminals
 
+        @rlgraph_api(component=self.root_component)
+        def get_queue_size(root):
+            return fifo_queue.get_size()
+
     def define_graph_api_learner(
             self, fifo_output_splitter, fifo_queue, states_dict_splitter,
             transposer, staging_area, preprocessor, policy, loss_function, optimizer
@@ -28,11 +28,12 @@ from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.define_by_run_ops import define_by_run_flatten
 from rlgraph.utils.ops import flatten_op, unflatten_op, DataOpDict, ContainerDataOp, FlattenedDataOp
 from rlgraph.utils.util import strip_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class PPOAgent(Agent):
@@ -29,11 +29,12 @@ from rlgraph.utils import RLGraphError
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.ops import flatten_op, DataOpTuple
 from rlgraph.utils.util import strip_list, force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class SyncSpecification(object):
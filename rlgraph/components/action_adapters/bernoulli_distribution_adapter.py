@@ -16,11 +16,12 @@
 from rlgraph import get_backend
 from rlgraph.components.action_adapters import ActionAdapter
 from rlgraph.utils.decorators import graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class BernoulliDistributionAdapter(ActionAdapter):
@@ -18,13 +18,13 @@ from rlgraph.components.action_adapters import ActionAdapter
 from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import graph_fn
 from rlgraph.utils.util import SMALL_NUMBER
+from rlgraph.utils.lazy_import import lazy_import
 
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
-    from rlgraph.utils.pytorch_util import SMALL_NUMBER_TORCH
+    torch = lazy_import("torch")
 
 
 class CategoricalDistributionAdapter(ActionAdapter):
@@ -55,7 +55,7 @@ class CategoricalDistributionAdapter(ActionAdapter):
 
         elif get_backend() == "pytorch":
             softmax_logits = torch.softmax(adapter_outputs, dim=-1)
-            parameters = torch.max(softmax_logits, SMALL_NUMBER_TORCH)
+            parameters = torch.clamp(softmax_logits, min=SMALL_NUMBER)
             # Log probs.
             log_probs = torch.log(parameters)
 
@@ -18,12 +18,12 @@ from rlgraph import get_backend
 from rlgraph.components.action_adapters import ActionAdapter
 from rlgraph.utils import SMALL_NUMBER
 from rlgraph.utils.decorators import graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    from rlgraph.utils.pytorch_util import SMALL_NUMBER_TORCH
-    import torch
+    torch = lazy_import("torch")
 
 
 class GumbelSoftmaxDistributionAdapter(ActionAdapter):
@@ -49,7 +49,7 @@ class GumbelSoftmaxDistributionAdapter(ActionAdapter):
 
         elif get_backend() == "pytorch":
             softmax_logits = torch.softmax(adapter_outputs, dim=-1)
-            parameters = torch.max(softmax_logits, SMALL_NUMBER_TORCH)
+            parameters = torch.clamp(softmax_logits, min=SMALL_NUMBER)
             # Log probs.
             log_probs = torch.log(parameters)
 
@@ -7,9 +7,10 @@ from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import FlattenedDataOp, unflatten_op, DataOpTuple
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class BatchSplitter(Component):
@@ -26,11 +26,12 @@ from rlgraph.spaces.int_box import IntBox
 from rlgraph.components import Component
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.pytorch_util import pytorch_tile
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class DecayComponent(Component):
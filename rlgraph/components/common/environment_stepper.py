@@ -27,16 +27,21 @@ from rlgraph.utils.ops import DataOpTuple, DataOpDict, flatten_op, unflatten_op
 from rlgraph.spaces import Space, Dict
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.specifiable_server import SpecifiableServer
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
-    nest = tf.contrib.framework.nest
+    tf = lazy_import("tensorflow")
+    nest = lazy_import("tensorflow.python.util.nest")
 
 
 class EnvironmentStepper(Component):
     """
     A Component that takes an Environment object, a PreprocessorStack and a Policy to step
     n times through the environment, each time picking actions depending on the states that the environment produces.
+
+    With `num_environments` > 1, the server process hosts a SequentialVectorEnv of that many environments, which are
+    all stepped with a single call per time step, and the ActorComponent runs once per time step on the [N, ...]
+    batch of their states.
     """
 
     def __init__(self, environment_spec, actor_component_spec, num_steps=20,
@@ -45,7 +50,7 @@ class EnvironmentStepper(Component):
                  add_action_probs=False, action_probs_space=None,
                  add_action=False, add_reward=False,
                  add_previous_action_to_state=False, add_previous_reward_to_state=False,
-                 scope="environment-stepper",
+                 num_environments=1, shared_memory=False, scope="environment-stepper",
                  **kwargs):
         """
         Args:
@@ -80,6 +85,11 @@ class EnvironmentStepper(Component):
             add_previous_reward_to_state (bool): Whether to add the previous reward as another input channel to the
                 ActionComponent's (NN's) input at each step. This is only possible if the state space is already a Dict.
                 It will be added under the key "previous_reward". Default: False.
+            num_environments (int): The number of environments to step through in parallel. If > 1, all outputs of
+                `step` carry an additional batch rank (of size `num_environments`) after the (leading) time rank.
+                Default: 1.
+            shared_memory (bool): Whether the environment server should return states, rewards and terminals
+                through shared memory instead of pickling them through a pipe. Default: False.
         """
         super(EnvironmentStepper, self).__init__(scope=scope, **kwargs)
 
@@ -147,14 +157,21 @@ class EnvironmentStepper(Component):
                 "ERROR: If `add_action_probs` is True, must provide an `action_probs_space`!"
 
         self.environment_spec = environment_spec
+        self.num_environments = num_environments
+        # The batch shape of all per-step values (terminals, rewards, actions, etc..).
+        self.batch_shape = () if self.num_environments == 1 else (self.num_environments,)
         self.environment_server = SpecifiableServer(
             specifiable_class=Environment,
-            spec=environment_spec,
+            spec=environment_spec if self.num_environments == 1 else dict(
+                type="sequential-vector-env", num_environments=self.num_environments, env_spec=environment_spec
+            ),
             output_spaces=dict(
                 step_flow=self.state_space_env_list + [self.reward_space, bool],
                 reset_flow=self.state_space_env_list
             ),
-            shutdown_method="terminate"
+            shutdown_method="terminate" if self.num_environments == 1 else "terminate_all",
+            batch_size=None if self.num_environments == 1 else self.num_environments,
+            shared_memory=shared_memory
         )
         # Add the sub-components.
         self.actor_component = ActorComponent.from_spec(actor_component_spec)  # type: ActorComponent
@@ -178,13 +195,13 @@ class EnvironmentStepper(Component):
         )
         self.current_state = self.get_variable(
             name="current-state", from_space=self.state_space_actor, initializer=0, flatten=True, trainable=False,
-            local=True, use_resource=True
+            local=True, use_resource=True, add_batch_rank=self.num_environments if self.num_environments > 1 else False
         )
         if self.has_rnn:
             self.current_internal_states = self.get_variable(
                 name="current-internal-states", from_space=self.internal_states_space,
                 initializer=0.0, flatten=True, trainable=False, local=True, use_resource=True,
-                add_batch_rank=1
+                add_batch_rank=self.num_environments
             )
 
     @rlgraph_api(returns=1)
@@ -202,11 +219,14 @@ class EnvironmentStepper(Component):
 
                 flat_state = OrderedDict()
                 for i, flat_key in enumerate(self.state_space_actor_flattened.keys()):
-                    # Add a simple (size 1) batch rank to the state so it'll pass through the NN.
-                    # - Also have to add a time-rank for RNN processing.
+                    # Add a simple (size 1) batch rank to the state so it'll pass through the NN (vectorized
+                    # states already have their batch rank).
                     expanded = state[i]
-                    for _ in range(1 if self.has_rnn is False else 2):
+                    if self.num_environments == 1:
                         expanded = tf.expand_dims(input=expanded, axis=0)
+                    # Also have to add a time-rank for RNN processing.
+                    if self.has_rnn is True:
+                        expanded = tf.expand_dims(input=expanded, axis=1)
                     # Make None so it'll be recognized as batch-rank by the auto-Space detector.
                     flat_state[flat_key] = tf.placeholder_with_default(
                         input=expanded, shape=(None,) + ((None,) if self.has_rnn is True else ()) +
@@ -216,7 +236,7 @@ class EnvironmentStepper(Component):
                 # Recreate state as the original Space to pass it into the actor-component.
                 state = unflatten_op(flat_state)
 
-                # Get action and preprocessed state (as batch-size 1).
+                # Get action and preprocessed state (as batch-size 1 or `num_environments`).
                 out = (self.actor_component.get_preprocessed_state_and_action if self.add_action_probs is False else
                        self.actor_component.get_preprocessed_state_action_and_action_probs)(
                     state,
@@ -231,9 +251,10 @@ class EnvironmentStepper(Component):
                 current_internal_states = out.get("last_internal_states")
 
                 # Strip the batch (and maybe time) ranks again from the action in case the Env doesn't like it.
-                a_no_extra_ranks = a[0, 0] if self.has_rnn is True else a[0]
+                # Vectorized Envs keep the batch rank.
+                a_no_extra_ranks = self._strip_extra_ranks(a)
                 # Step through the Env and collect next state (tuple!), reward and terminal as single values
-                # (not batched).
+                # (not batched) or as batches of `num_environments` values.
                 out = self.environment_server.step_flow(a_no_extra_ranks)
                 s_, r, t_ = out[:-2], out[-2], out[-1]
                 r = tf.cast(r, dtype="float32")
@@ -250,8 +271,7 @@ class EnvironmentStepper(Component):
                 ret = [t_, s_] + \
                     ([a_no_extra_ranks] if self.add_action else []) + \
                     ([r] if self.add_reward else []) + \
-                    ([(action_probs[0][0] if self.has_rnn is True else action_probs[0])] if
-                     self.add_action_probs is True else []) + \
+                    ([self._strip_extra_ranks(action_probs)] if self.add_action_probs is True else []) + \
                     ([tuple(current_internal_states)] if self.has_rnn is True else [])
 
                 return tuple(ret)
@@ -259,18 +279,20 @@ class EnvironmentStepper(Component):
             # Initialize the tf.scan run.
             initializer = [
                 # terminals
-                tf.zeros(shape=(), dtype=tf.bool),
+                tf.zeros(shape=self.batch_shape, dtype=tf.bool),
                 # current (raw) state (flattened components if ContainerSpace).
                 tuple(map(lambda x: x.read_value(), self.current_state.values()))
             ]
             # Append actions and rewards if needed.
             if self.add_action:
-                initializer.append(tf.zeros(shape=self.action_space.shape, dtype=self.action_space.dtype))
+                initializer.append(
+                    tf.zeros(shape=self.batch_shape + self.action_space.shape, dtype=self.action_space.dtype)
+                )
             if self.add_reward:
-                initializer.append(tf.zeros(shape=self.reward_space.shape))
+                initializer.append(tf.zeros(shape=self.batch_shape + self.reward_space.shape))
             # Append action probs if needed.
             if self.add_action_probs is True:
-                initializer.append(tf.zeros(shape=self.action_probs_space.shape))
+                initializer.append(tf.zeros(shape=self.batch_shape + self.action_probs_space.shape))
             # Append internal states if needed.
             if self.current_internal_states is not None:
                 initializer.append(tuple(
@@ -302,9 +324,14 @@ class EnvironmentStepper(Component):
                 # Remove batch rank from internal states again.
                 internal_states_wo_batch = list()
                 for i, var_ref in enumerate(self.current_internal_states.values()):  #range(len(step_results[slot])):
-                    # 1=batch axis (which has dim=1); 0=time axis.
-                    internal_states_component = tf.squeeze(step_results[slot][i], axis=1)
-                    assigns.append(self.assign_variable(var_ref, internal_states_component[-1:]))
+                    # Vectorized: Keep the batch axis (1) and store the last time step's batch.
+                    if self.num_environments > 1:
+                        internal_states_component = step_results[slot][i]
+                        assigns.append(self.assign_variable(var_ref, internal_states_component[-1]))
+                    else:
+                        # 1=batch axis (which has dim=1); 0=time axis.
+                        internal_states_component = tf.squeeze(step_results[slot][i], axis=1)
+                        assigns.append(self.assign_variable(var_ref, internal_states_component[-1:]))
                     internal_states_wo_batch.append(internal_states_component)
                 step_results[slot] = tuple(internal_states_wo_batch)
 
@@ -314,11 +341,12 @@ class EnvironmentStepper(Component):
                 full_results = []
                 for slot in range(len(step_results)):
                     first_values, rest_values = initializer[slot], step_results[slot]
+                    is_internal_states = self.current_internal_states is not None and slot == len(step_results) - 1
                     # Internal states need a slightly different concatenating as the batch rank is missing.
-                    if self.current_internal_states is not None and slot == len(step_results) - 1:
+                    if is_internal_states and self.num_environments == 1:
                         full_results.append(nest.map_structure(self._concat, first_values, rest_values))
                     # States need concatenating (first state needed).
-                    elif slot == 1:
+                    elif slot == 1 or is_internal_states:
                         full_results.append(nest.map_structure(
                             lambda first, rest: tf.concat([[first], rest], axis=0), first_values, rest_values)
                         )
@@ -339,9 +367,20 @@ class EnvironmentStepper(Component):
             full_results = DataOpTuple(full_results)
             for o in flatten_op(full_results).values():
                 o._time_rank = 0  # which position in the shape is the time-rank?
+                if self.num_environments > 1:
+                    o._batch_rank = 1
 
             return full_results
 
+    def _strip_extra_ranks(self, value):
+        """
+        Helper method to remove the (size 1) batch rank (non-vectorized only) and the (size 1) time rank (RNN only)
+        from an ActorComponent output.
+        """
+        if self.num_environments == 1:
+            return value[0][0] if self.has_rnn is True else value[0]
+        return value[:, 0] if self.has_rnn is True else value
+
     @staticmethod
     def _concat(first, rest):
         """
@@ -20,9 +20,10 @@ from __future__ import print_function
 from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.utils.decorators import graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class IterativeOptimization(Component):
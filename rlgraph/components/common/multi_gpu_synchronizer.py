@@ -25,9 +25,10 @@ from rlgraph.components.component import Component
 from rlgraph.spaces import Dict
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.ops import DataOpTuple, DataOpDict
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class MultiGpuSynchronizer(Component):
@@ -21,9 +21,10 @@ from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.utils.util import convert_dtype
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class NoiseComponent(Component):
@@ -22,9 +22,10 @@ from rlgraph.components.component import Component
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import flatten_op, unflatten_op, FlattenedDataOp
 from rlgraph.utils.util import convert_dtype as dtype_
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class StagingArea(Component):
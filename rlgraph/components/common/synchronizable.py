@@ -23,9 +23,10 @@ from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import DataOpDict
 from rlgraph.utils.util import get_shape
 from rlgraph.components import Component
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class Synchronizable(Component):
@@ -33,15 +33,16 @@ from rlgraph.utils.decorators import rlgraph_api, component_api_registry, compon
 from rlgraph.utils.ops import DataOpDict, FLAT_TUPLE_OPEN, FLAT_TUPLE_CLOSE, TraceContext
 from rlgraph.utils.rlgraph_errors import RLGraphError, RLGraphObsoletedError
 from rlgraph.utils.specifiable import Specifiable
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "tf-eager":
-    import tensorflow as tf
-    import tensorflow.contrib.eager as eager
+    tf = lazy_import("tensorflow")
+    eager = lazy_import("tensorflow.contrib.eager")
 elif get_backend() == "pytorch":
     from rlgraph.utils import PyTorchVariable
-    import torch
+    torch = lazy_import("torch")
 
 
 class Component(Specifiable):
@@ -143,6 +144,8 @@ class Component(Specifiable):
 
         # How this component executes its 'call' method.
         self.execution_mode = "static_graph" if self.backend != "python" else "define_by_run"
+        # Whether define-by-run API-method calls are counted and timed (see `Component.call_times`).
+        self.profiling_enabled = True
 
         # `self.api_method_inputs`: Registry for all unique API-method input parameter names and their Spaces.
         # Two API-methods may share the same input if their input parameters have the same names.
@@ -1213,6 +1216,11 @@ class Component(Specifiable):
                         and shape is not None and (indices is None or len(indices) == 0):
                     return torch.zeros(shape, dtype=dtype)
 
+                # Preallocated buffers: Gather all indices at once and share memory with the gathered array.
+                if indices is not None and isinstance(variable, np.ndarray) and variable.dtype != object:
+                    ret = torch.from_numpy(variable[np.asarray(indices, dtype=np.int64)])
+                    return ret if dtype is None else ret.to(dtype)
+
                 if indices is not None:
                     ret = []
                     for i in indices:
@@ -21,11 +21,12 @@ from rlgraph import get_backend
 from rlgraph.components.distributions.distribution import Distribution
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.util import convert_dtype
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow_probability as tfp
+    tfp = lazy_import("tensorflow_probability")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Bernoulli(Distribution):
@@ -21,12 +21,13 @@ from rlgraph import get_backend
 from rlgraph.components.distributions.distribution import Distribution
 from rlgraph.utils import util
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
-    import tensorflow_probability as tfp
+    tf = lazy_import("tensorflow")
+    tfp = lazy_import("tensorflow_probability")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Categorical(Distribution):
@@ -22,9 +22,10 @@ import numpy as np
 from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class Distribution(Component):
@@ -22,9 +22,10 @@ from rlgraph.components.distributions.categorical import Categorical
 from rlgraph.components.distributions.distribution import Distribution
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow_probability as tfp
+    tfp = lazy_import("tensorflow_probability")
 elif get_backend() == "pytorch":
     pass
 
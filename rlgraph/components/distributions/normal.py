@@ -22,11 +22,12 @@ from rlgraph.components.distributions.distribution import Distribution
 from rlgraph.spaces import Tuple, FloatBox
 from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow_probability as tfp
+    tfp = lazy_import("tensorflow_probability")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Normal(Distribution):
@@ -21,20 +21,25 @@ from __future__ import print_function
 import functools
 
 from rlgraph import get_backend
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
+    nest = lazy_import("tensorflow.python.util.nest")
 
+# The Batcher TensorFlow ops. Only loaded once the first Batcher is created (see `_load_batcher_ops`).
+batcher_ops = None
+
+
+def _load_batcher_ops():
     # TODO handle this?
     try:
-        batcher_ops = tf.load_op_library('/home/rlgraph/deepmind/deepmind-scalable-agent/batcher.so')
+        return tf.load_op_library('/home/rlgraph/deepmind/deepmind-scalable-agent/batcher.so')
     except:
         try:
-            batcher_ops = tf.load_op_library('/root/scalable_agent/batcher.so')
+            return tf.load_op_library('/root/scalable_agent/batcher.so')
         except:
-            pass
-
-    nest = tf.contrib.framework.nest
+            return None
 
 
 class Batcher(object):
@@ -46,6 +51,9 @@ class Batcher(object):
     """
 
     def __init__(self, minimum_batch_size, maximum_batch_size, timeout_ms):
+        global batcher_ops
+        if batcher_ops is None:
+            batcher_ops = _load_batcher_ops()
         self.handle = batcher_ops.batcher(
             minimum_batch_size, maximum_batch_size, timeout_ms or -1
         )
@@ -17,11 +17,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import numpy as np
 import operator
 
 from rlgraph.utils.rlgraph_errors import RLGraphError
 
 
+# Maps the supported reduce operators to their element-wise numpy ufuncs for batched updates.
+_UFUNCS = {
+    operator.add: np.add,
+    min: np.minimum,
+    max: np.maximum
+}
+
+
 class MemSegmentTree(object):
     """
     In-memory Segment tree for prioritized replay.
@@ -29,6 +38,9 @@ class MemSegmentTree(object):
     Note: The pure TensorFlow segment tree is much slower because variable updating is expensive,
     and in scenarios like Ape-X, memory and update are separated processes, so there is little to be gained
     from inserting into the graph.
+
+    Values are stored in a flat numpy array so that batches of inserts and prefix-sum queries can be
+    processed level by level (O(log N) vectorized passes) instead of one index at a time.
     """
 
     def __init__(
@@ -41,13 +53,17 @@ class MemSegmentTree(object):
         Helper to represent a segment tree.
 
         Args:
-            values (list): Storage for the segment tree.
-            capacity (int): Capacity of segment tree.
+            values (Union[list,np.ndarray]): Storage for the segment tree (will be converted into a
+                float64 numpy array of length 2 * capacity).
+            capacity (int): Capacity of segment tree. Must be a power of 2.
             operator (callable): Reduce operation of the segment tree.
         """
-        self.values = values
+        self.values = np.asarray(values, dtype=np.float64)
         self.capacity = capacity
         self.operator = operator
+        if operator not in _UFUNCS:
+            raise RLGraphError("Unsupported segment tree operator. Supported ops are [add, min, max].")
+        self.ufunc = _UFUNCS[operator]
 
     def insert(self, index, element):
         """
@@ -72,6 +88,27 @@ class MemSegmentTree(object):
             )
             index = index >> 1
 
+    def insert_batch(self, indices, elements):
+        """
+        Inserts a batch of elements into the segment tree and updates all their ancestors level by level.
+
+        Args:
+            indices (Union[list,np.ndarray]): Insertion indices.
+            elements (Union[float,list,np.ndarray]): Elements to insert (scalars are broadcast).
+                For duplicate indices, the last element wins.
+        """
+        indices = np.asarray(indices, dtype=np.int64) + self.capacity
+        if indices.size == 0:
+            return
+        self.values[indices] = elements
+
+        # All leaves sit at the same depth (capacity is a power of 2) -> walk up one level per pass.
+        indices = np.unique(indices >> 1)
+        while indices[0] >= 1:
+            update_indices = 2 * indices
+            self.values[indices] = self.ufunc(self.values[update_indices], self.values[update_indices + 1])
+            indices = np.unique(indices >> 1)
+
     def get(self, index):
         """
         Reads an item from the segment tree.
@@ -84,6 +121,18 @@ class MemSegmentTree(object):
         """
         return self.values[self.capacity + index]
 
+    def get_batch(self, indices):
+        """
+        Reads a batch of items from the segment tree.
+
+        Args:
+            indices (Union[list,np.ndarray]): Indices to read.
+
+        Returns:
+            np.ndarray: The elements.
+        """
+        return self.values[self.capacity + np.asarray(indices, dtype=np.int64)]
+
     def index_of_prefixsum(self, prefix_sum):
         """
         Identifies the highest index which satisfies the condition that the sum
@@ -107,6 +156,31 @@ class MemSegmentTree(object):
                 index = update_index + 1
         return index - self.capacity
 
+    def find_prefixsum_indices(self, prefix_sums):
+        """
+        Batched version of `index_of_prefixsum`: Descends the tree for all prefix sums together,
+        one vectorized pass per tree level.
+
+        Args:
+            prefix_sums (Union[list,np.ndarray]): Upper bounds on the prefixes we are allowed to select.
+
+        Returns:
+            np.ndarray: Indices satisfying the prefix sum condition for each of the given prefix sums.
+        """
+        prefix_sums = np.array(prefix_sums, dtype=np.float64, ndmin=1)
+        indices = np.ones_like(prefix_sums, dtype=np.int64)
+        if prefix_sums.size == 0:
+            return indices
+        assert np.all(prefix_sums >= 0) and np.all(prefix_sums <= self.get_sum() + 1e-5)
+
+        while indices[0] < self.capacity:
+            update_indices = 2 * indices
+            left_values = self.values[update_indices]
+            go_right = left_values <= prefix_sums
+            prefix_sums -= np.where(go_right, left_values, 0.0)
+            indices = update_indices + go_right
+        return indices - self.capacity
+
     def reduce(self, start, limit, reduce_op=operator.add):
         """
         Applies an operation to specified segment.
@@ -146,7 +220,7 @@ class MemSegmentTree(object):
                 result = reduce_op(result, self.values[limit])
             start = start >> 1
             limit = limit >> 1
-        return result
+        return float(result)
 
     def get_min_value(self, start=0, stop=None):
         """
@@ -198,3 +272,27 @@ class MinSumSegmentTree(object):
             self.min_segment_tree.values[index] = min(self.min_segment_tree.values[update_index],
                                                       self.min_segment_tree.values[update_index + 1])
             index = index >> 1
+
+    def insert_batch(self, indices, elements):
+        """
+        Inserts a batch of elements into both segment trees, updating all ancestors
+        of the inserted leaves level by level.
+
+        Args:
+            indices (Union[list,np.ndarray]): Insertion indices.
+            elements (Union[float,list,np.ndarray]): Elements to insert (scalars are broadcast).
+        """
+        indices = np.asarray(indices, dtype=np.int64) + self.capacity
+        if indices.size == 0:
+            return
+        sum_values = self.sum_segment_tree.values
+        min_values = self.min_segment_tree.values
+        sum_values[indices] = elements
+        min_values[indices] = elements
+
+        indices = np.unique(indices >> 1)
+        while indices[0] >= 1:
+            update_indices = 2 * indices
+            sum_values[indices] = sum_values[update_indices] + sum_values[update_indices + 1]
+            min_values[indices] = np.minimum(min_values[update_indices], min_values[update_indices + 1])
+            indices = np.unique(indices >> 1)
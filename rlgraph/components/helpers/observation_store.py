@@ -0,0 +1,249 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph.utils.rlgraph_errors import RLGraphError
+
+
+class ObservationStore(object):
+    """
+    In-memory, frame-deduplicating storage for stacked observations (e.g. the output of a `Sequence`
+    preprocessor) and their next-observations in a replay memory.
+
+    Instead of storing every stacked state and next-state (each holding `sequence_length` frames), only the newest
+    frame of each inserted state is kept in a ring buffer. At sample time, stacked states are rebuilt from the frames
+    of the preceding records, clamped at episode starts (where the `Sequence` preprocessor repeats the reset frame),
+    and next-states are rebuilt as the states of later records. How a record relates to its neighbours is detected
+    once at insert time by comparing frames, so no episode meta-data has to be passed in. Next-states not found in
+    the same insert stay pending and are resolved by the first matching state of a later insert (e.g. the next
+    single-record insert of the same environment). Records that cannot be reconstructed this way (e.g. the first
+    frames of a trajectory fragment inserted after another environment's fragment, or the next-state of an
+    episode's last record) are kept in full in small overflow tables.
+
+    The store mirrors the ring-buffer indexing of the memory using it: the i-th inserted record (counting from 0)
+    lives at index i % capacity.
+    """
+    def __init__(self, capacity, sequence_length=4, stack_axis=-1, add_rank=True, max_next_state_offset=1):
+        """
+        Args:
+            capacity (int): Number of records (transitions) the memory holds.
+            sequence_length (int): Number of frames stacked into one observation.
+            stack_axis (int): Axis of a single (unbatched) observation along which frames are stacked.
+            add_rank (bool): True if frames are stacked in an extra rank (`Sequence(add_rank=True)`), False if they are
+                concatenated within `stack_axis`.
+            max_next_state_offset (int): Maximum distance (in records) between a record and the later record whose
+                state is its next-state. Should be set to the n-step adjustment if next-states are n-step shifted.
+        """
+        self.capacity = capacity
+        self.sequence_length = sequence_length
+        self.stack_axis = stack_axis
+        self.add_rank = add_rank
+        self.max_next_state_offset = max_next_state_offset
+
+        # Frames must outlive the oldest record using them as a predecessor.
+        self.frame_capacity = self.capacity + self.sequence_length - 1
+        self.frames = None
+        # Global insert counter of the record at each index.
+        self.counters = np.full(shape=(self.capacity,), fill_value=-1, dtype=np.int64)
+        # Number of preceding records whose frames make up the stacked state (older frames repeat the oldest one).
+        self.back_lengths = np.zeros(shape=(self.capacity,), dtype=np.int8)
+        # Distance to the later record holding the next-state (0 means: stored in overflow).
+        self.next_state_offsets = np.zeros(shape=(self.capacity,), dtype=np.int32)
+        self.state_overflow = {}
+        self.next_state_overflow = {}
+        # Unresolved next-states (also in `next_state_overflow`): Hash of their newest frame -> memory indices.
+        self.pending_next_states = {}
+        self.pending_keys = {}
+        self.num_inserted = 0
+        # Frames with lower counters than this are not available (e.g. truncated inserts).
+        self.first_valid_frame = 0
+        # Batched axis along which frames are stacked (set on first insert).
+        self.axis = None
+
+    def _allocate(self, states):
+        rank = len(states.shape) - 1
+        self.axis = self.stack_axis % rank + 1
+        frame_shape = self._frame(states, 0).shape[1:]
+        self.frames = np.zeros(shape=(self.frame_capacity,) + frame_shape, dtype=states.dtype)
+
+    def _frame(self, states, position):
+        """
+        Slices the frame at `position` (0=oldest, sequence_length - 1=newest) out of a batch of stacked states.
+        """
+        if self.add_rank:
+            return np.take(states, position, axis=self.axis)
+        channels = states.shape[self.axis] // self.sequence_length
+        return np.take(states, range_(position * channels, (position + 1) * channels), axis=self.axis)
+
+    def _stack(self, frames):
+        """
+        Stacks a list of frame batches (oldest first) back into a batch of observations.
+        """
+        if self.add_rank:
+            return np.stack(frames, axis=self.axis)
+        return np.concatenate(frames, axis=self.axis)
+
+    @staticmethod
+    def _equal(a, b):
+        """
+        Row-wise equality of two batches.
+        """
+        return np.all((a == b).reshape((len(a), -1)), axis=1)
+
+    def insert(self, states, next_states):
+        """
+        Inserts a batch of stacked states and their next-states.
+
+        Args:
+            states (np.ndarray): Batch of stacked observations.
+            next_states (np.ndarray): Batch of stacked next-observations.
+        """
+        states = np.asarray(states)
+        next_states = np.asarray(next_states)
+        num_records = len(states)
+        if num_records == 0:
+            return
+        if self.frames is None:
+            self._allocate(states)
+
+        # Only the last `capacity` records would survive the insert anyway.
+        offset = max(num_records - self.capacity, 0)
+        if offset > 0:
+            states, next_states = states[offset:], next_states[offset:]
+            num_records -= offset
+            self.num_inserted += offset
+            self.first_valid_frame = self.num_inserted
+
+        counters = np.arange(self.num_inserted, self.num_inserted + num_records)
+        indices = counters % self.capacity
+        for index in indices:
+            self.state_overflow.pop(index, None)
+            self.next_state_overflow.pop(index, None)
+            self._drop_pending(index)
+
+        # Write newest frames first so predecessors within this batch can be matched.
+        newest_position = self.sequence_length - 1
+        newest_frames = self._frame(states, newest_position)
+        self.frames[counters % self.frame_capacity] = newest_frames
+        self.counters[indices] = counters
+
+        # Next-states left pending by earlier inserts are the first matching states of this batch.
+        if len(self.pending_next_states) > 0:
+            self._resolve_pending(states, newest_frames, counters)
+
+        # Count how many consecutive predecessors provide this record's older frames.
+        back_lengths = np.zeros(shape=(num_records,), dtype=np.int8)
+        still_matching = np.ones(shape=(num_records,), dtype=np.bool_)
+        for k in range_(1, self.sequence_length):
+            available = (counters - k) >= max(self.first_valid_frame, self.num_inserted + num_records -
+                                              self.frame_capacity)
+            stored = self.frames[(counters - k) % self.frame_capacity]
+            still_matching &= available & self._equal(self._frame(states, newest_position - k), stored)
+            back_lengths += still_matching
+        # Frames older than the last matching predecessor must repeat it (as after an episode start).
+        reconstructable = np.ones(shape=(num_records,), dtype=np.bool_)
+        for k in range_(1, self.sequence_length):
+            position = newest_position - k
+            must_repeat = back_lengths < k
+            reconstructable &= ~must_repeat | self._equal(self._frame(states, position),
+                                                          self._frame(states, position + 1))
+        self.back_lengths[indices] = back_lengths
+        for i in np.where(~reconstructable)[0]:
+            self.state_overflow[indices[i]] = states[i]
+
+        # Find the later record in this batch whose state equals this record's next-state.
+        next_state_offsets = np.zeros(shape=(num_records,), dtype=np.int32)
+        for d in range_(1, self.max_next_state_offset + 1):
+            if d >= num_records:
+                break
+            unresolved = next_state_offsets[:-d] == 0
+            matches = unresolved & self._equal(next_states[:-d], states[d:])
+            next_state_offsets[:-d][matches] = d
+        self.next_state_offsets[indices] = next_state_offsets
+        pending = np.where(next_state_offsets == 0)[0]
+        if len(pending) > 0:
+            pending_frames = self._frame(next_states[pending], newest_position)
+            for i, frame in zip(pending, pending_frames):
+                self.next_state_overflow[indices[i]] = next_states[i]
+                key = hash(frame.tobytes())
+                self.pending_next_states.setdefault(key, []).append(indices[i])
+                self.pending_keys[indices[i]] = key
+
+        self.num_inserted += num_records
+
+    def _resolve_pending(self, states, newest_frames, counters):
+        """
+        Points pending next-states to the first record of a new batch holding the same state.
+        """
+        for i in range_(len(states)):
+            pending_indices = self.pending_next_states.get(hash(newest_frames[i].tobytes()))
+            if pending_indices is None:
+                continue
+            for index in list(pending_indices):
+                if np.array_equal(self.next_state_overflow[index], states[i]):
+                    self.next_state_offsets[index] = counters[i] - self.counters[index]
+                    del self.next_state_overflow[index]
+                    self._drop_pending(index)
+            if len(self.pending_next_states) == 0:
+                break
+
+    def _drop_pending(self, index):
+        key = self.pending_keys.pop(index, None)
+        if key is None:
+            return
+        pending_indices = self.pending_next_states[key]
+        pending_indices.remove(index)
+        if len(pending_indices) == 0:
+            del self.pending_next_states[key]
+
+    def _rebuild(self, indices, overflow):
+        counters = self.counters[indices]
+        back_lengths = self.back_lengths[indices].astype(np.int64)
+        frames = []
+        for position in range_(self.sequence_length):
+            k = self.sequence_length - 1 - position
+            frames.append(self.frames[(counters - np.minimum(k, back_lengths)) % self.frame_capacity])
+        stacked = self._stack(frames)
+        for i, index in enumerate(indices):
+            if index in overflow:
+                stacked[i] = overflow[index]
+        return stacked
+
+    def get(self, indices):
+        """
+        Rebuilds the stacked states and next-states for the given memory indices.
+
+        Args:
+            indices (np.ndarray): Memory indices to read.
+
+        Returns:
+            tuple: Batch of stacked states and batch of stacked next-states.
+        """
+        if self.frames is None:
+            raise RLGraphError("ERROR: Cannot read from an empty ObservationStore.")
+        indices = np.asarray(indices, dtype=np.int64)
+        states = self._rebuild(indices, self.state_overflow)
+        next_indices = (indices + self.next_state_offsets[indices]) % self.capacity
+        next_states = self._rebuild(next_indices, self.state_overflow)
+        for i, index in enumerate(indices):
+            if index in self.next_state_overflow:
+                next_states[i] = self.next_state_overflow[index]
+        return states, next_states
@@ -20,11 +20,12 @@ from __future__ import print_function
 from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class SequenceHelper(Component):
@@ -89,17 +90,27 @@ class SequenceHelper(Component):
             )
             return sequence_lengths.stack()
         elif get_backend() == "pytorch":
-            sequence_lengths = []
-            length = 0
-            for index in sequence_indices:
-                length += 1
-                if index == 1:
-                    sequence_lengths.append(length)
-                    length = 0
-            # Append final sequence.
-            if length > 0:
-                sequence_lengths.append(length)
-            return torch.tensor(sequence_lengths, dtype=torch.int32)
+            return self._sequence_lengths(sequence_indices == 1)
+
+    @staticmethod
+    def _sequence_lengths(sequence_ends):
+        """
+        Computes sub-sequence lengths from a boolean tensor marking the last element of each sub-sequence. A trailing
+        sub-sequence without end marker is included.
+
+        Args:
+            sequence_ends (torch.Tensor): Bool tensor, True for the last element of a sub-sequence.
+
+        Returns:
+            torch.Tensor: Sub-sequence lengths (int32).
+        """
+        num_elements = len(sequence_ends)
+        end_indices = torch.nonzero(sequence_ends).view(-1)
+        # Append final sequence.
+        if num_elements > 0 and (len(end_indices) == 0 or end_indices[-1] != num_elements - 1):
+            end_indices = torch.cat((end_indices, torch.tensor([num_elements - 1], dtype=end_indices.dtype)))
+        previous_end_indices = torch.cat((torch.tensor([-1], dtype=end_indices.dtype), end_indices[:-1]))
+        return (end_indices - previous_end_indices).int()
 
     @rlgraph_api(returns=2)
     def _graph_fn_calc_sequence_decays(self, sequence_indices, decay=0.9):
@@ -182,22 +193,17 @@ class SequenceHelper(Component):
             )
             return tf.stop_gradient(sequence_lengths.stack()), tf.stop_gradient(decays.stack())
         elif get_backend() == "pytorch":
-            sequence_lengths = []
-            decays = []
-
-            length = 0
-            for index in sequence_indices:
-                # Compute decay based on sequence length.
-                decays.append(pow(decay, length))
-                length += 1
-                if index == 1:
-                    sequence_lengths.append(length)
-                    length = 0
-
-            # Append final sequence.
-            if length > 0:
-                sequence_lengths.append(length)
-            return torch.tensor(sequence_lengths, dtype=torch.int32), torch.tensor(decays, dtype=torch.int32)
+            sequence_ends = sequence_indices == 1
+            num_elements = len(sequence_ends)
+            element_indices = torch.arange(num_elements)
+            # Each element's sub-sequence starts one after the last sequence end before it.
+            starts = torch.zeros(num_elements, dtype=torch.int64)
+            if num_elements > 1:
+                starts[1:] = torch.where(sequence_ends[:-1], element_indices[1:], starts[1:])
+                starts = torch.cummax(starts, dim=0)[0]
+            # Decay is based on the position within the sub-sequence, so val = decay^position.
+            decays = torch.pow(float(decay), (element_indices - starts).float())
+            return self._sequence_lengths(sequence_ends), decays
 
     @rlgraph_api
     def _graph_fn_reverse_apply_decays_to_sequence(self, values, sequence_indices, decay=0.9):
@@ -260,24 +266,22 @@ class SequenceHelper(Component):
             return tf.stop_gradient(decayed_values)
 
         elif get_backend() == "pytorch":
-            # Scan sequences in reverse:
-            decayed_values = []
-            i = len(values.data) - 1
-            prev_v = 0
-            for v in reversed(values.data):
-                # Arrived at new sequence, start over.
-                if sequence_indices[i] == 1:
-                    prev_v = 0
-
-                # Accumulate prior value.
-                accum_v = v + decay * prev_v
-                decayed_values.append(accum_v)
-                prev_v = accum_v
-
-                i -= 1
-
-            # Reverse, convert, and return final.
-            return torch.tensor(list(reversed(decayed_values)), dtype=torch.float32)
+            # Solves decayed[i] = values[i] + coefficients[i] * decayed[i + 1] for the whole batch with a
+            # parallel (log-step) scan, where the coefficient is 0 at sequence ends (the accumulation starts over).
+            decayed_values = values.detach().float()
+            coefficients = float(decay) * (sequence_indices != 1).float()
+            coefficients = coefficients.view((-1,) + (1,) * (decayed_values.dim() - 1))
+            num_values = len(decayed_values)
+            offset = 1
+            # After each step, (coefficients[i], decayed_values[i]) summarize the window [i, i + 2 * offset).
+            while offset < num_values:
+                decayed_values = torch.cat((
+                    decayed_values[:-offset] + coefficients[:-offset] * decayed_values[offset:],
+                    decayed_values[-offset:]
+                ))
+                coefficients = torch.cat((coefficients[:-offset] * coefficients[offset:], coefficients[-offset:]))
+                offset *= 2
+            return decayed_values
 
     @rlgraph_api
     def _graph_fn_bootstrap_values(self, rewards, values, terminals, sequence_indices, discount=0.99):
@@ -369,30 +373,27 @@ class SequenceHelper(Component):
             # Squeeze because we inserted
             return tf.squeeze(deltas)
         elif get_backend() == "pytorch":
-            deltas = []
-            discount_tensor = torch.tensor(discount)
-            start_index = 0
-            i = 0
-            if len(values) > 1:
-                last_sequence = torch.unsqueeze(sequence_indices[-1], -1)
-                sequence_indices = torch.cat((sequence_indices[:-1], torch.ones_like(last_sequence)), 0)
-
-            for _ in range(len(values)):
-                if sequence_indices[i]:
-                    # Compute deltas for this sub-sequence.
-                    # Cannot do this all at once because we would need the correct offsets for each sub-sequence.
-                    baseline_slice = list(values[start_index:i + 1])
-                    if terminals[i]:
-                        baseline_slice.append(0)
-                    else:
-                        baseline_slice.append(values[-1])
-                    adjusted_v = torch.tensor(baseline_slice)
-
-                    # +1 because we want to include i-th value.
-                    delta = rewards[start_index:i + 1] + discount_tensor * adjusted_v[1:] - adjusted_v[:-1]
-                    deltas.extend(delta)
-                    start_index = i + 1
-                i += 1
-
-            return torch.tensor(deltas)
+            num_values = len(values)
+            if num_values == 0:
+                return torch.zeros(0)
+            values = values.detach().float().reshape(num_values)
+            rewards = rewards.float().reshape(num_values)
+            sequence_ends = (sequence_indices != 0).reshape(num_values)
+            # Again ensure last index is 1 for any sub-sample arriving here.
+            if num_values > 1:
+                sequence_ends = torch.cat((sequence_ends[:-1], torch.ones(1, dtype=torch.bool)))
+
+            # Within a sub-sequence, the next value is the successor's value. At the end of a sub-sequence,
+            # boot-strap with 0 if terminal, otherwise with the last observed value.
+            next_values = torch.cat((values[1:], values[-1:]))
+            bootstrap_values = torch.where(
+                terminals.reshape(num_values) != 0, torch.zeros_like(values), values[-1].expand(num_values)
+            )
+            next_values = torch.where(sequence_ends, bootstrap_values, next_values)
+            deltas = rewards + float(discount) * next_values - values
+
+            # A single value without sequence end belongs to no complete sub-sequence.
+            if not sequence_ends[-1]:
+                return deltas[:0]
+            return deltas
 
@@ -21,12 +21,13 @@ from functools import partial
 
 from rlgraph import get_backend
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch.nn as nn
+    nn = lazy_import("torch.nn")
 
 
 def get_activation_function(activation_function=None, *other_parameters):
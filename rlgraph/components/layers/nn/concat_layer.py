@@ -21,11 +21,12 @@ from rlgraph import get_backend
 from rlgraph.components.layers.nn.nn_layer import NNLayer
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.util import force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class ConcatLayer(NNLayer):
@@ -22,12 +22,13 @@ from rlgraph.components.layers.nn.activation_functions import get_activation_fun
 from rlgraph.components.layers.nn.nn_layer import NNLayer
 from rlgraph.utils import PyTorchVariable
 from rlgraph.utils.initializer import Initializer
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch.nn as nn
-    from rlgraph.utils.pytorch_util import get_input_channels, SamePaddedConv2d
+    nn = lazy_import("torch.nn")
+    from rlgraph.utils.pytorch_util import get_input_channels
 
 
 class Conv2DLayer(NNLayer):
@@ -104,6 +105,7 @@ class Conv2DLayer(NNLayer):
             # ))
             if self.padding == "same":
                 # N.b. there is no 'same' or 'valid' padding for PyTorch so need custom layer.
+                from rlgraph.utils.pytorch_util import SamePaddedConv2d
                 self.layer = SamePaddedConv2d(
                     in_channels=num_channels,
                     out_channels=self.filters,
@@ -24,12 +24,13 @@ from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils import PyTorchVariable
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import DataOpTuple
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
-    import torch.nn as nn
+    torch = lazy_import("torch")
+    nn = lazy_import("torch.nn")
 
 
 class LSTMLayer(NNLayer):
@@ -19,11 +19,12 @@ from __future__ import print_function
 from rlgraph import get_backend
 from rlgraph.components.layers.nn.nn_layer import NNLayer
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch.nn as nn
+    nn = lazy_import("torch.nn")
 
 
 class MaxPool2DLayer(NNLayer):
@@ -17,6 +17,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from rlgraph.components.layers.preprocessing.atari_preprocess import AtariPreprocess
 from rlgraph.components.layers.preprocessing.clip import Clip
 from rlgraph.components.layers.preprocessing.concat import Concat
 from rlgraph.components.layers.preprocessing.container_splitter import ContainerSplitter
@@ -35,6 +36,7 @@ from rlgraph.components.layers.preprocessing.sequence import Sequence
 from rlgraph.components.layers.preprocessing.transpose import Transpose
 
 PreprocessLayer.__lookup_classes__ = dict(
+    ataripreprocess=AtariPreprocess,
     clip=Clip,
     concat=Concat,
     divide=Divide,
@@ -0,0 +1,232 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from multiprocessing.pool import ThreadPool
+
+import cv2
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph import get_backend
+from rlgraph.components.layers.preprocessing.preprocess_layer import PreprocessLayer
+from rlgraph.spaces import IntBox, FloatBox
+from rlgraph.utils import util
+from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
+
+cv2.ocl.setUseOpenCL(False)
+
+if get_backend() == "tf":
+    tf = lazy_import("tensorflow")
+elif get_backend() == "pytorch":
+    torch = lazy_import("torch")
+
+
+class AtariPreprocess(PreprocessLayer):
+    """
+    Fuses the standard Atari image preprocessing chain (crop, grayscale, resize, type conversion and scaling) into
+    one layer: A batch of (height x width x 3) RGB frames is processed image by image into preallocated buffers and
+    written into a single output batch, instead of each step allocating its own intermediate batch.
+    Gray-scaling happens before resizing, so only one color channel has to be resized.
+
+    Can replace e.g. `[image_crop, image_resize, grayscale, divide]` in a `preprocessing_spec`. Due to the
+    different order of gray-scaling and resizing, outputs may differ from such a chain by rounding errors.
+    """
+    def __init__(self, width, height, crop_x=0, crop_y=0, crop_width=None, crop_height=None, grayscale=True,
+                 weights=None, interpolation="area", dtype="float", divisor=255.0, num_threads=0,
+                 scope="atari-preprocess", **kwargs):
+        """
+        Args:
+            width (int): The width to resize to.
+            height (int): The height to resize to.
+            crop_x (int): Start x coordinate of the crop.
+            crop_y (int): Start y coordinate of the crop.
+            crop_width (Optional[int]): Width of the crop. Default: Full remaining width.
+            crop_height (Optional[int]): Height of the crop. Default: Full remaining height.
+            grayscale (bool): Whether to gray-scale the images (output keeps a color rank of dim=1).
+            weights (Optional[tuple,list]): RGB-weights for gray-scaling. Default: cv2's RGB-to-gray weights.
+            interpolation (str): One of "bilinear", "area". Default: "area".
+            dtype (str): The output data type, e.g. "float" or "uint8".
+            divisor (Optional[float]): Number to divide (float) outputs by, e.g. 255 to scale pixels to [0, 1].
+                Ignored for integer dtypes.
+            num_threads (int): If > 0, processes the images of a batch in a thread pool of this size (cv2 releases
+                the GIL).
+        """
+        super(AtariPreprocess, self).__init__(scope=scope, **kwargs)
+        self.width = width
+        self.height = height
+        self.crop_x = crop_x
+        self.crop_y = crop_y
+        self.crop_width = crop_width
+        self.crop_height = crop_height
+        self.grayscale = grayscale
+        self.weights = weights
+        self.dtype = dtype
+        self.num_threads = num_threads
+
+        assert self.crop_x >= 0 and self.crop_y >= 0
+
+        if interpolation == "bilinear":
+            if get_backend() == "tf":
+                self.tf_interpolation = tf.image.ResizeMethod.BILINEAR
+            self.cv2_interpolation = cv2.INTER_LINEAR
+        elif interpolation == "area":
+            if get_backend() == "tf":
+                self.tf_interpolation = tf.image.ResizeMethod.AREA
+            self.cv2_interpolation = cv2.INTER_AREA
+        else:
+            raise RLGraphError("Invalid interpolation algorithm {}!. Allowed are 'bilinear' and "
+                               "'area'.".format(interpolation))
+
+        self.np_dtype = util.convert_dtype(self.dtype, to="np")
+        self.is_float = np.issubdtype(self.np_dtype, np.floating)
+        self.scale = 1.0 / divisor if divisor is not None and self.is_float else None
+
+        # Preallocated per-image buffers for the gray-scaled and resized images (reallocated if the batch grows).
+        self.gray_buffer = None
+        self.resize_buffer = None
+        self.thread_pool = None
+
+        # The output spaces after preprocessing.
+        self.output_spaces = None
+
+    def check_input_spaces(self, input_spaces, action_space=None):
+        in_space = input_spaces["inputs"]
+        if in_space.rank != 3 or (self.grayscale is True and in_space.shape[-1] != 3):
+            raise RLGraphError(
+                "ERROR: AtariPreprocess requires images of shape (height, width, 3), but input Space is {}!".
+                format(in_space)
+            )
+
+    def get_preprocessed_space(self, space):
+        shape = (self.height, self.width, 1 if self.grayscale is True else space.shape[-1])
+        if self.is_float:
+            high = 1.0 if self.scale is not None else 255.0
+            return FloatBox(shape=shape, low=0.0, high=high, add_batch_rank=space.has_batch_rank)
+        return IntBox(low=0, high=256, shape=shape, dtype=self.dtype, add_batch_rank=space.has_batch_rank)
+
+    def create_variables(self, input_spaces, action_space=None):
+        in_space = input_spaces["inputs"]
+        self.output_spaces = self.get_preprocessed_space(in_space)
+        if self.num_threads > 0 and (self.backend == "python" or get_backend() == "python" or
+                                     get_backend() == "pytorch"):
+            # Do not leak the pool of a previous build.
+            self.terminate()
+            self.thread_pool = ThreadPool(self.num_threads)
+
+    def terminate(self):
+        """
+        Closes and joins the thread pool (if any).
+        """
+        if self.thread_pool is not None:
+            self.thread_pool.close()
+            self.thread_pool.join()
+            self.thread_pool = None
+
+    def __del__(self):
+        # `thread_pool` may not exist if the constructor raised.
+        if getattr(self, "thread_pool", None) is not None:
+            self.terminate()
+
+    @rlgraph_api
+    def _graph_fn_call(self, inputs):
+        """
+        Images come in with either a batch dimension or not.
+        """
+        if self.backend == "python" or get_backend() == "python":
+            return self._preprocess(np.asarray(inputs))
+        elif get_backend() == "pytorch":
+            if isinstance(inputs, list):
+                inputs = torch.tensor(inputs)
+            return torch.from_numpy(self._preprocess(inputs.numpy()))
+        elif get_backend() == "tf":
+            crop_height = self.crop_height or tf.shape(inputs)[-3] - self.crop_y
+            crop_width = self.crop_width or tf.shape(inputs)[-2] - self.crop_x
+            images = tf.image.crop_to_bounding_box(
+                image=inputs, offset_height=self.crop_y, offset_width=self.crop_x,
+                target_height=crop_height, target_width=crop_width
+            )
+            if self.grayscale is True:
+                weights = self.weights or (0.299, 0.587, 0.114)
+                images = tf.reduce_sum(
+                    tf.cast(images, dtype=tf.float32) * np.asarray(weights, dtype=np.float32), axis=-1, keepdims=True
+                )
+            images = tf.image.resize_images(
+                images=images, size=(self.height, self.width), method=self.tf_interpolation
+            )
+            if self.scale is not None:
+                images = images * self.scale
+            return tf.cast(images, dtype=util.convert_dtype(self.dtype, to="tf"))
+
+    def _preprocess(self, inputs):
+        """
+        Preprocesses a numpy image or batch of images with cv2.
+
+        Args:
+            inputs (np.ndarray): Single image (rank 3) or a batch of images (rank 4).
+
+        Returns:
+            np.ndarray: The preprocessed image(s).
+        """
+        has_batch_rank = inputs.ndim == 4
+        images = inputs if has_batch_rank else inputs[np.newaxis]
+        crop_height = self.crop_height or images.shape[1] - self.crop_y
+        crop_width = self.crop_width or images.shape[2] - self.crop_x
+        images = images[:, self.crop_y:self.crop_y + crop_height, self.crop_x:self.crop_x + crop_width]
+
+        batch_size = len(images)
+        num_channels = 1 if self.grayscale is True else images.shape[-1]
+        if self.gray_buffer is None or len(self.gray_buffer) < batch_size or \
+                self.gray_buffer.shape[1:3] != images.shape[1:3]:
+            self.gray_buffer = np.empty(images.shape[:3], dtype=images.dtype)
+            self.resize_buffer = np.empty(
+                (batch_size, self.height, self.width) + ((num_channels,) if num_channels > 1 else ()),
+                dtype=images.dtype
+            )
+        resized = self.resize_buffer[:batch_size]
+
+        def process(i):
+            image = images[i]
+            if self.grayscale is True:
+                if self.weights is None:
+                    image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=self.gray_buffer[i])
+                else:
+                    image = cv2.transform(image, np.asarray([self.weights], dtype=np.float32),
+                                          dst=self.gray_buffer[i])
+            cv2.resize(image, dsize=(self.width, self.height), dst=resized[i],
+                       interpolation=self.cv2_interpolation)
+
+        if self.thread_pool is not None and batch_size > 1:
+            self.thread_pool.map(process, range_(batch_size))
+        else:
+            for i in range_(batch_size):
+                process(i)
+
+        # One (new) output batch, as downstream components may keep references to their inputs.
+        out = np.empty((batch_size, self.height, self.width, num_channels), dtype=self.np_dtype)
+        resized = np.reshape(resized, out.shape)
+        if self.scale is not None:
+            np.multiply(resized, self.scale, out=out, casting="unsafe")
+        else:
+            np.copyto(out, resized, casting="unsafe")
+
+        if has_batch_rank is False:
+            out = out[0]
+        return out
@@ -20,11 +20,12 @@ from __future__ import print_function
 from rlgraph import get_backend
 from rlgraph.components.layers.preprocessing.preprocess_layer import PreprocessLayer
 from rlgraph.utils.util import force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch.nn as nn
+    nn = lazy_import("torch.nn")
 
 
 class Concat(PreprocessLayer):
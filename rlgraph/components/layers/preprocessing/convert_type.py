@@ -26,11 +26,12 @@ from rlgraph.spaces.space_utils import get_space_from_op
 from rlgraph.utils import util
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class ConvertType(PreprocessLayer):
@@ -26,14 +26,14 @@ from rlgraph.components.layers.preprocessing.preprocess_layer import PreprocessL
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import unflatten_op
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 cv2.ocl.setUseOpenCL(False)
 
 if get_backend() == "tf":
-    import tensorflow as tf
-    from tensorflow.python.ops.image_ops_impl import ResizeMethod
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class ImageResize(PreprocessLayer):
@@ -54,13 +54,13 @@ class ImageResize(PreprocessLayer):
         
         if interpolation == "bilinear":
             if get_backend() == "tf":
-                self.tf_interpolation = ResizeMethod.BILINEAR
+                self.tf_interpolation = tf.image.ResizeMethod.BILINEAR
                 # All other backends use cv2 currently.
             # Sometimes we mix python preprocessor stack with tf backend -> always need this.
             self.cv2_interpolation = cv2.INTER_LINEAR
         elif interpolation == "area":
             if get_backend() == "tf":
-                self.tf_interpolation = ResizeMethod.AREA
+                self.tf_interpolation = tf.image.ResizeMethod.AREA
             self.cv2_interpolation = cv2.INTER_AREA
         else:
             raise RLGraphError("Invalid interpolation algorithm {}!. Allowed are 'bilinear' and "
@@ -118,54 +118,43 @@ class ImageResize(PreprocessLayer):
         if self.backend == "python" or get_backend() == "python":
             if isinstance(inputs, list):
                 inputs = np.asarray(inputs)
-            had_single_color_dim = (inputs.shape[-1] == 1)
-            # Batch of samples.
-            if inputs.ndim == 4:
-                resized = []
-                for i in range_(len(inputs)):
-                    resized.append(cv2.resize(
-                        inputs[i], dsize=(self.width, self.height), interpolation=self.cv2_interpolation)
-                    )
-                resized = np.asarray(resized)
-            # Single sample.
-            else:
-                resized = cv2.resize(
-                    inputs, dsize=(self.width, self.height), interpolation=self.cv2_interpolation
-                )
-
-            # cv2.resize removes the color rank, if its dimension is 1 (e.g. grayscale), add it back here.
-            if had_single_color_dim is True:
-                resized = np.expand_dims(resized, axis=-1)
-
-            return resized
+            return self._resize(inputs)
         elif get_backend() == "pytorch":
             if isinstance(inputs, list):
                 inputs = torch.tensor(inputs)
-
-            had_single_color_dim = (inputs.shape[-1] == 1)
-            # Batch of samples.
-            if len(inputs.shape) == 4:
-                resized = []
-                for i in range_(len(inputs)):
-                    # Get numpy array.
-                    resized.append(cv2.resize(
-                        inputs[i].numpy(), dsize=(self.width, self.height),
-                        interpolation=self.cv2_interpolation)
-                    )
-                resized = torch.tensor(resized)
-            # Single sample.
-            else:
-                resized = cv2.resize(
-                    inputs.numpy(), dsize=(self.width, self.height), interpolation=self.cv2_interpolation
-                )
-
-            # cv2.resize removes the color rank, if its dimension is 1 (e.g. grayscale), add it back here.
-            if had_single_color_dim is True:
-                resized = torch.unsqueeze(resized, dim=-1)
-
-            return resized
+            return torch.from_numpy(self._resize(inputs.numpy()))
         elif get_backend() == "tf":
             return tf.image.resize_images(
                 images=inputs, size=(self.width, self.height), method=self.tf_interpolation
             )
 
+    def _resize(self, inputs):
+        """
+        Resizes a numpy image or batch of images with cv2. Batches are resized image by image directly into one
+        preallocated output array.
+
+        Args:
+            inputs (np.ndarray): Single image (rank 2 or 3) or a batch of images (rank 4).
+
+        Returns:
+            np.ndarray: The resized image(s).
+        """
+        # Batch of samples.
+        if inputs.ndim == 4:
+            resized = np.empty(
+                shape=(len(inputs), self.height, self.width) + inputs.shape[3:], dtype=inputs.dtype
+            )
+            # cv2.resize works on (and removes) a color rank of dimension 1 (e.g. grayscale) as 2D image.
+            images = inputs[:, :, :, 0] if inputs.shape[-1] == 1 else inputs
+            resized_images = resized[:, :, :, 0] if inputs.shape[-1] == 1 else resized
+            for i in range_(len(inputs)):
+                cv2.resize(images[i], dsize=(self.width, self.height), dst=resized_images[i],
+                           interpolation=self.cv2_interpolation)
+            return resized
+        # Single sample.
+        else:
+            resized = cv2.resize(inputs, dsize=(self.width, self.height), interpolation=self.cv2_interpolation)
+            # cv2.resize removes the color rank, if its dimension is 1 (e.g. grayscale), add it back here.
+            if inputs.ndim == 3 and inputs.shape[-1] == 1:
+                resized = np.expand_dims(resized, axis=-1)
+            return resized
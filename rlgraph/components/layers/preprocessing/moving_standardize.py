@@ -23,25 +23,37 @@ from rlgraph import get_backend
 from rlgraph.components.layers.preprocessing.preprocess_layer import PreprocessLayer
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.util import SMALL_NUMBER
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class MovingStandardize(PreprocessLayer):
     """
     Standardizes inputs using a moving estimate of mean and std.
+
+    For the python backend, each batch slot keeps its own estimates (one slot per environment if `batch_size` > 1,
+    see `reset_slots`). With `batch_size`=1, each incoming batch of N samples is merged into the estimates at once
+    via the parallel variance formula (Chan et al.), counting as N samples. Resetting the layer (or some of its
+    slots) drops the estimates back to the last ones set via `set_statistics` (or to zero). The statistics of all
+    samples seen can be exported (`get_statistics`), combined (`merge_statistics`) and set (`set_statistics`), e.g. to
+    keep them consistent across distributed workers.
     """
     def __init__(self, batch_size=1, scope="moving-standardize", **kwargs):
         """
         Args:
-            batch_size (int): Number of samples processed per step.
+            batch_size (int): Number of samples processed per step. Each batch slot keeps its own estimates (and,
+                for the python backend, its own sample count, so slots can be reset individually).
         """
         super(MovingStandardize, self).__init__(scope=scope, **kwargs)
         self.batch_size = batch_size
         self.sample_count = None
+        # The estimates of the last `set_statistics` call and of all samples seen since (python backend).
+        self.synced_statistics = None
+        self.new_statistics = None
 
         # Current estimate of state mean.
         self.mean_est = None
@@ -57,7 +69,7 @@ class MovingStandardize(PreprocessLayer):
         self.in_shape = (self.batch_size, ) + in_space.shape
 
         if self.backend == "python" or get_backend() == "python" or get_backend() == "pytorch":
-            self.sample_count = 0.0
+            self.sample_count = np.zeros(shape=(self.batch_size,), dtype=np.float32)
             self.mean_est = np.zeros(self.in_shape, dtype=np.float32)
             self.std_sum_est = np.zeros(self.in_shape, dtype=np.float32)
         elif get_backend() == "tf":
@@ -80,36 +92,139 @@ class MovingStandardize(PreprocessLayer):
     @rlgraph_api
     def _graph_fn_reset(self):
         if self.backend == "python" or get_backend() == "python" or get_backend() == "pytorch":
-            self.sample_count = 0.0
-            self.mean_est = np.zeros(self.in_shape)
-            self.std_sum_est = np.zeros(self.in_shape)
+            self.reset_slots(slice(None))
         elif get_backend() == "tf":
             return tf.variables_initializer([self.sample_count, self.mean_est, self.std_sum_est])
 
+    def reset_slots(self, slots):
+        """
+        Drops the estimates of the given batch slots back to the last synced ones (zero if never synced).
+        """
+        if self.synced_statistics is None:
+            self.sample_count[slots] = 0.0
+            self.mean_est[slots] = 0.0
+            self.std_sum_est[slots] = 0.0
+        else:
+            self.sample_count[slots] = self.synced_statistics["count"]
+            self.mean_est[slots] = self.synced_statistics["mean"]
+            self.std_sum_est[slots] = self.synced_statistics["std_sum"]
+
+    def get_statistics(self, only_new=False):
+        """
+        Exports the estimates over all samples seen (python backend only), independent of episode resets.
+
+        Args:
+            only_new (bool): Whether to only export the estimates of the samples seen since the last
+                `set_statistics` call (e.g. to be merged into globally kept estimates without counting samples twice).
+
+        Returns:
+            dict: Keys "count", "mean" and "std_sum" (sum of squared deviations from the mean).
+        """
+        if only_new is True:
+            statistics = self.new_statistics
+        else:
+            statistics = self.merge_statistics(self.synced_statistics, self.new_statistics)
+        if statistics is None:
+            shape = (1,) + self.in_shape[1:]
+            return dict(count=0.0, mean=np.zeros(shape, dtype=np.float32), std_sum=np.zeros(shape, dtype=np.float32))
+        return dict(count=statistics["count"], mean=np.copy(statistics["mean"]), std_sum=np.copy(statistics["std_sum"]))
+
+    def set_statistics(self, statistics):
+        """
+        Replaces the estimates of all slots (python backend only), e.g. with ones merged from many workers.
+
+        Args:
+            statistics (dict): Estimates as returned by `get_statistics` or `merge_statistics`.
+        """
+        shape = (1,) + self.in_shape[1:]
+        self.synced_statistics = dict(
+            count=float(statistics["count"]),
+            mean=np.reshape(np.asarray(statistics["mean"], dtype=np.float32), shape),
+            std_sum=np.reshape(np.asarray(statistics["std_sum"], dtype=np.float32), shape)
+        )
+        self.new_statistics = None
+        self.reset_slots(slice(None))
+
+    @staticmethod
+    def merge_statistics(*statistics):
+        """
+        Combines several estimates (as returned by `get_statistics`) into the estimates over all their samples.
+
+        Args:
+            *statistics (dict): The estimates to combine. None values are ignored.
+
+        Returns:
+            Optional[dict]: The combined estimates or None if no estimates were given.
+        """
+        merged = None
+        for stats in statistics:
+            if stats is None:
+                continue
+            elif merged is None:
+                merged = dict(count=stats["count"], mean=stats["mean"], std_sum=stats["std_sum"])
+            else:
+                merged = MovingStandardize._merge_moments(
+                    merged["count"], merged["mean"], merged["std_sum"], stats["count"], stats["mean"],
+                    stats["std_sum"]
+                )
+        return merged
+
+    @staticmethod
+    def _merge_moments(count_a, mean_a, std_sum_a, count_b, mean_b, std_sum_b):
+        # https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Parallel_algorithm
+        # Counts may be arrays (one per slot), broadcastable against the moments.
+        count = count_a + count_b
+        delta = mean_b - mean_a
+        # Both counts 0: Keep the (zero) moments.
+        safe_count = np.maximum(count, 1.0)
+        mean = mean_a + delta * (count_b / safe_count)
+        std_sum = std_sum_a + std_sum_b + np.square(delta) * (count_a * count_b / safe_count)
+        return dict(count=count, mean=mean, std_sum=std_sum)
+
+    @staticmethod
+    def _get_moments(batch, axis):
+        batch_mean = np.mean(batch, axis=axis)
+        std_sum = np.sum(np.square(batch - np.expand_dims(batch_mean, axis)), axis=axis)
+        return batch_mean, std_sum
+
     @rlgraph_api
     def _graph_fn_call(self, inputs):
         if self.backend == "python" or get_backend() == "python" or get_backend() == "pytorch":
-            # https://www.johndcook.com/blog/standard_deviation/
             inputs = np.asarray(inputs, dtype=np.float32)
-            self.sample_count += 1.0
-            if self.sample_count == 1.0:
-                self.mean_est[...] = inputs
-            else:
-                update = inputs - self.mean_est
-                self.mean_est[...] += update / self.sample_count
-                self.std_sum_est[...] += update * update * (self.sample_count - 1.0) / self.sample_count
+            # One sample per slot or - with a single slot - the whole batch (or a single sample w/o batch rank).
+            slot_batches = np.reshape(inputs, newshape=(self.batch_size, -1) + self.in_shape[1:])
+            num_samples = slot_batches.shape[1]
+            # Per-slot counts, broadcastable against the estimates.
+            count_shape = (self.batch_size,) + (1,) * (len(self.in_shape) - 1)
+
+            # Merge the moments of each slot's samples at once.
+            batch_mean, batch_std_sum = self._get_moments(slot_batches, axis=1)
+            merged = self._merge_moments(
+                np.reshape(self.sample_count, count_shape), self.mean_est, self.std_sum_est,
+                float(num_samples), batch_mean, batch_std_sum
+            )
+            self.sample_count = np.reshape(merged["count"], (self.batch_size,)).astype(np.float32)
+            self.mean_est = merged["mean"].astype(np.float32)
+            self.std_sum_est = merged["std_sum"].astype(np.float32)
+
+            # Keep track of all samples since the last sync (over all slots, across resets).
+            flat_batch = np.reshape(slot_batches, newshape=(-1,) + self.in_shape[1:])
+            new_mean, new_std_sum = self._get_moments(flat_batch[np.newaxis], axis=1)
+            self.new_statistics = self.merge_statistics(
+                self.new_statistics, dict(count=float(len(flat_batch)), mean=new_mean, std_sum=new_std_sum)
+            )
 
             # Subtract mean.
-            result = inputs - self.mean_est
+            result = slot_batches - self.mean_est[:, np.newaxis]
 
             # Estimate variance via sum of variance.
-            if self.sample_count > 1.0:
-                var_estimate = self.std_sum_est / (self.sample_count - 1.0)
-            else:
-                var_estimate = np.square(self.mean_est)
-            std = np.sqrt(var_estimate) + SMALL_NUMBER
+            count = np.reshape(self.sample_count, count_shape)
+            var_estimate = np.where(
+                count > 1.0, self.std_sum_est / np.maximum(count - 1.0, 1.0), np.square(self.mean_est)
+            )
+            std = np.sqrt(var_estimate)[:, np.newaxis] + SMALL_NUMBER
 
-            standardized = result / std
+            standardized = np.reshape(result / std, inputs.shape)
             if get_backend() == "pytorch":
                 standardized = torch.Tensor(standardized)
             return standardized
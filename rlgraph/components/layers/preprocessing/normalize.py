@@ -22,11 +22,12 @@ from rlgraph.components.layers.preprocessing.preprocess_layer import PreprocessL
 from rlgraph.spaces import Space
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.util import SMALL_NUMBER
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Normalize(PreprocessLayer):
@@ -20,9 +20,10 @@ from __future__ import print_function
 from rlgraph import get_backend
 from rlgraph.components.layers.layer import Layer
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class PreprocessLayer(Layer):
@@ -48,6 +49,53 @@ class PreprocessLayer(Layer):
         # TODO: fix for python backend.
         return
 
+    def reset_slots(self, slots):
+        """
+        Resets the state of only some batch slots, e.g. of those environments whose episodes just ended when this
+        layer processes the states of several environments at once. Only supported for the python backend.
+        Stateless PreprocessLayers do not need to override this.
+
+        Args:
+            slots (Union[int,List[int]]): The batch slot(s) to reset.
+        """
+        pass
+
+    def get_statistics(self, only_new=False):
+        """
+        Exports running statistics this layer estimates from its inputs (python backend only), e.g. to merge them
+        across workers. Layers without such statistics do not need to override this.
+
+        Args:
+            only_new (bool): Whether to only export statistics of inputs seen since the last `set_statistics` call.
+
+        Returns:
+            Optional[dict]: The statistics or None if this layer does not keep any.
+        """
+        return None
+
+    def set_statistics(self, statistics):
+        """
+        Replaces the running statistics of this layer (see `get_statistics`).
+
+        Args:
+            statistics (dict): The statistics to use from now on.
+        """
+        pass
+
+    @staticmethod
+    def merge_statistics(*statistics):
+        """
+        Combines several statistics of this layer type (as returned by `get_statistics`), e.g. of the same layer on
+        different workers.
+
+        Args:
+            *statistics (dict): The statistics to combine. None values are ignored.
+
+        Returns:
+            Optional[dict]: The combined statistics or None if this layer does not keep any.
+        """
+        return None
+
     @rlgraph_api(flatten_ops=True, split_ops=True)
     def _graph_fn_call(self, *inputs):
         return super(PreprocessLayer, self)._graph_fn_call(*inputs)
@@ -27,11 +27,12 @@ from rlgraph.utils import pytorch_one_hot
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.numpy import one_hot
 from rlgraph.utils.ops import unflatten_op, FLATTEN_SCOPE_PREFIX
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class ReShape(PreprocessLayer):
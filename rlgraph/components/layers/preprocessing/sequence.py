@@ -17,8 +17,6 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-from collections import deque
-
 import numpy as np
 from six.moves import xrange as range_
 
@@ -28,11 +26,12 @@ from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import FlattenedDataOp, unflatten_op
 from rlgraph.utils.util import get_rank, force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Sequence(PreprocessLayer):
@@ -79,7 +78,15 @@ class Sequence(PreprocessLayer):
         # The output spaces after preprocessing (per flat-key).
         self.output_spaces = None
         if self.backend == "python" or get_backend() == "python" or get_backend() == "pytorch":
-            self.deque = deque([], maxlen=self.sequence_length)
+            # Preallocated ring buffers (per flat-key) holding the last `sequence_length` inputs.
+            self.ring_buffers = {}
+            # The time-ordered (oldest to newest) ring positions for each possible index (newest position).
+            self.ring_orders = [
+                (index + 1 + np.arange(self.sequence_length)) % self.sequence_length
+                for index in range_(self.sequence_length)
+            ]
+            # Batch slots whose sequences must be re-filled with their next input (see `reset_slots`).
+            self.slots_to_refill = []
 
     def get_preprocessed_space(self, space):
         ret = {}
@@ -122,9 +129,17 @@ class Sequence(PreprocessLayer):
     def _graph_fn_reset(self):
         if self.backend == "python" or get_backend() == "python" or get_backend() == "pytorch":
             self.index = -1
+            self.slots_to_refill = []
         elif get_backend() == "tf":
             return tf.variables_initializer([self.index])
 
+    def reset_slots(self, slots):
+        """
+        The sequences of the given batch slots are re-filled with `sequence_length` x their next input (like after
+        a full reset), while all other slots keep their history.
+        """
+        self.slots_to_refill.extend(force_list(slots))
+
     @rlgraph_api(flatten_ops=True, split_ops=False)
     def _graph_fn_call(self, inputs):
         """
@@ -139,65 +154,17 @@ class Sequence(PreprocessLayer):
         Returns:
             FlattenedDataOp: The FlattenedDataOp holding the sequenced SingleDataOps as values.
         """
-        # A normal (index != -1) assign op.
         if self.backend == "python" or get_backend() == "python":
-            if self.index == -1:
-                for _ in range_(self.sequence_length):
-                    self.deque.append(inputs)
-            else:
-                self.deque.append(inputs)
-            self.index = (self.index + 1) % self.sequence_length
-
-            if self.add_rank:
-                sequence = np.stack(self.deque, axis=-1)
-            # Concat the sequence items in the last rank.
-            else:
-                sequence = np.concatenate(self.deque, axis=-1)
-
-            # TODO move into transpose component.
-            if self.in_data_format == "channels_last" and self.out_data_format == "channels_first":
-                sequence = sequence.transpose((0, 3, 2, 1))
-
-            return sequence
+            if isinstance(inputs, dict):
+                return self._sequence_via_ring_buffers(inputs)
+            return self._sequence_via_ring_buffers({"": inputs})[""]
         elif get_backend() == "pytorch":
-            if self.index == -1:
-                for _ in range_(self.sequence_length):
-                    if isinstance(inputs, dict):
-                        for key, value in inputs.items():
-                            self.deque.append(value)
-                    else:
-                        self.deque.append(inputs)
-            else:
-                if isinstance(inputs, dict):
-                    for key, value in inputs.items():
-                        self.deque.append(value)
-                        self.index = (self.index + 1) % self.sequence_length
-                else:
-                    self.deque.append(inputs)
-                    self.index = (self.index + 1) % self.sequence_length
-
-            if self.add_rank:
-                sequence = torch.stack(torch.tensor(self.deque), dim=-1)
-            # Concat the sequence items in the last rank.
-            else:
-                data = []
-                for t in self.deque:
-                    if isinstance(t, torch.Tensor):
-                        data.append(t)
-                    else:
-                        data.append(torch.tensor(t))
-                sequence = torch.cat(data, dim=-1)
-
-            # TODO remove when transpose component implemented.
-            if self.in_data_format == "channels_last" and self.out_data_format == "channels_first":
-                # Problem: PyTorch does not have data format options in conv layers ->
-                # only channels first supported.
-                # -> Confusingly have to transpose.
-                # B W H C -> B C W H
-                # e.g. atari: [4 84 84 4] -> [4 4 84 84]
-                sequence = sequence.permute(0, 3, 2, 1)
-
-            return sequence
+            if isinstance(inputs, dict):
+                sequences = self._sequence_via_ring_buffers(inputs)
+                if len(sequences) == 1:
+                    return torch.from_numpy(next(iter(sequences.values())))
+                return {key: torch.from_numpy(sequence) for key, sequence in sequences.items()}
+            return torch.from_numpy(self._sequence_via_ring_buffers({"": inputs})[""])
         elif get_backend() == "tf":
             # Assigns the input_ into the buffer at the current time index.
             def normal_assign():
@@ -253,3 +220,61 @@ class Sequence(PreprocessLayer):
             # TODO implement transpose
                 return sequences
 
+    def _sequence_via_ring_buffers(self, inputs):
+        """
+        Python/PyTorch implementation of `call`: Copies each input into its (preallocated) ring buffer and gathers
+        the sequence (oldest to newest) with a single `np.take` along the ring's time axis.
+
+        Args:
+            inputs (Dict[str,any]): The inputs (arrays or tensors) by flat-key.
+
+        Returns:
+            Dict[str,np.ndarray]: The sequences by flat-key.
+        """
+        # After a reset (index is -1), the buffers are filled entirely with `sequence_length` x the input.
+        fill = self.index == -1
+        self.index = 0 if fill else (self.index + 1) % self.sequence_length
+
+        sequences = {}
+        for key, value in inputs.items():
+            if get_backend() == "pytorch" and isinstance(value, torch.Tensor):
+                value = value.detach().cpu().numpy()
+            value = np.asarray(value)
+            # Time-major ring if a rank is added, otherwise time right before the last rank, so the gathered
+            # sequence's last two ranks can be merged into the concatenated one without a copy.
+            time_axis = 0 if self.add_rank else value.ndim - 1
+            ring_shape = value.shape[:time_axis] + (self.sequence_length,) + value.shape[time_axis:]
+            ring_buffer = self.ring_buffers.get(key)
+            # (Re)allocate only if the input shape changed (inputs of other dtypes are cast into the buffer).
+            if ring_buffer is None or ring_buffer.shape != ring_shape:
+                ring_buffer = self.ring_buffers[key] = np.empty(ring_shape, dtype=value.dtype)
+                fill = True
+            time_major = ring_buffer if time_axis == 0 else np.moveaxis(ring_buffer, time_axis, 0)
+
+            if fill:
+                time_major[:] = value
+            else:
+                time_major[self.index] = value
+                if len(self.slots_to_refill) > 0:
+                    time_major[:, self.slots_to_refill] = value[self.slots_to_refill]
+
+            sequence = np.take(ring_buffer, self.ring_orders[self.index], axis=time_axis)
+            # Add the sequence-rank to the end of our inputs (as a view).
+            if self.add_rank:
+                sequence = np.moveaxis(sequence, 0, -1)
+            # Concat the sequence items in the last rank.
+            else:
+                sequence = np.reshape(sequence, value.shape[:-1] + (-1,))
+
+            # TODO move into transpose component.
+            if self.in_data_format == "channels_last" and self.out_data_format == "channels_first":
+                # Problem: PyTorch does not have data format options in conv layers ->
+                # only channels first supported.
+                # -> Confusingly have to transpose.
+                # B W H C -> B C W H
+                # e.g. atari: [4 84 84 4] -> [4 4 84 84]
+                sequence = sequence.transpose((0, 3, 2, 1))
+            sequences[key] = sequence
+        self.slots_to_refill = []
+
+        return sequences
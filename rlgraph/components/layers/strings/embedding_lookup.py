@@ -23,9 +23,10 @@ from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.initializer import Initializer
 from rlgraph.utils.util import convert_dtype
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class EmbeddingLookup(Layer):
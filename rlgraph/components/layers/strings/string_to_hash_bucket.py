@@ -22,9 +22,10 @@ from rlgraph.components.layers.strings.string_layer import StringLayer
 from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.util import convert_dtype as dtype_
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class StringToHashBucket(StringLayer):
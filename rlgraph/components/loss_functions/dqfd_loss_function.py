@@ -21,9 +21,10 @@ from rlgraph import get_backend
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.components.loss_functions.dqn_loss_function import DQNLossFunction
 from rlgraph.utils.util import get_rank
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class DQFDLossFunction(DQNLossFunction):
@@ -27,11 +27,12 @@ from rlgraph.utils import pytorch_one_hot
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.pytorch_util import pytorch_tile
 from rlgraph.utils.util import get_rank
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class DQNLossFunction(LossFunction):
@@ -21,11 +21,12 @@ from rlgraph import get_backend
 from rlgraph.components import Component
 from rlgraph.spaces import ContainerSpace
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class LossFunction(Component):
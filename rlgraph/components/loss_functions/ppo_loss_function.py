@@ -21,11 +21,12 @@ from rlgraph import get_backend
 from rlgraph.components.loss_functions import LossFunction
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.util import get_rank
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class PPOLossFunction(LossFunction):
@@ -21,9 +21,10 @@ from rlgraph import get_backend
 from rlgraph.components.loss_functions.loss_function import LossFunction
 from rlgraph.spaces.space_utils import sanity_check_space
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class SACLossFunction(LossFunction):
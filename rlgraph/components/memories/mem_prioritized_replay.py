@@ -19,7 +19,6 @@ from __future__ import print_function
 
 import numpy as np
 import operator
-from six.moves import xrange as range_
 
 from rlgraph import get_backend
 from rlgraph.utils import util, DataOpDict
@@ -28,9 +27,10 @@ from rlgraph.utils.util import SMALL_NUMBER, get_rank
 from rlgraph.components.memories.memory import Memory
 from rlgraph.components.helpers.mem_segment_tree import MemSegmentTree, MinSumSegmentTree
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class MemPrioritizedReplay(Memory):
@@ -40,10 +40,12 @@ class MemPrioritizedReplay(Memory):
     API:
         update_records(indices, update) -> Updates the given indices with the given priority scores.
     """
-    def __init__(self, capacity=1000, next_states=True, alpha=1.0, beta=0.0):
-        super(MemPrioritizedReplay, self).__init__()
+    def __init__(self, capacity=1000, next_states=True, alpha=1.0, beta=0.0, observation_store_spec=None,
+                 preallocate_buffers=False):
+        super(MemPrioritizedReplay, self).__init__(
+            observation_store_spec=observation_store_spec, preallocate_buffers=preallocate_buffers
+        )
 
-        self.memory_values = []
         self.index = 0
         self.capacity = capacity
 
@@ -62,9 +64,9 @@ class MemPrioritizedReplay(Memory):
             self.priority_capacity *= 2
 
         # Create segment trees, initialize with neutral elements.
-        sum_values = [0.0 for _ in range_(2 * self.priority_capacity)]
+        sum_values = np.zeros(shape=(2 * self.priority_capacity,), dtype=np.float64)
         sum_segment_tree = MemSegmentTree(sum_values, self.priority_capacity, operator.add)
-        min_values = [float('inf') for _ in range_(2 * self.priority_capacity)]
+        min_values = np.full(shape=(2 * self.priority_capacity,), fill_value=float('inf'), dtype=np.float64)
         min_segment_tree = MemSegmentTree(min_values, self.priority_capacity, min)
 
         self.merged_segment_tree = MinSumSegmentTree(
@@ -78,26 +80,15 @@ class MemPrioritizedReplay(Memory):
         if records is None or get_rank(records[self.terminal_key]) == 0:
             return
         num_records = len(records[self.terminal_key])
+        if self.observation_store is not None:
+            self._insert_into_observation_store(records)
 
+        insert_indices = np.arange(start=self.index, stop=self.index + num_records) % self.capacity
         if num_records == 1:
-            if self.index >= self.size:
-                self.memory_values.append(records)
-            else:
-                self.memory_values[self.index] = records
             self.merged_segment_tree.insert(self.index, self.default_new_weight)
         else:
-            insert_indices = np.arange(start=self.index, stop=self.index + num_records) % self.capacity
-            i = 0
-            for insert_index in insert_indices:
-                self.merged_segment_tree.insert(insert_index, self.default_new_weight)
-                record = {}
-                for name, record_values in records.items():
-                    record[name] = record_values[i]
-                if insert_index >= self.size:
-                    self.memory_values.append(record)
-                else:
-                    self.memory_values[insert_index] = record
-                i += 1
+            self.merged_segment_tree.insert_batch(insert_indices, self.default_new_weight)
+        self._write_records(insert_indices, records)
 
         # Update indices
         self.index = (self.index + num_records) % self.capacity
@@ -106,41 +97,35 @@ class MemPrioritizedReplay(Memory):
     @rlgraph_api
     def _graph_fn_get_records(self, num_records=1):
         available_records = min(num_records, self.size)
-        indices = []
-        prob_sum = self.merged_segment_tree.sum_segment_tree.get_sum(0, self.size - 1)
+        sum_segment_tree = self.merged_segment_tree.sum_segment_tree
+        prob_sum = sum_segment_tree.get_sum(0, self.size - 1)
         samples = np.random.random(size=(available_records,)) * prob_sum
-        for sample in samples:
-            indices.append(self.merged_segment_tree.sum_segment_tree.index_of_prefixsum(prefix_sum=sample))
+        indices = sum_segment_tree.find_prefixsum_indices(samples)
 
-        sum_prob = self.merged_segment_tree.sum_segment_tree.get_sum() + SMALL_NUMBER
+        sum_prob = sum_segment_tree.get_sum() + SMALL_NUMBER
         min_prob = self.merged_segment_tree.min_segment_tree.get_min_value() / sum_prob
         max_weight = (min_prob * self.size) ** (-self.beta)
-        weights = []
-        for index in indices:
-            sample_prob = self.merged_segment_tree.sum_segment_tree.get(index) / sum_prob
-            weight = (sample_prob * self.size) ** (-self.beta)
-            weights.append(weight / max_weight)
+        sample_probs = sum_segment_tree.get_batch(indices) / sum_prob
+        weights = (sample_probs * self.size) ** (-self.beta) / max_weight
 
         if get_backend() == "pytorch":
-            indices = torch.tensor(indices)
-            weights = torch.tensor(weights)
-        else:
-            indices = np.asarray(indices)
-            weights = np.asarray(weights)
+            indices = torch.from_numpy(indices)
+            weights = torch.from_numpy(weights.astype(np.float32))
 
         records = DataOpDict()
         for name, variable in self.memory.items():
             records[name] = self.read_variable(variable, indices, dtype=
             util.convert_dtype(self.flat_record_space[name].dtype, to="pytorch"))
+        if self.observation_store is not None:
+            records.update(self._read_from_observation_store(indices))
         records = define_by_run_unflatten(records)
         return records, indices, weights
 
     @rlgraph_api(must_be_complete=False)
     def _graph_fn_update_records(self, indices, update):
-        for index, loss in zip(indices, update):
-            priority = np.power(loss, self.alpha)
-            self.merged_segment_tree.insert(index, priority)
-            self.max_priority = max(self.max_priority, priority)
+        priorities = np.power(np.asarray(update), self.alpha)
+        self.merged_segment_tree.insert_batch(np.asarray(indices), priorities)
+        self.max_priority = max(self.max_priority, np.max(priorities))
 
     def get_state(self):
         return {
@@ -17,10 +17,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import numpy as np
+
+from rlgraph import get_backend
 from rlgraph.utils.ops import FLATTEN_SCOPE_PREFIX
 
 from rlgraph.components.component import Component, rlgraph_api
-from rlgraph.utils import FlattenedDataOp
+from rlgraph.components.helpers.observation_store import ObservationStore
+from rlgraph.spaces.space_utils import get_list_registry
+from rlgraph.utils import FlattenedDataOp, util
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
+
+if get_backend() == "pytorch":
+    torch = lazy_import("torch")
 
 
 class Memory(Component):
@@ -31,10 +41,19 @@ class Memory(Component):
         insert_records(records) -> Triggers an insertion of records into the memory.
         get_records(num_records) -> Returns `num_records` records from the memory.
     """
-    def __init__(self, capacity=1000, scope="memory", **kwargs):
+    def __init__(self, capacity=1000, scope="memory", observation_store_spec=None, preallocate_buffers=False,
+                 **kwargs):
         """
         Args:
             capacity (int): Maximum capacity of the memory.
+            observation_store_spec (Optional[dict]): If given, the memory keeps its states and next_states
+                frame-deduplicated in an `ObservationStore` constructed with these args (e.g. `sequence_length`,
+                `stack_axis`, `add_rank`) instead of storing every stacked observation twice. Only supported by
+                the python/PyTorch memories that store next_states.
+            preallocate_buffers (bool): PyTorch only. If True, stores each flat record key in a contiguous,
+                preallocated numpy buffer instead of a list, so records are written and read with a single
+                fancy-index per key. Has no effect for TF (variables are already contiguous).
+                Default: False.
         """
         super(Memory, self).__init__(scope=scope, **kwargs)
 
@@ -49,22 +68,86 @@ class Memory(Component):
         # Use this to get batch size.
         self.terminal_key = FLATTEN_SCOPE_PREFIX + "terminals"
 
+        self.preallocate_buffers = preallocate_buffers
+        self.observation_store_spec = observation_store_spec
+        self.observation_store = None
+        self.states_key = FLATTEN_SCOPE_PREFIX + "states"
+        self.next_states_key = FLATTEN_SCOPE_PREFIX + "next_states"
+
     def create_variables(self, input_spaces, action_space=None):
         # Store our record-space for convenience.
         self.record_space = input_spaces["records"]
         self.flat_record_space = self.record_space.flatten()
 
         # Create the main memory as a flattened OrderedDict from any arbitrarily nested Space.
-        self.memory = self.get_variable(
-            name="memory", trainable=False,
-            from_space=self.record_space,
-            flatten=True,
-            add_batch_rank=self.capacity,
-            initializer=0
-        )
+        if self.preallocate_buffers is True and get_backend() == "pytorch":
+            self.memory = self.get_variable(
+                name="memory", trainable=False,
+                initializer=self.record_space.flatten(mapping=lambda key, primitive: get_list_registry(
+                    primitive, capacity=self.capacity, flatten=False, preallocate=True
+                ))
+            )
+        else:
+            self.memory = self.get_variable(
+                name="memory", trainable=False,
+                from_space=self.record_space,
+                flatten=True,
+                add_batch_rank=self.capacity,
+                initializer=0
+            )
         # Number of elements present.
         self.size = self.get_variable(name="size", dtype=int, trainable=False, initializer=0)
 
+        if self.observation_store_spec is not None:
+            self._create_observation_store()
+
+    def _create_observation_store(self):
+        """
+        Moves states and next_states out of the main memory into a frame-deduplicating `ObservationStore`.
+        """
+        if get_backend() == "tf":
+            raise RLGraphError("ERROR: Observation stores are only supported by python/PyTorch memories!")
+        if self.states_key not in self.memory or self.next_states_key not in self.memory:
+            raise RLGraphError(
+                "ERROR: Observation stores require primitive 'states' and 'next_states' in the record space, but "
+                "record space keys are {}!".format(list(self.flat_record_space.keys()))
+            )
+        self.observation_store = ObservationStore(capacity=self.capacity, **self.observation_store_spec)
+        del self.memory[self.states_key]
+        del self.memory[self.next_states_key]
+
+    def _insert_into_observation_store(self, records):
+        """
+        Inserts the states and next_states of a batch of flattened records into the observation store.
+
+        Args:
+            records (FlattenedDataOp): Flattened records to insert.
+        """
+        self.observation_store.insert(np.asarray(records[self.states_key]), np.asarray(records[self.next_states_key]))
+
+    def _read_from_observation_store(self, indices):
+        """
+        Rebuilds the states and next_states for the given indices from the observation store.
+
+        Args:
+            indices (Union[ndarray,torch.Tensor]): Indices to read.
+
+        Returns:
+            dict: Flat keys of states and next_states mapping to their values.
+        """
+        ret = {}
+        if len(indices) == 0:
+            for key in [self.states_key, self.next_states_key]:
+                ret[key] = self.read_variable([], indices, dtype=util.convert_dtype(
+                    self.flat_record_space[key].dtype, to="pytorch"), shape=self.flat_record_space[key].shape)
+            return ret
+        states, next_states = self.observation_store.get(np.asarray(indices))
+        for key, value in [(self.states_key, states), (self.next_states_key, next_states)]:
+            if get_backend() == "pytorch":
+                value = torch.from_numpy(value).to(util.convert_dtype(self.flat_record_space[key].dtype, to="pytorch"))
+            ret[key] = value
+        return ret
+
     @rlgraph_api(flatten_ops=True)
     def _graph_fn_insert_records(self, records):
         """
@@ -110,6 +193,21 @@ class Memory(Component):
         # Optional?
         pass
 
+    def _write_records(self, indices, records):
+        """
+        Writes flattened record values to the given memory indices (python/PyTorch memories only).
+
+        Args:
+            indices (Union[ndarray,torch.Tensor]): Indices to write to, one per record.
+            records (FlattenedDataOp): Record value dict, keyed like `self.memory`.
+        """
+        for key, variable in self.memory.items():
+            if isinstance(variable, np.ndarray):
+                variable[np.asarray(indices)] = np.asarray(records[key])
+            else:
+                for i, val in zip(indices, records[key]):
+                    variable[i] = val
+
     def _read_records(self, indices):
         """
         Obtains record values for the provided indices.
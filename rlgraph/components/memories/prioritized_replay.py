@@ -24,9 +24,10 @@ from rlgraph.components.memories.memory import Memory
 from rlgraph.components.helpers.segment_tree import SegmentTree
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.util import get_batch_size
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class PrioritizedReplay(Memory):
@@ -23,12 +23,13 @@ from rlgraph.utils import util, DataOpDict
 from rlgraph.utils.define_by_run_ops import define_by_run_unflatten
 from rlgraph.utils.util import get_batch_size
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
     import numpy as np
 
 
@@ -87,9 +88,9 @@ class ReplayMemory(Memory):
                 return tf.no_op()
         elif get_backend() == "pytorch":
             update_indices = torch.arange(self.index, self.index + num_records) % self.capacity
-            for key in self.memory:
-                for i, val in zip(update_indices, records[key]):
-                    self.memory[key][i] = val
+            self._write_records(update_indices, records)
+            if self.observation_store is not None:
+                self._insert_into_observation_store(records)
             self.index = (self.index + num_records) % self.capacity
             self.size = min(self.size + num_records, self.capacity)
             return None
@@ -116,6 +117,8 @@ class ReplayMemory(Memory):
                 records[name] = self.read_variable(variable, indices, dtype=
                                                    util.convert_dtype(self.flat_record_space[name].dtype, to="pytorch"),
                                                    shape=self.flat_record_space[name].shape)
+            if self.observation_store is not None:
+                records.update(self._read_from_observation_store(indices))
             records = define_by_run_unflatten(records)
             weights = torch.ones(indices.shape, dtype=torch.float32) if len(indices) > 0 \
                 else torch.ones(1, dtype=torch.float32)
@@ -23,12 +23,13 @@ from rlgraph.utils import util, DataOpDict
 from rlgraph.utils.define_by_run_ops import define_by_run_unflatten
 from rlgraph.utils.util import get_batch_size
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
     import numpy as np
-    import torch
+    torch = lazy_import("torch")
 
 
 class RingBuffer(Memory):
@@ -165,9 +166,7 @@ class RingBuffer(Memory):
             self.size = min(self.size + num_records, self.capacity)
 
             # Updates all the necessary sub-variables in the record.
-            for key in self.memory:
-                for i, val in zip(update_indices, records[key]):
-                    self.memory[key][i] = val
+            self._write_records(update_indices, records)
 
             # The TF version returns no-op, return None so return-val inference system does not throw error.
             return None
@@ -24,9 +24,10 @@ from rlgraph.spaces import ContainerSpace, Dict
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.ops import flatten_op, unflatten_op
 from rlgraph.utils.util import default_dict
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class DictPreprocessorStack(PreprocessorStack):
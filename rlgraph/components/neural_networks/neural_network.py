@@ -26,9 +26,10 @@ from rlgraph.components.layers.preprocessing.container_splitter import Container
 from rlgraph.components.neural_networks.stack import Stack
 from rlgraph.utils import force_tuple, force_list
 from rlgraph.utils.decorators import rlgraph_api
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class NeuralNetwork(Stack):
@@ -24,9 +24,10 @@ from rlgraph.components.layers.preprocessing import PreprocessLayer
 from rlgraph.components.neural_networks.stack import Stack
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.util import default_dict
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class PreprocessorStack(Stack):
@@ -79,6 +80,72 @@ class PreprocessorStack(Stack):
             reset_op = self._graph_fn_reset(*resets)
             return reset_op
 
+    def reset_slots(self, slots):
+        """
+        Resets only the given batch slots of all PreprocessLayers in this Stack (python backend only).
+        See `PreprocessLayer.reset_slots`.
+
+        Args:
+            slots (Union[int,List[int]]): The batch slot(s) to reset.
+        """
+        for preprocess_layer in self.sub_components.values():  # type: PreprocessLayer
+            if re.search(r'^\.helper-', preprocess_layer.scope):
+                continue
+            preprocess_layer.reset_slots(slots)
+
+    def get_statistics(self, only_new=False):
+        """
+        Exports the running statistics of all PreprocessLayers in this Stack that keep any (python backend only).
+        See `PreprocessLayer.get_statistics`.
+
+        Args:
+            only_new (bool): Whether to only export statistics of inputs seen since the last `set_statistics` call.
+
+        Returns:
+            dict: The statistics by PreprocessLayer scope.
+        """
+        statistics = {}
+        for preprocess_layer in self.sub_components.values():  # type: PreprocessLayer
+            if re.search(r'^\.helper-', preprocess_layer.scope):
+                continue
+            layer_statistics = preprocess_layer.get_statistics(only_new=only_new)
+            if layer_statistics is not None:
+                statistics[preprocess_layer.scope] = layer_statistics
+        return statistics
+
+    def set_statistics(self, statistics):
+        """
+        Replaces the running statistics of the PreprocessLayers in this Stack.
+
+        Args:
+            statistics (dict): The statistics by PreprocessLayer scope (see `get_statistics`).
+        """
+        for scope, layer_statistics in statistics.items():
+            self.sub_components[scope].set_statistics(layer_statistics)
+
+    def merge_statistics(self, *statistics):
+        """
+        Combines the statistics (as returned by `get_statistics`) of several Stacks with this Stack's layout, e.g. of
+        the same preprocessor on different workers. Each layer's statistics are merged by that layer (see
+        `PreprocessLayer.merge_statistics`), scopes without a statistics-keeping layer in this Stack are skipped.
+
+        Args:
+            *statistics (dict): The statistics by PreprocessLayer scope to combine. None values are ignored.
+
+        Returns:
+            dict: The combined statistics by PreprocessLayer scope.
+        """
+        merged = {}
+        for stack_statistics in statistics:
+            for scope, layer_statistics in (stack_statistics or {}).items():
+                preprocess_layer = self.sub_components.get(scope)
+                if preprocess_layer is None:
+                    continue
+                layer_merged = preprocess_layer.merge_statistics(merged.get(scope), layer_statistics)
+                if layer_merged is not None:
+                    merged[scope] = layer_merged
+        return merged
+
     @graph_fn
     def _graph_fn_reset(self, *preprocessor_resets):
         if get_backend() == "tf":
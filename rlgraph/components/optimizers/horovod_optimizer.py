@@ -19,12 +19,13 @@ from __future__ import print_function
 
 from rlgraph import get_backend, get_distributed_backend
 from rlgraph.components.optimizers.optimizer import Optimizer
+from rlgraph.utils.lazy_import import lazy_import
 
 
 if get_backend() == "tf" and get_distributed_backend() == "horovod":
-    import horovod.tensorflow as hvd
+    hvd = lazy_import("horovod.tensorflow")
 elif get_backend() == "pytorch" and get_backend() == "horovod":
-    import horovod.pytorch as hvd
+    hvd = lazy_import("horovod.pytorch")
 
 
 class HorovodOptimizer(Optimizer):
@@ -22,11 +22,12 @@ from rlgraph.components.optimizers.optimizer import Optimizer
 from rlgraph.utils.decorators import rlgraph_api
 from rlgraph.utils.ops import DataOpTuple
 from rlgraph.utils.util import force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class LocalOptimizer(Optimizer):
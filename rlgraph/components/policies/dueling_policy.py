@@ -24,11 +24,12 @@ from rlgraph.components.policies.policy import Policy
 from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.rlgraph_errors import RLGraphObsoletedError
 from rlgraph.utils.util import get_rank
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class DuelingPolicy(Policy):
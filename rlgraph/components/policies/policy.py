@@ -32,11 +32,12 @@ from rlgraph.utils.decorators import rlgraph_api, graph_fn
 from rlgraph.utils.define_by_run_ops import define_by_run_unflatten
 from rlgraph.utils.ops import FlattenedDataOp, DataOpDict, ContainerDataOp, flat_key_lookup, unflatten_op
 from rlgraph.utils.rlgraph_errors import RLGraphError, RLGraphObsoletedError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class Policy(Component):
@@ -25,6 +25,9 @@ from rlgraph.environments.openai_gym import OpenAIGymEnv
 from rlgraph.environments.random_env import RandomEnv
 from rlgraph.environments.vector_env import VectorEnv
 from rlgraph.environments.sequential_vector_env import SequentialVectorEnv
+from rlgraph.environments.multiprocess_vector_env import MultiprocessVectorEnv
+from rlgraph.environments.vector_grid_world import VectorGridWorld
+from rlgraph.environments.vector_random_env import VectorRandomEnv
 
 Environment.__lookup_classes__ = dict(
     deterministic=DeterministicEnv,
@@ -34,13 +37,19 @@ Environment.__lookup_classes__ = dict(
     gaussiandensityasrewardenv=GaussianDensityAsRewardEnv,
     gridworld=GridWorld,
     gridworldenv=GridWorld,
+    multiprocessvector=MultiprocessVectorEnv,
+    multiprocessvectorenv=MultiprocessVectorEnv,
     openai=OpenAIGymEnv,
     openaigym=OpenAIGymEnv,
     openaigymenv=OpenAIGymEnv,
     random=RandomEnv,
     randomenv=RandomEnv,
     sequentialvector=SequentialVectorEnv,
-    sequentialvectorenv=SequentialVectorEnv
+    sequentialvectorenv=SequentialVectorEnv,
+    vectorgridworld=VectorGridWorld,
+    vectorgridworldenv=VectorGridWorld,
+    vectorrandom=VectorRandomEnv,
+    vectorrandomenv=VectorRandomEnv
 )
 
 try:
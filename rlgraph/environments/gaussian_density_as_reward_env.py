@@ -18,10 +18,12 @@ from __future__ import division
 from __future__ import print_function
 
 import numpy as np
-from scipy import stats
 
 from rlgraph.environments.environment import Environment
 from rlgraph.spaces import FloatBox
+from rlgraph.utils.lazy_import import lazy_import
+
+stats = lazy_import("scipy.stats")
 
 
 class GaussianDensityAsRewardEnv(Environment):
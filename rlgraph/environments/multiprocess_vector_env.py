@@ -0,0 +1,283 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import ctypes
+import multiprocessing
+
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph.environments.environment import Environment
+from rlgraph.environments.vector_env import VectorEnv
+from rlgraph.spaces.containers import ContainerSpace
+from rlgraph.utils.rlgraph_errors import RLGraphError
+
+
+def _make_env(env_spec):
+    if isinstance(env_spec, dict):
+        return Environment.from_spec(env_spec)
+    elif hasattr(env_spec, '__call__'):
+        return env_spec()
+    raise RLGraphError("Env_spec must be either a dict containing an environment spec or a callable returning "
+                       "a new environment object.")
+
+
+def _shared_array(shape, dtype):
+    """
+    Allocates a lock-free shared memory block and returns it together with a numpy view on it.
+    """
+    dtype = np.dtype(dtype)
+    raw = multiprocessing.RawArray(ctypes.c_byte, max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return raw, _view(raw, shape, dtype)
+
+
+def _view(raw, shape, dtype):
+    dtype = np.dtype(dtype)
+    return np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+class MultiprocessVectorEnv(VectorEnv):
+    """
+    Multi-environment class which runs its environments in separate worker processes.
+
+    States, rewards and terminals are written by the workers into shared-memory numpy buffers (and actions are read
+    from one), so a step only sends one small command to each worker process and waits for its acknowledgement; no
+    observations are pickled. Optionally, workers reset finished environments right after acknowledging a step, so
+    the reset overlaps with the caller's own work (e.g. action computation for the next step).
+
+    Note: Infos returned by the sub-environments are not transferred (`step` returns None for each environment).
+    """
+    def __init__(self, num_environments, env_spec, num_processes=None, auto_reset=False, start_method=None,
+                 **kwargs):
+        """
+        Args:
+            num_environments (int): Number of environments.
+            env_spec (Union[dict,callable]): Environment spec or callable returning a new environment. Callables
+                must be picklable unless the "fork" start method is used.
+            num_processes (Optional[int]): Number of worker processes the environments are distributed over.
+                Default: One process per environment.
+            auto_reset (bool): If True, workers reset terminated environments in the background, right after a step.
+                `reset(index)` then returns the already reset state.
+            start_method (Optional[str]): Start method of the worker processes ("fork", "spawn", "forkserver").
+                Default: The platform's default.
+        """
+        # Construct one environment locally to get the spaces (and make sure the spec is valid).
+        self.local_env = _make_env(env_spec)
+        state_space, action_space = self.local_env.state_space, self.local_env.action_space
+        if isinstance(state_space, ContainerSpace):
+            raise RLGraphError("ERROR: MultiprocessVectorEnv does not support container state spaces!")
+
+        super(MultiprocessVectorEnv, self).__init__(
+            num_environments=num_environments, state_space=state_space, action_space=action_space
+        )
+        self.num_processes = min(num_processes or num_environments, num_environments)
+        self.auto_reset = auto_reset
+
+        # Shared buffers (and our numpy views on them).
+        state_shape = (num_environments,) + tuple(state_space.shape)
+        self.raw_states, self.states = _shared_array(state_shape, state_space.dtype)
+        self.raw_reset_states, self.reset_states = _shared_array(state_shape, state_space.dtype)
+        self.raw_rewards, self.rewards = _shared_array((num_environments,), np.float64)
+        self.raw_terminals, self.terminals = _shared_array((num_environments,), np.bool_)
+        # Container actions can't be written into one buffer -> are sent with the step command.
+        if isinstance(action_space, ContainerSpace):
+            self.raw_actions, self.actions = None, None
+        else:
+            self.raw_actions, self.actions = _shared_array(
+                (num_environments,) + tuple(action_space.shape), action_space.dtype
+            )
+        buffers = dict(
+            states=(self.raw_states, state_shape, state_space.dtype),
+            reset_states=(self.raw_reset_states, state_shape, state_space.dtype),
+            rewards=(self.raw_rewards, (num_environments,), np.float64),
+            terminals=(self.raw_terminals, (num_environments,), np.bool_)
+        )
+        if self.raw_actions is not None:
+            buffers["actions"] = (self.raw_actions, self.actions.shape, action_space.dtype)
+
+        # Contiguous chunks of environment indices per process.
+        bounds = np.linspace(0, num_environments, self.num_processes + 1).astype(np.int64)
+        self.env_slices = [(int(bounds[i]), int(bounds[i + 1])) for i in range_(self.num_processes)]
+        # Maps env index -> process index.
+        self.process_index = np.repeat(np.arange(self.num_processes), np.diff(bounds))
+
+        context = multiprocessing.get_context(start_method) if start_method is not None else multiprocessing
+        self.pipes = []
+        self.processes = []
+        for start, end in self.env_slices:
+            parent_pipe, child_pipe = context.Pipe()
+            process = context.Process(
+                target=self.run_worker, args=(env_spec, start, end, buffers, self.auto_reset, child_pipe)
+            )
+            process.daemon = True
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        # Wait for all workers to have built their environments.
+        self._receive_all()
+        self.closed = False
+
+    def _receive(self, process_index):
+        result = self.pipes[process_index].recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _receive_all(self):
+        return [self._receive(i) for i in range_(self.num_processes)]
+
+    def _broadcast(self, command):
+        for pipe in self.pipes:
+            pipe.send(command)
+        return self._receive_all()
+
+    def seed(self, seed=None):
+        return [s for seeds in self._broadcast(("seed", seed)) for s in seeds]
+
+    def get_env(self, index=0):
+        """
+        Returns the local (never stepped) copy of the environments, e.g. for inspecting spaces. The actual
+        sub-environments live in the worker processes.
+        """
+        return self.local_env
+
+    def reset(self, index=0):
+        process_index = self.process_index[index]
+        self.pipes[process_index].send(("reset", index))
+        self._receive(process_index)
+        return np.array(self.reset_states[index])
+
+    def reset_all(self):
+        self._broadcast(("reset_all",))
+        return np.array(self.reset_states)
+
+    def step(self, actions, **kwargs):
+        if self.actions is not None:
+            self.actions[:] = actions
+            command = ("step", None)
+        else:
+            command = None
+        for i, (start, end) in enumerate(self.env_slices):
+            self.pipes[i].send(command or ("step", actions[start:end]))
+        self._receive_all()
+        return np.array(self.states), np.array(self.rewards), np.array(self.terminals), \
+            [None] * self.num_environments
+
+    def render(self, index=0):
+        process_index = self.process_index[index]
+        self.pipes[process_index].send(("render", index))
+        self._receive(process_index)
+
+    def terminate(self, index=0):
+        process_index = self.process_index[index]
+        self.pipes[process_index].send(("terminate", index))
+        self._receive(process_index)
+
+    def terminate_all(self):
+        if self.closed:
+            return
+        for pipe in self.pipes:
+            try:
+                pipe.send(None)
+                pipe.close()
+            except IOError:
+                pass
+        for process in self.processes:
+            process.join()
+        self.local_env.terminate()
+        self.closed = True
+
+    @staticmethod
+    def run_worker(env_spec, start, end, buffers, auto_reset, pipe):
+        """
+        Worker process loop: Builds the environments with indices [start, end) and executes commands on them.
+        """
+        views = {key: _view(raw, shape, dtype) for key, (raw, shape, dtype) in buffers.items()}
+        states, reset_states = views["states"], views["reset_states"]
+        rewards, terminals = views["rewards"], views["terminals"]
+        actions = views.get("actions")
+        environments = []
+        # Indices of environments that were already reset in the background.
+        already_reset = set()
+        try:
+            # Forked processes would otherwise all continue the parent's random stream.
+            np.random.seed()
+            environments = [_make_env(env_spec) for _ in range_(start, end)]
+            pipe.send(None)
+
+            while True:
+                command = pipe.recv()
+                # "close" signal (None) -> End this process.
+                if command is None:
+                    break
+                name = command[0]
+                if name == "step":
+                    env_actions = actions[start:end] if command[1] is None else command[1]
+                    finished = []
+                    for i, env in enumerate(environments):
+                        state, reward, terminal, _ = env.step(env_actions[i])
+                        states[start + i] = state
+                        rewards[start + i] = reward
+                        terminals[start + i] = terminal
+                        if terminal:
+                            finished.append(i)
+                    already_reset.clear()
+                    pipe.send(None)
+                    # Reset finished environments while the caller goes on.
+                    if auto_reset:
+                        for i in finished:
+                            reset_states[start + i] = environments[i].reset()
+                            already_reset.add(start + i)
+                    continue
+                elif name == "reset":
+                    index = command[1]
+                    if index not in already_reset:
+                        reset_states[index] = environments[index - start].reset()
+                    already_reset.discard(index)
+                    result = None
+                elif name == "reset_all":
+                    for i, env in enumerate(environments):
+                        reset_states[start + i] = env.reset()
+                    already_reset.clear()
+                    result = None
+                elif name == "seed":
+                    result = [env.seed(command[1]) for env in environments]
+                elif name == "render":
+                    environments[command[1] - start].render()
+                    result = None
+                elif name == "terminate":
+                    environments[command[1] - start].terminate()
+                    result = None
+                else:
+                    raise RLGraphError("ERROR: Unknown command '{}'!".format(name))
+                pipe.send(result)
+
+        # Pass the exception back so the main process knows what's going on.
+        except Exception as e:
+            pipe.send(e)
+        finally:
+            for env in environments:
+                try:
+                    env.terminate()
+                except Exception:
+                    pass
+
+    def __str__(self):
+        return "MultiprocessVectorEnv({}x{})".format(self.num_environments, self.state_space)
@@ -20,6 +20,7 @@ from __future__ import print_function
 from queue import Queue
 from threading import Thread
 
+import numpy as np
 from six.moves import xrange as range_
 
 from rlgraph.environments import VectorEnv, Environment
@@ -87,6 +88,36 @@ class SequentialVectorEnv(VectorEnv):
             infos.append(info)
         return states, rewards, terminals, infos
 
+    def reset_flow(self):
+        """
+        Resets all environments via their `reset_flow` methods.
+
+        Returns:
+            any: The (flat) state components of all environments, each stacked along a 0th (batch) axis.
+        """
+        states = [env.reset_flow() for env in self.environments]
+        return self._stack_flow_results([s if isinstance(s, tuple) else (s,) for s in states])
+
+    def step_flow(self, actions):
+        """
+        Steps all environments via their `step_flow` methods (auto-resetting those that reach a terminal).
+
+        Args:
+            actions (any): The batch of actions (one per environment).
+
+        Returns:
+            tuple: The (flat) state components, rewards and terminals of all environments, each stacked along a 0th
+                (batch) axis.
+        """
+        return self._stack_flow_results(
+            [self.environments[i].step_flow(actions[i]) for i in range_(self.num_environments)]
+        )
+
+    @staticmethod
+    def _stack_flow_results(results):
+        stacked = tuple(np.stack(values) for values in zip(*results))
+        return stacked[0] if len(stacked) == 1 else stacked
+
     def render(self, index=0):
         self.environments[index].render()
 
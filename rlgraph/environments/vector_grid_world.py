@@ -0,0 +1,248 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+import numpy as np
+
+from rlgraph.environments.grid_world import GridWorld
+from rlgraph.environments.vector_env import VectorEnv
+
+
+class VectorGridWorld(VectorEnv):
+    """
+    Steps `num_environments` GridWorlds (same map and settings) at once. All (deterministic) transitions, rewards and
+    terminals are precomputed as lookup tables over the discrete positions, so a step of all environments is a handful
+    of numpy array operations and the state batches are written directly (instead of one `GridWorld.step()` call per
+    environment).
+
+    Behaves like `num_environments` separate `GridWorld` objects, e.g. in a SequentialVectorEnv.
+    """
+    # Orientation index (0=0deg, 1=90deg, 2=180deg, 3=270deg) -> "xy+orientation" state components.
+    ORIENTATIONS = np.array([[0, 1], [1, 0], [0, -1], [-1, 0]], dtype=np.int32)
+    # Move (0=up, 1=right, 2=down, 3=left) -> x/y increments.
+    INCREMENTS = np.array([[0, -1], [1, 0], [0, 1], [-1, 0]])
+
+    def __init__(self, num_environments, world="4x4", save_mode=False, action_type="udlr",
+                 reward_function="sparse", state_representation="discrete"):
+        """
+        Args:
+            num_environments (int): The number of GridWorlds to step at once.
+
+        For all other args, see `GridWorld`.
+        """
+        self.grid_world_kwargs = dict(
+            world=world, save_mode=save_mode, action_type=action_type, reward_function=reward_function,
+            state_representation=state_representation
+        )
+        # Template env for parsing the map and setting up the Spaces.
+        self.env = GridWorld(**self.grid_world_kwargs)
+
+        super(VectorGridWorld, self).__init__(
+            num_environments=num_environments, state_space=self.env.state_space, action_space=self.env.action_space
+        )
+
+        self.action_type = action_type
+        self.state_representation = state_representation
+        self.n_row, self.n_col = self.env.n_row, self.env.n_col
+        num_positions = self.n_row * self.n_col
+
+        positions = np.arange(num_positions)
+        x = positions // self.n_col
+        y = positions % self.n_col
+        field_types = self._get_field_types(x, y)
+
+        # Next position tables (indexed by in_air (0 or 1), position and move).
+        self.next_positions = np.zeros(shape=(2, num_positions, 4), dtype=np.int32)
+        for move, (dx, dy) in enumerate(self.INCREMENTS):
+            next_x = np.clip(x + dx, 0, self.n_row - 1)
+            next_y = np.clip(y + dy, 0, self.n_col - 1)
+            blocked = self._get_field_types(next_x, next_y) == "W"
+            # Can't move out of holes and the goal (unless in the air).
+            stuck = np.isin(field_types, ["H", "G"])
+            self.next_positions[0, :, move] = np.where(blocked | stuck, positions, next_x * self.n_col + next_y)
+            self.next_positions[1, :, move] = np.where(blocked, positions, next_x * self.n_col + next_y)
+
+        # Reward and terminal tables (indexed by position).
+        sparse = (reward_function == "sparse")
+        self.rewards = np.full(shape=(num_positions,), fill_value=-1.0, dtype=np.float32)
+        self.rewards[field_types == "H"] = -5.0 if sparse else -10.0
+        self.rewards[field_types == "F"] = -3.0 if sparse else -10.0
+        self.rewards[field_types == "G"] = 1.0 if sparse else 50.0
+        self.terminals = np.isin(field_types, ["H", "G"])
+
+        # Valid (random) start positions.
+        self.start_positions = positions[np.isin(field_types, [" ", "S", "F"])]
+
+        # Static camera pixels (everything except for the actor's position).
+        if self.state_representation == "camera":
+            self.camera_pixels = np.zeros(shape=(self.n_row, self.n_col, 3), dtype=np.int32)
+            self.camera_pixels[self.env.world == "F", 0] = 127
+            self.camera_pixels[self.env.world == "H", 0] = 255
+            self.camera_pixels[self.env.world == "W", 1] = 127
+            self.camera_pixels[self.env.world == "G", 1] = 255
+
+        # The current positions and orientations (0=0deg, 1=90deg, 2=180deg, 3=270deg) of all environments.
+        self.discrete_pos = np.full(shape=(num_environments,), fill_value=self.env.default_start_pos, dtype=np.int32)
+        self.orientation = np.zeros(shape=(num_environments,), dtype=np.int32)
+
+    def _get_field_types(self, x, y):
+        """
+        Returns the field types for the given x/y coordinates (indexing the world like `GridWorld` does: `world[y, x]`).
+        Coordinates outside the world (only possible for non-square worlds) count as walls.
+        """
+        inside = (y < self.n_row) & (x < self.n_col)
+        field_types = np.full(shape=x.shape, fill_value="W")
+        field_types[inside] = self.env.world[y[inside], x[inside]]
+        return field_types
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = time.time()
+        np.random.seed(seed)
+        return seed
+
+    def get_env(self, index=0):
+        """
+        Returns a GridWorld in the current position and orientation of the given sub-environment.
+        """
+        env = GridWorld(**self.grid_world_kwargs)
+        env.discrete_pos = int(self.discrete_pos[index])
+        env.orientation = int(self.orientation[index]) * 90
+        env.refresh_state()
+        return env
+
+    def reset(self, index=0, randomize=False):
+        """
+        Args:
+            index (int): The sub-environment to reset.
+            randomize (bool): Whether to start the new episode in a random position (instead of "S").
+        """
+        self._reset_indices(np.array([index]), randomize)
+        return self._get_states(np.array([index]))[0]
+
+    def reset_all(self, randomize=False):
+        self._reset_indices(np.arange(self.num_environments), randomize)
+        return self._get_states()
+
+    def reset_flow(self, randomize=False):
+        return self.reset_all(randomize=randomize)
+
+    def _reset_indices(self, indices, randomize=False):
+        if randomize is False:
+            self.discrete_pos[indices] = self.env.default_start_pos
+        else:
+            self.discrete_pos[indices] = np.random.choice(self.start_positions, size=len(indices))
+        self.orientation[indices] = 0
+
+    def step(self, actions):
+        """
+        Args:
+            actions (Union[np.ndarray,Dict[str,np.ndarray]]): The batch of actions (one per environment).
+                For "udlr": Ints 0-3 (see `GridWorld.step`).
+                For "ftj": A dict with keys "turn", "forward" and "jump" (see `GridWorld.step`), each holding one
+                    value per environment (missing keys mean: no turn, don't move, no jump), or ints 0-17 (see
+                    `GridWorld._translate_action`).
+
+        Returns:
+            tuple: States, rewards, terminals (all batched) and infos (list of None).
+        """
+        self._move(actions)
+        rewards = self.rewards[self.discrete_pos]
+        terminals = self.terminals[self.discrete_pos]
+        return self._get_states(), rewards, terminals, [None] * self.num_environments
+
+    def step_flow(self, actions):
+        """
+        Steps all environments and resets those that reached a terminal (like `GridWorld.step_flow`).
+
+        Returns:
+            tuple: States (after possible resets), rewards and terminals.
+        """
+        self._move(actions)
+        rewards = self.rewards[self.discrete_pos]
+        terminals = self.terminals[self.discrete_pos]
+        if np.any(terminals):
+            self._reset_indices(np.nonzero(terminals)[0])
+        return self._get_states(), rewards, terminals
+
+    def _move(self, actions):
+        if self.action_type == "ftj":
+            turn, forward, jump = self._translate_actions(actions)
+            self.orientation = (self.orientation + turn - 1) % 4
+            # Forward (2) moves in direction of the orientation, backward (0) in the opposite direction.
+            moving = (forward != 1)
+            move = np.where(forward == 2, self.orientation, (self.orientation + 2) % 4)
+            self.discrete_pos = np.where(
+                moving, self.next_positions[0, self.discrete_pos, move], self.discrete_pos
+            )
+            # Jump -> Move two fields forward (over walls/fires/holes w/o any damage).
+            jumping = (jump == 1)
+            jumped_pos = self.next_positions[0, self.discrete_pos, self.orientation]
+            jumped_pos = self.next_positions[1, jumped_pos, self.orientation]
+            self.discrete_pos = np.where(jumping, jumped_pos, self.discrete_pos)
+        else:
+            self.discrete_pos = self.next_positions[0, self.discrete_pos, np.asarray(actions).reshape(-1)]
+
+    def _translate_actions(self, actions):
+        """
+        Translates a batch of "ftj" actions into turn, forward and jump arrays.
+        """
+        if isinstance(actions, dict):
+            no_op = np.ones(shape=(self.num_environments,), dtype=np.int32)
+            turn = np.asarray(actions.get("turn", no_op))
+            forward = np.asarray(actions.get("forward", no_op))
+            jump = np.asarray(actions.get("jump", no_op - 1))
+            return turn, forward, jump
+        # 3 x 3 x 2 = 18 actions (see `GridWorld._translate_action` for the mapping).
+        actions = np.asarray(actions).reshape(-1)
+        return actions // 6, (actions % 6) // 2, actions % 2
+
+    def _get_states(self, indices=None):
+        """
+        Returns the state batch for all (or the given) sub-environments.
+        """
+        discrete_pos = self.discrete_pos if indices is None else self.discrete_pos[indices]
+        if self.state_representation == "discrete":
+            return discrete_pos.astype(np.int32)
+        x = discrete_pos // self.n_col
+        y = discrete_pos % self.n_col
+        if self.state_representation == "xy":
+            return np.stack([x, y], axis=-1).astype(np.int32)
+        elif self.state_representation == "xy+orientation":
+            orientation = self.orientation if indices is None else self.orientation[indices]
+            return np.concatenate(
+                [np.stack([x, y], axis=-1).astype(np.int32), self.ORIENTATIONS[orientation]], axis=-1
+            )
+        # Camera.
+        states = np.repeat(self.camera_pixels[np.newaxis], len(discrete_pos), axis=0)
+        states[np.arange(len(discrete_pos)), y, x, 2] = 255
+        return states
+
+    def render(self, index=0):
+        self.get_env(index).render()
+
+    def terminate(self, index=0):
+        pass
+
+    def terminate_all(self):
+        pass
+
+    def __str__(self):
+        return "VectorGridWorld({}x{})".format(self.num_environments, self.env.description)
@@ -0,0 +1,105 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+import numpy as np
+
+import rlgraph.spaces as spaces
+from rlgraph.environments.random_env import RandomEnv
+from rlgraph.environments.vector_env import VectorEnv
+
+
+class VectorRandomEnv(VectorEnv):
+    """
+    Steps `num_environments` RandomEnvs at once: States, rewards and terminals of all environments are sampled as
+    one batch each (instead of one `RandomEnv.step()` call per environment).
+    """
+    def __init__(self, num_environments, state_space, action_space, reward_space=None, terminal_prob=0.1,
+                 deterministic=False):
+        """
+        Args:
+            num_environments (int): The number of RandomEnvs to step at once.
+
+        For all other args, see `RandomEnv`.
+        """
+        super(VectorRandomEnv, self).__init__(
+            num_environments=num_environments, state_space=state_space, action_space=action_space
+        )
+        self.reward_space = spaces.Space.from_spec(reward_space)
+        self.terminal_prob = terminal_prob
+
+        if deterministic is True:
+            np.random.seed(10)
+        self.last_state = np.random.get_state()
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = time.time()
+        np.random.seed(seed)
+        self.last_state = np.random.get_state()
+        return seed
+
+    def get_env(self, index=0):
+        return RandomEnv(
+            state_space=self.state_space, action_space=self.action_space, reward_space=self.reward_space,
+            terminal_prob=self.terminal_prob
+        )
+
+    def reset(self, index=0):
+        np.random.set_state(self.last_state)
+        state = self.state_space.sample()
+        self.last_state = np.random.get_state()
+        return state
+
+    def reset_all(self):
+        return self.step()[0]  # 0=states
+
+    def reset_flow(self):
+        return self.reset_all()
+
+    def step(self, actions=None):
+        """
+        Args:
+            actions (Optional[any]): The batch of actions (one per environment). Ignored.
+
+        Returns:
+            tuple: States, rewards, terminals (all batched) and infos (list of None).
+        """
+        # Set the seed to the last observed state for this instance.
+        np.random.set_state(self.last_state)
+        states = self.state_space.sample(size=self.num_environments)
+        rewards = self.reward_space.sample(size=self.num_environments)
+        terminals = np.random.random_sample(size=self.num_environments) < self.terminal_prob
+        # Store the current state of the RNG.
+        self.last_state = np.random.get_state()
+        return states, rewards, terminals, [None] * self.num_environments
+
+    def step_flow(self, actions=None):
+        ret = self.step(actions)
+        return ret[0], ret[1], ret[2]
+
+    def terminate(self, index=0):
+        pass
+
+    def terminate_all(self):
+        pass
+
+    def __str__(self):
+        return "VectorRandomEnv({})".format(self.num_environments)
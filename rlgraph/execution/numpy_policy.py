@@ -0,0 +1,340 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+from math import log
+import re
+
+import numpy as np
+
+from rlgraph import get_backend
+from rlgraph.utils.numpy import dense_layer, relu, sigmoid, softmax
+from rlgraph.utils.ops import unflatten_op
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.util import SMALL_NUMBER
+
+# NumPy versions of the activation functions supported by `get_activation_function`.
+_ACTIVATIONS = dict(
+    linear=lambda x: x,
+    relu=relu,
+    lrelu=lambda x, alpha=0.2: relu(x, alpha),
+    leaky_relu=lambda x, alpha=0.2: relu(x, alpha),
+    elu=lambda x: np.where(x < 0.0, np.exp(x) - 1.0, x),
+    selu=lambda x: 1.0507009873554805 * np.where(x < 0.0, 1.6732632423543772 * (np.exp(x) - 1.0), x),
+    sigmoid=sigmoid,
+    swish=lambda x: x * sigmoid(x),
+    softmax=softmax,
+    softplus=lambda x: np.logaddexp(x, 0.0),
+    softsign=lambda x: x / (1.0 + np.abs(x)),
+    tanh=np.tanh
+)
+
+
+class NumpyPolicy(object):
+    """
+    Standalone NumPy version of an Agent's acting path (NeuralNetwork -> ActionAdapter -> action distribution ->
+    epsilon exploration), e.g. for actors that only need to compute actions: No graph has to be built and no
+    TF-session/torch-module is needed to act.
+
+    A NumpyPolicy is exported from an Agent's (built or unbuilt) Policy via `from_agent` and takes the same
+    `set_weights` payload as the Agent (`Agent.get_weights()["policy_weights"]`).
+    Supported are dense-layer networks (with auto-generated `call` method) and Categorical (IntBox), Bernoulli
+    (BoolBox) and Normal (FloatBox) action heads. For dueling policies, the advantage head alone determines the
+    actions (the state-value is a per-state constant under argmax and softmax).
+    """
+    def __init__(self, layers, action_heads, greedy=True, epsilon_decay=None, seed=None):
+        """
+        Args:
+            layers (List[dict]): The dense layers of the main network in call order, each a dict with keys "scope"
+                (the layer's global scope), "activation", "activation_params" and optionally "bias" (the initial
+                biases).
+            action_heads (Dict[str,dict]): Flat action key -> action head dict with keys "type" (one of
+                "categorical", "bernoulli", "normal"), "layers" (the action adapter's dense layers as in `layers`),
+                "shape" (the action adapter's output shape w/o batch rank), "dtype" (of the actions) and
+                "num_categories" (categorical heads only).
+            greedy (bool): Whether to pick max-likelihood actions and explore via epsilon (Q-learning agents) or to
+                sample actions while exploring (policy gradient agents).
+            epsilon_decay (Optional[dict]): The epsilon decay as dict with keys "type" (one of "constant",
+                "polynomial", "exponential"), "from", "to", "start_timestep", "num_timesteps" and "power",
+                "half_life" or "constant_value". None for no epsilon exploration.
+            seed (Optional[int]): Seed for the random number generator used for sampling and exploration.
+        """
+        self.layers = layers
+        self.action_heads = action_heads
+        self.greedy = greedy
+        self.epsilon_decay = epsilon_decay
+        self.random = np.random.RandomState(seed)
+
+        # Global time step (number of states acted on) driving the epsilon decay (see `Agent.timesteps`).
+        self.timesteps = 0
+
+        # Layer scope -> kernel (in x out) and bias (None for no bias).
+        self.kernels = {}
+        self.biases = {}
+        for layer in self.layers + [layer for head in self.action_heads.values() for layer in head["layers"]]:
+            if layer.get("bias") is not None:
+                self.biases[layer["scope"]] = layer["bias"]
+        # Layer scope -> (kernel key, whether to transpose, bias key) in the `set_weights` payload.
+        self.weight_keys = None
+
+    @staticmethod
+    def from_agent(agent, greedy=None, seed=None):
+        """
+        Exports an Agent's Policy (and epsilon exploration) into a NumpyPolicy. If the Agent is built, its current
+        weights are set as well.
+
+        Args:
+            agent (Agent): The Agent to export. Does not have to be built.
+            greedy (Optional[bool]): See ctor. Default: True for Q-learning (DQN, DQFD) agents.
+            seed (Optional[int]): See ctor.
+
+        Returns:
+            NumpyPolicy: The exported policy.
+
+        Raises:
+            RLGraphError: If the Policy contains components that cannot be run in NumPy.
+        """
+        from rlgraph.agents.dqfd_agent import DQFDAgent
+        from rlgraph.agents.dqn_agent import DQNAgent
+        from rlgraph.spaces import ContainerSpace
+
+        policy = agent.policy
+        if getattr(policy, "neural_network", None) is None or not getattr(policy, "action_adapters", None):
+            raise RLGraphError("ERROR: Cannot export {} to NumPy!".format(type(policy).__name__))
+        if isinstance(agent.preprocessed_state_space, ContainerSpace):
+            raise RLGraphError("ERROR: NumpyPolicy does not support container state spaces ({})!".format(
+                agent.preprocessed_state_space
+            ))
+
+        action_heads = OrderedDict()
+        for flat_key, action_adapter in policy.action_adapters.items():
+            adapter_type = type(action_adapter).__name__
+            if adapter_type == "CategoricalDistributionAdapter":
+                head = dict(type="categorical", num_categories=action_adapter.action_space.num_categories)
+            elif adapter_type == "BernoulliDistributionAdapter":
+                head = dict(type="bernoulli")
+            elif adapter_type == "NormalDistributionAdapter":
+                head = dict(type="normal")
+            else:
+                raise RLGraphError("ERROR: NumpyPolicy does not support action adapters of type {}!".format(
+                    adapter_type
+                ))
+            head["layers"] = NumpyPolicy._get_dense_layers(action_adapter.network)
+            head["shape"] = tuple(action_adapter.final_shape)
+            head["dtype"] = action_adapter.action_space.dtype
+            action_heads[flat_key] = head
+
+        epsilon_decay = None
+        epsilon_exploration = agent.exploration.epsilon_exploration if agent.exploration is not None else None
+        if epsilon_exploration is not None:
+            epsilon_decay = NumpyPolicy._get_decay(epsilon_exploration.decay_component)
+        elif agent.exploration is not None and agent.exploration.noise_component is not None:
+            raise RLGraphError("ERROR: NumpyPolicy does not support noise exploration!")
+
+        numpy_policy = NumpyPolicy(
+            layers=NumpyPolicy._get_dense_layers(policy.neural_network),
+            action_heads=action_heads,
+            greedy=greedy if greedy is not None else isinstance(agent, (DQNAgent, DQFDAgent)),
+            epsilon_decay=epsilon_decay,
+            seed=seed
+        )
+        if agent.graph_built:
+            numpy_policy.set_weights(agent.get_weights()["policy_weights"])
+            numpy_policy.timesteps = agent.timesteps
+        return numpy_policy
+
+    @staticmethod
+    def _get_dense_layers(network):
+        from rlgraph.components.layers.nn.dense_layer import DenseLayer
+        from rlgraph.components.layers.preprocessing.reshape import ReShape
+
+        if network.custom_call_given is True or len(network.functional_api_outputs) > 0:
+            raise RLGraphError("ERROR: NumpyPolicy does not support networks with custom `call` methods ({})!".format(
+                network.global_scope
+            ))
+        layers = []
+        for sub_component in network.sub_components.values():
+            if re.search(r'^\.helper-', sub_component.scope) or isinstance(sub_component, ReShape):
+                continue
+            elif type(sub_component) is not DenseLayer:
+                raise RLGraphError("ERROR: NumpyPolicy does not support {} layers ({})!".format(
+                    type(sub_component).__name__, sub_component.global_scope
+                ))
+            if sub_component.activation is not None and sub_component.activation not in _ACTIVATIONS:
+                raise RLGraphError("ERROR: NumpyPolicy does not support activation '{}' ({})!".format(
+                    sub_component.activation, sub_component.global_scope
+                ))
+            layer = dict(
+                scope=sub_component.global_scope, activation=sub_component.activation,
+                activation_params=list(sub_component.activation_params or [])
+            )
+            # PyTorch weight payloads do not contain biases: Start from the built layer's ones.
+            if get_backend() == "pytorch" and getattr(sub_component.layer, "bias", None) is not None:
+                layer["bias"] = sub_component.layer.bias.detach().numpy()
+            layers.append(layer)
+        return layers
+
+    @staticmethod
+    def _get_decay(decay_component):
+        decay_type = type(decay_component).__name__
+        decay = {
+            "from": decay_component.from_, "to": decay_component.to_,
+            "start_timestep": decay_component.start_timestep, "num_timesteps": decay_component.num_timesteps
+        }
+        if decay_type == "ConstantDecay":
+            decay.update(type="constant", constant_value=decay_component.constant_value)
+        elif decay_type == "PolynomialDecay":
+            decay.update(type="polynomial", power=decay_component.power)
+        elif decay_type == "ExponentialDecay":
+            decay.update(type="exponential", half_life=decay_component.half_life_timesteps)
+        else:
+            raise RLGraphError("ERROR: NumpyPolicy does not support decay components of type {}!".format(decay_type))
+        return decay
+
+    def set_weights(self, policy_weights, value_function_weights=None):
+        """
+        Sets the policy weights (see `Agent.set_weights`).
+
+        Args:
+            policy_weights (dict): The policy's variables as returned by `Agent.get_weights()["policy_weights"]`
+                (TensorFlow: kernels and biases, PyTorch: weight matrices only, biases then stay as they are).
+            value_function_weights (Optional[any]): Ignored (value functions are not needed for acting).
+
+        Raises:
+            RLGraphError: If the weights of a layer are missing in `policy_weights`.
+        """
+        if self.weight_keys is None:
+            self.weight_keys = self._get_weight_keys(policy_weights)
+        for scope, (kernel_key, transpose, bias_key) in self.weight_keys.items():
+            kernel = np.asarray(policy_weights[kernel_key], dtype=np.float32)
+            self.kernels[scope] = np.transpose(kernel) if transpose else kernel
+            if bias_key is not None:
+                self.biases[scope] = np.asarray(policy_weights[bias_key], dtype=np.float32)
+
+    def _get_weight_keys(self, policy_weights):
+        weight_keys = {}
+        all_layers = list(self.layers)
+        for head in self.action_heads.values():
+            all_layers.extend(head["layers"])
+        for layer in all_layers:
+            # Variables are keyed by their global scope (with "-" as scope separator), prefixed by e.g. the root's.
+            scope_key = re.sub(r'/', "-", layer["scope"])
+            kernel_key, transpose, bias_key = None, False, None
+            for key in policy_weights.keys():
+                # TensorFlow: tf.layers.Dense's kernel (in x out) and bias.
+                if key.endswith(scope_key + "-dense-kernel"):
+                    kernel_key = key
+                elif key.endswith(scope_key + "-dense-bias"):
+                    bias_key = key
+                # PyTorch: The layer's weight matrix (out x in).
+                elif key.endswith(scope_key):
+                    kernel_key, transpose = key, True
+            if kernel_key is None:
+                raise RLGraphError("ERROR: No weights found for layer '{}' in given weights ({})!".format(
+                    layer["scope"], list(policy_weights.keys())
+                ))
+            weight_keys[layer["scope"]] = (kernel_key, transpose, bias_key)
+        return weight_keys
+
+    def get_action(self, states, use_exploration=True, time_step=None):
+        """
+        Computes actions for a batch of (preprocessed) states, like `Agent.get_action` with
+        `apply_preprocessing=False`.
+
+        Args:
+            states (np.ndarray): The batch of preprocessed states.
+            use_exploration (bool): Whether to explore (greedy policies) or sample actions (non-greedy policies).
+            time_step (Optional[int]): The time step for the epsilon decay. Default: Counted internally, increasing
+                by the batch size with each call (as in `Agent.get_action`).
+
+        Returns:
+            any: The batch of actions (a dict of action batches for container action spaces).
+        """
+        if len(self.kernels) == 0:
+            raise RLGraphError("ERROR: NumpyPolicy has no weights, call `set_weights` first!")
+        states = np.asarray(states, dtype=np.float32)
+        batch_size = len(states)
+        self.timesteps += batch_size
+        if time_step is None:
+            time_step = self.timesteps
+
+        nn_outputs = self._apply_layers(self.layers, states)
+        deterministic = self.greedy or not use_exploration
+        epsilon = self._get_epsilon(time_step) if (use_exploration and self.epsilon_decay is not None) else 0.0
+
+        actions = {}
+        for flat_key, head in self.action_heads.items():
+            adapter_outputs = np.reshape(
+                self._apply_layers(head["layers"], nn_outputs), (batch_size,) + head["shape"]
+            )
+            action = self._draw(head, adapter_outputs, deterministic)
+            # Epsilon exploration: Uniformly random actions for a random subset of the batch items.
+            if epsilon > 0.0 and head["type"] == "categorical":
+                explore = self.random.random_sample(size=action.shape[:1]) < epsilon
+                if np.any(explore):
+                    random_actions = self.random.randint(0, head["num_categories"], size=action.shape)
+                    action = np.where(
+                        np.reshape(explore, explore.shape + (1,) * (action.ndim - 1)), random_actions, action
+                    )
+            actions[flat_key] = action.astype(head["dtype"])
+
+        return unflatten_op(actions)
+
+    def _apply_layers(self, layers, inputs):
+        outputs = inputs
+        for layer in layers:
+            outputs = dense_layer(outputs, self.kernels[layer["scope"]], self.biases.get(layer["scope"]))
+            if layer["activation"] is not None:
+                outputs = _ACTIVATIONS[layer["activation"]](outputs, *layer["activation_params"])
+        return outputs
+
+    def _draw(self, head, adapter_outputs, deterministic):
+        if head["type"] == "categorical":
+            if deterministic:
+                return np.argmax(adapter_outputs, axis=-1)
+            probs = np.maximum(softmax(adapter_outputs), SMALL_NUMBER)
+            cumulative = np.cumsum(probs, axis=-1)
+            samples = self.random.random_sample(size=cumulative.shape[:-1] + (1,)) * cumulative[..., -1:]
+            return np.minimum(np.sum(cumulative <= samples, axis=-1), head["num_categories"] - 1)
+        elif head["type"] == "bernoulli":
+            # Same as `Policy`: Deterministic actions threshold the adapter outputs directly.
+            if deterministic:
+                return adapter_outputs > 0.5
+            return self.random.random_sample(size=adapter_outputs.shape) < sigmoid(adapter_outputs)
+        else:
+            mean, log_sd = np.split(adapter_outputs, 2, axis=-1)
+            if deterministic:
+                return mean
+            sd = np.exp(np.clip(log_sd, log(SMALL_NUMBER), -log(SMALL_NUMBER)))
+            return mean + sd * self.random.standard_normal(size=mean.shape)
+
+    def _get_epsilon(self, time_step):
+        decay = self.epsilon_decay
+        if time_step <= decay["start_timestep"]:
+            return decay["from"]
+        elif time_step >= decay["start_timestep"] + decay["num_timesteps"]:
+            return decay["to"]
+        time_steps_in_decay_window = float(time_step - decay["start_timestep"])
+        if decay["type"] == "constant":
+            return decay["constant_value"]
+        elif decay["type"] == "polynomial":
+            return (decay["from"] - decay["to"]) * \
+                (1.0 - time_steps_in_decay_window / decay["num_timesteps"]) ** decay["power"] + decay["to"]
+        else:
+            return decay["from"] * 0.5 ** (time_steps_in_decay_window / decay["half_life"])
@@ -18,21 +18,24 @@ from __future__ import division
 from __future__ import print_function
 
 import random
+import time
 
+import numpy as np
 from rlgraph.environments import Environment
 from six.moves import queue
-from threading import Thread
+from threading import Event, Thread, Lock
 
 from rlgraph import get_distributed_backend
 from rlgraph.agents import Agent
 from rlgraph.execution.ray import RayValueWorker
 from rlgraph.execution.ray.apex.ray_memory_actor import RayMemoryActor
 from rlgraph.execution.ray.ray_executor import RayExecutor
-from rlgraph.execution.ray.ray_util import create_colocated_ray_actors, RayTaskPool, RayWeight
+from rlgraph.execution.ray.ray_util import create_colocated_ray_actors, RayTaskPool, RayWeightSync
 from rlgraph.spaces import Dict
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class ApexExecutor(RayExecutor):
@@ -71,12 +74,20 @@ class ApexExecutor(RayExecutor):
         self.replay_batch_size = self.agent_config["update_spec"]["batch_size"]
         self.num_cpus_per_replay_actor = self.executor_spec.get("num_cpus_per_replay_actor",
                                                                 self.replay_sampling_task_depth)
+        # If True, replay batches (`replay_sampling_task_depth` in flight per replay shard) are resolved
+        # by a background thread and fed straight into the learner queue.
+        self.prefetch_replay_batches = self.executor_spec.get("prefetch_replay_batches", True)
+        # Number of learner updates per replay shard merged into one remote priority update.
+        self.priority_update_batch_size = self.executor_spec.get("priority_update_batch_size", 4)
+        self.replay_prefetcher = None
 
         # How often weights are synced to remote workers.
         self.weight_sync_steps = self.executor_spec["weight_sync_steps"]
 
         # Necessary for target network updates.
         self.weight_syncs_executed = 0
+        # Versioned weight broadcast with optional "float16" or "delta" encoding.
+        self.weight_sync = RayWeightSync(encoding=self.executor_spec.get("weight_sync_encoding", None))
         self.steps_since_weights_synced = {}
 
         # These are the tasks actually interacting with the environment.
@@ -112,7 +123,8 @@ class ApexExecutor(RayExecutor):
         # Set up worker thread for performing updates.
         self.update_worker = UpdateWorker(
             agent=self.local_agent,
-            in_queue_size=self.executor_spec["learn_queue_size"]
+            in_queue_size=self.executor_spec["learn_queue_size"],
+            priority_update_batch_size=self.priority_update_batch_size
         )
         self.ray_init()
 
@@ -155,16 +167,25 @@ class ApexExecutor(RayExecutor):
         self.update_worker.start()
 
         # Prioritized replay sampling tasks via RayAgents.
-        for ray_memory in self.ray_local_replay_memories:
-            for _ in range(self.replay_sampling_task_depth):
-                # This initializes remote tasks to sample from the prioritized replay memories of each worker.
-                self.prioritized_replay_tasks.add_task(ray_memory, ray_memory.get_batch.remote())
+        if self.prefetch_replay_batches:
+            self.replay_prefetcher = ReplayPrefetcher(
+                memory_actors=self.ray_local_replay_memories,
+                prefetch_depth=self.replay_sampling_task_depth,
+                learner_queue=self.update_worker.input_queue,
+                discard_queued_samples=self.discard_queued_samples
+            )
+            self.replay_prefetcher.start()
+        else:
+            for ray_memory in self.ray_local_replay_memories:
+                for _ in range(self.replay_sampling_task_depth):
+                    # This initializes remote tasks to sample from the prioritized replay memories of each worker.
+                    self.prioritized_replay_tasks.add_task(ray_memory, ray_memory.get_batch.remote())
 
         # Env interaction tasks via RayWorkers which each
         # have a local agent.
-        weights = RayWeight(self.local_agent.get_weights())
+        self.weight_sync.publish(self.local_agent.get_weights())
         for ray_worker in self.ray_env_sample_workers:
-            ray_worker.set_weights.remote(weights)
+            self.weight_sync.sync(ray_worker)
             self.steps_since_weights_synced[ray_worker] = 0
 
             self.logger.info("Synced worker {} weights, initializing sample tasks.".format(
@@ -188,7 +209,6 @@ class ApexExecutor(RayExecutor):
         discarded = 0
         queue_inserts = 0
         rewards = []
-        weights = None
 
         # 1. Fetch results from RayWorkers.
         completed_sample_tasks = list(self.env_sample_tasks.get_completed())
@@ -203,19 +223,21 @@ class ApexExecutor(RayExecutor):
 
             self.steps_since_weights_synced[ray_worker] += sample_steps
             if self.steps_since_weights_synced[ray_worker] >= self.weight_sync_steps:
-                if weights is None or self.update_worker.update_done:
+                # New weight version only after the learner updated, workers already on it are skipped.
+                if self.update_worker.update_done:
                     self.update_worker.update_done = False
-                    weights = ray.put(RayWeight(self.local_agent.get_weights()))
-                # self.logger.debug("Syncing weights for worker {}".format(self.worker_ids[ray_worker]))
-                # self.logger.debug("Weights type: {}, weights = {}".format(type(weights), weights))
-                ray_worker.set_weights.remote(weights)
-                self.weight_syncs_executed += 1
+                    self.weight_sync.publish(self.local_agent.get_weights())
+                if self.weight_sync.sync(ray_worker):
+                    self.weight_syncs_executed += 1
                 self.steps_since_weights_synced[ray_worker] = 0
 
             # Reschedule environment samples.
             self.env_sample_tasks.add_task(ray_worker, ray_worker.execute_and_get_with_count.remote())
 
         # 2. Fetch completed replay priority sampling task, move to worker, reschedule.
+        # With prefetching, this happens in the background and we only collect the counts.
+        if self.replay_prefetcher is not None:
+            discarded, queue_inserts = self.replay_prefetcher.get_and_reset_counts()
         for ray_memory, replay_remote_task in self.prioritized_replay_tasks.get_completed():
             # Immediately schedule new batch sampling tasks on these workers.
             self.prioritized_replay_tasks.add_task(ray_memory, ray_memory.get_batch.remote())
@@ -233,15 +255,9 @@ class ApexExecutor(RayExecutor):
                 self.update_worker.input_queue.put((ray_memory, sampled_batch and sampled_batch.copy()))
                 queue_inserts += 1
 
-        # 3. Update priorities on priority sampling workers using loss values produced by update worker.
+        # 3. Count updates. The update worker sends priority updates to the replay shards itself.
         while not self.update_worker.output_queue.empty():
-            ray_memory, indices, loss_per_item = self.update_worker.output_queue.get()
-            # self.logger.info('indices = {}'.format(batch["indices"]))
-            # self.logger.info('loss = {}'.format(loss_per_item))
-
-            ray_memory.update_priorities.remote(indices, loss_per_item)
-            # len of loss per item is update count.
-            update_steps += len(indices)
+            update_steps += self.update_worker.output_queue.get()
 
         return env_steps, update_steps, {
             "discarded": discarded,
@@ -249,6 +265,144 @@ class ApexExecutor(RayExecutor):
             "rewards": rewards
         }
 
+    def execute_workload(self, workload):
+        # Only account for learner time during this workload.
+        self.update_worker.get_and_reset_times()
+        result = super(ApexExecutor, self).execute_workload(workload)
+        idle_time, busy_time = self.update_worker.get_and_reset_times()
+        result["learner_idle_time"] = idle_time
+        result["learner_idle_fraction"] = idle_time / ((idle_time + busy_time) or 1e-10)
+        self.logger.info("Learner idle time: {} s ({} % of learner time).".format(
+            idle_time, 100 * result["learner_idle_fraction"]
+        ))
+        return result
+
+    def terminate(self):
+        """
+        Stops and joins the background threads (replay prefetcher and update worker).
+        """
+        # Stop feeding the learner queue first, so the update worker can drain it.
+        if self.replay_prefetcher is not None:
+            self.replay_prefetcher.stop()
+            self.replay_prefetcher = None
+        self.update_worker.stop()
+
+
+class ReplayPrefetcher(Thread):
+    """
+    Keeps a number of replay batch sampling tasks in flight per replay shard and resolves them in the
+    background, so the learner never waits on the executor's event loop.
+    """
+    def __init__(self, memory_actors, prefetch_depth, learner_queue, discard_queued_samples=False):
+        """
+        Args:
+            memory_actors (list): Replay shards (RayMemoryActors) to sample from.
+            prefetch_depth (int): Number of batch sampling tasks kept in flight per shard.
+            learner_queue (queue.Queue): Learner input queue to put (memory actor, batch)-tuples into.
+            discard_queued_samples (bool): If true, discard samples if the learner queue is full instead
+                of blocking until free.
+        """
+        super(ReplayPrefetcher, self).__init__()
+        self.memory_actors = memory_actors
+        self.prefetch_depth = prefetch_depth
+        self.learner_queue = learner_queue
+        self.discard_queued_samples = discard_queued_samples
+        self.replay_tasks = RayTaskPool()
+
+        self.lock = Lock()
+        self.discarded = 0
+        self.queue_inserts = 0
+
+        # Terminate when host process terminates.
+        self.daemon = True
+        self.stopped = Event()
+
+    def run(self):
+        for ray_memory in self.memory_actors:
+            for _ in range(self.prefetch_depth):
+                self.replay_tasks.add_task(ray_memory, ray_memory.get_batch.remote())
+        while not self.stopped.is_set():
+            self.step()
+
+    def stop(self):
+        """
+        Stops prefetching and waits for the thread to finish.
+        """
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def step(self):
+        for ray_memory, replay_remote_task in self.replay_tasks.get_completed():
+            self.replay_tasks.add_task(ray_memory, ray_memory.get_batch.remote())
+            sampled_batch = ray.get(object_ids=replay_remote_task)
+            # Memory not yet filled enough to sample.
+            if sampled_batch is None:
+                continue
+            if self.discard_queued_samples and self.learner_queue.full():
+                with self.lock:
+                    self.discarded += 1
+            else:
+                # Copy due to memory leaks in Ray, see https://github.com/ray-project/ray/pull/3484/
+                self.learner_queue.put((ray_memory, sampled_batch.copy()))
+                with self.lock:
+                    self.queue_inserts += 1
+
+    def get_and_reset_counts(self):
+        """
+        Returns:
+            tuple: Number of discarded batches and number of batches put into the learner queue since the
+                last call.
+        """
+        with self.lock:
+            counts = (self.discarded, self.queue_inserts)
+            self.discarded = 0
+            self.queue_inserts = 0
+        return counts
+
+
+class PriorityUpdateBatcher(object):
+    """
+    Merges several priority updates per replay shard into one remote call.
+    """
+    def __init__(self, batch_size=1):
+        """
+        Args:
+            batch_size (int): Number of updates per shard to merge before sending them.
+        """
+        self.batch_size = batch_size
+        # Maps memory actor to lists of pending indices and losses.
+        self.pending = {}
+
+    def add(self, memory_actor, indices, loss_per_item):
+        """
+        Adds a priority update, sends all pending updates of the shard once `batch_size` are pending.
+
+        Args:
+            memory_actor (RayMemoryActor): Replay shard the batch was sampled from.
+            indices (ndarray): Indices to update in replay memory.
+            loss_per_item (ndarray): Loss values for indices.
+        """
+        pending_indices, pending_losses = self.pending.setdefault(memory_actor, ([], []))
+        pending_indices.append(indices)
+        pending_losses.append(loss_per_item)
+        if len(pending_indices) >= self.batch_size:
+            self.flush(memory_actor)
+
+    def flush(self, memory_actor=None):
+        """
+        Sends pending updates.
+
+        Args:
+            memory_actor (Optional[RayMemoryActor]): Shard to flush. If None, flushes all shards.
+        """
+        memory_actors = list(self.pending.keys()) if memory_actor is None else [memory_actor]
+        for memory_actor in memory_actors:
+            pending_indices, pending_losses = self.pending.pop(memory_actor, ([], []))
+            if len(pending_indices) > 0:
+                memory_actor.update_priorities.remote(np.concatenate(pending_indices),
+                                                      np.concatenate(pending_losses))
+
 
 class UpdateWorker(Thread):
     """
@@ -256,40 +410,87 @@ class UpdateWorker(Thread):
     Communicates with the main thread via a queue.
     """
 
-    def __init__(self, agent, in_queue_size):
+    def __init__(self, agent, in_queue_size, priority_update_batch_size=1):
         """
         Initializes the worker with a RLGraph agent and queues for
 
         Args:
             agent (Agent): RLGraph agent used to execute local updates.
-            input_queue (queue.Queue): Input queue the worker will use to poll samples.
-            output_queue (queue.Queue): Output queue the worker will use to push results of local
-                update computations.
+            in_queue_size (int): Size of the input queue the worker will use to poll samples.
+            priority_update_batch_size (int): Number of updates per replay shard merged into one
+                remote priority update.
         """
         super(UpdateWorker, self).__init__()
 
         # Agent to use for updating.
         self.agent = agent
         self.input_queue = queue.Queue(maxsize=in_queue_size)
+        # Number of records updated per update, for the main thread.
         self.output_queue = queue.Queue()
+        self.priority_batcher = PriorityUpdateBatcher(batch_size=priority_update_batch_size)
+
+        # Time spent waiting for input vs. updating.
+        self.lock = Lock()
+        self.idle_time = 0.0
+        self.busy_time = 0.0
+        self.wait_start = None
 
         # Terminate when host process terminates.
         self.daemon = True
+        self.stopped = Event()
 
         # Flag for main thread.
         self.update_done = False
 
     def run(self):
-        while True:
+        while not self.stopped.is_set():
             self.step()
 
+    def stop(self):
+        """
+        Stops updating and waits for the thread to finish.
+        """
+        self.stopped.set()
+        if self.is_alive():
+            # Wake up a worker waiting for input.
+            self.input_queue.put((None, None))
+            self.join()
+        self.priority_batcher.flush()
+
     def step(self):
+        # Send pending priority updates instead of holding them back while there is nothing to learn from.
+        if self.input_queue.empty():
+            self.priority_batcher.flush()
+
         # Fetch input for update:
         # Replay memory used.
+        with self.lock:
+            self.wait_start = time.perf_counter()
         memory_actor, sample_batch = self.input_queue.get()
+        update_start = time.perf_counter()
 
         if sample_batch is not None:
             losses = self.agent.update(batch=sample_batch)
-            # Just pass back indices for updating.
-            self.output_queue.put((memory_actor, sample_batch["indices"], losses[1]))
+            self.priority_batcher.add(memory_actor, sample_batch["indices"], losses[1])
+            self.output_queue.put(len(sample_batch["indices"]))
             self.update_done = True
+        with self.lock:
+            self.idle_time += update_start - self.wait_start
+            self.busy_time += time.perf_counter() - update_start
+            self.wait_start = None
+
+    def get_and_reset_times(self):
+        """
+        Returns:
+            tuple: Time (s) spent waiting for input and time spent updating since the last call.
+        """
+        with self.lock:
+            idle_time, busy_time = self.idle_time, self.busy_time
+            # Include the current wait so far, the rest of it counts towards the next call.
+            if self.wait_start is not None:
+                now = time.perf_counter()
+                idle_time += now - self.wait_start
+                self.wait_start = now
+            self.idle_time = 0.0
+            self.busy_time = 0.0
+        return idle_time, busy_time
@@ -19,19 +19,30 @@ from __future__ import print_function
 
 import numpy as np
 import operator
-from six.moves import xrange as range_
+from six import string_types
 
 from rlgraph.utils import SMALL_NUMBER
 from rlgraph.utils.specifiable import Specifiable
 from rlgraph.components.helpers.mem_segment_tree import MemSegmentTree, MinSumSegmentTree
-from rlgraph.execution.ray.ray_util import ray_decompress
+from rlgraph.components.helpers.observation_store import ObservationStore
+from rlgraph.execution.ray.ray_util import ray_decompress, ray_decompress_batch, is_compressed_batch
 
 
 class ApexMemory(Specifiable):
     """
     Apex prioritized replay implementing compression.
+
+    Records are stored column-wise in fixed-capacity numpy arrays (one per record field, one per key for
+    container actions) so that inserting a batch and gathering a sample are single fancy-index operations per
+    column. Priorities live in the leaves of the sum/min segment trees.
     """
-    def __init__(self, state_space=None, action_space=None, capacity=1000, alpha=1.0, beta=1.0):
+    # Record fields in the order of the record tuples passed to `insert_records`.
+    record_fields = ["states", "actions", "rewards", "terminals", "next_states"]
+    # Fixed dtypes for columns whose first value may not be representative (e.g. an integer reward).
+    column_dtypes = dict(rewards=np.float32, terminals=np.bool_)
+
+    def __init__(self, state_space=None, action_space=None, capacity=1000, alpha=1.0, beta=1.0,
+                 observation_store_spec=None):
         """
         Args:
             state_space (dict): State spec.
@@ -39,13 +50,22 @@ class ApexMemory(Specifiable):
             capacity (int): Max capacity.
             alpha (float): Initial weight.
             beta (float): Prioritisation factor.
+            observation_store_spec (Optional[dict]): If given, states and next-states are kept frame-deduplicated
+                in an `ObservationStore` constructed with these args (e.g. `sequence_length`, `add_rank`,
+                `max_next_state_offset`) instead of in their own columns. Compressed states are decompressed on
+                insert.
         """
         super(ApexMemory, self).__init__()
 
         self.state_space = state_space
         self.action_space = action_space
         self.container_actions = isinstance(action_space, dict)
-        self.memory_values = []
+        # Column storage, allocated on first insert as shapes and dtypes are inferred from the data
+        # (states may arrive compressed).
+        self.columns = None
+        self.observation_store = None
+        if observation_store_spec is not None:
+            self.observation_store = ObservationStore(capacity=capacity, **observation_store_spec)
         self.index = 0
         self.capacity = capacity
         self.size = 0
@@ -59,9 +79,9 @@ class ApexMemory(Specifiable):
             self.priority_capacity *= 2
 
         # Create segment trees, initialize with neutral elements.
-        sum_values = [0.0 for _ in range_(2 * self.priority_capacity)]
+        sum_values = np.zeros(shape=(2 * self.priority_capacity,), dtype=np.float64)
         sum_segment_tree = MemSegmentTree(sum_values, self.priority_capacity, operator.add)
-        min_values = [float('inf') for _ in range_(2 * self.priority_capacity)]
+        min_values = np.full(shape=(2 * self.priority_capacity,), fill_value=float('inf'), dtype=np.float64)
         min_segment_tree = MemSegmentTree(min_values, self.priority_capacity, min)
         self.merged_segment_tree = MinSumSegmentTree(
             sum_tree=sum_segment_tree,
@@ -69,13 +89,59 @@ class ApexMemory(Specifiable):
             capacity=self.priority_capacity
         )
 
+    def _allocate_column(self, value, dtype=None):
+        """
+        Allocates a fixed-capacity column for the given (single record) value.
+
+        Args:
+            value (any): A single record's value for this column.
+            dtype (Optional[np.dtype]): Dtype to use instead of the value's inferred dtype.
+
+        Returns:
+            np.ndarray: Column of shape [capacity] + value shape. Compressed values are stored as objects.
+        """
+        if value is None or isinstance(value, (bytes, string_types)):
+            return np.empty(shape=(self.capacity,), dtype=object)
+        value = np.asarray(value, dtype=dtype)
+        return np.zeros(shape=(self.capacity,) + value.shape, dtype=value.dtype)
+
+    def _allocate_columns(self, record):
+        """
+        Allocates all columns from a single record dict.
+
+        Args:
+            record (dict): Dict mapping record field names to one record's values.
+        """
+        self.container_actions = self.container_actions or isinstance(record["actions"], dict)
+        self.columns = {}
+        for name in self.record_fields:
+            if self.observation_store is not None and name in ("states", "next_states"):
+                continue
+            if name == "actions" and self.container_actions:
+                self.columns[name] = {k: self._allocate_column(v) for k, v in record[name].items()}
+            else:
+                self.columns[name] = self._allocate_column(record[name], dtype=self.column_dtypes.get(name))
+
     def insert_records(self, record):
-        # TODO: This has the record interface, but actually expects a specific structure anyway, so
-        # may as well change API?
-        if self.index >= self.size:
-            self.memory_values.append(record)
-        else:
-            self.memory_values[self.index] = record
+        """
+        Inserts a single record.
+
+        Args:
+            record (tuple): Record tuple (state, action, reward, terminal, next_state, weight). If weight
+                is None, the current max-priority is used.
+        """
+        if self.columns is None:
+            self._allocate_columns(dict(zip(self.record_fields, record)))
+        if self.observation_store is not None:
+            self.observation_store.insert([ray_decompress(record[0])], [ray_decompress(record[4])])
+        for name, value in zip(self.record_fields, record):
+            if name not in self.columns:
+                continue
+            if name == "actions" and self.container_actions:
+                for k, column in self.columns[name].items():
+                    column[self.index] = value[k]
+            else:
+                self.columns[name][self.index] = value
 
         # Weights. # TODO this is problematic due to index not existing.
         if record[5] is not None:
@@ -87,6 +153,69 @@ class ApexMemory(Specifiable):
         self.index = (self.index + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    def insert_batch(self, records):
+        """
+        Inserts a whole batch of records (e.g. from an `EnvironmentSample`) with one fancy-index assignment per
+        column and one batched segment tree update.
+
+        Args:
+            records (dict): Batch dict with keys states, actions (array or dict of arrays), rewards, terminals,
+                next_states and optionally importance_weights. If no importance weights are given, the
+                current max-priority is used.
+        """
+        num_records = len(records["terminals"])
+        if num_records == 0:
+            return
+        # Batch-compressed states are stored uncompressed.
+        if is_compressed_batch(records["states"]) or is_compressed_batch(records["next_states"]):
+            records = dict(records)
+            for name in ["states", "next_states"]:
+                if is_compressed_batch(records[name]):
+                    records[name] = ray_decompress_batch(records[name])
+        # Only the last `capacity` records would survive the insert anyway.
+        offset = max(num_records - self.capacity, 0)
+        if self.columns is None:
+            first_record = {}
+            for name in self.record_fields:
+                if isinstance(records[name], dict):
+                    first_record[name] = {k: v[0] for k, v in records[name].items()}
+                else:
+                    first_record[name] = records[name][0]
+            self._allocate_columns(first_record)
+
+        insert_indices = np.arange(start=self.index + offset, stop=self.index + num_records) % self.capacity
+        if self.observation_store is not None:
+            self.observation_store.insert(self._decompress_batch(records["states"]),
+                                          self._decompress_batch(records["next_states"]))
+        for name in self.record_fields:
+            if name not in self.columns:
+                continue
+            if name == "actions" and self.container_actions:
+                for k, column in self.columns[name].items():
+                    column[insert_indices] = records[name][k][offset:]
+            else:
+                self.columns[name][insert_indices] = records[name][offset:]
+
+        weights = records.get("importance_weights", None)
+        if weights is not None:
+            priorities = np.power(np.asarray(weights)[offset:], self.alpha)
+        else:
+            priorities = self.max_priority ** self.alpha
+        self.merged_segment_tree.insert_batch(insert_indices, priorities)
+
+        # Update indices.
+        self.index = (self.index + num_records) % self.capacity
+        self.size = min(self.size + num_records, self.capacity)
+
+    @staticmethod
+    def _decompress_batch(values):
+        """
+        Decompresses a batch of (possibly) individually compressed values into one array.
+        """
+        if len(values) > 0 and isinstance(values[0], (bytes, string_types)):
+            return np.asarray([ray_decompress(value) for value in values])
+        return np.asarray(values)
+
     def read_records(self, indices):
         """
         Obtains record values for the provided indices.
@@ -97,59 +226,50 @@ class ApexMemory(Specifiable):
         Returns:
              dict: Record value dict.
         """
-        states = []
-        if self.container_actions:
-            actions = {k: [] for k in self.action_space.keys()}
+        if self.observation_store is not None:
+            states, next_states = self.observation_store.get(indices)
         else:
-            actions = []
-        rewards = []
-        terminals = []
-        next_states = []
-        for index in indices:
-            state, action, reward, terminal, next_state, weight = self.memory_values[index]
-            states.append(ray_decompress(state))
-
-            if self.container_actions:
-                for name in self.action_space.keys():
-                    actions[name].append(action[name])
-            else:
-                actions.append(action)
-            rewards.append(reward)
-            terminals.append(terminal)
-            next_states.append(ray_decompress(next_state))
+            states = self.columns["states"][indices]
+            next_states = self.columns["next_states"][indices]
+            if states.dtype == object:
+                states = self._decompress_batch(states)
+            if next_states.dtype == object:
+                next_states = self._decompress_batch(next_states)
 
         if self.container_actions:
-            for name in self.action_space.keys():
-                actions[name] = np.squeeze(np.array(actions[name]))
+            actions = {k: np.squeeze(column[indices]) for k, column in self.columns["actions"].items()}
         else:
-            actions = np.array(actions)
+            actions = self.columns["actions"][indices]
         return dict(
-            states=np.asarray(states),
+            states=states,
             actions=actions,
-            rewards=np.asarray(rewards),
-            terminals=np.asarray(terminals),
-            next_states=np.asarray(next_states)
+            rewards=self.columns["rewards"][indices],
+            terminals=self.columns["terminals"][indices],
+            next_states=next_states
         )
 
     def get_records(self, num_records):
-        indices = []
-        prob_sum = self.merged_segment_tree.sum_segment_tree.get_sum(0, self.size)
+        sum_segment_tree = self.merged_segment_tree.sum_segment_tree
+        prob_sum = sum_segment_tree.get_sum(0, self.size)
         samples = np.random.random(size=(num_records,)) * prob_sum
-        for sample in samples:
-            indices.append(self.merged_segment_tree.sum_segment_tree.index_of_prefixsum(prefix_sum=sample))
+        indices = sum_segment_tree.find_prefixsum_indices(samples)
 
-        sum_prob = self.merged_segment_tree.sum_segment_tree.get_sum()
+        sum_prob = sum_segment_tree.get_sum()
         min_prob = self.merged_segment_tree.min_segment_tree.get_min_value() / sum_prob + SMALL_NUMBER
         max_weight = (min_prob * self.size) ** (-self.beta)
-        weights = []
-        for index in indices:
-            sample_prob = self.merged_segment_tree.sum_segment_tree.get(index) / sum_prob
-            weight = (sample_prob * self.size) ** (-self.beta)
-            weights.append(weight / max_weight)
+        sample_probs = sum_segment_tree.get_batch(indices) / sum_prob
+        weights = (sample_probs * self.size) ** (-self.beta) / max_weight
 
-        return self.read_records(indices=indices), np.asarray(indices), np.asarray(weights)
+        return self.read_records(indices=indices), indices, weights
 
     def update_records(self, indices, update):
-        for index, loss in zip(indices, update):
-            self.merged_segment_tree.insert(index, loss ** self.alpha)
-            self.max_priority = max(self.max_priority, loss)
+        """
+        Updates the priorities of the given indices with one batched segment tree update.
+
+        Args:
+            indices (ndarray): Indices to update.
+            update (ndarray): New (loss-based) priorities for the indices.
+        """
+        update = np.asarray(update)
+        self.merged_segment_tree.insert_batch(indices, update ** self.alpha)
+        self.max_priority = max(self.max_priority, np.max(update))
@@ -19,13 +19,13 @@ from __future__ import print_function
 
 import numpy as np
 from rlgraph.utils import SMALL_NUMBER
-from six.moves import xrange as range_
 from rlgraph import get_distributed_backend
 from rlgraph.execution.ray.apex.apex_memory import ApexMemory
 from rlgraph.execution.ray.ray_actor import RayActor
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class RayMemoryActor(RayActor):
@@ -70,31 +70,16 @@ class RayMemoryActor(RayActor):
         """
         Observes experience(s).
 
-        N.b. For performance reason, data layout is slightly different for apex.
+        N.b. For performance reason, data layout is slightly different for apex: The whole sample batch is
+        inserted at once via `ApexMemory.insert_batch`.
         """
         records = env_sample.get_batch()
-        num_records = len(records['states'])
 
         # TODO port to tf PR behaviour.
         if self.clip_rewards:
-            rewards = np.sign(records["rewards"])
-        else:
-            rewards = records["rewards"]
-        for i in range_(num_records):
-            # If Actions is dict with vectors per key, convert to single dict.
-            if isinstance(records["actions"], dict):
-                action = {k: v[i] for k, v in records["actions"].items()}
-            else:
-                action = records["actions"][i]
-
-            self.memory.insert_records((
-                records["states"][i],
-                action,
-                rewards[i],
-                records["terminals"][i],
-                records["next_states"][i],
-                records["importance_weights"][i]
-            ))
+            records = dict(records)
+            records["rewards"] = np.sign(records["rewards"])
+        self.memory.insert_batch(records)
 
     def update_priorities(self, indices, loss):
         """
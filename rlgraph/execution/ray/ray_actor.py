@@ -36,7 +36,19 @@ class RayActor(object):
         """
         return os.uname()[1]
 
-    def setup_preprocessor(self, preprocessing_spec, in_space):
+    def setup_preprocessor(self, preprocessing_spec, in_space, batch_size=None):
+        """
+        Builds a python-backend PreprocessorStack.
+
+        Args:
+            preprocessing_spec (Optional[list]): The preprocessor specs.
+            in_space (Space): The (raw) state Space.
+            batch_size (Optional[int]): If given, the number of batch slots (environments) that stateful layers
+                keep state for.
+
+        Returns:
+            Optional[PreprocessorStack]: The preprocessor stack or None if no spec given.
+        """
         if preprocessing_spec is not None:
             preprocessing_spec = deepcopy(preprocessing_spec)
             in_space = deepcopy(in_space)
@@ -48,10 +60,13 @@ class RayActor(object):
             processor_stack = PreprocessorStack(*preprocessing_spec, backend="python")
             build_space = in_space
             for sub_comp_scope in scopes:
-                processor_stack.sub_components[sub_comp_scope].create_variables(input_spaces=dict(
-                    preprocessing_inputs=build_space
+                sub_component = processor_stack.sub_components[sub_comp_scope]
+                if batch_size is not None and hasattr(sub_component, "batch_size"):
+                    sub_component.batch_size = batch_size
+                sub_component.create_variables(input_spaces=dict(
+                    inputs=build_space
                 ), action_space=None)
-                build_space = processor_stack.sub_components[sub_comp_scope].get_preprocessed_space(build_space)
+                build_space = sub_component.get_preprocessed_space(build_space)
             processor_stack.reset()
             return processor_stack
         else:
@@ -25,11 +25,13 @@ import time
 
 from rlgraph import get_distributed_backend
 from rlgraph.agents import Agent
+from rlgraph.components.neural_networks.preprocessor_stack import PreprocessorStack
 from rlgraph.environments import Environment
 from rlgraph.execution.ray.ray_util import worker_exploration
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class RayExecutor(object):
@@ -67,6 +69,15 @@ class RayExecutor(object):
         # Map worker objects to host ids.
         self.worker_ids = {}
 
+        # Running preprocessor statistics merged over all workers (see `sync_preprocessor_statistics`).
+        self.preprocessor_statistics = None
+        # Python stack (w/o variables) of the workers' preprocessor layout, used to merge their statistics.
+        self.preprocessor_stack = None
+        # Sync preprocessor statistics every n worker steps (0=never, as syncing blocks on all workers and
+        # replaces their own estimates).
+        self.preprocessor_sync_steps = executor_spec.get("preprocessor_sync_steps", 0)
+        self.steps_since_preprocessor_sync = 0
+
     def ray_init(self):
         """
         Connects to a Ray cluster or starts one if none exists.
@@ -98,6 +109,12 @@ class RayExecutor(object):
         Returns:
             list: Remote Ray actors.
         """
+        preprocessing_spec = agent_config.get("preprocessing_spec", None)
+        if preprocessing_spec is not None and self.preprocessor_sync_steps > 0:
+            self.preprocessor_stack = PreprocessorStack(
+                *[dict(spec, backend="python") for spec in deepcopy(preprocessing_spec)], backend="python"
+            )
+
         workers = []
         cls_as_remote = cls.as_remote(num_cpus=self.num_cpus_per_worker, num_gpus=self.num_gpus_per_worker).remote
 
@@ -179,6 +196,10 @@ class RayExecutor(object):
             while (iteration_step < report_interval) or\
                     time.monotonic() - iteration_start < report_interval_min_seconds:
                 worker_steps_executed, update_steps, stats = self._execute_step()
+                self.steps_since_preprocessor_sync += worker_steps_executed
+                if 0 < self.preprocessor_sync_steps <= self.steps_since_preprocessor_sync:
+                    self.sync_preprocessor_statistics()
+                    self.steps_since_preprocessor_sync = 0
                 iteration_step += worker_steps_executed
                 iteration_updates += update_steps
                 iteration_discarded += stats["discarded"]
@@ -245,6 +266,32 @@ class RayExecutor(object):
             mean_final_reward=worker_stats["mean_final_reward"]
         )
 
+    def sync_preprocessor_statistics(self):
+        """
+        Merges the running preprocessor statistics (e.g. MovingStandardize estimates) collected by all sample workers
+        since the last sync into the global statistics and sends those back to all workers, so all workers
+        standardize states consistently. Called every `preprocessor_sync_steps` worker steps during
+        `execute_workload` if `preprocessor_sync_steps` > 0.
+
+        Returns:
+            Optional[dict]: The merged statistics by preprocessor scope or None if syncing is disabled or the workers'
+                preprocessors do not keep any statistics.
+        """
+        if self.preprocessor_stack is None:
+            return None
+        tasks = [worker.get_preprocessor_statistics.remote(only_new=True) for worker in self.ray_env_sample_workers]
+        self.preprocessor_statistics = self.preprocessor_stack.merge_statistics(
+            self.preprocessor_statistics, *ray.get(tasks)
+        )
+        # No layer keeps statistics -> Nothing to sync from now on.
+        if len(self.preprocessor_statistics) == 0:
+            self.preprocessor_stack = None
+            self.preprocessor_statistics = None
+            return None
+        ray.get([worker.set_preprocessor_statistics.remote(self.preprocessor_statistics)
+                 for worker in self.ray_env_sample_workers])
+        return self.preprocessor_statistics
+
     def sample_metrics(self):
         return self.sample_iteration_throughputs
 
@@ -26,13 +26,18 @@ import time
 from rlgraph import get_distributed_backend
 from rlgraph.components.neural_networks.preprocessor_stack import PreprocessorStack
 from rlgraph.environments.sequential_vector_env import SequentialVectorEnv
+from rlgraph.environments.vector_env import VectorEnv
 from rlgraph.execution.environment_sample import EnvironmentSample
+from rlgraph.execution.numpy_policy import NumpyPolicy
 from rlgraph.execution.ray import RayExecutor
 from rlgraph.execution.ray.ray_actor import RayActor
-from rlgraph.execution.ray.ray_util import ray_compress
+from rlgraph.execution.ray.ray_util import ray_compress, ray_compress_batch
+from rlgraph.utils.profiler import Profiler
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class RayPolicyWorker(RayActor):
@@ -60,12 +65,26 @@ class RayPolicyWorker(RayActor):
         self.num_environments = worker_spec.pop("num_worker_environments", 1)
         self.worker_sample_size = worker_spec.pop("worker_sample_size") * self.num_environments
         self.worker_executes_postprocessing = worker_spec.pop("worker_executes_postprocessing", True)
+        # Act via a NumPy export of the agent's policy (see `NumpyPolicy`). The agent's graph is then only built if
+        # needed for post-processing.
+        self.numpy_inference = worker_spec.pop("numpy_inference", False)
 
+        # True: Compress every state separately, "batch": Compress all states of a sample as one blob.
         self.compress = worker_spec.pop("compress_states", False)
         self.env_ids = ["env_{}".format(i) for i in range_(self.num_environments)]
         num_background_envs = worker_spec.pop("num_background_envs", 1)
-
-        self.vector_env = SequentialVectorEnv(self.num_environments, env_spec, num_background_envs)
+        # Collect per-phase timings (see `rlgraph.utils.profiler.Profiler`) in this worker's process.
+        if worker_spec.pop("enable_profiling", False):
+            Profiler.enable()
+        # Optional spec of the VectorEnv class (e.g. {"type": "multiprocess-vector", "num_processes": 2}).
+        vector_env_spec = worker_spec.pop("vector_env_spec", None)
+
+        if vector_env_spec is None:
+            self.vector_env = SequentialVectorEnv(self.num_environments, env_spec, num_background_envs)
+        else:
+            self.vector_env = VectorEnv.from_spec(
+                vector_env_spec, num_environments=self.num_environments, env_spec=env_spec
+            )
 
         # Then update agent config.
         agent_config['state_space'] = self.vector_env.state_space
@@ -81,6 +100,7 @@ class RayPolicyWorker(RayActor):
             )
             self.is_preprocessed[env_id] = False
         self.agent = self.setup_agent(agent_config, worker_spec)
+        self.numpy_policy = NumpyPolicy.from_agent(self.agent) if self.numpy_inference else None
         self.worker_frameskip = frameskip
 
         #  Flag for container actions.
@@ -121,6 +141,11 @@ class RayPolicyWorker(RayActor):
         # Was the last state a terminal state so env should be reset in next call?
         self.last_terminals = [False for _ in range_(self.num_environments)]
 
+        # Version of the policy weights last set (see `RayWeight`), None before the first sync, and the decoded
+        # weights of that version (base for delta encoded weights).
+        self.policy_version = None
+        self.weights = None
+
     def get_constructor_success(self):
         """
         For debugging: fetch the last attribute. Will fail if constructor failed.
@@ -139,6 +164,8 @@ class RayPolicyWorker(RayActor):
         worker_exec_spec = worker_spec.get("execution_spec", None)
         if worker_exec_spec is not None:
             agent_config.update(execution_spec=worker_exec_spec)
+        if self.numpy_inference and not self.worker_executes_postprocessing:
+            agent_config = dict(agent_config, auto_build=False)
 
         # Build lazily per default.
         return RayExecutor.build_agent_from_config(agent_config)
@@ -211,8 +238,14 @@ class RayPolicyWorker(RayActor):
                 else:
                     self.preprocessed_states_buffer[i] = env_states[i]
 
-            actions = self.agent.get_action(states=self.preprocessed_states_buffer,
-                                            use_exploration=use_exploration, apply_preprocessing=False)
+            with Profiler.timer("worker", "act"):
+                if self.numpy_policy is not None:
+                    actions = self.numpy_policy.get_action(
+                        self.preprocessed_states_buffer, use_exploration=use_exploration
+                    )
+                else:
+                    actions = self.agent.get_action(states=self.preprocessed_states_buffer,
+                                                    use_exploration=use_exploration, apply_preprocessing=False)
 
             if self.agent.flat_action_space is not None:
                 some_key = next(iter(actions))
@@ -229,7 +262,8 @@ class RayPolicyWorker(RayActor):
                 env_actions = actions
                 if self.num_environments == 1 and env_actions.shape == ():
                     env_actions = [env_actions]
-            next_states, step_rewards, terminals, infos = self.vector_env.step(actions=env_actions)
+            with Profiler.timer("worker", "env_step"):
+                next_states, step_rewards, terminals, infos = self.vector_env.step(actions=env_actions)
             # Worker frameskip not needed as done in env.
             # for _ in range_(self.worker_frameskip):
             #     next_states, step_rewards, terminals, infos = self.vector_env.step(actions=actions)
@@ -363,6 +397,7 @@ class RayPolicyWorker(RayActor):
                 # Agent act/observe throughput.
                 timesteps_executed=timesteps_executed,
                 ops_per_second=(timesteps_executed / total_time),
+                policy_version=self.policy_version
             )
         )
 
@@ -372,11 +407,55 @@ class RayPolicyWorker(RayActor):
         return sample, sample.batch_size
 
     def set_weights(self, weights):
-        policy_weights = {k: v for k,v in zip(weights.policy_vars, weights.policy_values)}
-        vf_weights = None
-        if weights.has_vf:
-            vf_weights = {k: v for k, v in zip(weights.value_function_vars, weights.value_function_values)}
-        self.agent.set_weights(policy_weights, value_function_weights=vf_weights)
+        """
+        Sets the policy (and value function) weights of the local agent.
+
+        Args:
+            weights (RayWeight): The (possibly encoded) weights. Delta encoded weights must be based on the version
+                this worker currently holds.
+        """
+        if weights.encoding == "delta" and weights.base_version != self.policy_version:
+            raise RLGraphError("Received weight delta for version {} but worker holds version {}!".format(
+                weights.base_version, self.policy_version
+            ))
+        with Profiler.timer("worker", "weight_sync"):
+            self.weights = weights.decode(self.weights)
+            if self.agent.graph_built:
+                self.agent.set_weights(
+                    self.weights["policy_weights"], value_function_weights=self.weights.get("value_function_weights")
+                )
+            if self.numpy_policy is not None:
+                self.numpy_policy.set_weights(self.weights["policy_weights"])
+        # Samples generated from now on are tagged with this version.
+        self.policy_version = weights.policy_version
+
+    def get_preprocessor_statistics(self, only_new=True):
+        """
+        Exports the running statistics of this worker's preprocessors (e.g. MovingStandardize estimates), merged
+        over all its environments.
+
+        Args:
+            only_new (bool): Whether to only export statistics of states seen since the last
+                `set_preprocessor_statistics` call.
+
+        Returns:
+            dict: The statistics by preprocessor scope (see `PreprocessorStack.get_statistics`).
+        """
+        stacks = [self.preprocessors[env_id] for env_id in self.env_ids if self.preprocessors[env_id] is not None]
+        if len(stacks) == 0:
+            return {}
+        return stacks[0].merge_statistics(*[stack.get_statistics(only_new=only_new) for stack in stacks])
+
+    def set_preprocessor_statistics(self, statistics):
+        """
+        Replaces the running statistics of all of this worker's preprocessors, e.g. with globally merged ones.
+
+        Args:
+            statistics (dict): The statistics by preprocessor scope.
+        """
+        for env_id in self.env_ids:
+            if self.preprocessors[env_id] is not None:
+                self.preprocessors[env_id].set_statistics(statistics)
 
     def get_workload_statistics(self):
         """
@@ -403,7 +482,7 @@ class RayPolicyWorker(RayActor):
             mean_episode_reward = None
             final_episode_reward = None
 
-        return dict(
+        stats = dict(
             episode_timesteps=self.finished_episode_timesteps,
             episode_rewards=self.finished_episode_rewards,
             episode_total_times=self.finished_episode_total_times,
@@ -415,8 +494,13 @@ class RayPolicyWorker(RayActor):
             episodes_executed=self.episodes_executed,
             worker_steps=self.total_worker_steps,
             mean_worker_ops_per_second=sum(self.sample_steps) / sum(self.sample_times),
-            mean_worker_env_frames_per_second=sum(adjusted_frames) / sum(self.sample_times)
+            mean_worker_env_frames_per_second=sum(adjusted_frames) / sum(self.sample_times),
+            # Version of the weights this worker currently acts with.
+            weight_version=self.policy_version
         )
+        if Profiler.enabled is True:
+            stats["profile"] = Profiler.get_stats()
+        return stats
 
     def _process_policy_trajectories(self, states, actions, rewards, terminals, sequence_indices):
         """
@@ -432,7 +516,10 @@ class RayPolicyWorker(RayActor):
                 )
             )
 
-        if self.compress:
+        if self.compress == "batch":
+            env_dtype = self.vector_env.state_space.dtype
+            states = ray_compress_batch(np.asarray(states, dtype=util.convert_dtype(dtype=env_dtype, to='np')))
+        elif self.compress:
             env_dtype = self.vector_env.state_space.dtype
             states = [ray_compress(np.asarray(state, dtype=util.convert_dtype(dtype=env_dtype, to='np')))
                       for state in states]
@@ -19,13 +19,15 @@ from __future__ import print_function
 
 import os
 import base64
+import struct
 import numpy as np
 from six import string_types
 from rlgraph import get_distributed_backend
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
     import lz4.frame
     import pyarrow
 
@@ -35,25 +37,174 @@ class RayWeight(object):
     """
     Wrapper to transport TF weights to deal with serialisation bugs in Ray/Arrow.
 
+    Weights can optionally be encoded to reduce their transport size:
+    - "float16": Float values are sent as float16.
+    - "delta": Float values are sent as float16 differences to a base version of the weights, which the receiving
+        worker must hold (see `decode`).
+
     #TODO investigate serialisation bugs in Ray/flatten values.
     """
 
-    def __init__(self, weights):
-        self.policy_vars = []
-        self.policy_values = []
-
-        for k, v in weights["policy_weights"].items():
-            self.policy_vars.append(k)
-            self.policy_values.append(v)
+    def __init__(self, weights, policy_version=None, encoding=None, base_weights=None, base_version=None):
+        """
+        Args:
+            weights (dict): The agent's weights as returned by `Agent.get_weights()`.
+            policy_version (Optional[int]): Version (e.g. number of updates) of the policy these weights belong to.
+                Workers tag the samples they generate with it.
+            encoding (Optional[str]): None, "float16" or "delta".
+            base_weights (Optional[dict]): For "delta" encoding: The weights (same structure as `weights`) to encode
+                the difference to.
+            base_version (Optional[int]): For "delta" encoding: The version of `base_weights`.
+        """
+        if encoding not in [None, "float16", "delta"]:
+            raise RLGraphError("Invalid weight encoding '{}'! Allowed are None, 'float16' and 'delta'.".format(
+                encoding
+            ))
+        if encoding == "delta" and base_weights is None:
+            raise RLGraphError("'delta' weight encoding requires `base_weights`!")
+        self.policy_version = policy_version
+        self.encoding = encoding
+        self.base_version = base_version
+
+        self.policy_vars, self.policy_values = self._encode(
+            weights["policy_weights"], base_weights["policy_weights"] if base_weights is not None else None
+        )
 
         self.has_vf = False
         if "value_function_weights" in weights:
-            self.value_function_vars = []
-            self.value_function_values = []
             self.has_vf = True
-            for k, v in weights["value_function_weights"].items():
-                self.value_function_vars.append(k)
-                self.value_function_values.append(v)
+            self.value_function_vars, self.value_function_values = self._encode(
+                weights["value_function_weights"],
+                base_weights["value_function_weights"] if base_weights is not None else None
+            )
+
+    def _encode(self, weights, base_weights):
+        names = []
+        values = []
+        for k, v in weights.items():
+            names.append(k)
+            if self.encoding is not None and np.issubdtype(np.asarray(v).dtype, np.floating):
+                if self.encoding == "delta":
+                    v = np.asarray(v) - base_weights[k]
+                v = np.asarray(v, dtype=np.float16)
+            values.append(v)
+        return names, values
+
+    def decode(self, base_weights=None):
+        """
+        Decodes the transported weights.
+
+        Args:
+            base_weights (Optional[dict]): For "delta" encoding: The (decoded) weights of version `base_version`.
+
+        Returns:
+            dict: The weights in the format of `Agent.get_weights()`.
+        """
+        if self.encoding == "delta" and base_weights is None:
+            raise RLGraphError("Cannot decode 'delta' encoded weights (base version {}) without base weights!".format(
+                self.base_version
+            ))
+        weights = dict(policy_weights=self._decode(
+            self.policy_vars, self.policy_values, base_weights["policy_weights"] if base_weights else None
+        ))
+        if self.has_vf:
+            weights["value_function_weights"] = self._decode(
+                self.value_function_vars, self.value_function_values,
+                base_weights["value_function_weights"] if base_weights else None
+            )
+        return weights
+
+    def _decode(self, names, values, base_weights):
+        decoded = {}
+        for k, v in zip(names, values):
+            if self.encoding is not None and v.dtype == np.float16:
+                if self.encoding == "delta":
+                    base = base_weights[k]
+                    v = base + v.astype(base.dtype)
+                else:
+                    v = v.astype(np.float32)
+            decoded[k] = v
+        return decoded
+
+
+class RayWeightSync(object):
+    """
+    Versioned broadcast of a local agent's weights to remote workers:
+
+    - Each `publish` creates a new weight version, which is put into the Ray object store at most once.
+    - `sync` skips workers already holding the current version.
+    - With "delta" encoding, workers holding the previous version only receive the float16 difference. The sent
+        deltas are taken against the weights the workers actually reconstruct (not the exact local weights), so
+        quantization errors do not accumulate over versions.
+    """
+    def __init__(self, encoding=None):
+        """
+        Args:
+            encoding (Optional[str]): Weight encoding (see `RayWeight`): None, "float16" or "delta".
+        """
+        self.encoding = encoding
+        self.version = None
+        # Object ids of the current version's full (and for "delta" encoding, delta) weights.
+        self.full_weights = None
+        self.delta_weights = None
+        # Version the current delta is based on.
+        self.delta_base_version = None
+        # For "delta" encoding: The weights workers hold after decoding the current version.
+        self.weights = None
+        # Version last sent to each worker.
+        self.worker_versions = {}
+        self.num_syncs = 0
+        self.num_skipped_syncs = 0
+
+    def publish(self, weights, version=None):
+        """
+        Makes `weights` the current version.
+
+        Args:
+            weights (dict): The agent's weights as returned by `Agent.get_weights()`.
+            version (Optional[int]): The version number. Default: Previous version + 1 (0 for the first version).
+        """
+        previous_version = self.version
+        self.version = version if version is not None else (0 if previous_version is None else previous_version + 1)
+        if self.encoding == "delta":
+            self.full_weights = None
+            self.delta_weights = None
+            if self.weights is None:
+                self.weights = {key: {name: np.array(value) for name, value in sub_weights.items()}
+                                for key, sub_weights in weights.items()}
+            else:
+                delta = RayWeight(weights, policy_version=self.version, encoding="delta", base_weights=self.weights,
+                                  base_version=previous_version)
+                self.weights = delta.decode(self.weights)
+                self.delta_weights = ray.put(delta)
+                self.delta_base_version = previous_version
+        else:
+            self.full_weights = ray.put(RayWeight(weights, policy_version=self.version, encoding=self.encoding))
+
+    def sync(self, worker):
+        """
+        Sends the current weight version to the given worker, unless it already holds it.
+
+        Args:
+            worker (any): The Ray worker (must implement `set_weights`).
+
+        Returns:
+            bool: Whether weights were sent.
+        """
+        worker_version = self.worker_versions.get(worker)
+        if worker_version == self.version:
+            self.num_skipped_syncs += 1
+            return False
+        if self.delta_weights is not None and worker_version == self.delta_base_version:
+            worker.set_weights.remote(self.delta_weights)
+        else:
+            if self.full_weights is None:
+                self.full_weights = ray.put(RayWeight(self.weights, policy_version=self.version))
+            worker.set_weights.remote(self.full_weights)
+        # Ray executes a worker's tasks in order, so all later tasks of this worker act with this version.
+        self.worker_versions[worker] = self.version
+        self.num_syncs += 1
+        return True
 
 
 class RayTaskPool(object):
@@ -171,6 +322,73 @@ def ray_decompress(data):
     return data
 
 
+# Marks a batch compressed via `ray_compress_batch`.
+BATCH_COMPRESSION_MAGIC = b"RLGB"
+
+
+def ray_compress_batch(data):
+    """
+    Compresses a whole batch (e.g. of states) into one raw-bytes blob. Unlike `ray_compress`, the array is neither
+    serialized per element nor base64-encoded: The contiguous array buffer is compressed directly and prefixed with a
+    small header holding dtype and shape.
+
+    Args:
+        data (np.ndarray): Batch to compress.
+
+    Returns:
+        bytes: Compressed batch.
+    """
+    data = np.ascontiguousarray(data)
+    meta = "{};{}".format(data.dtype.str, ",".join(str(dim) for dim in data.shape)).encode("ascii")
+    header = BATCH_COMPRESSION_MAGIC + struct.pack("<H", len(meta)) + meta
+    return header + lz4.frame.compress(data.data)
+
+
+def is_compressed_batch(data):
+    """
+    Returns:
+        bool: True if data was compressed via `ray_compress_batch`.
+    """
+    return isinstance(data, bytes) and data[:len(BATCH_COMPRESSION_MAGIC)] == BATCH_COMPRESSION_MAGIC
+
+
+def _read_batch_header(data):
+    """
+    Reads dtype, shape and payload offset from the header of a batch compressed via `ray_compress_batch`.
+    """
+    offset = len(BATCH_COMPRESSION_MAGIC)
+    meta_length = struct.unpack_from("<H", data, offset)[0]
+    offset += struct.calcsize("<H")
+    dtype, shape = data[offset:offset + meta_length].decode("ascii").split(";")
+    shape = tuple(int(dim) for dim in shape.split(",")) if shape else ()
+    return np.dtype(dtype), shape, offset + meta_length
+
+
+def ray_decompress_batch(data, out=None):
+    """
+    Decompresses a batch compressed via `ray_compress_batch`.
+
+    Args:
+        data (bytes): Compressed batch.
+        out (Optional[np.ndarray]): Preallocated array (e.g. a slice of a larger batch) to decompress into. Must have
+            the shape of the compressed batch.
+
+    Returns:
+        np.ndarray: The decompressed batch (`out` if given).
+    """
+    dtype, shape, offset = _read_batch_header(data)
+    raw = lz4.frame.decompress(memoryview(data)[offset:], return_bytearray=True)
+    batch = np.frombuffer(raw, dtype=dtype).reshape(shape)
+    if out is None:
+        return batch
+    if out.shape != batch.shape:
+        raise RLGraphError("ERROR: Cannot decompress batch of shape {} into array of shape {}.".format(
+            batch.shape, out.shape
+        ))
+    out[...] = batch
+    return out
+
+
 # Ray's magic constant worker explorations..
 def worker_exploration(worker_index, num_workers):
     """
@@ -198,15 +416,32 @@ def merge_samples(samples, decompress=False):
     batch = {}
     sample_layout = samples[0].sample_batch
     for key in sample_layout.keys():
+        if is_compressed_batch(sample_layout[key]):
+            batch[key] = _merge_compressed_batches([sample.sample_batch[key] for sample in samples])
         # E.g. action dict.
-        if isinstance(sample_layout[key], dict):
+        elif isinstance(sample_layout[key], dict):
             batch[key] = {}
             for name in sample_layout[key].keys():
                 batch[key][name] = np.concatenate([sample.sample_batch[key][name] for sample in samples])
         else:
             batch[key] = np.concatenate([sample.sample_batch[key] for sample in samples])
 
-    if decompress:
+    # Batch-compressed states were already decompressed above.
+    if decompress and not is_compressed_batch(sample_layout["states"]):
         assert "states" in batch
         batch["states"] = np.asarray([ray_decompress(state) for state in batch["states"]])
     return batch
+
+
+def _merge_compressed_batches(blobs):
+    """
+    Decompresses a list of batch-compressed blobs into slices of one preallocated array.
+    """
+    headers = [_read_batch_header(blob) for blob in blobs]
+    dtype, shape, _ = headers[0]
+    merged = np.empty(shape=(sum(header[1][0] for header in headers),) + shape[1:], dtype=dtype)
+    start = 0
+    for blob, (_, shape, _) in zip(blobs, headers):
+        ray_decompress_batch(blob, out=merged[start:start + shape[0]])
+        start += shape[0]
+    return merged
@@ -27,13 +27,18 @@ from rlgraph import get_distributed_backend
 from rlgraph.utils.util import SMALL_NUMBER
 from rlgraph.components.neural_networks.preprocessor_stack import PreprocessorStack
 from rlgraph.environments.sequential_vector_env import SequentialVectorEnv
+from rlgraph.environments.vector_env import VectorEnv
 from rlgraph.execution.environment_sample import EnvironmentSample
+from rlgraph.execution.numpy_policy import NumpyPolicy
 from rlgraph.execution.ray import RayExecutor
 from rlgraph.execution.ray.ray_actor import RayActor
-from rlgraph.execution.ray.ray_util import ray_compress
+from rlgraph.execution.ray.ray_util import ray_compress, ray_compress_batch
+from rlgraph.utils.profiler import Profiler
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class RayValueWorker(RayActor):
@@ -62,12 +67,26 @@ class RayValueWorker(RayActor):
         # Make sample size proportional to num envs.
         self.worker_sample_size = worker_spec.pop("worker_sample_size") * self.num_environments
         self.worker_executes_postprocessing = worker_spec.pop("worker_executes_postprocessing", True)
+        # Act via a NumPy export of the agent's policy (see `NumpyPolicy`). The agent's graph is then only built if
+        # needed for post-processing.
+        self.numpy_inference = worker_spec.pop("numpy_inference", False)
         self.n_step_adjustment = worker_spec.pop("n_step_adjustment", 1)
+        # True: Compress every state separately, "batch": Compress all states of a sample as one blob.
+        self.compress_states = worker_spec.pop("compress_states", True)
         self.env_ids = ["env_{}".format(i) for i in range_(self.num_environments)]
         num_background_envs = worker_spec.pop("num_background_envs", 1)
-
-        # TODO from spec once we decided on generic vectorization.
-        self.vector_env = SequentialVectorEnv(self.num_environments, env_spec, num_background_envs)
+        # Collect per-phase timings (see `rlgraph.utils.profiler.Profiler`) in this worker's process.
+        if worker_spec.pop("enable_profiling", False):
+            Profiler.enable()
+        # Optional spec of the VectorEnv class (e.g. {"type": "multiprocess-vector", "num_processes": 2}).
+        vector_env_spec = worker_spec.pop("vector_env_spec", None)
+
+        if vector_env_spec is None:
+            self.vector_env = SequentialVectorEnv(self.num_environments, env_spec, num_background_envs)
+        else:
+            self.vector_env = VectorEnv.from_spec(
+                vector_env_spec, num_environments=self.num_environments, env_spec=env_spec
+            )
 
         # Then update agent config.
         agent_config['state_space'] = self.vector_env.state_space
@@ -94,12 +113,19 @@ class RayValueWorker(RayActor):
         self.preprocessors = {}
         preprocessing_spec = agent_config.get("preprocessing_spec", None)
         self.is_preprocessed = {}
+        # Batched: One stack preprocessing the states of all environments at once (one state slot per env).
+        self.batched_preprocessor = None
+        if worker_spec.pop("batched_preprocessing", False):
+            self.batched_preprocessor = self.setup_preprocessor(
+                preprocessing_spec, self.vector_env.state_space.with_batch_rank(), batch_size=self.num_environments
+            )
         for env_id in self.env_ids:
-            self.preprocessors[env_id] = self.setup_preprocessor(
+            self.preprocessors[env_id] = None if self.batched_preprocessor is not None else self.setup_preprocessor(
                 preprocessing_spec, self.vector_env.state_space.with_batch_rank()
             )
             self.is_preprocessed[env_id] = False
         self.agent = self.setup_agent(agent_config, worker_spec)
+        self.numpy_policy = NumpyPolicy.from_agent(self.agent) if self.numpy_inference else None
         self.worker_frameskip = frameskip
 
         #  Flag for container actions.
@@ -131,6 +157,9 @@ class RayValueWorker(RayActor):
             shape=(self.num_environments,) + self.agent.preprocessed_state_space.shape,
             dtype=self.agent.preprocessed_state_space.dtype
         )
+        # The batched buffer is always kept up to date (after each step).
+        if self.batched_preprocessor is not None:
+            self.preprocessed_states_buffer[:] = self.batched_preprocessor.preprocess(np.asarray(self.last_states))
         self.last_ep_timesteps = [0 for _ in range_(self.num_environments)]
         self.last_ep_rewards = [0 for _ in range_(self.num_environments)]
         self.last_ep_start_timestamps = [0.0 for _ in range_(self.num_environments)]
@@ -140,6 +169,11 @@ class RayValueWorker(RayActor):
         # Was the last state a terminal state so env should be reset in next call?
         self.last_terminals = [False for _ in range_(self.num_environments)]
 
+        # Version of the policy weights last set (see `RayWeight`), None before the first sync, and the decoded
+        # weights of that version (base for delta encoded weights).
+        self.policy_version = None
+        self.weights = None
+
     def get_constructor_success(self):
         """
         For debugging: fetch the last attribute. Will fail if constructor failed.
@@ -175,6 +209,8 @@ class RayValueWorker(RayActor):
         worker_exec_spec = worker_spec.get("execution_spec", None)
         if worker_exec_spec is not None:
             agent_config.update(execution_spec=worker_exec_spec)
+        if self.numpy_inference and not self.worker_executes_postprocessing:
+            agent_config = dict(agent_config, auto_build=False)
 
         # Build lazily per default.
         return RayExecutor.build_agent_from_config(agent_config)
@@ -237,17 +273,20 @@ class RayValueWorker(RayActor):
         terminals = [False for _ in range_(self.num_environments)]
         while timesteps_executed < num_timesteps:
             current_iteration_start_timestamp = time.perf_counter()
-            for i, env_id in enumerate(self.env_ids):
-                state = self.agent.state_space.force_batch(env_states[i])
-                if self.preprocessors[env_id] is not None:
-                    if self.is_preprocessed[env_id] is False:
-                        self.preprocessed_states_buffer[i] = self.preprocessors[env_id].preprocess(state)
-                        self.is_preprocessed[env_id] = True
-                else:
-                    self.preprocessed_states_buffer[i] = env_states[i]
+            # Batched: The buffer already holds the preprocessed states of all environments.
+            if self.batched_preprocessor is None:
+                for i, env_id in enumerate(self.env_ids):
+                    state = self.agent.state_space.force_batch(env_states[i])
+                    if self.preprocessors[env_id] is not None:
+                        if self.is_preprocessed[env_id] is False:
+                            self.preprocessed_states_buffer[i] = self.preprocessors[env_id].preprocess(state)
+                            self.is_preprocessed[env_id] = True
+                    else:
+                        self.preprocessed_states_buffer[i] = env_states[i]
 
-            actions = self.get_action(states=self.preprocessed_states_buffer,
-                                      use_exploration=use_exploration, apply_preprocessing=False)
+            with Profiler.timer("worker", "act"):
+                actions = self.get_action(states=self.preprocessed_states_buffer,
+                                          use_exploration=use_exploration, apply_preprocessing=False)
             if self.agent.flat_action_space is not None:
                 some_key = next(iter(actions))
                 assert isinstance(actions, dict) and isinstance(actions[some_key], np.ndarray),\
@@ -264,7 +303,8 @@ class RayValueWorker(RayActor):
                 if self.num_environments == 1 and env_actions.shape == ():
                     env_actions = [env_actions]
 
-            next_states, step_rewards, terminals, infos = self.vector_env.step(actions=env_actions)
+            with Profiler.timer("worker", "env_step"):
+                next_states, step_rewards, terminals, infos = self.vector_env.step(actions=env_actions)
             # Worker frameskip not needed as done in env.
             # for _ in range_(self.worker_frameskip):
             #     next_states, step_rewards, terminals, infos = self.vector_env.step(actions=actions)
@@ -282,6 +322,11 @@ class RayValueWorker(RayActor):
 
             # Do accounting for each environment.
             state_buffer = np.array(self.preprocessed_states_buffer)
+            cut_off_next_states = {}
+            if self.batched_preprocessor is not None:
+                cut_off_next_states = self._reset_and_preprocess_batch(
+                    next_states, terminals, current_episode_timesteps, max_timesteps_per_episode
+                )
             for i, env_id in enumerate(self.env_ids):
                 # Set is preprocessed to False because env_states are currently NOT preprocessed.
                 self.is_preprocessed[env_id] = False
@@ -316,6 +361,10 @@ class RayValueWorker(RayActor):
                     next_state = self.agent.state_space.force_batch(next_states[i])
                     if self.preprocessors[env_id] is not None:
                         next_state = self.preprocessors[env_id].preprocess(next_state)
+                    # Batched: Terminal next-state is the (already preprocessed) reset state, episodes cut off by
+                    # `max_timesteps_per_episode` keep their real last state to bootstrap from.
+                    elif self.batched_preprocessor is not None:
+                        next_state = cut_off_next_states.get(i, self.preprocessed_states_buffer[i:i + 1])
 
                     # Extend because next state has a batch dim.
                     env_sample_next_states.extend(next_state)
@@ -347,8 +396,9 @@ class RayValueWorker(RayActor):
                     sample_rewards[env_id] = []
                     sample_terminals[env_id] = []
 
-                    # Reset this environment and its pre-processor stack.
-                    env_states[i] = self.vector_env.reset(i)
+                    # Reset this environment and its pre-processor stack (already done if batched).
+                    if self.batched_preprocessor is None:
+                        env_states[i] = self.vector_env.reset(i)
                     if self.preprocessors[env_id] is not None:
                         self.preprocessors[env_id].reset()
                         # This re-fills the sequence with the reset state.
@@ -387,6 +437,8 @@ class RayValueWorker(RayActor):
                     # by adding to buffer.
                     self.preprocessed_states_buffer[i] = np.array(next_state)
                     self.is_preprocessed[env_id] = True
+                elif self.batched_preprocessor is not None:
+                    next_state = self.preprocessed_states_buffer[i:i + 1]
 
                 # Extend because next state has a batch dim.
                 env_sample_next_states.extend(next_state)
@@ -428,6 +480,37 @@ class RayValueWorker(RayActor):
             )
         )
 
+    def _reset_and_preprocess_batch(self, next_states, terminals, episode_timesteps, max_timesteps_per_episode):
+        """
+        Batched preprocessing: Resets all environments whose episodes end with this step (and their preprocessor
+        slots), then preprocesses the states of all environments in one call into the states buffer.
+
+        Args:
+            next_states (list): The states returned by the environment step (reset states are written into it).
+            terminals (list): The terminal signals of the step.
+            episode_timesteps (list): The running episode lengths (not yet counting this step).
+            max_timesteps_per_episode (int): Episode length limit (0 for none).
+
+        Returns:
+            dict: The preprocessed (real) next states (with batch rank) of the environments whose episodes were cut
+                off by `max_timesteps_per_episode` without a terminal, by environment index.
+        """
+        finished = [i for i in range_(self.num_environments) if terminals[i] or
+                    (0 < max_timesteps_per_episode <= episode_timesteps[i] + 1)]
+        cut_off_next_states = {}
+        cut_off = [i for i in finished if not terminals[i]]
+        if len(cut_off) > 0:
+            # Preprocess the last states on a copy: The slots get reset below and all other slots must only
+            # advance once per step.
+            last_states = deepcopy(self.batched_preprocessor).preprocess(np.asarray(next_states))
+            cut_off_next_states = {i: np.array(last_states[i:i + 1]) for i in cut_off}
+        for i in finished:
+            next_states[i] = self.vector_env.reset(i)
+        if len(finished) > 0:
+            self.batched_preprocessor.reset_slots(finished)
+        self.preprocessed_states_buffer[:] = self.batched_preprocessor.preprocess(np.asarray(next_states))
+        return cut_off_next_states
+
     @ray.method(num_return_vals=2)
     def execute_and_get_with_count(self):
         sample = self.execute_and_get_timesteps(num_timesteps=self.worker_sample_size)
@@ -437,11 +520,58 @@ class RayValueWorker(RayActor):
         return sample, {"batch_size": sample.batch_size, "last_rewards": sample.metrics["last_rewards"]}
 
     def set_weights(self, weights):
-        policy_weights = {k: v for k,v in zip(weights.policy_vars, weights.policy_values)}
-        vf_weights = None
-        if weights.has_vf:
-            vf_weights = {k: v for k, v in zip(weights.value_function_vars, weights.value_function_values)}
-        self.agent.set_weights(policy_weights, value_function_weights=vf_weights)
+        """
+        Sets the policy (and value function) weights of the local agent.
+
+        Args:
+            weights (RayWeight): The (possibly encoded) weights. Delta encoded weights must be based on the version
+                this worker currently holds.
+        """
+        if weights.encoding == "delta" and weights.base_version != self.policy_version:
+            raise RLGraphError("Received weight delta for version {} but worker holds version {}!".format(
+                weights.base_version, self.policy_version
+            ))
+        with Profiler.timer("worker", "weight_sync"):
+            self.weights = weights.decode(self.weights)
+            if self.agent.graph_built:
+                self.agent.set_weights(
+                    self.weights["policy_weights"], value_function_weights=self.weights.get("value_function_weights")
+                )
+            if self.numpy_policy is not None:
+                self.numpy_policy.set_weights(self.weights["policy_weights"])
+        # Samples generated from now on are tagged with this version.
+        self.policy_version = weights.policy_version
+
+    def get_preprocessor_statistics(self, only_new=True):
+        """
+        Exports the running statistics of this worker's preprocessors (e.g. MovingStandardize estimates), merged
+        over all its environments.
+
+        Args:
+            only_new (bool): Whether to only export statistics of states seen since the last
+                `set_preprocessor_statistics` call.
+
+        Returns:
+            dict: The statistics by preprocessor scope (see `PreprocessorStack.get_statistics`).
+        """
+        stacks = [self.batched_preprocessor] if self.batched_preprocessor is not None else \
+            [self.preprocessors[env_id] for env_id in self.env_ids if self.preprocessors[env_id] is not None]
+        if len(stacks) == 0:
+            return {}
+        return stacks[0].merge_statistics(*[stack.get_statistics(only_new=only_new) for stack in stacks])
+
+    def set_preprocessor_statistics(self, statistics):
+        """
+        Replaces the running statistics of all of this worker's preprocessors, e.g. with globally merged ones.
+
+        Args:
+            statistics (dict): The statistics by preprocessor scope.
+        """
+        if self.batched_preprocessor is not None:
+            self.batched_preprocessor.set_statistics(statistics)
+        for env_id in self.env_ids:
+            if self.preprocessors[env_id] is not None:
+                self.preprocessors[env_id].set_statistics(statistics)
 
     def get_workload_statistics(self):
         """
@@ -468,7 +598,7 @@ class RayValueWorker(RayActor):
             mean_episode_reward = None
             final_episode_reward = None
 
-        return dict(
+        stats = dict(
             episode_timesteps=self.finished_episode_timesteps,
             episode_rewards=self.finished_episode_rewards,
             episode_total_times=self.finished_episode_total_times,
@@ -480,8 +610,13 @@ class RayValueWorker(RayActor):
             episodes_executed=self.episodes_executed,
             worker_steps=self.total_worker_steps,
             mean_worker_ops_per_second=sum(self.sample_steps) / sum(self.sample_times),
-            mean_worker_env_frames_per_second=sum(adjusted_frames) / sum(self.sample_times)
+            mean_worker_env_frames_per_second=sum(adjusted_frames) / sum(self.sample_times),
+            # Version of the weights this worker currently acts with.
+            weight_version=self.policy_version
         )
+        if Profiler.enabled is True:
+            stats["profile"] = Profiler.get_stats()
+        return stats
 
     def _truncate_n_step(self, states, actions, rewards, next_states, terminals, was_terminal=True):
         """
@@ -564,13 +699,27 @@ class RayValueWorker(RayActor):
                 )
             )
             weights = np.abs(loss_per_item) + SMALL_NUMBER
-        env_dtype = self.vector_env.state_space.dtype
-        compressed_states = [ray_compress(np.asarray(state, dtype=util.convert_dtype(dtype=env_dtype, to='np')))
-                             for state in states]
-
-        compressed_next_states = compressed_states[self.n_step_adjustment:] + \
-                                 [ray_compress(np.asarray(next_s,dtype=util.convert_dtype(dtype=env_dtype, to='np')))
-                                  for next_s in next_states[-self.n_step_adjustment:]]
+        env_dtype = util.convert_dtype(dtype=self.vector_env.state_space.dtype, to='np')
+        if self.compress_states == "batch":
+            states = np.asarray(states, dtype=env_dtype)
+            next_states = np.concatenate([
+                states[self.n_step_adjustment:],
+                np.asarray(next_states[-self.n_step_adjustment:], dtype=env_dtype)
+            ])
+            compressed_states = ray_compress_batch(states)
+            compressed_next_states = ray_compress_batch(next_states)
+        elif self.compress_states:
+            compressed_states = [ray_compress(np.asarray(state, dtype=env_dtype)) for state in states]
+
+            compressed_next_states = compressed_states[self.n_step_adjustment:] + \
+                                     [ray_compress(np.asarray(next_s, dtype=env_dtype))
+                                      for next_s in next_states[-self.n_step_adjustment:]]
+        else:
+            compressed_states = np.asarray(states, dtype=env_dtype)
+            compressed_next_states = np.concatenate([
+                compressed_states[self.n_step_adjustment:],
+                np.asarray(next_states[-self.n_step_adjustment:], dtype=env_dtype)
+            ])
         if self.container_actions:
             for name in self.action_space.keys():
                 actions[name] = np.array(actions[name])
@@ -591,10 +740,14 @@ class RayValueWorker(RayActor):
             if np.random.random() <= self.exploration_epsilon:
                     action = self.agent.action_space.sample(size=self.num_environments)
             else:
-                    action = self.agent.get_action(states=states, use_exploration=use_exploration,
-                                                    apply_preprocessing=apply_preprocessing)
+                    action = self._get_policy_action(states, use_exploration, apply_preprocessing)
             return action
         else:
-            return self.agent.get_action(states=states, use_exploration=use_exploration,
-                                         apply_preprocessing=apply_preprocessing)
+            return self._get_policy_action(states, use_exploration, apply_preprocessing)
+
+    def _get_policy_action(self, states, use_exploration, apply_preprocessing):
+        if self.numpy_policy is not None:
+            return self.numpy_policy.get_action(states, use_exploration=use_exploration)
+        return self.agent.get_action(states=states, use_exploration=use_exploration,
+                                     apply_preprocessing=apply_preprocessing)
 
@@ -22,15 +22,21 @@ from rlgraph.execution.ray.ray_policy_worker import RayPolicyWorker
 
 from rlgraph import get_distributed_backend
 from rlgraph.execution.ray.ray_executor import RayExecutor
-from rlgraph.execution.ray.ray_util import merge_samples, RayWeight
+from rlgraph.execution.ray.ray_util import merge_samples, RayTaskPool, RayWeightSync
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_distributed_backend() == "ray":
-    import ray
+    ray = lazy_import("ray")
 
 
 class SyncBatchExecutor(RayExecutor):
     """
     Implements distributed synchronous execution.
+
+    With `async_sample_collection` enabled in the executor spec, sample tasks are instead kept in flight on all
+    workers, and each update batch is formed from whichever samples arrive first. Samples are tagged with the
+    version of the policy they were generated with, and samples lagging more than `max_policy_staleness` versions
+    behind the learner are discarded. This way, slow workers do not stall the learner.
     """
     def __init__(self, environment_spec, agent_config):
         """
@@ -66,6 +72,18 @@ class SyncBatchExecutor(RayExecutor):
         # These are the tasks actually interacting with the environment.
         self.worker_sample_size = self.executor_spec["num_worker_samples"]
 
+        # Asynchronous sample collection: Number of sample tasks in flight per worker and the max. number of
+        # policy versions (updates) a sample may lag behind to still be used for an update.
+        self.async_sample_collection = self.executor_spec.get("async_sample_collection", False)
+        self.env_interaction_task_depth = self.executor_spec.get("env_interaction_task_depth", 1)
+        self.max_policy_staleness = self.executor_spec.get("max_policy_staleness", 1)
+        self.env_sample_tasks = RayTaskPool()
+
+        # Number of updates done so far (= version of the current weights).
+        self.policy_version = 0
+        # Versioned weight broadcast with optional "float16" or "delta" encoding.
+        self.weight_sync = RayWeightSync(encoding=self.executor_spec.get("weight_sync_encoding", None))
+
         assert not ray_spec, "ERROR: ray_spec still contains items: {}".format(ray_spec)
         self.logger.info("Setting up execution for Apex executor.")
         self.setup_execution()
@@ -83,6 +101,17 @@ class SyncBatchExecutor(RayExecutor):
             # *args
             self.worker_spec, self.environment_spec, self.worker_frame_skip
         )
+        if self.async_sample_collection:
+            self.init_tasks()
+
+    def init_tasks(self):
+        self.weight_sync.publish(self.local_agent.get_weights(), version=self.policy_version)
+        for ray_worker in self.ray_env_sample_workers:
+            self.weight_sync.sync(ray_worker)
+            for _ in range(self.env_interaction_task_depth):
+                self.env_sample_tasks.add_task(
+                    ray_worker, ray_worker.execute_and_get_timesteps.remote(self.worker_sample_size)
+                )
 
     def _execute_step(self):
         """
@@ -95,13 +124,17 @@ class SyncBatchExecutor(RayExecutor):
         - Merge samples
         - Perform local update(s)
         """
+        if self.async_sample_collection:
+            return self._execute_async_step()
+
         # Env steps done during this rollout.
         env_steps = 0
 
         # 1. Sync local learners weights to remote workers.
-        weights = ray.put(RayWeight(self.local_agent.get_weights()))
+        if self.weight_sync.version != self.policy_version:
+            self.weight_sync.publish(self.local_agent.get_weights(), version=self.policy_version)
         for ray_worker in self.ray_env_sample_workers:
-            ray_worker.set_weights.remote(weights)
+            self.weight_sync.sync(ray_worker)
 
         # 2. Schedule samples and fetch results from RayWorkers.
         sample_batches = []
@@ -123,10 +156,54 @@ class SyncBatchExecutor(RayExecutor):
 
         # 4. Update from merged batch.
         self.local_agent.update(batch, apply_postprocessing=False)
+        self.policy_version += 1
         return env_steps, 1, {
             "discarded": 0,
             "queue_inserts": 0,
             "rewards": rewards
         }
 
+    def _execute_async_step(self):
+        """
+        Asynchronous variant of `_execute_step`:
+
+        - Collect completed sample tasks from any worker until enough fresh samples form an update batch,
+            discarding samples generated by a too stale policy.
+        - Immediately reschedule a sample task on each worker whose task completed, after syncing the current
+            weights to it if it is behind.
+        - Merge samples, perform local update and publish the new weight version.
+        """
+        env_steps = 0
+        discarded = 0
+        rewards = []
+        sample_batches = []
+        num_samples = 0
+        while num_samples < self.update_batch_size:
+            for ray_worker, sample_obj_id in self.env_sample_tasks.get_completed():
+                sample = ray.get(sample_obj_id)
+                # Sync weights (if behind) before rescheduling, so the next sample uses the newest policy.
+                self.weight_sync.sync(ray_worker)
+                self.env_sample_tasks.add_task(
+                    ray_worker, ray_worker.execute_and_get_timesteps.remote(self.worker_sample_size)
+                )
+
+                env_steps += sample.batch_size
+                if self.policy_version - sample.metrics["policy_version"] > self.max_policy_staleness:
+                    discarded += 1
+                    continue
+                if len(sample.metrics["last_rewards"]) > 0:
+                    rewards.extend(sample.metrics["last_rewards"])
+                sample_batches.append(sample)
+                num_samples += sample.batch_size
+
+        batch = merge_samples(sample_batches, decompress=self.compress_states)
+        self.local_agent.update(batch, apply_postprocessing=False)
+        self.policy_version += 1
+        self.weight_sync.publish(self.local_agent.get_weights(), version=self.policy_version)
+        return env_steps, 1, {
+            "discarded": discarded,
+            "queue_inserts": 0,
+            "rewards": rewards
+        }
+
 
@@ -26,13 +26,29 @@ from six.moves import xrange as range_
 from rlgraph.components import PreprocessorStack
 from rlgraph.execution.worker import Worker
 from rlgraph.spaces.containers import Dict, Tuple
+from rlgraph.utils.profiler import Profiler
 from rlgraph.utils.rlgraph_errors import RLGraphError
 from rlgraph.utils.util import default_dict
 
 
 class SingleThreadedWorker(Worker):
 
-    def __init__(self, preprocessing_spec=None, worker_executes_preprocessing=True, **kwargs):
+    def __init__(self, preprocessing_spec=None, worker_executes_preprocessing=True, vectorized_execution=False,
+                 batched_preprocessing=False, **kwargs):
+        """
+        Args:
+            preprocessing_spec (Optional[list]): Preprocessor specs the worker uses to preprocess states
+                (one stack per environment).
+            worker_executes_preprocessing (bool): Whether the worker (instead of the agent) preprocesses states.
+            vectorized_execution (bool): If True, processes each step of all environments at once: Rewards,
+                returns, timesteps and terminals are kept as arrays, the whole step is passed to
+                `Agent.observe(batched=True)` in one call, and per-environment logic only runs for environments
+                that terminated. Requires non-container state spaces.
+            batched_preprocessing (bool): If True, uses one preprocessor stack for all environments, which
+                preprocesses the states of all environments in a single call per step. Stateful layers (e.g. Sequence,
+                MovingStandardize) keep one slot per environment, which is reset when that environment's episode ends.
+                Requires `vectorized_execution`.
+        """
         super(SingleThreadedWorker, self).__init__(**kwargs)
 
         self.logger.info("Initialized single-threaded executor with {} environments '{}' and Agent '{}'".format(
@@ -44,14 +60,28 @@ class SingleThreadedWorker(Worker):
             worker_executes_preprocessing = False
 
         self.worker_executes_preprocessing = worker_executes_preprocessing
+        self.vectorized_execution = vectorized_execution
+        if self.vectorized_execution and isinstance(self.vector_env.state_space, (Dict, Tuple)):
+            raise RLGraphError("ERROR: Vectorized execution does not support container state spaces!")
+        if batched_preprocessing and not self.vectorized_execution:
+            raise RLGraphError("ERROR: Batched preprocessing requires vectorized execution!")
+
+        # One stack for all environments (batched) or one stack per environment.
+        self.batched_preprocessor = None
         if self.worker_executes_preprocessing:
             self.preprocessors = {}
             self.state_is_preprocessed = {}
-            for env_id in self.env_ids:
-                self.preprocessors[env_id] = self.setup_preprocessor(
-                    preprocessing_spec, self.vector_env.state_space.with_batch_rank()
+            if batched_preprocessing:
+                self.batched_preprocessor = self.setup_preprocessor(
+                    preprocessing_spec, self.vector_env.state_space.with_batch_rank(),
+                    batch_size=self.num_environments
                 )
-                self.state_is_preprocessed[env_id] = False
+            else:
+                for env_id in self.env_ids:
+                    self.preprocessors[env_id] = self.setup_preprocessor(
+                        preprocessing_spec, self.vector_env.state_space.with_batch_rank()
+                    )
+                    self.state_is_preprocessed[env_id] = False
 
         self.apply_preprocessing = not self.worker_executes_preprocessing
         self.preprocessed_states_buffer = np.zeros(
@@ -66,19 +96,31 @@ class SingleThreadedWorker(Worker):
         self.finished_episode_timesteps = [[] for _ in range_(self.num_environments)]
 
         # Accumulated return over the running episode.
-        self.episode_returns = [0 for _ in range_(self.num_environments)]
+        self.episode_returns = np.zeros(shape=(self.num_environments,))
 
         # The number of steps taken in the running episode.
-        self.episode_timesteps = [0 for _ in range_(self.num_environments)]
+        self.episode_timesteps = np.zeros(shape=(self.num_environments,), dtype=np.int64)
         # Whether the running episode has terminated.
-        self.episode_terminals = [False for _ in range_(self.num_environments)]
+        self.episode_terminals = np.zeros(shape=(self.num_environments,), dtype=np.bool_)
         # Wall time of the last start of the running episode.
         self.episode_starts = [0 for _ in range_(self.num_environments)]
         # The current state of the running episode.
         self.env_states = [None for _ in range_(self.num_environments)]
 
     @staticmethod
-    def setup_preprocessor(preprocessing_spec, in_space):
+    def setup_preprocessor(preprocessing_spec, in_space, batch_size=None):
+        """
+        Builds a python-backend PreprocessorStack.
+
+        Args:
+            preprocessing_spec (Optional[list]): The preprocessor specs.
+            in_space (Space): The (raw) state Space.
+            batch_size (Optional[int]): If given, the number of batch slots (environments) that stateful layers
+                keep state for.
+
+        Returns:
+            Optional[PreprocessorStack]: The preprocessor stack or None if no spec given.
+        """
         if preprocessing_spec is not None:
             # TODO move ingraph for python component assembly.
             preprocessing_spec = deepcopy(preprocessing_spec)
@@ -95,10 +137,13 @@ class SingleThreadedWorker(Worker):
             processor_stack = PreprocessorStack(*preprocessing_spec, backend="python")
             build_space = in_space
             for sub_comp_scope in scopes:
-                processor_stack.sub_components[sub_comp_scope].create_variables(input_spaces=dict(
+                sub_component = processor_stack.sub_components[sub_comp_scope]
+                if batch_size is not None and hasattr(sub_component, "batch_size"):
+                    sub_component.batch_size = batch_size
+                sub_component.create_variables(input_spaces=dict(
                     inputs=build_space
                 ), action_space=None)
-                build_space = processor_stack.sub_components[sub_comp_scope].get_preprocessed_space(build_space)
+                build_space = sub_component.get_preprocessed_space(build_space)
             processor_stack.reset()
             return processor_stack
         else:
@@ -146,8 +191,8 @@ class SingleThreadedWorker(Worker):
                 `num_episodes` must be provided.
             use_exploration (Optional[bool]): Indicates whether to utilize exploration (epsilon or noise based)
                 when picking actions. Default: True.
-            max_timesteps_per_episode (Optional[int]): Can be used to limit the number of timesteps per episode.
-                Use None or 0 for no limit. Default: None.
+            max_timesteps_per_episode (Optional[int,List[int]]): Can be used to limit the number of timesteps per
+                episode (a list holds one limit per environment). Use None or 0 for no limit. Default: None.
             update_spec (Optional[dict]): Update parameters. If None, the worker only performs rollouts.
                 Matches the structure of an Agent's update_spec dict and will be "defaulted" by that dict.
                 See `input_parsing/parse_update_spec.py` for more details.
@@ -167,7 +212,10 @@ class SingleThreadedWorker(Worker):
 
         num_timesteps = num_timesteps or 0
         num_episodes = num_episodes or 0
-        max_timesteps_per_episode = [max_timesteps_per_episode or 0 for _ in range_(self.num_environments)]
+        if isinstance(max_timesteps_per_episode, (list, tuple)):
+            max_timesteps_per_episode = [limit or 0 for limit in max_timesteps_per_episode]
+        else:
+            max_timesteps_per_episode = [max_timesteps_per_episode or 0 for _ in range_(self.num_environments)]
         frameskip = frameskip or self.frameskip
 
         # Stats.
@@ -188,11 +236,18 @@ class SingleThreadedWorker(Worker):
                 self.episode_timesteps[i] = 0
                 self.episode_terminals[i] = False
                 self.episode_starts[i] = time.perf_counter()
-                if self.worker_executes_preprocessing:
+                if self.worker_executes_preprocessing and self.batched_preprocessor is None:
                     self.state_is_preprocessed[env_id] = False
+            if self.batched_preprocessor is not None:
+                self.batched_preprocessor.reset()
 
             self.env_states = self.vector_env.reset_all()
             self.agent.reset()
+            if self.vectorized_execution:
+                self.env_states = np.asarray(self.env_states)
+                # The buffer always holds the preprocessed current states in vectorized mode.
+                if self.worker_executes_preprocessing:
+                    self.preprocessed_states_buffer[:] = self._preprocess_states(self.env_states)
         elif self.env_states[0] is None:
             raise RLGraphError("Runner must be reset at the very beginning. Environment is in invalid state.")
 
@@ -202,26 +257,33 @@ class SingleThreadedWorker(Worker):
             if self.render:
                 self.vector_env.render()
 
-            if self.worker_executes_preprocessing:
-                for i, env_id in enumerate(self.env_ids):
-                    state = self.agent.state_space.force_batch(env_states[i])
-                    if self.preprocessors[env_id] is not None:
-                        if self.state_is_preprocessed[env_id] is False:
-                            self.preprocessed_states_buffer[i] = self.preprocessors[env_id].preprocess(state)
-                            self.state_is_preprocessed[env_id] = True
-                    else:
-                        self.preprocessed_states_buffer[i] = env_states[i]
-                # TODO extra returns when worker is not applying preprocessing.
-                actions = self.agent.get_action(
-                    states=self.preprocessed_states_buffer, use_exploration=use_exploration,
-                    apply_preprocessing=self.apply_preprocessing
-                )
-                preprocessed_states = np.array(self.preprocessed_states_buffer)
-            else:
-                actions, preprocessed_states = self.agent.get_action(
-                    states=np.array(env_states), use_exploration=use_exploration,
-                    apply_preprocessing=True, extra_returns="preprocessed_states"
-                )
+            with Profiler.timer("worker", "act"):
+                if self.vectorized_execution and self.worker_executes_preprocessing:
+                    preprocessed_states = np.array(self.preprocessed_states_buffer)
+                    actions = self.agent.get_action(
+                        states=preprocessed_states, use_exploration=use_exploration,
+                        apply_preprocessing=self.apply_preprocessing
+                    )
+                elif self.worker_executes_preprocessing:
+                    for i, env_id in enumerate(self.env_ids):
+                        state = self.agent.state_space.force_batch(env_states[i])
+                        if self.preprocessors[env_id] is not None:
+                            if self.state_is_preprocessed[env_id] is False:
+                                self.preprocessed_states_buffer[i] = self.preprocessors[env_id].preprocess(state)
+                                self.state_is_preprocessed[env_id] = True
+                        else:
+                            self.preprocessed_states_buffer[i] = env_states[i]
+                    # TODO extra returns when worker is not applying preprocessing.
+                    actions = self.agent.get_action(
+                        states=self.preprocessed_states_buffer, use_exploration=use_exploration,
+                        apply_preprocessing=self.apply_preprocessing
+                    )
+                    preprocessed_states = np.array(self.preprocessed_states_buffer)
+                else:
+                    actions, preprocessed_states = self.agent.get_action(
+                        states=np.array(env_states), use_exploration=use_exploration,
+                        apply_preprocessing=True, extra_returns="preprocessed_states"
+                    )
 
             # Accumulate the reward over n env-steps (equals one action pick). n=self.frameskip.
             env_rewards = [0 for _ in range_(self.num_environments)]
@@ -257,8 +319,22 @@ class SingleThreadedWorker(Worker):
                 if self.num_environments == 1 and env_actions.shape == ():
                     env_actions = [env_actions]
 
+            if self.vectorized_execution:
+                episodes_finished = self._execute_vectorized_step(
+                    env_states, preprocessed_states, actions, env_actions, frameskip, max_timesteps_per_episode
+                )
+                episodes_executed += episodes_finished
+                self.episodes_since_update += episodes_finished
+                episode_terminals = self.episode_terminals
+                self.update_if_necessary()
+                timesteps_executed += self.num_environments
+                if 0 < num_episodes <= episodes_executed or 0 < num_timesteps <= timesteps_executed:
+                    break
+                continue
+
             for _ in range_(frameskip):
-                next_states, step_rewards, episode_terminals, _ = self.vector_env.step(actions=env_actions)
+                with Profiler.timer("worker", "env_step"):
+                    next_states, step_rewards, episode_terminals, _ = self.vector_env.step(actions=env_actions)
 
                 self.env_frames += self.num_environments
                 for i, step_reward in enumerate(step_rewards):
@@ -361,6 +437,9 @@ class SingleThreadedWorker(Worker):
             max_episode_reward=max_episode_reward,
             final_episode_reward=final_episode_reward
         )
+        # Per-phase and per-component timings (export via `Profiler.to_json/to_csv(results["profile"])`).
+        if Profiler.enabled is True:
+            results["profile"] = Profiler.get_stats()
 
         # Total time of run.
         self.logger.info("Finished execution in {} s".format(total_time))
@@ -380,12 +459,120 @@ class SingleThreadedWorker(Worker):
 
         return results
 
+    def _execute_vectorized_step(self, env_states, preprocessed_states, actions, env_actions, frameskip,
+                                 max_timesteps_per_episode):
+        """
+        Steps all environments, observes the whole step in one batched `observe` call and handles
+        finished episodes. Updates `env_states` (and the preprocessed states buffer) in place.
+
+        Args:
+            env_states (np.ndarray): Current (raw) states of all environments.
+            preprocessed_states (np.ndarray): Preprocessed current states the actions were picked for.
+            actions (any): Batched actions as returned by the agent.
+            env_actions (list): Actions per environment.
+            frameskip (int): How often actions are repeated.
+            max_timesteps_per_episode (List[int]): Episode length limit of each environment (0 for none).
+
+        Returns:
+            int: Number of finished episodes.
+        """
+        env_rewards = np.zeros(shape=(self.num_environments,))
+        for _ in range_(frameskip):
+            with Profiler.timer("worker", "env_step"):
+                next_states, step_rewards, episode_terminals, _ = self.vector_env.step(actions=env_actions)
+            self.env_frames += self.num_environments
+            env_rewards += step_rewards
+            if np.any(episode_terminals):
+                break
+        next_states = np.asarray(next_states)
+        episode_terminals = np.array(episode_terminals, dtype=np.bool_)
+
+        self.episode_returns += env_rewards
+        self.episode_timesteps += 1
+        max_timesteps_per_episode = np.asarray(max_timesteps_per_episode)
+        episode_terminals |= (max_timesteps_per_episode > 0) & (self.episode_timesteps >= max_timesteps_per_episode)
+
+        # Batched: Reset finished environments first, so one preprocessing call for all environments yields the
+        # states to act on next (terminal next-states are observed as the reset states).
+        finished = np.nonzero(episode_terminals)[0]
+        if self.batched_preprocessor is not None:
+            for i in finished:
+                next_states[i] = self.vector_env.reset(i)
+            if len(finished) > 0:
+                self.batched_preprocessor.reset_slots(finished)
+            preprocessed_next_states = self._preprocess_states(next_states)
+            self.preprocessed_states_buffer[:] = preprocessed_next_states
+        elif self.worker_executes_preprocessing:
+            preprocessed_next_states = self._preprocess_states(next_states)
+            self.preprocessed_states_buffer[:] = preprocessed_next_states
+        else:
+            preprocessed_next_states = next_states
+        if self.num_environments == 1 and isinstance(actions, np.ndarray) and actions.shape == ():
+            actions = np.reshape(actions, newshape=(1,))
+        with Profiler.timer("worker", "observe"):
+            self.agent.observe(
+                preprocessed_states=preprocessed_states, actions=actions, internals=[], rewards=env_rewards,
+                next_states=preprocessed_next_states, terminals=episode_terminals, env_id=self.env_ids, batched=True
+            )
+        env_states[:] = next_states
+
+        # Per-environment logic only for finished episodes.
+        for i in finished:
+            episode_duration = time.perf_counter() - self.episode_starts[i]
+            self.finished_episode_rewards[i].append(self.episode_returns[i])
+            self.finished_episode_durations[i].append(episode_duration)
+            self.finished_episode_timesteps[i].append(self.episode_timesteps[i])
+            self.log_finished_episode(
+                episode_return=self.episode_returns[i],
+                duration=episode_duration,
+                timesteps=self.episode_timesteps[i],
+                env_num=i
+            )
+
+            # Reset this environment and its preprocessor stack (already done above if batched).
+            if self.batched_preprocessor is None:
+                env_states[i] = self.vector_env.reset(i)
+                if self.worker_executes_preprocessing and self.preprocessors[self.env_ids[i]] is not None:
+                    self.preprocessors[self.env_ids[i]].reset()
+                    # This re-fills the sequence with the reset state.
+                    self.preprocessed_states_buffer[i] = self.preprocessors[self.env_ids[i]].preprocess(
+                        self.agent.state_space.force_batch(env_states[i])
+                    )
+            self.episode_returns[i] = 0
+            self.episode_timesteps[i] = 0
+            self.episode_starts[i] = time.perf_counter()
+        self.episode_terminals = episode_terminals
+        return len(finished)
+
+    def _preprocess_states(self, states):
+        """
+        Preprocesses the states of all environments with their preprocessor stacks.
+
+        Args:
+            states (np.ndarray): Batch of (raw) states, one per environment.
+
+        Returns:
+            np.ndarray: Batch of preprocessed states.
+        """
+        if self.batched_preprocessor is not None:
+            return np.asarray(self.batched_preprocessor.preprocess(states))
+        preprocessed_states = np.empty_like(self.preprocessed_states_buffer)
+        for i, env_id in enumerate(self.env_ids):
+            if self.preprocessors[env_id] is not None:
+                preprocessed_states[i] = self.preprocessors[env_id].preprocess(
+                    self.agent.state_space.force_batch(states[i])
+                )
+            else:
+                preprocessed_states[i] = states[i]
+        return preprocessed_states
+
     def _observe(self, env_ids, states, actions, rewards, next_states, terminals):
         # TODO: If worker does not execute preprocessing, next state is not preprocessed here.
         # Observe per environment.
-        self.agent.observe(
-            preprocessed_states=states, actions=actions, internals=[],
-            rewards=rewards, next_states=next_states,
-            terminals=terminals, env_id=env_ids
-        )
+        with Profiler.timer("worker", "observe"):
+            self.agent.observe(
+                preprocessed_states=states, actions=actions, internals=[],
+                rewards=rewards, next_states=next_states,
+                terminals=terminals, env_id=env_ids
+            )
 
@@ -23,6 +23,7 @@ import numpy as np
 from six.moves import xrange as range_
 
 from rlgraph.environments import VectorEnv, SequentialVectorEnv
+from rlgraph.utils.profiler import Profiler
 from rlgraph.utils.specifiable import Specifiable
 
 
@@ -31,7 +32,8 @@ class Worker(Specifiable):
     Generic worker to locally interact with simulator environments.
     """
     def __init__(self, agent, env_spec=None, num_environments=1, frameskip=1, render=False,
-                 worker_executes_exploration=True, exploration_epsilon=0.1, episode_finish_callback=None):
+                 worker_executes_exploration=True, exploration_epsilon=0.1, episode_finish_callback=None,
+                 vector_env_spec=None):
         """
         Args:
             agent (Agent): Agent to execute environment on.
@@ -44,6 +46,8 @@ class Worker(Specifiable):
                 Default: False.
             worker_executes_exploration (bool): If worker executes exploration by sampling.
             exploration_epsilon (Optional[float]): Epsilon to use if worker executes exploration.
+            vector_env_spec (Optional[dict]): Spec of the VectorEnv to run the `env_spec` environments in
+                (e.g. {"type": "multiprocess-vector", "num_processes": 2}). Default: SequentialVectorEnv.
         """
         super(Worker, self).__init__()
         self.num_environments = num_environments
@@ -55,9 +59,15 @@ class Worker(Specifiable):
             self.num_environments = self.vector_env.num_environments
             self.env_ids = ["env_{}".format(i) for i in range_(self.num_environments)]
         # `Env_spec` is for single envs inside a SequentialVectorEnv.
-        elif env_spec is not None:
+        elif env_spec is not None and vector_env_spec is None:
             self.vector_env = SequentialVectorEnv(env_spec=env_spec, num_environments=self.num_environments)
             self.env_ids = ["env_{}".format(i) for i in range_(self.num_environments)]
+        # `Env_spec` is for single envs inside a VectorEnv of the given type.
+        elif env_spec is not None:
+            self.vector_env = VectorEnv.from_spec(
+                vector_env_spec, env_spec=env_spec, num_environments=self.num_environments
+            )
+            self.env_ids = ["env_{}".format(i) for i in range_(self.num_environments)]
         # No env_spec.
         else:
             self.vector_env = None
@@ -205,7 +215,8 @@ class Worker(Specifiable):
     def execute_update(self):
         loss = 0
         for _ in range_(self.update_steps):
-            ret = self.agent.update()
+            with Profiler.timer("worker", "update"):
+                ret = self.agent.update()
             if isinstance(ret, tuple):
                 loss += ret[0]
             else:
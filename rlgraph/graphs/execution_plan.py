@@ -0,0 +1,155 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from rlgraph.utils.op_records import DataOpRecord
+from rlgraph.utils.ops import ContainerDataOp, DataOpDict, flatten_op, unflatten_op
+from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.util import force_list
+
+
+class ExecutionPlan(object):
+    """
+    Holds the structural information needed to run one API-method (with a given selection of `return_ops`)
+    in a static graph: The (nested) fetch structure and, for each input param, the placeholder (or the leaf
+    placeholders of a container placeholder) to feed it into.
+    Plans are created once per (API-method, return_ops) by the GraphBuilder, so repeated calls only need to
+    fill the feed-dict.
+    """
+    def __init__(self, api_method_name, in_op_records, out_op_records, return_ops=None):
+        """
+        Args:
+            api_method_name (str): The name of the API-method.
+            in_op_records (List[DataOpRecord]): The API-method's input op-records (holding the placeholders).
+            out_op_records (List[DataOpRecord]): The API-method's output op-records (holding the ops to fetch).
+            return_ops (Optional[list]): The return-keys (for dict returning API-methods) or return-indices (for
+                tuple returning API-methods) to fetch. None for all.
+        """
+        self.api_method_name = api_method_name
+        self.num_inputs = len(in_op_records)
+        # A single dict param is rolled out (sorted by keys) into positional params, unless the first input
+        # placeholder is itself a dict.
+        self.roll_out_dict_params = self.num_inputs > 0 and not isinstance(in_op_records[0].op, DataOpDict)
+
+        # Tuples of (placeholder, [(path, leaf placeholder)] or None for non-container placeholders).
+        self.placeholders = []
+        for op_rec in in_op_records:
+            if isinstance(op_rec.op, ContainerDataOp):
+                self.placeholders.append((op_rec.op, self._get_leaf_paths(op_rec.op)))
+            else:
+                self.placeholders.append((op_rec.op, None))
+
+        self.fetches = self._get_fetches(out_op_records, return_ops)
+
+    def _get_fetches(self, out_op_records, return_ops):
+        # API returns a dict.
+        if len(out_op_records) > 0 and out_op_records[0].kwarg is not None:
+            fetches = {}
+            for op_rec in out_op_records:
+                if return_ops is None or op_rec.kwarg in return_ops:
+                    flat_ops = flatten_op(op_rec.op, mapping=lambda o: o.op if isinstance(o, DataOpRecord) else o)
+                    fetches[op_rec.kwarg] = unflatten_op(flat_ops)
+
+            if return_ops is not None:
+                assert all(op in fetches for op in return_ops), \
+                    "ERROR: Not all wanted return_ops ({}) are returned by API-method `{}`!".format(
+                        return_ops, self.api_method_name)
+        # API returns a tuple.
+        else:
+            fetches = [op_rec.op for i, op_rec in enumerate(out_op_records) if return_ops is None or i in return_ops]
+            if return_ops is not None:
+                assert len(fetches) == len(return_ops), \
+                    "ERROR: Not all wanted return_ops ({}) are returned by API-method `{}`!".format(
+                        return_ops, self.api_method_name)
+        return fetches
+
+    @staticmethod
+    def _get_leaf_paths(op, path=()):
+        """
+        Returns a list of (path, leaf) tuples for a (possibly nested) container, where path is the tuple of
+        keys/indices leading from `op` to the leaf.
+        """
+        if isinstance(op, dict):
+            leaves = []
+            for key in sorted(op.keys()):
+                leaves.extend(ExecutionPlan._get_leaf_paths(op[key], path + (key,)))
+            return leaves
+        elif isinstance(op, tuple):
+            leaves = []
+            for i, sub_op in enumerate(op):
+                leaves.extend(ExecutionPlan._get_leaf_paths(sub_op, path + (i,)))
+            return leaves
+        return [(path, op)]
+
+    def get_params(self, params):
+        """
+        Turns the params of an API-method call into the list of positional params.
+
+        Args:
+            params (any): The input param(s) as given in the API-method call.
+
+        Returns:
+            list: The positional params.
+        """
+        if isinstance(params, dict) and self.roll_out_dict_params:
+            return [v for k, v in sorted(params.items())]
+        return force_list(params)
+
+    def feed(self, feed_dict, params):
+        """
+        Writes the given positional params into `feed_dict`, keyed by their placeholders.
+
+        Args:
+            feed_dict (dict): The feed-dict to fill.
+            params (list): The positional params.
+        """
+        for i, param in enumerate(params):
+            if param is None:
+                assert self.num_inputs == i, \
+                    "ERROR: More input params given ({}) than expected ({}) for call to '{}'!". \
+                    format(len(params), self.num_inputs, self.api_method_name)
+                break
+
+            # TODO: What if len(params) < len(self.api[api_method][0])?
+            # Need to handle default API-method params also for the root-component (this one).
+            if self.num_inputs <= i:
+                raise RLGraphError(
+                    "API-method with name '{}' only has {} input parameters! You passed in "
+                    "{}.".format(self.api_method_name, self.num_inputs, len(params))
+                )
+
+            placeholder, leaf_paths = self.placeholders[i]
+            if leaf_paths is None:
+                feed_dict[placeholder] = param
+                continue
+            try:
+                leaf_values = []
+                for path, leaf_placeholder in leaf_paths:
+                    value = param
+                    for key in path:
+                        if not isinstance(value, (dict, tuple, list)):
+                            raise TypeError
+                        value = value[key]
+                    leaf_values.append((leaf_placeholder, value))
+            # Param is not structured exactly like its placeholder (e.g. given already flattened or only partially):
+            # Fall back to matching by flat-keys.
+            except (KeyError, IndexError, TypeError):
+                flat_placeholders = flatten_op(placeholder)
+                leaf_values = [(flat_placeholders[flat_key], value) for flat_key, value in flatten_op(param).items()]
+            for leaf_placeholder, value in leaf_values:
+                feed_dict[leaf_placeholder] = value
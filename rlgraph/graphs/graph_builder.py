@@ -25,6 +25,7 @@ from collections import OrderedDict
 
 from rlgraph import get_backend
 from rlgraph.components.component import Component
+from rlgraph.graphs.execution_plan import ExecutionPlan
 from rlgraph.spaces import Space, Dict
 from rlgraph.spaces.space_utils import get_space_from_op, check_space_equivalence
 from rlgraph.utils.define_by_run_ops import define_by_run_flatten, define_by_run_split_args, define_by_run_unflatten, \
@@ -32,16 +33,17 @@ from rlgraph.utils.define_by_run_ops import define_by_run_flatten, define_by_run
 from rlgraph.utils.input_parsing import parse_summary_spec
 from rlgraph.utils.op_records import FlattenedDataOp, DataOpRecord, DataOpRecordColumnIntoGraphFn, \
     DataOpRecordColumnIntoAPIMethod, DataOpRecordColumnFromGraphFn, DataOpRecordColumnFromAPIMethod, get_call_param_name
-from rlgraph.utils.ops import is_constant, ContainerDataOp, DataOpDict, flatten_op, unflatten_op, TraceContext
+from rlgraph.utils.ops import is_constant, TraceContext
 from rlgraph.utils.rlgraph_errors import RLGraphError, RLGraphBuildError
 from rlgraph.utils.specifiable import Specifiable
 from rlgraph.utils.util import force_list, force_tuple, get_shape
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
     from rlgraph.utils.tf_util import pin_global_variables
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class GraphBuilder(Specifiable):
@@ -101,6 +103,13 @@ class GraphBuilder(Specifiable):
 
         # Maps API method names to in- (placeholders) and out op columns (ops to pull).
         self.api = {}
+        # Cached ExecutionPlans by (API-method name, return_ops).
+        self.execution_plans = {}
+
+        # Define-by-run fast path: No call profiling and cached container-arg checks.
+        self.fast_path = False
+        # Maps (component, graph_fn) to whether the graph_fn's args had to be flattened on its first call.
+        self.graph_fn_flattening = {}
 
         self.op_records_to_process = set()
         self.op_recs_depending_on_variables = set()
@@ -176,6 +185,7 @@ class GraphBuilder(Specifiable):
         self.graph_call_times = []
         self.var_call_times = []
         self.api = meta_graph.api
+        self.execution_plans = {}
         self.num_meta_ops = meta_graph.num_ops
 
         # Set the build phase to `building`.
@@ -507,78 +517,83 @@ class GraphBuilder(Specifiable):
         # print("calling graph_fn = ", op_rec_column.graph_fn)
         # print("args = ", args)
         # print("kwargs = ", kwargs)
-        if op_rec_column.flatten_ops is not False:
-            flattened_args, flattened_kwargs = op_rec_column.flatten_input_ops(*args, **kwargs)
-            # Split into SingleDataOps?
-            if op_rec_column.split_ops:
-                split_args_and_kwargs = op_rec_column.split_flattened_input_ops(*flattened_args, **flattened_kwargs)
-                # There is some splitting to do. Call graph_fn many times (one for each split).
-                if isinstance(split_args_and_kwargs, FlattenedDataOp):
-                    ops = {}
-                    num_return_values = -1
-                    for key, params in split_args_and_kwargs.items():
-                        params_args = params[0]
-                        params_kwargs = params[1]
+        # Mark that we are inside a graph_fn: API-methods and graph_fns called from in here return ops.
+        TraceContext.CALL_STACK.append("graph_fn")
+        try:
+            if op_rec_column.flatten_ops is not False:
+                flattened_args, flattened_kwargs = op_rec_column.flatten_input_ops(*args, **kwargs)
+                # Split into SingleDataOps?
+                if op_rec_column.split_ops:
+                    split_args_and_kwargs = op_rec_column.split_flattened_input_ops(*flattened_args, **flattened_kwargs)
+                    # There is some splitting to do. Call graph_fn many times (one for each split).
+                    if isinstance(split_args_and_kwargs, FlattenedDataOp):
+                        ops = {}
+                        num_return_values = -1
+                        for key, params in split_args_and_kwargs.items():
+                            params_args = params[0]
+                            params_kwargs = params[1]
+                            if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is False:
+                                TraceContext.ACTIVE_CALL_CONTEXT = True
+                                TraceContext.CONTEXT_START = time.perf_counter()
+
+                            ops[key] = force_tuple(op_rec_column.graph_fn(op_rec_column.component,
+                                                                          *params_args, **params_kwargs))
+                            if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is True:
+                                self.graph_call_times.append(time.perf_counter() - TraceContext.CONTEXT_START)
+                                TraceContext.CONTEXT_START = None
+                                TraceContext.ACTIVE_CALL_CONTEXT = False
+
+                            if num_return_values >= 0 and num_return_values != len(ops[key]):
+                                raise RLGraphError(
+                                    "Different split-runs through {} do not return the same number of values!".
+                                    format(op_rec_column.graph_fn.__name__)
+                                )
+                            num_return_values = len(ops[key])
+
+                        # Un-split the results dict into a tuple of `num_return_values` slots.
+                        un_split_ops = []
+                        for i in range(num_return_values):
+                            dict_with_singles = FlattenedDataOp()
+                            for key in split_args_and_kwargs.keys():
+                                dict_with_singles[key] = ops[key][i]
+                            un_split_ops.append(dict_with_singles)
+                        ops = tuple(un_split_ops)
+
+                    # No splitting to do: Pass everything as-is.
+                    else:
+                        split_args, split_kwargs = split_args_and_kwargs[0], split_args_and_kwargs[1]
                         if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is False:
                             TraceContext.ACTIVE_CALL_CONTEXT = True
                             TraceContext.CONTEXT_START = time.perf_counter()
-
-                        ops[key] = force_tuple(op_rec_column.graph_fn(op_rec_column.component,
-                                                                      *params_args, **params_kwargs))
+                        ops = op_rec_column.graph_fn(op_rec_column.component, *split_args, **split_kwargs)
                         if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is True:
                             self.graph_call_times.append(time.perf_counter() - TraceContext.CONTEXT_START)
                             TraceContext.CONTEXT_START = None
                             TraceContext.ACTIVE_CALL_CONTEXT = False
-
-                        if num_return_values >= 0 and num_return_values != len(ops[key]):
-                            raise RLGraphError(
-                                "Different split-runs through {} do not return the same number of values!".
-                                format(op_rec_column.graph_fn.__name__)
-                            )
-                        num_return_values = len(ops[key])
-
-                    # Un-split the results dict into a tuple of `num_return_values` slots.
-                    un_split_ops = []
-                    for i in range(num_return_values):
-                        dict_with_singles = FlattenedDataOp()
-                        for key in split_args_and_kwargs.keys():
-                            dict_with_singles[key] = ops[key][i]
-                        un_split_ops.append(dict_with_singles)
-                    ops = tuple(un_split_ops)
-
-                # No splitting to do: Pass everything as-is.
                 else:
-                    split_args, split_kwargs = split_args_and_kwargs[0], split_args_and_kwargs[1]
                     if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is False:
                         TraceContext.ACTIVE_CALL_CONTEXT = True
                         TraceContext.CONTEXT_START = time.perf_counter()
-                    ops = op_rec_column.graph_fn(op_rec_column.component, *split_args, **split_kwargs)
+
+                    ops = op_rec_column.graph_fn(op_rec_column.component, *flattened_args, **flattened_kwargs)
                     if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is True:
                         self.graph_call_times.append(time.perf_counter() - TraceContext.CONTEXT_START)
                         TraceContext.CONTEXT_START = None
                         TraceContext.ACTIVE_CALL_CONTEXT = False
+            # Just pass in everything as-is.
             else:
                 if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is False:
+                    call_time = time.perf_counter()
                     TraceContext.ACTIVE_CALL_CONTEXT = True
-                    TraceContext.CONTEXT_START = time.perf_counter()
+                    TraceContext.CONTEXT_START = call_time
 
-                ops = op_rec_column.graph_fn(op_rec_column.component, *flattened_args, **flattened_kwargs)
+                ops = op_rec_column.graph_fn(op_rec_column.component, *args, **kwargs)
                 if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is True:
                     self.graph_call_times.append(time.perf_counter() - TraceContext.CONTEXT_START)
                     TraceContext.CONTEXT_START = None
                     TraceContext.ACTIVE_CALL_CONTEXT = False
-        # Just pass in everything as-is.
-        else:
-            if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is False:
-                call_time = time.perf_counter()
-                TraceContext.ACTIVE_CALL_CONTEXT = True
-                TraceContext.CONTEXT_START = call_time
-
-            ops = op_rec_column.graph_fn(op_rec_column.component, *args, **kwargs)
-            if is_build_time and TraceContext.ACTIVE_CALL_CONTEXT is True:
-                self.graph_call_times.append(time.perf_counter() - TraceContext.CONTEXT_START)
-                TraceContext.CONTEXT_START = None
-                TraceContext.ACTIVE_CALL_CONTEXT = False
+        finally:
+            TraceContext.CALL_STACK.pop()
         # Make sure everything coming from a computation is always a tuple (for out-Socket indexing).
         ops = force_tuple(ops)
 
@@ -798,6 +813,27 @@ class GraphBuilder(Specifiable):
             if sub_component.input_complete is False:
                 self._analyze_input_incomplete_component(sub_component)
 
+    def get_execution_plan(self, api_method_name, return_ops=None):
+        """
+        Returns the (cached) ExecutionPlan for calling the given API-method with the given return_ops.
+
+        Args:
+            api_method_name (str): The name of the API-method.
+            return_ops (Optional[list]): The return-keys/indices to fetch (None for all).
+
+        Returns:
+            ExecutionPlan: The plan holding the fetch structure and placeholders of the API-method.
+        """
+        key = (api_method_name, tuple(return_ops) if return_ops is not None else None)
+        plan = self.execution_plans.get(key)
+        if plan is None:
+            if api_method_name not in self.api:
+                raise RLGraphError("No API-method with name '{}' found!".format(api_method_name))
+            plan = ExecutionPlan(api_method_name, self.api[api_method_name][0], self.api[api_method_name][1],
+                                 return_ops)
+            self.execution_plans[key] = plan
+        return plan
+
     def get_execution_inputs(self, *api_method_calls):
         """
         Creates a fetch-dict and a feed-dict for a graph session call.
@@ -816,78 +852,24 @@ class GraphBuilder(Specifiable):
                 continue
 
             api_method_name = api_method_call
-            params = []
+            params = None
             return_ops = None
 
             # Call is defined by a list/tuple of [method], [input params], [return_ops]?
             if isinstance(api_method_call, (list, tuple)):
                 api_method_name = api_method_call[0] if not callable(api_method_call[0]) else \
                     api_method_call[0].__name__
-                # If input is one dict: Check first placeholder for being a dict as well and if so, do a normal 1:1
-                # mapping, otherwise, roll out the input dict as a list.
-                if isinstance(api_method_call[1], dict) and \
-                        not isinstance(self.api[api_method_name][0][0].op, DataOpDict):
-                    params = [v for k, v in sorted(api_method_call[1].items())]
-                else:
-                    params = force_list(api_method_call[1])
-
+                params = api_method_call[1]
                 return_ops = force_list(api_method_call[2]) if len(api_method_call) > 2 and \
                                                                api_method_call[2] is not None else None
             # Allow passing the function directly
             if callable(api_method_call):
                 api_method_name = api_method_call.__name__
 
-            if api_method_name not in self.api:
-                raise RLGraphError("No API-method with name '{}' found!".format(api_method_name))
-
-            # API returns a dict.
-            if len(self.api[api_method_name][1]) > 0 and self.api[api_method_name][1][0].kwarg is not None:
-                for op_rec in self.api[api_method_name][1]:
-                    if return_ops is None or op_rec.kwarg in return_ops:
-                        if api_method_name not in fetch_dict:
-                            fetch_dict[api_method_name] = {}
-                        flat_ops = flatten_op(op_rec.op, mapping=lambda o: o.op if isinstance(o, DataOpRecord) else o)
-                        fetch_dict[api_method_name][op_rec.kwarg] = unflatten_op(flat_ops)
-
-                if return_ops is not None:
-                    assert all(op in fetch_dict[api_method_name] for op in return_ops),\
-                        "ERROR: Not all wanted return_ops ({}) are returned by API-method `api_method_call`!".format(
-                        return_ops)
-            # API returns a tuple.
-            else:
-                fetch_dict[api_method_name] = [op_rec.op for i, op_rec in enumerate(self.api[api_method_name][1]) if
-                                               return_ops is None or i in return_ops]
-                if return_ops is not None:
-                    assert len(fetch_dict[api_method_name]) == len(return_ops),\
-                        "ERROR: Not all wanted return_ops ({}) are returned by API-method `api_method_call`!".format(
-                        return_ops)
-
-            for i, param in enumerate(params):
-                if param is None:
-                    assert len(self.api[api_method_name][0]) == i, \
-                        "ERROR: More input params given ({}) than expected ({}) for call to '{}'!". \
-                        format(len(params), len(self.api[api_method_name][0]), api_method_name)
-                    break
-
-                # TODO: What if len(params) < len(self.api[api_method][0])?
-                # Need to handle default API-method params also for the root-component (this one).
-                if len(self.api[api_method_name][0]) <= i:
-                    raise RLGraphError(
-                        "API-method with name '{}' only has {} input parameters! You passed in "
-                        "{}.".format(api_method_name, len(self.api[api_method_name][0]), len(params))
-                    )
-
-                placeholder = self.api[api_method_name][0][i].op  # 0=input op-recs; i=ith input op-rec
-                if isinstance(placeholder, ContainerDataOp):
-                    flat_placeholders = flatten_op(placeholder)
-                    for flat_key, value in flatten_op(param).items():
-                        feed_dict[flat_placeholders[flat_key]] = value
-                # Special case: Get the default argument for this arg.
-                # TODO: Support API-method's kwargs here as well (mostly useful for test.test).
-                #elif param is None:
-                #    feed_dict[placeholder] = self.root_component.api_methods[api_method_call].default_values[i]
-                else:
-                    feed_dict[placeholder] = param
+            plan = self.get_execution_plan(api_method_name, return_ops)
+            fetch_dict[api_method_name] = plan.fetches
+            if params is not None:
+                plan.feed(feed_dict, plan.get_params(params))
 
         return fetch_dict, feed_dict
 
@@ -904,7 +886,8 @@ class GraphBuilder(Specifiable):
             any: Results of executing this api-method.
         """
         # Reset call profiler.
-        Component.reset_profile()
+        if self.fast_path is False:
+            Component.reset_profile()
         if api_method not in self.api:
             raise RLGraphError("No API-method with name '{}' found!".format(api_method))
 
@@ -937,6 +920,9 @@ class GraphBuilder(Specifiable):
         # No container arg handling.
         if not flatten_ops:
             return graph_fn(component, *args, **kwargs)
+        # Fast path: graph_fns that did not get any container args on their first call won't get them later either.
+        elif self.fast_path is True and self.graph_fn_flattening.get((component, graph_fn)) is False:
+            return self._call_graph_fn_unflattened(component, graph_fn, add_auto_key_as_first_param, *args, **kwargs)
         else:
             # Flatten and identify containers for potential splits.
             flattened_args = []
@@ -959,6 +945,9 @@ class GraphBuilder(Specifiable):
                     else:
                         flattened_kwargs[key] = arg
 
+            if self.fast_path is True:
+                self.graph_fn_flattening[(component, graph_fn)] = args_actually_flattened
+
             # If splitting args, split then iterate and merge. Only split if some args were actually flattened.
             if args_actually_flattened:
                 split_args_and_kwargs = define_by_run_split_args(add_auto_key_as_first_param,
@@ -1024,14 +1013,20 @@ class GraphBuilder(Specifiable):
                 return unflattened_ret[0] if len(unflattened_ret) == 1 else unflattened_ret
             else:
                 # Just pass in args and kwargs because not actually flattened, with or without default key.
-                if add_auto_key_as_first_param:
-                    ret = graph_fn(component, "", *args, **kwargs)
-                else:
-                    ret = graph_fn(component, *args, **kwargs)
-                return define_by_run_unpack(ret)
+                return self._call_graph_fn_unflattened(
+                    component, graph_fn, add_auto_key_as_first_param, *args, **kwargs
+                )
+
+    @staticmethod
+    def _call_graph_fn_unflattened(component, graph_fn, add_auto_key_as_first_param, *args, **kwargs):
+        if add_auto_key_as_first_param:
+            ret = graph_fn(component, "", *args, **kwargs)
+        else:
+            ret = graph_fn(component, *args, **kwargs)
+        return define_by_run_unpack(ret)
 
     def build_define_by_run_graph(self, meta_graph, input_spaces, available_devices,
-                                  device_strategy="default", default_device=None, device_map=None):
+                                  device_strategy="default", default_device=None, device_map=None, fast_path=False):
         """
         Builds a graph for eager or define by run execution. This primarily consists of creating variables through
         the component hierarchy by pushing the input spaces  through the graph.
@@ -1044,6 +1039,8 @@ class GraphBuilder(Specifiable):
             device_strategy (Optional[str]): Device strategy.
             default_device (Optional[str]): Default device identifier.
             device_map (Optional[Dict]): Dict of Component names mapped to device names to place the Component's ops.
+            fast_path (bool): Whether to execute with low overhead: No per-call profiling and container-arg checks
+                of graph_fns only on their first call.
         """
         # Time the build procedure.
         time_start = time.perf_counter()
@@ -1053,6 +1050,8 @@ class GraphBuilder(Specifiable):
         self.var_call_times = []
         self.api = meta_graph.api
         self.num_meta_ops = meta_graph.num_ops
+        self.fast_path = fast_path
+        self.graph_fn_flattening = {}
 
         # Set devices usable for this graph.
         self.available_devices = available_devices
@@ -1087,7 +1086,9 @@ class GraphBuilder(Specifiable):
         iterations = self._build(op_records_list)
 
         # Set execution mode in components to change `call` behaviour to direct function evaluation.
-        self.root_component.propagate_sub_component_properties(properties=dict(execution_mode="define_by_run"))
+        self.root_component.propagate_sub_component_properties(
+            properties=dict(execution_mode="define_by_run", profiling_enabled=not self.fast_path)
+        )
 
         # Call post build logic.
         self.root_component._post_build(self.root_component)
@@ -27,9 +27,10 @@ from rlgraph.graphs import GraphExecutor
 from rlgraph.utils import util
 from rlgraph.utils.define_by_run_ops import define_by_run_flatten, define_by_run_unflatten
 from rlgraph.utils.util import force_torch_tensors
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class PyTorchExecutor(GraphExecutor):
@@ -58,6 +59,10 @@ class PyTorchExecutor(GraphExecutor):
         # Squeeze result dims, often necessary in tests.
         self.remove_batch_dims = True
 
+        # Low-overhead execution: No call profiling, cached graph_fn arg checks and results returned as-is (no
+        # squeezing or copying).
+        self.fast_path = self.execution_spec.get("fast_path", False)
+
     def build(self, root_components, input_spaces, **kwargs):
         start = time.perf_counter()
         self.init_execution()
@@ -70,7 +75,8 @@ class PyTorchExecutor(GraphExecutor):
             meta_build_times.append(time.perf_counter() - start)
 
             build_time = self.graph_builder.build_define_by_run_graph(
-                meta_graph=meta_graph, input_spaces=input_spaces, available_devices=self.available_devices
+                meta_graph=meta_graph, input_spaces=input_spaces, available_devices=self.available_devices,
+                fast_path=self.fast_path
             )
             build_times.append(build_time)
 
@@ -148,7 +154,10 @@ class PyTorchExecutor(GraphExecutor):
 
     def clean_results(self, ret, to_return):
         for result in to_return:
-            if isinstance(result, dict):
+            if self.fast_path is True and not isinstance(result, dict):
+                # Numpy view on the (already detached) tensor's memory.
+                ret.append(result.numpy() if isinstance(result, torch.Tensor) else result)
+            elif isinstance(result, dict):
                 cleaned_dict = {k: v for k, v in result.items() if v is not None}
                 cleaned_dict = self.clean_dict(cleaned_dict)
                 ret.append(cleaned_dict)
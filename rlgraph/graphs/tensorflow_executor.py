@@ -23,15 +23,17 @@ import time
 from rlgraph import get_backend, get_distributed_backend
 import rlgraph.utils as util
 from rlgraph.components.common.multi_gpu_synchronizer import MultiGpuSynchronizer
+from rlgraph.utils.profiler import Profiler
 from rlgraph.utils.rlgraph_errors import RLGraphError
 from rlgraph.graphs.graph_executor import GraphExecutor
 from rlgraph.utils.util import force_list
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
-    from tensorflow.python.client import device_lib
-    from rlgraph.utils.specifiable_server import SpecifiableServer, SpecifiableServerHook
-    from tensorflow.python.client import timeline
+    tf = lazy_import("tensorflow")
+    device_lib = lazy_import("tensorflow.python.client.device_lib")
+    from rlgraph.utils.specifiable_server import SpecifiableServer
+    timeline = lazy_import("tensorflow.python.client.timeline")
 
 
 class TensorFlowExecutor(GraphExecutor):
@@ -219,9 +221,13 @@ class TensorFlowExecutor(GraphExecutor):
     def execute(self, *api_method_calls):
         # Fetch inputs for the different API-methods.
         fetch_dict, feed_dict = self.graph_builder.get_execution_inputs(*api_method_calls)
+        if Profiler.enabled is True:
+            start = time.perf_counter()
         ret = self.monitored_session.run(
             fetch_dict, feed_dict=feed_dict, options=self.tf_session_options, run_metadata=self.run_metadata
         )
+        if Profiler.enabled is True:
+            Profiler.record("execute", ",".join(sorted(fetch_dict.keys())), time.perf_counter() - start)
 
         if self.profiling_enabled:
             self.update_profiler_if_necessary()
@@ -513,6 +519,7 @@ class TensorFlowExecutor(GraphExecutor):
         # TODO: Change this registry to a tf collections based one. Problem: EnvStepper is created before the Graph,
         # TODO: So when the Graph gets entered, the registry (with the SpecifiableServer in it) is gone.
         if len(SpecifiableServer.INSTANCES) > 0:
+            from rlgraph.utils.specifiable_server import SpecifiableServerHook
             hooks.append(SpecifiableServerHook())
 
     def setup_session(self, hooks):
@@ -26,11 +26,12 @@ from rlgraph import get_backend
 from rlgraph.spaces.space import Space
 from rlgraph.utils.initializer import Initializer
 from rlgraph.utils.util import convert_dtype
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class BoxSpace(Space):
@@ -28,13 +28,15 @@ from rlgraph.spaces.float_box import FloatBox
 from rlgraph.spaces.int_box import IntBox
 from rlgraph.spaces.text_box import TextBox
 from rlgraph.utils.util import RLGraphError, convert_dtype, get_shape, LARGE_INTEGER, force_tuple
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 # TODO: replace completely by `Component.get_variable` (python-backend)
-def get_list_registry(from_space, capacity=None, initializer=0, flatten=True, add_batch_rank=False):
+def get_list_registry(from_space, capacity=None, initializer=0, flatten=True, add_batch_rank=False,
+                      preallocate=False):
     """
     Creates a list storage for a space by providing an ordered dict mapping space names
     to empty lists.
@@ -49,9 +51,23 @@ def get_list_registry(from_space, capacity=None, initializer=0, flatten=True, ad
             the created variable. If it is an int, will add that int instead of None.
             Default: False.
 
+        preallocate (bool): If True and `capacity` is given, creates contiguous numpy buffers of shape
+            (capacity,) + space-shape (and the space's dtype) instead of lists. These can be read with a single
+            fancy-index instead of per-element.
+            Default: False.
+
     Returns:
         dict: Container dict mapping spaces to empty lists.
     """
+    if preallocate and capacity is not None:
+        if flatten:
+            return from_space.flatten(
+                custom_scope_separator="-", scope_separator_at_start=False,
+                mapping=lambda k, primitive: get_preallocated_buffer(primitive, capacity, initializer)
+            )
+        else:
+            return get_preallocated_buffer(from_space, capacity, initializer)
+
     if flatten:
         if capacity is not None:
             var = from_space.flatten(
@@ -71,6 +87,25 @@ def get_list_registry(from_space, capacity=None, initializer=0, flatten=True, ad
     return var
 
 
+def get_preallocated_buffer(space, capacity, initializer=0):
+    """
+    Creates a contiguous numpy buffer holding `capacity` values of a primitive space.
+
+    Args:
+        space (Space): The primitive Space to create a buffer for.
+        capacity (int): Number of values in the buffer (size of the 0th rank).
+        initializer (any): Value to fill the buffer with.
+
+    Returns:
+        np.ndarray: The buffer of shape (capacity,) + space-shape.
+    """
+    dtype = np.dtype(convert_dtype(space.dtype, to="np"))
+    # Strings (and other non-numeric types) are kept as python objects.
+    if dtype.kind in ("O", "S", "U"):
+        return np.full(shape=(capacity,) + space.shape, fill_value=None, dtype=object)
+    return np.full(shape=(capacity,) + space.shape, fill_value=initializer, dtype=dtype)
+
+
 def get_space_from_op(op):
     """
     Tries to re-create a Space object given some DataOp (e.g. a tf op).
@@ -381,6 +381,49 @@ class TestIMPALAAgentFunctionality(unittest.TestCase):
         agent.environment_stepper.environment_server.stop_server()
         agent.terminate()
 
+    def test_isolated_vectorized_impala_actor_agent_functionality(self):
+        """
+        Creates a non-distributed IMPALAAgent (actor) stepping through 4 DeepMindLab Envs at once and checks that
+        each Env's sample-run is inserted as a separate record into the FIFOQueue.
+        """
+        try:
+            from rlgraph.environments.deepmind_lab import DeepmindLabEnv
+        except ImportError:
+            print("Deepmind Lab not installed: Will skip this test.")
+            return
+
+        num_environments = 4
+        worker_sample_size = 20
+        agent_config = config_from_path("configs/impala_agent_for_deepmind_lab_env.json")
+        env_spec = dict(level_id="seekavoid_arena_01", observations=["RGB_INTERLEAVED", "INSTR"], frameskip=4)
+        dummy_env = DeepmindLabEnv.from_spec(env_spec)
+
+        agent = IMPALAAgent.from_spec(
+            agent_config,
+            type="actor",
+            architecture="large",
+            environment_spec=default_dict(dict(type="deepmind-lab"), env_spec),
+            state_space=dummy_env.state_space,
+            action_space=dummy_env.action_space,
+            internal_states_space=IMPALAAgent.default_internal_states_space,
+            execution_spec=dict(disable_monitoring=True),
+            worker_sample_size=worker_sample_size,
+            num_environments=num_environments,
+            fifo_queue_spec=dict(capacity=100)
+        )
+        # Start Specifiable Server with Envs manually (monitoring is disabled).
+        agent.environment_stepper.environment_server.start_server()
+        steps = 3
+        for _ in range(steps):
+            out = agent.call_api_method("perform_n_steps_and_insert_into_fifo")
+            # Terminals are time-major.
+            self.assertEqual(out[1].shape, (worker_sample_size, num_environments))
+        # One record per Env and sample-run.
+        self.assertEqual(agent.call_api_method("get_queue_size"), steps * num_environments)
+
+        agent.environment_stepper.environment_server.stop_server()
+        agent.terminate()
+
     #def test_distributed_impala_agent_functionality_actor_part(self):
     #    """
     #    Creates an IMPALAAgent (actor) and starts it without the learner piece.
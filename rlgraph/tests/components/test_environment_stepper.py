@@ -257,6 +257,66 @@ class TestEnvironmentStepper(unittest.TestCase):
         # Make sure we close the session (to shut down the Env on the server).
         test.terminate()
 
+    def test_vectorized_environment_stepper_on_deterministic_env_with_returning_action_probs(self):
+        num_environments = 3
+        preprocessor_spec = [dict(type="divide", divisor=2)]
+        network_spec = config_from_path("configs/test_simple_nn.json")
+        exploration_spec = None
+        actor_component = ActorComponent(
+            preprocessor_spec,
+            dict(network_spec=network_spec, action_space=self.deterministic_env_action_space),
+            exploration_spec
+        )
+        environment_stepper = EnvironmentStepper(
+            environment_spec=dict(type="deterministic_env", steps_to_terminal=6),
+            actor_component_spec=actor_component,
+            state_space=self.deterministic_env_state_space,
+            reward_space="float32",
+            add_action_probs=True,
+            action_probs_space=self.deterministic_action_probs_space,
+            num_steps=3,
+            num_environments=num_environments
+        )
+
+        test = ComponentTest(
+            component=environment_stepper,
+            action_space=self.deterministic_env_action_space,
+        )
+
+        weights = test.read_variable_values(environment_stepper.actor_component.policy.variable_registry)
+        policy_scope = "environment-stepper/actor-component/policy/"
+        weights_hid = weights[policy_scope+"test-network/hidden-layer/dense/kernel"]
+        biases_hid = weights[policy_scope+"test-network/hidden-layer/dense/bias"]
+        weights_action = weights[policy_scope+"action-adapter-0/action-network/action-layer/dense/kernel"]
+        biases_action = weights[policy_scope+"action-adapter-0/action-network/action-layer/dense/bias"]
+
+        def action_probs(preprocessed_state):
+            return softmax(dense_layer(
+                dense_layer(np.array([preprocessed_state]), weights_hid, biases_hid), weights_action, biases_action
+            ))
+
+        # Step 3 times through all Envs at once and collect results (time-major: [time, env, ...]).
+        expected = (
+            # t_
+            np.array([[False] * num_environments] * 3),
+            # s' (raw)
+            np.array([[[s]] * num_environments for s in [0.0, 1.0, 2.0, 3.0]]),
+            # action probs
+            np.array([[action_probs(s)] * num_environments for s in [0.0, 0.5, 1.0]])
+        )
+        test.test("step", expected_outputs=expected, decimals=3)
+
+        # Step again, check whether stitching of states/etc.. and the Envs' resets work.
+        expected = (
+            np.array([[False] * num_environments, [False] * num_environments, [True] * num_environments]),
+            np.array([[[s]] * num_environments for s in [3.0, 4.0, 5.0, 0.0]]),  # s' (raw)
+            np.array([[action_probs(s)] * num_environments for s in [1.5, 2.0, 2.5]])
+        )
+        test.test("step", expected_outputs=expected, decimals=3)
+
+        # Make sure we close the session (to shut down the Envs on the server).
+        test.terminate()
+
     def test_environment_stepper_on_deterministic_env_with_action_probs_lstm(self):
         internal_states_space = Tuple(FloatBox(shape=(3,)), FloatBox(shape=(3,)))
         preprocessor_spec = [dict(type="multiply", factor=0.1)]
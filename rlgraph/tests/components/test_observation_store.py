@@ -0,0 +1,95 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph.components.helpers.observation_store import ObservationStore
+
+
+class TestObservationStore(unittest.TestCase):
+    """
+    Tests frame-deduplicated storage of stacked observations.
+    """
+    sequence_length = 4
+
+    def make_trajectory(self, length, add_rank=True):
+        # Mimics a `Sequence` preprocessor: the reset frame is repeated at the episode start.
+        frames = np.random.randint(0, 255, size=(length + 1, 3, 2)).astype(np.uint8)
+        stacks = []
+        for t in range_(length + 1):
+            sequence = [frames[max(t - self.sequence_length + 1 + j, 0)] for j in range_(self.sequence_length)]
+            stacks.append(np.stack(sequence, axis=-1) if add_rank else np.concatenate(sequence, axis=-1))
+        stacks = np.asarray(stacks)
+        return stacks[:-1], stacks[1:]
+
+    def test_reconstruct_fragments(self):
+        capacity = 50
+        for add_rank in [True, False]:
+            for n_step in [1, 3]:
+                store = ObservationStore(capacity, self.sequence_length, add_rank=add_rank,
+                                         max_next_state_offset=n_step)
+                all_states, all_next_states, episode_ends = [], [], []
+                for _ in range_(20):
+                    states, next_states = self.make_trajectory(np.random.randint(1, 12), add_rank=add_rank)
+                    episode_ends.append(len(all_states) + len(states))
+                    if n_step > 1:
+                        if len(states) > n_step:
+                            next_states = np.concatenate([states[n_step:], next_states[-n_step:]])
+                        else:
+                            next_states = next_states[-1:].repeat(len(states), axis=0)
+                    # Split fragments across inserts.
+                    cut = np.random.randint(0, len(states) + 1)
+                    for s, ns in [(states[:cut], next_states[:cut]), (states[cut:], next_states[cut:])]:
+                        store.insert(s, ns)
+                        all_states.extend(s)
+                        all_next_states.extend(ns)
+
+                total = store.num_inserted
+                indices = np.arange(total - min(total, capacity), total) % capacity
+                states, next_states = store.get(indices)
+                self.assertTrue(np.array_equal(states, np.asarray(all_states)[-capacity:]))
+                self.assertTrue(np.array_equal(next_states, np.asarray(all_next_states)[-capacity:]))
+                # Most frames must be shared, not stored in overflow.
+                self.assertLess(len(store.state_overflow), capacity // 2)
+                # Only next-states of episode ends (the last n-step records of each episode) are kept in overflow.
+                num_episode_ends = len([end for end in episode_ends if end > total - capacity])
+                self.assertLessEqual(len(store.next_state_overflow), n_step * num_episode_ends)
+
+                # Consecutive single-record inserts of one episode: Next-states resolve against the next insert.
+                store = ObservationStore(capacity, self.sequence_length, add_rank=add_rank,
+                                         max_next_state_offset=n_step)
+                states, next_states = self.make_trajectory(30, add_rank=add_rank)
+                next_states = np.concatenate([states[n_step:], next_states[-n_step:]])
+                for i in range_(len(states)):
+                    store.insert(states[i:i + 1], next_states[i:i + 1])
+                self.assertLessEqual(len(store.next_state_overflow), n_step)
+                retrieved_states, retrieved_next_states = store.get(np.arange(30))
+                self.assertTrue(np.array_equal(retrieved_states, states))
+                self.assertTrue(np.array_equal(retrieved_next_states, next_states))
+
+    def test_truncating_insert(self):
+        store = ObservationStore(10, self.sequence_length)
+        states, next_states = self.make_trajectory(25)
+        store.insert(states, next_states)
+
+        retrieved_states, retrieved_next_states = store.get(np.arange(15, 25) % 10)
+        self.assertTrue(np.array_equal(retrieved_states, states[-10:]))
+        self.assertTrue(np.array_equal(retrieved_next_states, next_states[-10:]))
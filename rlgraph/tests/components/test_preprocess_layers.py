@@ -24,7 +24,7 @@ import cv2
 import numpy as np
 
 from rlgraph.components.layers import GrayScale, ReShape, Multiply, Divide, Clip, ImageBinary, ImageResize, ImageCrop, \
-    MovingStandardize
+    MovingStandardize, AtariPreprocess
 from rlgraph.environments import OpenAIGymEnv
 from rlgraph.spaces import *
 from rlgraph.tests import ComponentTest, recursive_assert_almost_equal
@@ -219,6 +219,48 @@ class TestPreprocessLayers(unittest.TestCase):
         out = image_crop._graph_fn_call(input_image)
         recursive_assert_almost_equal(out, expected)
 
+    def test_python_image_resize_with_batch(self):
+        image_resize = ImageResize(width=4, height=4, interpolation="bilinear", backend="python")
+        image_resize.create_variables(input_spaces=dict(inputs=FloatBox(shape=(16, 16, 3), add_batch_rank=True)))
+
+        input_image = cv2.imread(os.path.join(os.path.dirname(__file__), "images/16x16x3_image.bmp"))
+        expected = cv2.resize(input_image, dsize=(4, 4), interpolation=cv2.INTER_LINEAR)
+
+        out = image_resize._graph_fn_call(np.asarray([input_image, input_image[::-1]]))
+        recursive_assert_almost_equal(out, np.asarray([expected, expected[::-1]]))
+        # Single color channel is kept.
+        out = image_resize._graph_fn_call(np.asarray([input_image[:, :, :1], input_image[:, :, 1:2]]))
+        recursive_assert_almost_equal(out, np.asarray([expected[:, :, :1], expected[:, :, 1:2]]))
+
+    def test_python_atari_preprocess(self):
+        space = IntBox(256, shape=(210, 160, 3), dtype="uint8", add_batch_rank=True)
+        for num_threads in [0, 2]:
+            atari_preprocess = AtariPreprocess(
+                width=84, height=84, crop_y=25, crop_height=160, num_threads=num_threads, backend="python"
+            )
+            atari_preprocess.create_variables(input_spaces=dict(inputs=space))
+            self.assertEqual(atari_preprocess.get_preprocessed_space(space).shape, (84, 84, 1))
+
+            input_ = space.sample(size=3).astype(np.uint8)
+            # Crop, grayscale, resize and scale image by image.
+            expected = np.asarray([cv2.resize(
+                cv2.cvtColor(image[25:185], cv2.COLOR_RGB2GRAY), dsize=(84, 84), interpolation=cv2.INTER_AREA
+            ) for image in input_])[:, :, :, np.newaxis] / 255.0
+
+            out = atari_preprocess._graph_fn_call(input_)
+            self.assertEqual(out.dtype, np.float32)
+            recursive_assert_almost_equal(out, expected, decimals=5)
+            # Single image.
+            out = atari_preprocess._graph_fn_call(input_[1])
+            recursive_assert_almost_equal(out, expected[1], decimals=5)
+
+            # Worker threads are closed and joined.
+            thread_pool = atari_preprocess.thread_pool
+            atari_preprocess.terminate()
+            self.assertIsNone(atari_preprocess.thread_pool)
+            if thread_pool is not None:
+                self.assertTrue(all(not worker.is_alive() for worker in thread_pool._pool))
+
     def test_black_and_white(self):
         binary = ImageBinary()
         # Color image of 2x2x3 size.
@@ -266,3 +308,42 @@ class TestPreprocessLayers(unittest.TestCase):
         # Final output.
         expected_out = (samples[-1] - moving_standardize.mean_est) / std
         self.assertTrue(np.allclose(out, expected_out))
+
+    def test_moving_standardize_python_with_batches_and_merged_statistics(self):
+        space = FloatBox(shape=(3,), add_batch_rank=True)
+        workers = [MovingStandardize(backend="python") for _ in range(2)]
+        for worker in workers:
+            worker.create_variables(input_spaces=dict(inputs=space), action_space=None)
+
+        # Each batch of N samples counts as N samples.
+        samples = [space.sample(size=8) * 10.0 for _ in range(6)]
+        for i, batch in enumerate(samples):
+            out = workers[i % 2]._graph_fn_call(batch)
+        self.assertEqual(workers[0].sample_count, 24.0)
+        all_first = np.concatenate(samples[0::2], axis=0)
+        self.assertTrue(np.allclose(workers[0].mean_est[0], np.mean(all_first, axis=0), atol=1e-4))
+        self.assertTrue(np.allclose(
+            workers[0].std_sum_est[0] / (workers[0].sample_count - 1.0), np.var(all_first, ddof=1, axis=0), atol=1e-3
+        ))
+        expected_out = (samples[-1] - workers[1].mean_est[0]) / \
+            (np.sqrt(workers[1].std_sum_est[0] / (workers[1].sample_count - 1.0)) + SMALL_NUMBER)
+        self.assertTrue(np.allclose(out, expected_out, atol=1e-4))
+
+        # Merge both workers' estimates and sync them back.
+        merged = MovingStandardize.merge_statistics(*[worker.get_statistics() for worker in workers])
+        all_samples = np.concatenate(samples, axis=0)
+        self.assertEqual(merged["count"], 48.0)
+        self.assertTrue(np.allclose(merged["mean"][0], np.mean(all_samples, axis=0), atol=1e-4))
+        self.assertTrue(np.allclose(merged["std_sum"][0] / 47.0, np.var(all_samples, ddof=1, axis=0), atol=1e-3))
+        for worker in workers:
+            worker.set_statistics(merged)
+
+        # Only statistics of new samples are exported after a sync.
+        new_batch = space.sample(size=4)
+        workers[0]._graph_fn_call(new_batch)
+        new_statistics = workers[0].get_statistics(only_new=True)
+        self.assertEqual(new_statistics["count"], 4.0)
+        self.assertTrue(np.allclose(new_statistics["mean"][0], np.mean(new_batch, axis=0), atol=1e-3))
+        self.assertTrue(np.allclose(
+            new_statistics["std_sum"][0], np.sum(np.square(new_batch - np.mean(new_batch, axis=0)), axis=0), atol=1e-2
+        ))
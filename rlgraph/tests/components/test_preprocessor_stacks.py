@@ -269,6 +269,104 @@ class TestPreprocessorStacks(unittest.TestCase):
             out = stack.preprocess(input_)
             recursive_assert_almost_equal(out, input_)
 
+    def test_batched_python_preprocessor_stack_with_slot_resets(self):
+        """
+        Tests that one python stack processing the states of several environments at once (with per-environment
+        slot resets) yields the same outputs as one stack per environment.
+        """
+        num_envs = 3
+        space = FloatBox(shape=(2,), add_batch_rank=True)
+
+        def build_stack(batch_size):
+            stack = PreprocessorStack(
+                dict(type="moving_standardize", batch_size=batch_size, scope="s", backend="python"),
+                dict(type="sequence", sequence_length=3, batch_size=batch_size, add_rank=True, scope="q",
+                     in_data_format="channels_first", backend="python"),
+                backend="python"
+            )
+            build_space = space
+            for sub_comp_scope in ["s", "q"]:
+                stack.sub_components[sub_comp_scope].create_variables(input_spaces=dict(inputs=build_space))
+                build_space = stack.sub_components[sub_comp_scope].get_preprocessed_space(build_space)
+            stack.reset()
+            return stack
+
+        batched_stack = build_stack(num_envs)
+        env_stacks = [build_stack(1) for _ in range_(num_envs)]
+        for step in range_(10):
+            states = space.sample(size=num_envs)
+            # Episode of env 1 ends every 3rd step, the one of env 2 after step 6.
+            reset_slots = [i for i in range_(num_envs) if (i == 1 and step % 3 == 0) or (i == 2 and step == 6)]
+            batched_stack.reset_slots(reset_slots)
+            for i in reset_slots:
+                env_stacks[i].reset()
+
+            batched_out = batched_stack.preprocess(states)
+            self.assertEqual(batched_out.shape, (num_envs, 2, 3))
+            for i in range_(num_envs):
+                out = env_stacks[i].preprocess(states[i:i + 1])
+                recursive_assert_almost_equal(batched_out[i], out[0], decimals=5)
+
+    def test_batched_python_preprocessor_stack_statistics_with_slot_resets(self):
+        """
+        Tests that batched slot resets and per-environment stack resets both drop MovingStandardize estimates back
+        to the last synced statistics, and that statistics are merged per layer.
+        """
+        num_envs = 3
+        space = FloatBox(shape=(2,), add_batch_rank=True)
+
+        def build_stack(batch_size):
+            stack = PreprocessorStack(
+                dict(type="multiply", factor=2.0, scope="m", backend="python"),
+                dict(type="moving_standardize", batch_size=batch_size, scope="s", backend="python"),
+                backend="python"
+            )
+            for sub_comp_scope in ["m", "s"]:
+                stack.sub_components[sub_comp_scope].create_variables(input_spaces=dict(inputs=space))
+            stack.reset()
+            return stack
+
+        batched_stack = build_stack(num_envs)
+        env_stacks = [build_stack(1) for _ in range_(num_envs)]
+        for step in range_(4):
+            states = space.sample(size=num_envs)
+            batched_stack.preprocess(states)
+            for i in range_(num_envs):
+                env_stacks[i].preprocess(states[i:i + 1])
+
+        # Only layers keeping statistics are exported and merged.
+        statistics = batched_stack.get_statistics()
+        self.assertEqual(list(statistics.keys()), ["s"])
+        self.assertEqual(statistics["s"]["count"], 12.0)
+        merged = batched_stack.merge_statistics(*[stack.get_statistics() for stack in env_stacks])
+        recursive_assert_almost_equal(merged, statistics, decimals=4)
+        self.assertEqual(batched_stack.merge_statistics(dict(m=dict(count=1.0)), None), {})
+
+        batched_stack.set_statistics(merged)
+        for stack in env_stacks:
+            stack.set_statistics(merged)
+
+        synced_layer = batched_stack.sub_components["s"]
+        for step in range_(6):
+            states = space.sample(size=num_envs)
+            reset_slots = [i for i in range_(num_envs) if (i == 1 and step % 2 == 0) or (i == 2 and step == 3)]
+            batched_stack.reset_slots(reset_slots)
+            for i in reset_slots:
+                env_stacks[i].reset()
+                # Back to the synced estimates.
+                self.assertEqual(synced_layer.sample_count[i], 12.0)
+                recursive_assert_almost_equal(synced_layer.mean_est[i], merged["s"]["mean"][0], decimals=4)
+                self.assertEqual(env_stacks[i].sub_components["s"].sample_count[0], 12.0)
+
+            batched_out = batched_stack.preprocess(states)
+            for i in range_(num_envs):
+                out = env_stacks[i].preprocess(states[i:i + 1])
+                recursive_assert_almost_equal(batched_out[i], out[0], decimals=4)
+
+        # Resets do not drop the statistics of new samples.
+        self.assertEqual(batched_stack.get_statistics(only_new=True)["s"]["count"], 18.0)
+        self.assertEqual(batched_stack.get_statistics()["s"]["count"], 30.0)
+
     def test_preprocessor_from_list_spec(self):
         space = FloatBox(shape=(2,))
         stack = PreprocessorStack.from_spec([
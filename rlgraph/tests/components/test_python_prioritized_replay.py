@@ -21,8 +21,11 @@ import unittest
 import numpy as np
 from six.moves import xrange as range_
 from rlgraph.components.memories.mem_prioritized_replay import MemPrioritizedReplay
+from rlgraph.execution.environment_sample import EnvironmentSample
 from rlgraph.execution.ray.apex.apex_memory import ApexMemory
-from rlgraph.execution.ray.ray_util import ray_compress
+from rlgraph.execution.ray.apex.ray_memory_actor import RayMemoryActor
+from rlgraph.execution.ray.ray_util import ray_compress, ray_compress_batch, ray_decompress_batch, \
+    is_compressed_batch
 from rlgraph.spaces import Dict, IntBox, BoolBox, FloatBox
 
 
@@ -255,3 +258,118 @@ class TestPythonPrioritizedReplay(unittest.TestCase):
         self.assertEqual(tree.index_of_prefixsum(1.51), 2)
         self.assertEqual(tree.index_of_prefixsum(3.0), 3)
         self.assertEqual(tree.index_of_prefixsum(5.50), 3)
+
+    def test_batched_tree_insert_and_prefixsum(self):
+        """
+        Tests that batched inserts and prefix sum lookups match their per-element counterparts.
+        """
+        capacity = 16
+        memory = ApexMemory(capacity=capacity)
+        batched_tree = memory.merged_segment_tree
+        memory = ApexMemory(capacity=capacity)
+        tree = memory.merged_segment_tree
+
+        indices = np.array([0, 3, 5, 6, 11, 15])
+        priorities = np.random.uniform(0.1, 2.0, size=len(indices))
+        batched_tree.insert_batch(indices, priorities)
+        for index, priority in zip(indices, priorities):
+            tree.insert(index, priority)
+
+        self.assertTrue(np.allclose(batched_tree.sum_segment_tree.values, tree.sum_segment_tree.values))
+        self.assertTrue(np.allclose(batched_tree.min_segment_tree.values, tree.min_segment_tree.values))
+        self.assertTrue(np.allclose(batched_tree.sum_segment_tree.get_batch(indices), priorities))
+
+        samples = np.random.random(size=(100,)) * tree.sum_segment_tree.get_sum()
+        batched_indices = batched_tree.sum_segment_tree.find_prefixsum_indices(samples)
+        expected_indices = [tree.sum_segment_tree.index_of_prefixsum(sample) for sample in samples]
+        self.assertTrue(np.array_equal(batched_indices, expected_indices))
+
+    def test_apex_batch_insert(self):
+        """
+        Tests columnar batch inserts with wraparound and container actions.
+        """
+        memory = ApexMemory(
+            capacity=4,
+            alpha=self.alpha,
+            beta=self.beta
+        )
+        num_records = 6
+        records = dict(
+            states=np.random.random(size=(num_records, 4)),
+            actions=dict(action1=np.arange(num_records), action2=np.arange(num_records) * 2),
+            rewards=np.arange(num_records),
+            terminals=np.zeros(num_records, dtype=bool),
+            next_states=np.random.random(size=(num_records, 4)),
+            importance_weights=np.ones(num_records) * 0.5
+        )
+        memory.insert_batch(records)
+        self.assertEqual(memory.size, 4)
+        self.assertEqual(memory.index, 2)
+        # The last 4 records survive, written with wraparound.
+        self.assertTrue(np.array_equal(memory.columns["actions"]["action1"], [4, 5, 2, 3]))
+        self.assertTrue(np.allclose(memory.columns["rewards"], [4.0, 5.0, 2.0, 3.0]))
+        self.assertTrue(np.allclose(memory.merged_segment_tree.sum_segment_tree.get_sum(), 2.0))
+
+        batch, indices, weights = memory.get_records(3)
+        self.assertEqual(len(indices), 3)
+        self.assertTrue(np.allclose(batch["states"], records["states"][(indices - 2) % 4 + 2]))
+        self.assertTrue(np.array_equal(batch["actions"]["action2"], memory.columns["actions"]["action2"][indices]))
+
+    def test_apex_batch_compressed_insert(self):
+        """
+        Tests inserting states compressed as one blob per batch.
+        """
+        memory = ApexMemory(
+            capacity=10,
+            alpha=self.alpha,
+            beta=self.beta
+        )
+        num_records = 5
+        states = np.random.randint(0, 255, size=(num_records + 1, 8, 8, 2)).astype(np.uint8)
+        compressed_states = ray_compress_batch(states[:-1])
+        self.assertTrue(is_compressed_batch(compressed_states))
+        self.assertTrue(np.array_equal(ray_decompress_batch(compressed_states), states[:-1]))
+
+        memory.insert_batch(dict(
+            states=compressed_states,
+            actions=np.arange(num_records),
+            rewards=np.ones(num_records),
+            terminals=np.zeros(num_records, dtype=bool),
+            next_states=ray_compress_batch(states[1:])
+        ))
+        self.assertEqual(memory.columns["states"].dtype, np.uint8)
+        batch, indices, _ = memory.get_records(4)
+        self.assertTrue(np.array_equal(batch["states"], states[indices]))
+        self.assertTrue(np.array_equal(batch["next_states"], states[indices + 1]))
+
+    def test_memory_actor_batched_observe(self):
+        """
+        Tests that the replay actor inserts whole worker samples with clipped rewards.
+        """
+        memory_actor = RayMemoryActor(dict(
+            min_sample_memory_size=1,
+            sample_batch_size=3,
+            clip_rewards=True,
+            memory_spec=dict(capacity=self.capacity, alpha=self.alpha, beta=self.beta)
+        ))
+        num_records = 8
+        records = dict(
+            states=np.random.random(size=(num_records, 4)),
+            actions=dict(action1=np.arange(num_records)),
+            rewards=np.linspace(-2.0, 2.0, num_records),
+            terminals=np.zeros(num_records, dtype=bool),
+            next_states=np.random.random(size=(num_records, 4)),
+            importance_weights=np.ones(num_records)
+        )
+        for _ in range_(2):
+            memory_actor.observe(EnvironmentSample(sample_batch=records, batch_size=num_records))
+        memory = memory_actor.memory
+        self.assertEqual(memory.size, self.capacity)
+        self.assertEqual(memory.index, 2 * num_records % self.capacity)
+        # Second batch wraps around: indices 8, 9, 0, ..., 5.
+        self.assertTrue(np.array_equal(memory.columns["rewards"][:6], np.sign(records["rewards"][2:])))
+        self.assertTrue(np.allclose(memory.merged_segment_tree.sum_segment_tree.get_sum(), self.capacity))
+
+        batch = memory_actor.get_batch()
+        self.assertEqual(len(batch["indices"]), 3)
+        self.assertEqual(len(batch["importance_weights"]), 3)
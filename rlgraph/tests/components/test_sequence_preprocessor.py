@@ -101,6 +101,36 @@ class TestSequencePreprocessor(unittest.TestCase):
                 out, np.asarray([[[1.1, 1.11, 10]], [[2.2, 2.22, 20]], [[3.3, 3.33, 30]], [[4.4, 4.44, 40]]])
             )
 
+    def test_python_sequence_preprocessor_with_slot_resets(self):
+        seq_len = 3
+        space = FloatBox(shape=(2,), add_batch_rank=True)
+        for add_rank in [True, False]:
+            sequencer = Sequence(
+                sequence_length=seq_len, batch_size=2, add_rank=add_rank, in_data_format="channels_first",
+                backend="python"
+            )
+            sequencer.create_variables(input_spaces=dict(inputs=space))
+            sequencer._graph_fn_reset()
+
+            inputs = [np.asarray([[float(t), -float(t)], [10.0 + t, -10.0 - t]]) for t in range_(5)]
+            # Reference: The stored history per slot (oldest to newest).
+            history = [[inputs[0][slot]] * seq_len for slot in range_(2)]
+            for t, input_ in enumerate(inputs):
+                if t == 3:
+                    sequencer.reset_slots([1])
+                out = sequencer._graph_fn_call(input_)
+                if t > 0:
+                    for slot in range_(2):
+                        history[slot] = history[slot][1:] + [input_[slot]]
+                    if t == 3:
+                        history[1] = [input_[1]] * seq_len
+                expected = np.asarray([
+                    np.stack(history[slot], axis=-1) if add_rank else np.concatenate(history[slot], axis=-1)
+                    for slot in range_(2)
+                ])
+                recursive_assert_almost_equal(out, expected)
+                self.assertEqual(sequencer.index, t % seq_len)
+
     def test_sequence_preprocessor_with_batch(self):
         space = FloatBox(shape=(2,), add_batch_rank=True)
         sequencer = Sequence(sequence_length=2, batch_size=3, add_rank=True)
@@ -0,0 +1,66 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+from rlgraph.graphs.graph_builder import GraphBuilder
+from rlgraph.utils.op_records import DataOpRecord
+from rlgraph.utils.ops import DataOpDict, DataOpTuple, flatten_op
+
+
+class TestExecutionPlan(unittest.TestCase):
+    """
+    Tests the cached fetch- and feed-structures of the GraphBuilder's execution plans. Uses plain strings in
+    place of placeholders/ops, so no backend graph is needed.
+    """
+    def _get_graph_builder(self):
+        graph_builder = GraphBuilder()
+        placeholder = DataOpDict(a="a-ph", b=DataOpTuple("b0-ph", "b1-ph"))
+        graph_builder.api = dict(
+            dict_api=(
+                [DataOpRecord(op=placeholder), DataOpRecord(op="x-ph")],
+                [DataOpRecord(op="x-op", kwarg="x"), DataOpRecord(op="y-op", kwarg="y")]
+            ),
+            tuple_api=(
+                [DataOpRecord(op="p1-ph"), DataOpRecord(op="p2-ph")],
+                [DataOpRecord(op="r0-op"), DataOpRecord(op="r1-op")]
+            )
+        )
+        return graph_builder
+
+    def test_execution_inputs(self):
+        graph_builder = self._get_graph_builder()
+        fetch_dict, feed_dict = graph_builder.get_execution_inputs(
+            ("dict_api", [dict(a=1, b=(2, 3)), 4], "y"),
+            # Dict params are rolled out by sorted keys.
+            ("tuple_api", dict(z=6, a=5), [1])
+        )
+        self.assertEqual(fetch_dict, dict(dict_api=dict(y="y-op"), tuple_api=["r1-op"]))
+        self.assertEqual(feed_dict, {"a-ph": 1, "b0-ph": 2, "b1-ph": 3, "x-ph": 4, "p1-ph": 5, "p2-ph": 6})
+
+        # Already flattened container params are matched by flat-key.
+        _, feed_dict = graph_builder.get_execution_inputs(("dict_api", [flatten_op(dict(a=1, b=(2, 3)))]))
+        self.assertEqual(feed_dict, {"a-ph": 1, "b0-ph": 2, "b1-ph": 3})
+
+    def test_plans_are_cached(self):
+        graph_builder = self._get_graph_builder()
+        graph_builder.get_execution_inputs(("tuple_api", [1, 2]))
+        plan = graph_builder.get_execution_plan("tuple_api")
+        graph_builder.get_execution_inputs(("tuple_api", [3, 4]), ("tuple_api", [3, 4], [0]))
+        self.assertIs(graph_builder.get_execution_plan("tuple_api"), plan)
+        self.assertEqual(len(graph_builder.execution_plans), 2)
@@ -0,0 +1,76 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import unittest
+
+import numpy as np
+
+from rlgraph.utils.profiler import Histogram, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """
+    Tests the Profiler's histograms, timers and exports.
+    """
+    def tearDown(self):
+        Profiler.disable()
+        Profiler.reset()
+
+    def test_histogram_stats(self):
+        histogram = Histogram()
+        values = np.random.lognormal(mean=-9.0, sigma=1.0, size=10000)
+        for value in values:
+            histogram.add(value)
+        stats = histogram.get_stats()
+
+        self.assertEqual(stats["count"], 10000)
+        self.assertAlmostEqual(stats["mean"], np.mean(values))
+        self.assertEqual(stats["max"], np.max(values))
+        # Percentiles are read from 5%-wide buckets.
+        self.assertAlmostEqual(stats["p50"] / np.percentile(values, 50), 1.0, delta=0.05)
+        self.assertAlmostEqual(stats["p99"] / np.percentile(values, 99), 1.0, delta=0.05)
+        # Memory is bounded by the number of buckets.
+        self.assertLessEqual(len(histogram.buckets), Histogram.NUM_BUCKETS)
+
+    def test_timer_only_records_if_enabled(self):
+        with Profiler.timer("worker", "act"):
+            pass
+        self.assertEqual(len(Profiler.get_stats()), 0)
+
+        Profiler.enable()
+        for _ in range(3):
+            with Profiler.timer("worker", "act"):
+                pass
+        Profiler.record("worker", "update", 0.5)
+        stats = Profiler.get_stats()
+        self.assertEqual(stats["worker"]["act"]["count"], 3)
+        self.assertEqual(stats["worker"]["update"]["mean"], 0.5)
+
+    def test_exports(self):
+        Profiler.enable()
+        Profiler.record("api_method", "agent/policy.get_action", 0.001)
+        Profiler.record("api_method", "agent/policy.get_action", 0.003)
+
+        stats = json.loads(Profiler.to_json())
+        self.assertEqual(stats["api_method"]["agent/policy.get_action"]["count"], 2)
+        self.assertAlmostEqual(stats["api_method"]["agent/policy.get_action"]["total"], 0.004)
+
+        lines = Profiler.to_csv().strip().splitlines()
+        self.assertEqual(lines[0], "category,name,count,total,mean,min,p50,p99,max")
+        self.assertTrue(lines[1].startswith("api_method,agent/policy.get_action,2,"))
@@ -21,6 +21,8 @@ import logging
 import time
 import unittest
 
+import numpy as np
+
 from rlgraph.agents import DQNAgent, ApexAgent
 from rlgraph.components import Policy, MemPrioritizedReplay
 from rlgraph.environments import OpenAIGymEnv
@@ -28,7 +30,7 @@ from rlgraph.spaces import FloatBox, IntBox, Dict, BoolBox
 from rlgraph.tests import ComponentTest
 from rlgraph.tests.dummy_components import *
 from rlgraph.tests.dummy_components_with_sub_components import *
-from rlgraph.tests.test_util import config_from_path
+from rlgraph.tests.test_util import config_from_path, recursive_assert_almost_equal
 from rlgraph.utils import root_logger, softmax
 from rlgraph.utils.define_by_run_ops import print_call_chain
 
@@ -141,6 +143,36 @@ class TestPytorchBackend(unittest.TestCase):
         test = ComponentTest(component=memory, input_spaces=input_spaces, auto_build=False)
         return test.build()
 
+    def test_memory_preallocated_buffers(self):
+        record_space = Dict(
+            states=FloatBox(shape=(4,)),
+            actions=IntBox(2),
+            rewards=float,
+            terminals=BoolBox(),
+            add_batch_rank=True
+        )
+        input_spaces = dict(
+            records=record_space,
+            num_records=int,
+            indices=IntBox(add_batch_rank=True),
+            update=FloatBox(add_batch_rank=True)
+        )
+        memory = MemPrioritizedReplay(capacity=10, preallocate_buffers=True)
+        test = ComponentTest(component=memory, input_spaces=input_spaces)
+        for buffer in memory.memory.values():
+            self.assertIsInstance(buffer, np.ndarray)
+            self.assertEqual(len(buffer), 10)
+
+        # Insert with wrap-around.
+        records = record_space.sample(size=15)
+        test.test(("insert_records", [records]), expected_outputs=None)
+        retrieved, indices, _ = test.test(("get_records", 8), expected_outputs=None)
+        self.assertEqual(retrieved["states"].shape, (8, 4))
+        self.assertEqual(retrieved["actions"].dtype, np.int32)
+        # Index i holds the last record inserted at i.
+        recursive_assert_almost_equal(retrieved["states"], records["states"][indices + 10 * (indices < 5)])
+        recursive_assert_almost_equal(retrieved["rewards"], records["rewards"][indices + 10 * (indices < 5)])
+
     # TODO -> batch dim works differently in pytorch -> have to squeeze.
     def test_dense_layer(self):
         # Space must contain batch dimension (otherwise, NNLayer will complain).
@@ -73,3 +73,28 @@ class TestSpecifiableServer(unittest.TestCase):
         self.assertTrue(out1[2] is np.bool_(False))
         self.assertTrue(out2[2] is np.bool_(False))
 
+    def test_specifiable_server_with_shared_memory(self):
+        action_space = IntBox(2)
+        state_space = FloatBox(shape=(2, 3))
+        env_spec = dict(type="random_env", state_space=state_space, action_space=action_space, deterministic=True)
+        specifiable_server_pipe = SpecifiableServer(Environment, env_spec, dict(
+            step_flow=[state_space, float, bool]
+        ), "terminate")
+        # Same Env, but return values come back through shared memory.
+        specifiable_server_shm = SpecifiableServer(Environment, env_spec, dict(
+            step_flow=[state_space, float, bool]
+        ), "terminate", shared_memory=True)
+
+        ret_pipe = [specifiable_server_pipe.step_flow(action_space.sample()) for _ in range(3)]
+        ret_shm = [specifiable_server_shm.step_flow(action_space.sample()) for _ in range(3)]
+        self.assertEqual(ret_shm[0][0].shape, (2, 3))
+
+        with tf.train.SingularMonitoredSession(hooks=[SpecifiableServerHook()]) as sess:
+            out_pipe = [sess.run(ret) for ret in ret_pipe]
+            out_shm = [sess.run(ret) for ret in ret_shm]
+
+        # Both transports must deliver the exact same values (more calls than ring slots).
+        for o_pipe, o_shm in zip(out_pipe, out_shm):
+            np.testing.assert_array_equal(o_pipe[0], o_shm[0])
+            self.assertEqual(o_pipe[1], o_shm[1])
+            self.assertEqual(o_pipe[2], o_shm[2])
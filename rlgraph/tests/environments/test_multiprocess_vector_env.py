@@ -0,0 +1,99 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+
+from rlgraph.environments import MultiprocessVectorEnv, SequentialVectorEnv
+from rlgraph.tests.test_util import recursive_assert_almost_equal
+
+
+class TestMultiprocessVectorEnv(unittest.TestCase):
+    """
+    Tests creation, resetting and stepping through a multiprocess vectorized Env.
+    """
+    def test_multiprocess_vector_env(self):
+        num_envs = 4
+        env = MultiprocessVectorEnv(
+            num_environments=num_envs, env_spec={"type": "gridworld", "world": "2x2"}, num_processes=2
+        )
+
+        s = env.reset(index=0)  # ["XH", " G"]  X=player's position
+        self.assertTrue(s == 0)
+
+        s = env.reset_all()
+        self.assertTrue(np.all(s == 0))
+
+        s, r, t, _ = env.step([2 for _ in range(num_envs)])  # down: [" H", "XG"]
+        self.assertTrue(np.all(s == 1))
+        self.assertTrue(np.all(r == -1.0))
+        self.assertFalse(np.any(t))
+
+        s, r, t, _ = env.step([1 for _ in range(num_envs)])  # right: [" H", " X"]
+        self.assertTrue(np.all(s == 3))
+        self.assertTrue(np.all(r == 1.0))
+        self.assertTrue(np.all(t))
+
+        [env.reset(index=i) for i in range(num_envs)]  # ["XH", " G"]
+        # Different actions per env: right -> hole, down -> free field.
+        s, r, t, _ = env.step([1, 2, 1, 2])
+        expected = [(2, -5.0, True), (1, -1.0, False), (2, -5.0, True), (1, -1.0, False)]
+        for i, (state, reward, terminal) in enumerate(expected):
+            self.assertEqual(s[i], state)
+            self.assertEqual(r[i], reward)
+            self.assertEqual(t[i], terminal)
+
+        env.terminate_all()
+
+    def test_auto_reset_matches_sequential_env(self):
+        num_envs = 3
+        env_specs = [
+            {"type": "random-env", "state_space": {"type": "float-box", "shape": (2,)},
+             "action_space": {"type": "int-box", "low": 0, "high": 2}, "terminal_prob": 0.3},
+            {"type": "grid-world", "world": "4x4"}
+        ]
+        for env_spec in env_specs:
+            env = MultiprocessVectorEnv(num_environments=num_envs, env_spec=env_spec, auto_reset=True)
+            sequential_env = SequentialVectorEnv(num_environments=num_envs, env_spec=env_spec)
+            self.assertEqual(str(sequential_env.state_space), str(env.state_space))
+            self.assertEqual(str(sequential_env.action_space), str(env.action_space))
+
+            env.seed(10)
+            sequential_env.seed(10)
+            recursive_assert_almost_equal(env.reset_all(), np.asarray(sequential_env.reset_all()))
+
+            # Same actions for both, terminated envs are reset in the background by the multiprocess env.
+            actions = np.random.RandomState(0).randint(
+                0, env.action_space.num_categories, size=(50, num_envs)
+            )
+            num_terminals = 0
+            for step_actions in actions:
+                s, r, t, _ = env.step(step_actions)
+                expected_s, expected_r, expected_t, _ = sequential_env.step(step_actions)
+                recursive_assert_almost_equal(s, np.asarray(expected_s))
+                recursive_assert_almost_equal(r, np.asarray(expected_r, dtype=np.float64))
+                self.assertEqual(list(t), [bool(t_) for t_ in expected_t])
+                for i in np.nonzero(t)[0]:
+                    # Already reset in the background, must match a fresh reset of the sequential env.
+                    recursive_assert_almost_equal(env.reset(i), sequential_env.reset(i))
+                    num_terminals += 1
+            self.assertGreater(num_terminals, 0)
+            env.terminate_all()
+            sequential_env.terminate_all()
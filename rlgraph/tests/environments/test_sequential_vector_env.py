@@ -69,3 +69,21 @@ class TestSequentialVectorEnv(unittest.TestCase):
         all(self.assertTrue(r_ == -1.0) for r_ in r)
         all(self.assertTrue(not t_) for t_ in t)
 
+    def test_sequential_vector_env_flow_methods(self):
+        num_envs = 3
+        env = SequentialVectorEnv(num_environments=num_envs, env_spec={"type": "gridworld", "world": "2x2"})
+
+        s = env.reset_flow()  # ["XH", " G"]  X=player's position
+        self.assertTrue(s.shape == (num_envs,))
+        self.assertTrue(all(s == 0))
+
+        # Different actions per env.
+        s, r, t = env.step_flow([2, 1, 3])  # down: [" H", "XG"], right: hole, left: wall
+        self.assertTrue(list(s) == [1, 0, 0])  # hole -> auto-reset
+        self.assertTrue(list(r) == [-1.0, -5.0, -1.0])
+        self.assertTrue(list(t) == [False, True, False])
+
+        s, r, t = env.step_flow([1, 2, 2])  # right: goal (auto-reset), down, down
+        self.assertTrue(list(s) == [0, 1, 1])
+        self.assertTrue(list(r) == [1.0, -1.0, -1.0])
+        self.assertTrue(list(t) == [True, False, False])
@@ -0,0 +1,116 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+import unittest
+
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph.environments import Environment, GridWorld, VectorGridWorld
+from rlgraph.tests.test_util import recursive_assert_almost_equal
+
+
+class TestVectorGridWorld(unittest.TestCase):
+    """
+    Tests the batched VectorGridWorld against single GridWorlds.
+    """
+    num_environments = 8
+
+    def _compare_with_grid_worlds(self, num_steps=200, **kwargs):
+        vector_env = VectorGridWorld(num_environments=self.num_environments, **kwargs)
+        envs = [GridWorld(**kwargs) for _ in range_(self.num_environments)]
+        self.assertEqual(vector_env.state_space, envs[0].state_space)
+        self.assertEqual(vector_env.action_space, envs[0].action_space)
+
+        recursive_assert_almost_equal(vector_env.reset_all(), np.stack([env.reset() for env in envs]))
+        for _ in range_(num_steps):
+            actions = vector_env.action_space.sample(size=self.num_environments)
+            states, rewards, terminals = vector_env.step_flow(actions)
+            for i, env in enumerate(envs):
+                if isinstance(actions, dict):
+                    action = {key: value[i] for key, value in actions.items()}
+                else:
+                    action = actions[i]
+                state, reward, terminal = env.step_flow(action)
+                recursive_assert_almost_equal(states[i], state)
+                self.assertEqual(rewards[i], reward)
+                self.assertEqual(terminals[i], terminal)
+
+    def test_vector_grid_world_against_grid_worlds(self):
+        for world in ["2x2", "4x4", "8x8", "16x16", "4-room"]:
+            for state_representation in ["discrete", "xy", "camera"]:
+                self._compare_with_grid_worlds(world=world, state_representation=state_representation)
+            self._compare_with_grid_worlds(world=world, save_mode=True, reward_function="rich")
+
+    def test_vector_grid_world_with_container_actions(self):
+        for world in ["4x4", "16x16", "4-room"]:
+            for state_representation in ["discrete", "xy+orientation", "camera"]:
+                self._compare_with_grid_worlds(
+                    world=world, action_type="ftj", state_representation=state_representation
+                )
+
+        # Enumerated (0-17) container actions.
+        vector_env = VectorGridWorld(num_environments=2, world="4x4", action_type="ftj",
+                                     state_representation="xy+orientation")
+        env = GridWorld(world="4x4", action_type="ftj", state_representation="xy+orientation")
+        for action in [11, 3, 17, 10, 5, 0]:
+            states, rewards, terminals, _ = vector_env.step(np.array([action, 8]))
+            state, reward, terminal, _ = env.step(action)
+            recursive_assert_almost_equal(states[0], state)
+            recursive_assert_almost_equal(states[1], [0, 0, 0, 1])
+            self.assertEqual(rewards[0], reward)
+
+    def test_vector_grid_world_resets(self):
+        vector_env = Environment.from_spec(dict(type="vector-grid-world", num_environments=100, world="4x4"))
+        self.assertTrue(isinstance(vector_env, VectorGridWorld))
+        states = vector_env.reset_all(randomize=True)
+        # Random starts only on " ", "S" or "F" fields.
+        self.assertFalse(np.any(np.isin(states, [3, 5, 13, 14, 15])))
+
+        # Single reset.
+        vector_env.step(np.full(shape=(100,), fill_value=2))
+        self.assertEqual(vector_env.reset(index=3), 0)
+        self.assertEqual(vector_env.get_env(3).discrete_pos, 0)
+
+    def test_vector_grid_world_performance(self):
+        num_steps = 1000
+        for world, action_type, state_representation in [
+            ("16x16", "udlr", "discrete"), ("16x16", "ftj", "xy+orientation"), ("16x16", "udlr", "camera")
+        ]:
+            kwargs = dict(world=world, action_type=action_type, state_representation=state_representation)
+            vector_env = VectorGridWorld(num_environments=64, **kwargs)
+            actions = [vector_env.action_space.sample(size=64) for _ in range_(num_steps)]
+            start = time.perf_counter()
+            for i in range_(num_steps):
+                vector_env.step_flow(actions[i])
+            vector_time = time.perf_counter() - start
+
+            env = GridWorld(**kwargs)
+            single_actions = env.action_space.sample(size=num_steps)
+            if isinstance(single_actions, dict):
+                single_actions = [{key: value[i] for key, value in single_actions.items()} for i in range_(num_steps)]
+            start = time.perf_counter()
+            for i in range_(num_steps):
+                env.step_flow(single_actions[i])
+            single_time = time.perf_counter() - start
+
+            print("{} {} {}: GridWorld {:.0f} steps/s, VectorGridWorld(64) {:.0f} steps/s.".format(
+                world, action_type, state_representation, num_steps / single_time, num_steps * 64 / vector_time
+            ))
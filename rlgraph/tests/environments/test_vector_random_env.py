@@ -0,0 +1,64 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+
+from rlgraph.environments import VectorRandomEnv
+from rlgraph.spaces import Dict, FloatBox, IntBox
+from rlgraph.tests.test_util import recursive_assert_almost_equal
+
+
+class TestVectorRandomEnv(unittest.TestCase):
+    """
+    Tests creation, resetting and stepping through a batched VectorRandomEnv.
+    """
+    def test_vector_random_env(self):
+        env = VectorRandomEnv(
+            num_environments=16, state_space=FloatBox(shape=(2, 2)), action_space=IntBox(2), terminal_prob=0.5,
+            deterministic=True
+        )
+        states = env.reset_all()
+        self.assertEqual(states.shape, (16, 2, 2))
+        self.assertTrue(all(env.state_space.contains(state) for state in states))
+
+        states, rewards, terminals, infos = env.step(env.action_space.sample(size=16))
+        self.assertEqual(states.shape, (16, 2, 2))
+        self.assertEqual(rewards.shape, (16,))
+        self.assertEqual(terminals.dtype, np.bool_)
+        self.assertEqual(len(infos), 16)
+
+        # Deterministic.
+        other_env = VectorRandomEnv(
+            num_environments=16, state_space=FloatBox(shape=(2, 2)), action_space=IntBox(2), terminal_prob=0.5,
+            deterministic=True
+        )
+        other_env.reset_all()
+        recursive_assert_almost_equal(other_env.step_flow()[0], states)
+
+    def test_vector_random_env_with_container_states(self):
+        env = VectorRandomEnv(
+            num_environments=1000, state_space=Dict(a=IntBox(3), b=FloatBox(shape=(2,))), action_space=IntBox(2),
+            terminal_prob=0.2
+        )
+        states, rewards, terminals = env.step_flow()
+        self.assertEqual(states["a"].shape, (1000,))
+        self.assertEqual(states["b"].shape, (1000, 2))
+        self.assertTrue(0.1 < np.mean(terminals) < 0.3)
@@ -55,6 +55,10 @@ class TestApexExecutor(unittest.TestCase):
         result = executor.execute_workload(workload=dict(
             num_timesteps=5000, report_interval=100, report_interval_min_seconds=1)
         )
+        self.assertGreaterEqual(result["learner_idle_fraction"], 0.0)
+        self.assertLessEqual(result["learner_idle_fraction"], 1.0)
+        # Learner times only cover the workload they are reported for.
+        self.assertLessEqual(result["learner_idle_time"], result["runtime"] + 1.0)
         full_worker_stats = executor.result_by_worker()
         print("All finished episode rewards")
         print(full_worker_stats["episode_rewards"])
@@ -75,6 +79,12 @@ class TestApexExecutor(unittest.TestCase):
                 "ERROR: state '{}' not expected in q-table as it's a terminal state!".format(state)
             recursive_assert_almost_equal(q_values, expected_q_values_per_state[state], decimals=0)
 
+        # Background threads are stopped on teardown.
+        replay_prefetcher = executor.replay_prefetcher
+        executor.terminate()
+        self.assertFalse(executor.update_worker.is_alive())
+        self.assertFalse(replay_prefetcher.is_alive())
+
     def test_learning_2x2_grid_world_container_actions(self):
         """
         Tests Apex container action functionality.
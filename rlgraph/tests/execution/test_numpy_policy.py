@@ -0,0 +1,119 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import numpy as np
+
+from rlgraph.agents import Agent
+from rlgraph.execution.numpy_policy import NumpyPolicy
+from rlgraph.spaces import FloatBox, IntBox
+from rlgraph.tests.test_util import config_from_path, recursive_assert_almost_equal
+from rlgraph.utils.rlgraph_errors import RLGraphError
+
+
+class TestNumpyPolicy(unittest.TestCase):
+    """
+    Tests NumPy exports of agent policies against the agents themselves.
+    """
+    state_space = FloatBox(shape=(4,))
+    action_space = IntBox(2)
+
+    def test_numpy_policy_matches_dqn_agent(self):
+        agent_config = config_from_path("configs/dqn_agent_for_cartpole.json")
+        agent = Agent.from_spec(
+            agent_config, state_space=self.state_space, action_space=self.action_space, dueling_q=False
+        )
+        numpy_policy = NumpyPolicy.from_agent(agent)
+        self.assertTrue(numpy_policy.greedy)
+
+        states = self.state_space.with_batch_rank().sample(size=100) * 5.0
+        expected = agent.get_action(states, use_exploration=False, apply_preprocessing=False)
+        actions = numpy_policy.get_action(states, use_exploration=False)
+        self.assertEqual(actions.dtype, expected.dtype)
+        recursive_assert_almost_equal(actions, expected)
+
+        # Export from an unbuilt agent: Weights come in via the agent's `set_weights` payload.
+        unbuilt_agent = Agent.from_spec(
+            agent_config, state_space=self.state_space, action_space=self.action_space, dueling_q=False,
+            auto_build=False
+        )
+        numpy_policy = NumpyPolicy.from_agent(unbuilt_agent)
+        self.assertRaises(RLGraphError, numpy_policy.get_action, states)
+        numpy_policy.set_weights(agent.get_weights()["policy_weights"])
+        recursive_assert_almost_equal(numpy_policy.get_action(states, use_exploration=False), expected)
+
+    def test_numpy_policy_epsilon_exploration(self):
+        agent_config = config_from_path("configs/dqn_agent_for_cartpole.json")
+        agent = Agent.from_spec(
+            agent_config, state_space=self.state_space, action_space=self.action_space, dueling_q=False
+        )
+        numpy_policy = NumpyPolicy.from_agent(agent, seed=10)
+
+        # Linear decay from 1.0 to 0.05 over 1500 timesteps.
+        self.assertEqual(numpy_policy._get_epsilon(0), 1.0)
+        self.assertAlmostEqual(numpy_policy._get_epsilon(750), 0.525)
+        self.assertAlmostEqual(numpy_policy._get_epsilon(2000), 0.05)
+
+        # Fully random at the start (epsilon=1.0): About half of the actions differ from the greedy ones.
+        states = self.state_space.with_batch_rank().sample(size=1000)
+        greedy_actions = numpy_policy.get_action(states, use_exploration=False)
+        actions = numpy_policy.get_action(states, time_step=0)
+        self.assertTrue(0.4 < np.mean(actions != greedy_actions) < 0.6)
+        # Timesteps are counted like the agent's.
+        self.assertEqual(numpy_policy.timesteps, agent.timesteps + 2000)
+        # Epsilon=0.05 at the end.
+        actions = numpy_policy.get_action(states, time_step=2000)
+        self.assertTrue(np.mean(actions != greedy_actions) < 0.1)
+
+    def test_numpy_policy_samples_ppo_actions(self):
+        agent_config = config_from_path("configs/ppo_agent_for_cartpole.json")
+        agent = Agent.from_spec(
+            agent_config, state_space=self.state_space, action_space=self.action_space, auto_build=False
+        )
+        numpy_policy = NumpyPolicy.from_agent(agent, seed=10)
+        self.assertFalse(numpy_policy.greedy)
+
+        # TensorFlow style weights payload (kernels and biases of the tf.layers.Dense objects).
+        layers = numpy_policy.layers + numpy_policy.action_heads[""]["layers"]
+        weights = {}
+        in_units = self.state_space.shape[0]
+        for i, layer in enumerate(layers):
+            key = "ppo-agent-" + layer["scope"].replace("/", "-") + "-dense-"
+            units = 2 if i == len(layers) - 1 else 8
+            weights[key + "kernel"] = np.random.normal(size=(in_units, units))
+            weights[key + "bias"] = np.random.normal(size=(units,))
+            in_units = units
+        numpy_policy.set_weights(weights)
+
+        states = self.state_space.with_batch_rank().sample(size=100)
+        logits = states
+        for i, layer in enumerate(layers):
+            key = "ppo-agent-" + layer["scope"].replace("/", "-") + "-dense-"
+            logits = np.matmul(logits, weights[key + "kernel"]) + weights[key + "bias"]
+            if layer["activation"] == "tanh":
+                logits = np.tanh(logits)
+            elif layer["activation"] == "relu":
+                logits = np.maximum(logits, 0.0)
+        recursive_assert_almost_equal(numpy_policy.get_action(states, use_exploration=False), np.argmax(logits, -1))
+
+        # Sampled actions follow the softmaxed action logits.
+        actions = numpy_policy.get_action(np.tile(states[:1], (5000, 1)))
+        probs = np.exp(logits[0]) / np.sum(np.exp(logits[0]))
+        self.assertAlmostEqual(np.mean(actions == 1), probs[1], places=1)
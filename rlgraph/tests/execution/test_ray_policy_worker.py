@@ -20,7 +20,7 @@ from __future__ import print_function
 import unittest
 
 from rlgraph.execution.ray.ray_policy_worker import RayPolicyWorker
-from rlgraph.execution.ray.ray_util import RayWeight
+from rlgraph.execution.ray.ray_util import RayWeight, RayWeightSync
 from rlgraph.tests.test_util import config_from_path
 
 from rlgraph import get_distributed_backend
@@ -82,3 +82,31 @@ class TestRayPolicyWorker(unittest.TestCase):
         ray.wait([ret])
         print('Object store weight sync successful.')
 
+    def test_versioned_delta_weight_syncing(self):
+        """
+        Tests versioned weight syncs with delta encoding to a remote worker.
+        """
+        env = Environment.from_spec(self.env_spec)
+        agent_config = config_from_path("configs/sync_batch_ppo_cartpole.json")
+
+        ray_spec = agent_config["execution_spec"].pop("ray_spec")
+        local_agent = Agent.from_spec(
+            agent_config,
+            state_space=env.state_space,
+            action_space=env.action_space
+        )
+        ray_spec["worker_spec"]["worker_sample_size"] = 50
+        worker = RayPolicyWorker.as_remote().remote(agent_config, ray_spec["worker_spec"], self.env_spec)
+
+        weight_sync = RayWeightSync(encoding="delta")
+        for version in range(3):
+            weight_sync.publish(local_agent.get_weights())
+            self.assertTrue(weight_sync.sync(worker))
+            # Worker already holds the current version.
+            self.assertFalse(weight_sync.sync(worker))
+
+        sample = ray.get(worker.execute_and_get_timesteps.remote(50))
+        self.assertEqual(sample.metrics["policy_version"], 2)
+        stats = ray.get(worker.get_workload_statistics.remote())
+        self.assertEqual(stats["weight_version"], 2)
+
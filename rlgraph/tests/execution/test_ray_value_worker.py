@@ -20,6 +20,7 @@ from __future__ import print_function
 import unittest
 from time import sleep
 
+from rlgraph.execution.ray import RayExecutor
 from rlgraph.execution.ray.ray_value_worker import RayValueWorker
 from rlgraph.execution.ray.ray_util import RayWeight
 from rlgraph.tests.test_util import recursive_assert_almost_equal, config_from_path
@@ -201,3 +202,85 @@ class TestRayWorker(unittest.TestCase):
         ray.wait([ret])
         print('Object store weight sync successful.')
 
+    def test_preprocessor_statistics_sync(self):
+        """
+        Tests merging the MovingStandardize statistics of several remote workers via the executor.
+        """
+        agent_config = config_from_path("configs/apex_agent_cartpole.json")
+        agent_config["preprocessing_spec"] = [dict(type="moving_standardize", scope="moving-standardize")]
+        ray_spec = agent_config["execution_spec"].pop("ray_spec")
+        ray_spec["worker_spec"]["worker_sample_size"] = 50
+
+        # Syncing is opt-in.
+        executor = RayExecutor(
+            executor_spec=dict(preprocessor_sync_steps=1000), environment_spec=self.env_spec,
+            worker_spec=ray_spec["worker_spec"]
+        )
+        executor.ray_env_sample_workers = executor.create_remote_workers(
+            RayValueWorker, 2, agent_config, ray_spec["worker_spec"], self.env_spec
+        )
+        ray.get([worker.execute_and_get_timesteps.remote(50, break_on_terminal=False)
+                 for worker in executor.ray_env_sample_workers])
+        worker_statistics = ray.get([worker.get_preprocessor_statistics.remote(only_new=True)
+                                     for worker in executor.ray_env_sample_workers])
+
+        statistics = executor.sync_preprocessor_statistics()
+        expected = executor.preprocessor_stack.merge_statistics(*worker_statistics)
+        recursive_assert_almost_equal(statistics, expected)
+        self.assertGreaterEqual(statistics["moving-standardize"]["count"], 100)
+
+        # All workers now use the merged estimates, and have no new statistics to report.
+        for worker in executor.ray_env_sample_workers:
+            recursive_assert_almost_equal(ray.get(worker.get_preprocessor_statistics.remote(only_new=False)), expected)
+        recursive_assert_almost_equal(executor.sync_preprocessor_statistics(), expected)
+
+    def test_batched_preprocessing_with_episode_cutoffs(self):
+        """
+        Tests that episodes cut off by `max_timesteps_per_episode` keep their real last state as next-state when
+        preprocessing the states of all environments at once.
+        """
+        agent_config = config_from_path("configs/apex_agent_cartpole.json")
+        agent_config["preprocessing_spec"] = [dict(type="multiply", factor=2.0, scope="multiply")]
+        ray_spec = agent_config["execution_spec"].pop("ray_spec")
+        ray_spec["worker_spec"]["worker_sample_size"] = 50
+        ray_spec["worker_spec"]["batched_preprocessing"] = True
+        worker = RayValueWorker.as_remote().remote(agent_config, ray_spec["worker_spec"], self.env_spec)
+
+        result = ray.get(worker.execute_and_get_timesteps.remote(
+            100, max_timesteps_per_episode=5, break_on_terminal=False
+        ))
+        observations = result.get_batch()
+        states = np.asarray(observations["states"])
+        next_states = np.asarray(observations["next_states"])
+        non_terminal = np.logical_not(np.asarray(observations["terminals"]))
+        self.assertGreater(np.sum(non_terminal), 0)
+        # CartPole (euler): x' = x + 0.02 * x_dot (also after scaling), so all non-terminal next-states (including
+        # those of cut off episodes) must be successors of their states and not reset states.
+        recursive_assert_almost_equal(
+            next_states[non_terminal][:, 0], states[non_terminal][:, 0] + 0.02 * states[non_terminal][:, 1],
+            decimals=4
+        )
+
+    def test_numpy_inference(self):
+        """
+        Tests acting via a NumPy export of the policy without building the worker's agent.
+        """
+        env = Environment.from_spec(self.env_spec)
+        agent_config = config_from_path("configs/apex_agent_cartpole.json")
+        ray_spec = agent_config["execution_spec"].pop("ray_spec")
+        local_agent = Agent.from_spec(
+            agent_config,
+            state_space=env.state_space,
+            action_space=env.action_space
+        )
+
+        ray_spec["worker_spec"]["worker_sample_size"] = 50
+        ray_spec["worker_spec"]["numpy_inference"] = True
+        ray_spec["worker_spec"]["worker_executes_postprocessing"] = False
+        worker = RayValueWorker.as_remote().remote(agent_config, ray_spec["worker_spec"], self.env_spec)
+
+        # The NumPy policy acts with the synced weights.
+        ray.wait([worker.set_weights.remote(RayWeight(local_agent.get_weights()))])
+        result = ray.get(worker.execute_and_get_timesteps.remote(100, break_on_terminal=False))
+        observations = result.get_batch()
+        self.assertEqual(len(observations["terminals"]), 100)
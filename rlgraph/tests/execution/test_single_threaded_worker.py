@@ -20,8 +20,9 @@ from __future__ import print_function
 import unittest
 
 from rlgraph.agents.random_agent import RandomAgent
-from rlgraph.environments import OpenAIGymEnv
+from rlgraph.environments import GridWorld, OpenAIGymEnv
 from rlgraph.execution.single_threaded_worker import SingleThreadedWorker
+from rlgraph.utils.profiler import Profiler
 
 
 class TestSingleThreadedWorker(unittest.TestCase):
@@ -71,3 +72,82 @@ class TestSingleThreadedWorker(unittest.TestCase):
         self.assertEqual(result['episodes_executed'], 5)
         self.assertLessEqual(result['env_frames'], 50)
         self.assertGreaterEqual(result['runtime'], 0.0)
+
+    def test_vectorized_timesteps(self):
+        """
+        Tests the vectorized execution loop on multiple environments.
+        """
+        agent = RandomAgent(
+            action_space=self.environment.action_space,
+            state_space=self.environment.state_space
+        )
+        worker = SingleThreadedWorker(
+            env_spec=lambda: OpenAIGymEnv(gym_env='CartPole-v0'),
+            agent=agent,
+            num_environments=4,
+            frameskip=1,
+            worker_executes_preprocessing=False,
+            vectorized_execution=True
+        )
+
+        result = worker.execute_timesteps(100)
+        self.assertEqual(result['timesteps_executed'], 100)
+        self.assertGreater(result['episodes_executed'], 0)
+        self.assertLessEqual(result['episodes_executed'], 100)
+        self.assertGreaterEqual(result['env_frames'], 100)
+        self.assertGreaterEqual(result['runtime'], 0.0)
+
+    def test_vectorized_timesteps_with_per_environment_episode_limits(self):
+        """
+        Tests that the vectorized execution loop limits each environment's episodes to that environment's own length.
+        """
+        env = GridWorld(world="4x4", action_type="ftj", state_representation="xy+orientation")
+        agent = RandomAgent(action_space=env.action_space, state_space=env.state_space)
+        worker = SingleThreadedWorker(
+            env_spec=lambda: GridWorld(world="4x4", action_type="ftj", state_representation="xy+orientation"),
+            agent=agent,
+            num_environments=4,
+            frameskip=1,
+            worker_executes_preprocessing=False,
+            vectorized_execution=True
+        )
+
+        max_timesteps_per_episode = [1, 2, 3, 4]
+        result = worker.execute_timesteps(200, max_timesteps_per_episode=max_timesteps_per_episode)
+        self.assertEqual(result["timesteps_executed"], 200)
+        self.assertEqual(worker.finished_episode_timesteps[0], [1] * 50)
+        for timesteps, max_timesteps in zip(worker.finished_episode_timesteps, max_timesteps_per_episode):
+            self.assertGreater(len(timesteps), 0)
+            self.assertLessEqual(max(timesteps), max_timesteps)
+        # Not all environments are cut off at the first environment's limit.
+        self.assertGreater(max(worker.finished_episode_timesteps[-1]), 1)
+
+    def test_profiled_timesteps(self):
+        """
+        Tests that per-phase timings are returned if the Profiler is enabled.
+        """
+        agent = RandomAgent(
+            action_space=self.environment.action_space,
+            state_space=self.environment.state_space
+        )
+        worker = SingleThreadedWorker(
+            env_spec=lambda: self.environment,
+            agent=agent,
+            frameskip=1,
+            worker_executes_preprocessing=False
+        )
+
+        Profiler.enable()
+        try:
+            result = worker.execute_timesteps(100)
+        finally:
+            Profiler.disable()
+        profile = result["profile"]
+        self.assertEqual(profile["worker"]["act"]["count"], 100)
+        self.assertEqual(profile["worker"]["env_step"]["count"], 100)
+        self.assertEqual(profile["worker"]["observe"]["count"], 100)
+        self.assertIn("worker,act,100,", Profiler.to_csv(profile))
+
+        # Disabled: No profile.
+        result = worker.execute_timesteps(10)
+        self.assertNotIn("profile", result)
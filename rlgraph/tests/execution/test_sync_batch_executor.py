@@ -18,9 +18,14 @@ from __future__ import division
 from __future__ import print_function
 
 import unittest
+
+from rlgraph import get_distributed_backend
 from rlgraph.execution.ray.sync_batch_executor import SyncBatchExecutor
 from rlgraph.tests.test_util import config_from_path
 
+if get_distributed_backend() == "ray":
+    import ray
+
 
 class TestSyncBatchExecutor(unittest.TestCase):
     """
@@ -50,6 +55,60 @@ class TestSyncBatchExecutor(unittest.TestCase):
         print("Finished executing workload:")
         print(result)
 
+    def test_ppo_learning_cartpole_with_async_sample_collection(self):
+        """
+        Tests sync-batch ppo on cartpole with asynchronous (straggler-tolerant) sample collection.
+        """
+        env_spec = dict(
+            type="openai",
+            gym_env="CartPole-v0"
+        )
+        agent_config = config_from_path("configs/sync_batch_ppo_cartpole.json")
+        executor_spec = agent_config["execution_spec"]["ray_spec"]["executor_spec"]
+        executor_spec["async_sample_collection"] = True
+        executor_spec["env_interaction_task_depth"] = 2
+        executor_spec["max_policy_staleness"] = 1
+
+        executor = SyncBatchExecutor(
+            environment_spec=env_spec,
+            agent_config=agent_config,
+        )
+        print("Successfully created executor.")
+
+        result = executor.execute_workload(workload=dict(num_timesteps=20000, report_interval=1000,
+                                                         report_interval_min_seconds=1))
+        print("Finished executing workload:")
+        print(result)
+        self.assertGreater(executor.policy_version, 0)
+
+    def test_preprocessor_statistics_sync(self):
+        """
+        Tests syncing the MovingStandardize statistics of 2 policy workers during the workload.
+        """
+        env_spec = dict(
+            type="openai",
+            gym_env="CartPole-v0"
+        )
+        agent_config = config_from_path("configs/sync_batch_ppo_cartpole.json")
+        agent_config["preprocessing_spec"] = [dict(type="moving_standardize", scope="moving-standardize")]
+        executor_spec = agent_config["execution_spec"]["ray_spec"]["executor_spec"]
+        executor_spec["preprocessor_sync_steps"] = 500
+        self.assertEqual(executor_spec["num_sample_workers"], 2)
+
+        executor = SyncBatchExecutor(
+            environment_spec=env_spec,
+            agent_config=agent_config,
+        )
+        executor.execute_workload(workload=dict(num_timesteps=2000, report_interval=100,
+                                                report_interval_min_seconds=0))
+        count = executor.preprocessor_statistics["moving-standardize"]["count"]
+        self.assertGreaterEqual(count, 1500)
+
+        # Each worker holds the merged statistics plus the ones of its samples since the last sync.
+        for worker in executor.ray_env_sample_workers:
+            worker_statistics = ray.get(worker.get_preprocessor_statistics.remote(only_new=False))
+            self.assertGreaterEqual(worker_statistics["moving-standardize"]["count"], count)
+
     def test_learning_2x2_grid_world_container_actions(self):
         """
         Tests sync batch container action functionality.
@@ -0,0 +1,137 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import inspect
+import time
+import unittest
+
+from rlgraph import get_backend
+from rlgraph.agents import Agent
+from rlgraph.environments import GridWorld
+from rlgraph.spaces import FloatBox, IntBox
+from rlgraph.tests.test_util import config_from_path
+from rlgraph.utils.ops import TraceContext
+
+
+class TestBuildPerformance(unittest.TestCase):
+    """
+    Measures graph assembly and build times of all agents.
+    """
+    cartpole_state_space = FloatBox(shape=(4,))
+    cartpole_action_space = IntBox(2)
+
+    def _build_agent(self, config_path, state_space, action_space, **kwargs):
+        agent_config = config_from_path(config_path)
+        agent_config.update(kwargs)
+        start = time.perf_counter()
+        agent = Agent.from_spec(agent_config, state_space=state_space, action_space=action_space, auto_build=False)
+        build_stats = agent.build()
+        total_time = time.perf_counter() - start
+        print("{}: total={:.2f}s, meta-graph={}, build={}".format(
+            type(agent).__name__, total_time, build_stats.get("meta_graph_build_times"),
+            build_stats.get("build_times")
+        ))
+        agent.terminate()
+        return total_time
+
+    def test_call_site_classification(self):
+        """
+        Compares the per-call cost of the stack-frame inspection formerly used to decide whether an API-method/graph_fn
+        returns ops or op-records with the `TraceContext` lookup used now.
+        """
+        num_calls = 1000
+
+        def nested(depth):
+            if depth == 0:
+                start = time.perf_counter()
+                for _ in range(num_calls):
+                    inspect.stack()
+                stack_time = time.perf_counter() - start
+                start = time.perf_counter()
+                for _ in range(num_calls):
+                    TraceContext.in_graph_fn()
+                return stack_time, time.perf_counter() - start
+            return nested(depth - 1)
+
+        # Graph assembly typically runs ~30 frames deep.
+        stack_time, context_time = nested(30)
+        print("Per call: inspect.stack()={:.2f}us TraceContext.in_graph_fn()={:.4f}us".format(
+            stack_time / num_calls * 1e6, context_time / num_calls * 1e6
+        ))
+        self.assertLess(context_time, stack_time)
+
+    def test_dqn_build(self):
+        env = GridWorld("2x2")
+        self._build_agent(
+            "configs/dqn_agent_for_2x2_gridworld.json", GridWorld.grid_world_2x2_flattened_state_space,
+            env.action_space, preprocessing_spec=None, dueling_q=False,
+            optimizer_spec=dict(type="adam", learning_rate=0.05)
+        )
+
+    def test_apex_build(self):
+        env = GridWorld("2x2")
+        self._build_agent(
+            "configs/apex_agent_for_2x2_gridworld.json", GridWorld.grid_world_2x2_flattened_state_space,
+            env.action_space, preprocessing_spec=None
+        )
+
+    def test_dqfd_build(self):
+        self._build_agent(
+            "configs/dqfd_agent_for_cartpole.json", self.cartpole_state_space, self.cartpole_action_space,
+            dueling_q=False
+        )
+
+    def test_actor_critic_build(self):
+        # The PyTorch ring buffer cannot yet gather with byte masks (`masked_select`).
+        if get_backend() != "tf":
+            return
+        env = GridWorld("2x2")
+        self._build_agent(
+            "configs/actor_critic_agent_for_2x2_gridworld.json", GridWorld.grid_world_2x2_flattened_state_space,
+            env.action_space
+        )
+
+    def test_ppo_build(self):
+        # The PyTorch ring buffer cannot yet gather with byte masks (`masked_select`).
+        if get_backend() != "tf":
+            return
+        env = GridWorld("2x2")
+        self._build_agent(
+            "configs/ppo_agent_for_2x2_gridworld.json", GridWorld.grid_world_2x2_flattened_state_space,
+            env.action_space
+        )
+
+    def test_sac_build(self):
+        # SAC's graph functions only support TensorFlow.
+        if get_backend() != "tf":
+            return
+        self._build_agent(
+            "configs/sac_agent_for_cartpole.json", self.cartpole_state_space, self.cartpole_action_space
+        )
+
+    def test_impala_build(self):
+        # IMPALA is only available for TensorFlow.
+        if get_backend() != "tf":
+            return
+        env = GridWorld("2x2")
+        self._build_agent(
+            "configs/impala_agent_for_2x2_gridworld.json", env.state_space, env.action_space,
+            type="single-impala-agent", update_spec=dict(batch_size=16),
+            execution_spec=dict(disable_monitoring=True)
+        )
@@ -0,0 +1,65 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+import unittest
+
+import numpy as np
+
+from rlgraph.components.helpers import GeneralizedAdvantageEstimation
+from rlgraph.spaces import BoolBox, FloatBox
+from rlgraph.tests import ComponentTest
+
+
+class TestGAEPerformance(unittest.TestCase):
+    """
+    Measures the throughput of GAE (sequence-helper bootstrapping and reverse decays) on large batches.
+    """
+    input_spaces = dict(
+        rewards=FloatBox(add_batch_rank=True),
+        baseline_values=FloatBox(add_batch_rank=True),
+        terminals=BoolBox(add_batch_rank=True),
+        sequence_indices=BoolBox(add_batch_rank=True)
+    )
+
+    batch_sizes = [1000, 10000, 100000]
+    episode_end_probability = 0.01
+    num_iterations = 10
+
+    def test_calc_gae_values_throughput(self):
+        gae = GeneralizedAdvantageEstimation(gae_lambda=0.95, discount=0.99)
+        test = ComponentTest(component=gae, input_spaces=self.input_spaces)
+
+        for batch_size in self.batch_sizes:
+            rewards = np.random.random(size=batch_size).astype(np.float32)
+            baseline_values = np.random.random(size=batch_size).astype(np.float32)
+            sequence_indices = np.random.random(size=batch_size) < self.episode_end_probability
+            sequence_indices[-1] = True
+            terminals = np.logical_and(sequence_indices, np.random.random(size=batch_size) < 0.5)
+
+            start = time.perf_counter()
+            for _ in range(self.num_iterations):
+                test.test(
+                    ("calc_gae_values", [baseline_values, rewards, terminals, sequence_indices]),
+                    expected_outputs=None
+                )
+            runtime = time.perf_counter() - start
+            print("Batch size {}: {:.4f} s per GAE call, {:.0f} samples/s.".format(
+                batch_size, runtime / self.num_iterations, batch_size * self.num_iterations / runtime
+            ))
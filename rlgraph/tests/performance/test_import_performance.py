@@ -0,0 +1,69 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from rlgraph import get_backend
+
+
+class TestImportPerformance(unittest.TestCase):
+    """
+    Measures rlgraph import times in fresh interpreters. Backends (tensorflow, torch, ray) are only imported once
+    they are used, so importing e.g. environments (on a Ray worker) stays cheap.
+    """
+    num_runs = 3
+
+    # Imports the module, then reports the import time and which heavyweight modules got imported.
+    import_script = \
+        "import json, sys, time; start = time.perf_counter(); import {module}; " \
+        "print(json.dumps(dict(time=time.perf_counter() - start, " \
+        "modules=[m for m in ['tensorflow', 'torch', 'ray', 'scipy'] if m in sys.modules])))"
+
+    def _import_in_subprocess(self, module, env=None):
+        output = subprocess.check_output(
+            [sys.executable, "-c", self.import_script.format(module=module)], env=env
+        )
+        return json.loads(output.decode().strip().split("\n")[-1])
+
+    def test_import_times(self):
+        backend_module = "tensorflow" if get_backend() == "tf" else "torch"
+        for module in ["rlgraph", "rlgraph.environments", "rlgraph.agents"]:
+            results = [self._import_in_subprocess(module) for _ in range(self.num_runs)]
+            print("`import {}`: {:.3f}s (best of {}).".format(
+                module, min(result["time"] for result in results), self.num_runs)
+            )
+            self.assertNotIn(backend_module, results[0]["modules"])
+            self.assertNotIn("ray", results[0]["modules"])
+            self.assertNotIn("scipy", results[0]["modules"])
+
+    def test_import_does_not_write_config(self):
+        home = tempfile.mkdtemp()
+        try:
+            env = dict(os.environ, HOME=home)
+            env.pop("RLGRAPH_HOME", None)
+            self._import_in_subprocess("rlgraph.agents", env=env)
+            self.assertFalse(os.path.exists(os.path.join(home, ".rlgraph")))
+        finally:
+            shutil.rmtree(home)
@@ -0,0 +1,65 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+import unittest
+
+from rlgraph import get_backend
+from rlgraph.agents import Agent
+from rlgraph.spaces import FloatBox, IntBox
+from rlgraph.tests.test_util import config_from_path
+
+
+class TestPyTorchFastPath(unittest.TestCase):
+    """
+    Compares single-state acting latency of a PyTorch agent with and without the executor's `fast_path`.
+    """
+    state_space = FloatBox(shape=(4,))
+    action_space = IntBox(2)
+    num_calls = 1000
+
+    def _measure_get_action(self, fast_path):
+        agent_config = config_from_path("configs/dqn_agent_for_cartpole.json")
+        agent_config["execution_spec"] = dict(fast_path=fast_path)
+        agent = Agent.from_spec(
+            agent_config, state_space=self.state_space, action_space=self.action_space, dueling_q=False,
+            optimizer_spec=dict(type="adam", learning_rate=0.01)
+        )
+        state = self.state_space.sample()
+        # Warm up.
+        for _ in range(10):
+            agent.get_action(state)
+
+        start = time.perf_counter()
+        for _ in range(self.num_calls):
+            action = agent.get_action(state)
+        runtime = time.perf_counter() - start
+        self.assertTrue(self.action_space.contains(action))
+        actions = agent.get_action(self.state_space.sample(size=3))
+        self.assertEqual(actions.shape, (3,))
+        agent.terminate()
+        return runtime / self.num_calls
+
+    def test_get_action_latency(self):
+        if get_backend() != "pytorch":
+            return
+        default_latency = self._measure_get_action(fast_path=False)
+        fast_latency = self._measure_get_action(fast_path=True)
+        print("get_action latency: default={:.3f}ms fast-path={:.3f}ms".format(
+            default_latency * 1000, fast_latency * 1000
+        ))
@@ -0,0 +1,75 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+import unittest
+
+import numpy as np
+from six.moves import xrange as range_
+
+from rlgraph.execution.ray.ray_util import ray_compress, ray_decompress, ray_compress_batch, ray_decompress_batch
+
+
+class TestRayCompressionPerformance(unittest.TestCase):
+    """
+    Compares per-state (base64) compression against whole-batch compression for Atari-sized frames.
+    """
+    batch_size = 200
+    state_shape = (84, 84, 4)
+    iterations = 20
+
+    def make_states(self):
+        # Mostly static frames with a moving object compress similar to Atari screens.
+        states = np.zeros(shape=(self.batch_size,) + self.state_shape, dtype=np.uint8)
+        states[:, 60:, :, :] = 100
+        for i in range_(self.batch_size):
+            states[i, i % 70:i % 70 + 8, 40:48, :] = 255
+        return states
+
+    def test_compression_throughput(self):
+        states = self.make_states()
+
+        start = time.perf_counter()
+        for _ in range_(self.iterations):
+            compressed = [ray_compress(state) for state in states]
+        compress_time = (time.perf_counter() - start) / self.iterations
+        start = time.perf_counter()
+        for _ in range_(self.iterations):
+            decompressed = np.asarray([ray_decompress(state) for state in compressed])
+        decompress_time = (time.perf_counter() - start) / self.iterations
+        self.assertTrue(np.array_equal(decompressed, states))
+        per_state_bytes = sum(len(state) for state in compressed)
+        print("Per-state: compress {:.5f} s, decompress {:.5f} s, {} bytes per batch of {}.".format(
+            compress_time, decompress_time, per_state_bytes, self.batch_size
+        ))
+
+        out = np.empty_like(states)
+        start = time.perf_counter()
+        for _ in range_(self.iterations):
+            compressed = ray_compress_batch(states)
+        compress_time = (time.perf_counter() - start) / self.iterations
+        start = time.perf_counter()
+        for _ in range_(self.iterations):
+            ray_decompress_batch(compressed, out=out)
+        decompress_time = (time.perf_counter() - start) / self.iterations
+        self.assertTrue(np.array_equal(out, states))
+        print("Batch: compress {:.5f} s, decompress {:.5f} s, {} bytes per batch of {}.".format(
+            compress_time, decompress_time, len(compressed), self.batch_size
+        ))
+        self.assertLess(len(compressed), per_state_bytes)
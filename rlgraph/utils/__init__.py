@@ -28,6 +28,7 @@ from rlgraph.utils.util import convert_dtype, get_shape, get_rank, force_tuple,
 from rlgraph.utils.numpy import softmax, relu, one_hot
 from rlgraph.utils.pytorch_util import pytorch_one_hot, PyTorchVariable
 from rlgraph.utils.define_by_run_ops import print_call_chain
+from rlgraph.utils.profiler import Profiler
 # from rlgraph.utils.specifiable_server import SpecifiableServer, SpecifiableServerHook
 #from rlgraph.utils.decorators import api
 
@@ -38,5 +39,5 @@ __all__ = [
     "Initializer", "Specifiable", "convert_dtype", "get_shape", "get_rank", "force_tuple", "force_list",
     "logging_formatter", "root_logger", "tf_logger", "print_logging_handler", "softmax", "relu", "one_hot",
     "DataOp", "SingleDataOp", "DataOpDict", "DataOpTuple", "ContainerDataOp", "FlattenedDataOp",
-    "pytorch_one_hot", "PyTorchVariable", "LARGE_INTEGER", "SMALL_NUMBER", "MIN_LOG_STDDEV", "MAX_LOG_STDDEV"
+    "pytorch_one_hot", "PyTorchVariable", "Profiler", "LARGE_INTEGER", "SMALL_NUMBER", "MIN_LOG_STDDEV", "MAX_LOG_STDDEV"
 ]
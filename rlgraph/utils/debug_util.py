@@ -19,7 +19,6 @@ from __future__ import print_function
 
 from collections import defaultdict
 import numpy as np
-import pandas as pd
 import time
 import os
 
@@ -70,6 +69,7 @@ class PerformanceTimer(object):
         self.complete_data.append(data)
 
     def get_results(self, prefix=None):
+        import pandas as pd
         df = pd.DataFrame(self.complete_data)
         return_data = dict()
         column_names = list()
@@ -85,6 +85,7 @@ class PerformanceTimer(object):
         return return_data
 
     def write(self):
+        import pandas as pd
         df = pd.DataFrame(self.complete_data)
 
         write_header = False
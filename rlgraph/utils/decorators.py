@@ -28,6 +28,7 @@ from rlgraph.utils import util
 from rlgraph.utils.op_records import GraphFnRecord, APIMethodRecord, DataOpRecord, DataOpRecordColumnIntoAPIMethod, \
     DataOpRecordColumnFromAPIMethod, DataOpRecordColumnIntoGraphFn, DataOpRecordColumnFromGraphFn
 from rlgraph.utils.ops import TraceContext
+from rlgraph.utils.profiler import Profiler
 from rlgraph.utils.rlgraph_errors import RLGraphError, RLGraphAPICallParamError, RLGraphVariableIncompleteError, \
     RLGraphInputIncompleteError
 
@@ -92,24 +93,31 @@ def rlgraph_api(api_method=None, *, component=None, name=None, returns=None,
     _sanity_check_decorator_options(flatten_ops, split_ops, add_auto_key_as_first_param)
 
     def decorator_func(wrapped_func):
+        api_fn_name = name or re.sub(r'^_graph_fn_', "", wrapped_func.__name__)
 
         def api_method_wrapper(self, *args, **kwargs):
-            api_fn_name = name or re.sub(r'^_graph_fn_', "", wrapped_func.__name__)
             # Direct evaluation of function.
             if self.execution_mode == "define_by_run":
-                type(self).call_count += 1
-
-                start = time.perf_counter()
                 # Check with owner if extra args needed.
                 if api_fn_name in self.api_methods and self.api_methods[api_fn_name].add_auto_key_as_first_param:
-                    output = wrapped_func(self, "", *args, **kwargs)
-                else:
-                    output = wrapped_func(self, *args, **kwargs)
+                    args = ("",) + args
+                if self.profiling_enabled is False and Profiler.enabled is False:
+                    return wrapped_func(self, *args, **kwargs)
+
+                type(self).call_count += 1
+                start = time.perf_counter()
+                output = wrapped_func(self, *args, **kwargs)
+                runtime = time.perf_counter() - start
 
                 # Store runtime for this method.
-                type(self).call_times.append(  # Component.call_times
-                    (self.name, wrapped_func.__name__, time.perf_counter() - start)
-                )
+                if self.profiling_enabled is True:
+                    type(self).call_times.append(  # Component.call_times
+                        (self.name, wrapped_func.__name__, runtime)
+                    )
+                if Profiler.enabled is True:
+                    Profiler.record(
+                        "api_method", "{}.{}".format(self.global_scope or self.name, api_fn_name), runtime
+                    )
                 return output
 
             api_method_rec = self.api_methods[api_fn_name]
@@ -200,17 +208,21 @@ def rlgraph_api(api_method=None, *, component=None, name=None, returns=None,
             # Regular API-method: Call it here.
             api_fn_args, api_fn_kwargs = in_op_column.get_args_and_kwargs()
 
-            if api_method_rec.is_graph_fn_wrapper is False:
-                return_values = wrapped_func(self, *api_fn_args, **api_fn_kwargs)
-            # Wrapped graph_fn: Call it through yet another wrapper.
-            else:
-                return_values = graph_fn_wrapper(
-                    self, wrapped_func, returns, dict(
-                        flatten_ops=flatten_ops, split_ops=split_ops,
-                        add_auto_key_as_first_param=add_auto_key_as_first_param,
-                        requires_variable_completeness=requires_variable_completeness
-                    ), *api_fn_args, **api_fn_kwargs
-                )
+            TraceContext.CALL_STACK.append("api_method")
+            try:
+                if api_method_rec.is_graph_fn_wrapper is False:
+                    return_values = wrapped_func(self, *api_fn_args, **api_fn_kwargs)
+                # Wrapped graph_fn: Call it through yet another wrapper.
+                else:
+                    return_values = graph_fn_wrapper(
+                        self, wrapped_func, returns, dict(
+                            flatten_ops=flatten_ops, split_ops=split_ops,
+                            add_auto_key_as_first_param=add_auto_key_as_first_param,
+                            requires_variable_completeness=requires_variable_completeness
+                        ), *api_fn_args, **api_fn_kwargs
+                    )
+            finally:
+                TraceContext.CALL_STACK.pop()
 
             # Process the results (push into a column).
             out_op_column = DataOpRecordColumnFromAPIMethod(
@@ -230,22 +242,20 @@ def rlgraph_api(api_method=None, *, component=None, name=None, returns=None,
             # And append the new out-column to the api-method-rec.
             api_method_rec.out_op_columns.append(out_op_column)
 
-            # Do we need to return the raw ops or the op-recs?
-            # Only need to check if False, otherwise, we return ops directly anyway.
-            return_ops = False
-            stack = inspect.stack()
-            f_locals = stack[1][0].f_locals
+            # Only look at the direct caller frames (`inspect.stack()` would read source files for all frames).
+            caller_frame = inspect.currentframe().f_back
+            f_locals = caller_frame.f_locals
             # We may be in a list comprehension, try next frame.
             if f_locals.get(".0"):
-                f_locals = stack[2][0].f_locals
+                f_locals = caller_frame.f_back.f_locals
             # Check whether the caller component is a parent of this one.
             caller_component = f_locals.get("root", f_locals.get("self_", f_locals.get("self")))
 
             # Potential call from a lambda.
-            if caller_component is None and "fn" in stack[2][0].f_locals:
+            if caller_component is None and "fn" in caller_frame.f_back.f_locals:
                 # This is the component.
                 prev_caller_component = TraceContext.PREV_CALLER
-                lambda_obj = stack[2][0].f_locals["fn"]
+                lambda_obj = caller_frame.f_back.f_locals["fn"]
                 if "lambda" in inspect.getsource(lambda_obj):
                     # Try to reconstruct caller by using parent of prior caller.
                     caller_component = prev_caller_component.parent_component
@@ -261,7 +271,8 @@ def rlgraph_api(api_method=None, *, component=None, name=None, returns=None,
             elif caller_component is not None and \
                     type(caller_component).__name__ != "MetaGraphBuilder" and \
                     caller_component not in [self] + self.get_parents():
-                if not (stack[1][3] == "__init__" and re.search(r'op_records\.py$', stack[1][1])):
+                if not (caller_frame.f_code.co_name == "__init__" and
+                        re.search(r'op_records\.py$', caller_frame.f_code.co_filename)):
                     raise RLGraphError(
                         "The component '{}' is not a child (or grand-child) of the caller ({})! Maybe you forgot to "
                         "add it as a sub-component via `add_components()`.".
@@ -270,17 +281,10 @@ def rlgraph_api(api_method=None, *, component=None, name=None, returns=None,
 
             # Update trace context.
             TraceContext.PREV_CALLER = caller_component
+            del caller_frame
 
-            for stack_item in stack[1:]:  # skip current frame
-                # If we hit an API-method call -> return op-recs.
-                if stack_item[3] == "api_method_wrapper" and re.search(r'decorators\.py$', stack_item[1]):
-                    break
-                # If we hit a graph_fn call -> return ops.
-                elif stack_item[3] == "run_through_graph_fn" and re.search(r'graph_builder\.py$', stack_item[1]):
-                    return_ops = True
-                    break
-
-            if return_ops is True:
+            # Do we need to return the raw ops (called from within a graph_fn) or the op-recs?
+            if TraceContext.in_graph_fn():
                 if type(return_values) == dict:
                     return {key: value.op for key, value in out_op_column.get_args_and_kwargs()[1].items()}
                 else:
@@ -376,6 +380,13 @@ def graph_fn(graph_fn=None, *, component=None, returns=None,
         def _graph_fn_wrapper(self, *args, **kwargs):
             if self.execution_mode == "define_by_run":
                 # Direct execution.
+                if Profiler.enabled is True:
+                    graph_fn_name = "{}.{}".format(self.global_scope or self.name, wrapped_func.__name__)
+                    with Profiler.timer("graph_fn", graph_fn_name):
+                        return self.graph_builder.execute_define_by_run_graph_fn(self, wrapped_func, dict(
+                            flatten_ops=flatten_ops, split_ops=split_ops,
+                            add_auto_key_as_first_param=add_auto_key_as_first_param
+                        ), *args, **kwargs)
                 return self.graph_builder.execute_define_by_run_graph_fn(self, wrapped_func,  dict(
                         flatten_ops=flatten_ops, split_ops=split_ops,
                         add_auto_key_as_first_param=add_auto_key_as_first_param
@@ -627,17 +638,8 @@ def graph_fn_wrapper(component, wrapped_func, returns, options, *args, **kwargs)
 
     component.graph_fns[wrapped_func.__name__].out_op_columns.append(out_graph_fn_column)
 
-    return_ops = False
-    for stack_item in inspect.stack()[1:]:  # skip current frame
-        # If we hit an API-method call -> return op-recs.
-        if stack_item[3] == "api_method_wrapper" and re.search(r'decorators\.py$', stack_item[1]):
-            break
-        # If we hit a graph_fn call -> return ops.
-        elif stack_item[3] == "run_through_graph_fn" and re.search(r'graph_builder\.py$', stack_item[1]):
-            return_ops = True
-            break
-
-    if return_ops is True:  #re.match(r'^_graph_fn_.+|<lambda>$', stack[2][3]) and out_graph_fn_column.op_records[0].op is not None:
+    # Called from within a graph_fn (not via an API-method) -> return ops, otherwise op-recs.
+    if TraceContext.in_graph_fn():
         assert out_graph_fn_column.op_records[0].op is not None,\
             "ERROR: Cannot return ops (instead of op-recs) if ops are still None!"
         if len(out_graph_fn_column.op_records) == 1:
@@ -23,9 +23,10 @@ from collections import OrderedDict
 from rlgraph import get_backend
 from rlgraph.utils.ops import FLAT_TUPLE_OPEN, FLAT_TUPLE_CLOSE, deep_tuple, FlattenedDataOp, FLATTEN_SCOPE_PREFIX, \
     DataOpDict
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 def print_call_chain(profile_data, sort=True, filter_threshold=None):
@@ -181,6 +182,26 @@ def define_by_run_split_args(add_auto_key_as_first_param, *args, **kwargs):
         return unwrapped_args, {key: value[""] for key, value in kwargs.items()}
 
 
+# Parsed flat-keys: Maps a flat-key to its list of (type, index) tuples (type=list for tuple-indices, else OrderedDict).
+_flat_key_cache = {}
+
+
+def _parse_flat_key(flat_key):
+    parsed = _flat_key_cache.get(flat_key)
+    if parsed is None:
+        parsed = []
+        op_name = flat_key[1:] if flat_key.startswith(FLATTEN_SCOPE_PREFIX) else flat_key
+        # N.b. removed this because we do not prepend / any more before first key.
+        for sub_key in op_name.split(FLATTEN_SCOPE_PREFIX):
+            mo = re.match(r'^{}(\d+){}$'.format(FLAT_TUPLE_OPEN, FLAT_TUPLE_CLOSE), sub_key)
+            if mo:
+                parsed.append((list, int(mo.group(1))))
+            else:
+                parsed.append((OrderedDict, sub_key))
+        _flat_key_cache[flat_key] = parsed
+    return parsed
+
+
 def define_by_run_unflatten(result_dict):
     """
     Takes a dict with auto-generated keys and returns the corresponding
@@ -209,19 +230,7 @@ def define_by_run_unflatten(result_dict):
         current_structure = None
         op_type = None
 
-        if op_name.startswith(FLATTEN_SCOPE_PREFIX):
-            op_name = op_name[1:]
-        # N.b. removed this because we do not prepend / any more before first key.
-        op_key_list = op_name.split(FLATTEN_SCOPE_PREFIX)  # skip 1st char (/)
-        for sub_key in op_key_list:
-            mo = re.match(r'^{}(\d+){}$'.format(FLAT_TUPLE_OPEN, FLAT_TUPLE_CLOSE), sub_key)
-            if mo:
-                op_type = list
-                idx = int(mo.group(1))
-            else:
-                op_type = OrderedDict
-                idx = sub_key
-
+        for op_type, idx in _parse_flat_key(op_name):
             if current_structure is None:
                 if base_structure is None:
                     base_structure = [None] if op_type == list else DataOpDict()
@@ -211,7 +211,10 @@ def parse_execution_spec(execution_spec):
             device_map={},
             # TODO potentially set to nproc?
             torch_num_threads=1,
-            OMP_NUM_THREADS=1
+            OMP_NUM_THREADS=1,
+            # Low-overhead execution: No per-call profiling, cached graph_fn arg structures, results returned
+            # without squeezing/copying (numpy results may share memory with torch tensors).
+            fast_path=False
         )
         execution_spec = default_dict(execution_spec, default_spec)
 
@@ -0,0 +1,79 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a (heavyweight) module, e.g. tensorflow, torch or ray, that only imports the actual module on first
+    attribute access. Modules can thus bind their backend modules at import time (`tf = lazy_import("tensorflow")`),
+    while the backend is only loaded once a Component that needs it is built or run.
+    """
+    def __init__(self, name):
+        """
+        Args:
+            name (str): The full name of the module to import, e.g. "torch.nn".
+        """
+        super(LazyModule, self).__init__(name)
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+            # Subsequent attribute lookups hit our __dict__ directly.
+            self.__dict__.update(self._module.__dict__)
+        return self._module
+
+    def __getattr__(self, item):
+        # Only called for attributes not (yet) in our __dict__.
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        if self._module is None:
+            return "<lazy module '{}' (not loaded)>".format(self.__name__)
+        return repr(self._module)
+
+
+# Module name -> LazyModule, so all modules share the same stand-in.
+_lazy_modules = {}
+
+
+def lazy_import(name):
+    """
+    Returns a module stand-in that imports the module `name` on first attribute access. If the module is already
+    imported, returns the module itself.
+
+    Args:
+        name (str): The full name of the module, e.g. "tensorflow" or "torch.nn".
+
+    Returns:
+        Union[module,LazyModule]: The module or its lazy stand-in.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if name not in _lazy_modules:
+        _lazy_modules[name] = LazyModule(name)
+    return _lazy_modules[name]
@@ -43,6 +43,18 @@ class TraceContext(object):
     ACTIVE_CALL_CONTEXT = False
     CONTEXT_START = None
 
+    # Stack of the build-time calls currently being executed ("api_method" or "graph_fn"; innermost last).
+    # API-methods and graph_fns called directly from within a graph_fn return ops, otherwise op-records.
+    CALL_STACK = []
+
+    @staticmethod
+    def in_graph_fn():
+        """
+        Returns:
+            bool: Whether the innermost active build-time call is a graph_fn.
+        """
+        return len(TraceContext.CALL_STACK) > 0 and TraceContext.CALL_STACK[-1] == "graph_fn"
+
 
 class DataOp(object):
     """
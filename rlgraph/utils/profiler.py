@@ -0,0 +1,258 @@
+# Copyright 2018/2019 The RLgraph authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import csv
+import io
+import json
+import math
+import time
+from collections import OrderedDict
+
+
+class Histogram(object):
+    """
+    Bounded-memory histogram of durations (in seconds).
+
+    Count, total, min and max are exact. Percentiles are read from logarithmically spaced buckets (each bucket
+    5% wider than the previous one), so they are accurate to within ~2.5% while memory stays constant no matter
+    how many values are recorded.
+    """
+    # Smallest resolved duration (100ns); anything below lands in the first bucket.
+    MIN_VALUE = 1e-7
+    LOG_BUCKET_RATIO = math.log(1.05)
+    # Covers durations up to ~MIN_VALUE * 1.05^500 (~4e3s); larger values land in the last bucket.
+    NUM_BUCKETS = 500
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        # Sparse bucket-index -> count mapping (at most NUM_BUCKETS entries).
+        self.buckets = {}
+
+    def add(self, value):
+        """
+        Records one duration.
+
+        Args:
+            value (float): The duration in seconds.
+        """
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.MIN_VALUE) / self.LOG_BUCKET_RATIO), self.NUM_BUCKETS - 1)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, q):
+        """
+        Args:
+            q (float): The percentile to compute (between 0 and 100).
+
+        Returns:
+            float: The (approximate) q-th percentile of all recorded values. 0.0 if nothing was recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets.keys()):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Geometric center of the bucket, clipped to the observed range.
+                value = self.MIN_VALUE * math.exp((index + 0.5) * self.LOG_BUCKET_RATIO)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: count, total, mean, min, p50, p99 and max of all recorded values.
+        """
+        return OrderedDict([
+            ("count", self.count),
+            ("total", self.total),
+            ("mean", self.total / self.count if self.count > 0 else 0.0),
+            ("min", self.min if self.count > 0 else 0.0),
+            ("p50", self.percentile(50)),
+            ("p99", self.percentile(99)),
+            ("max", self.max)
+        ])
+
+
+class _Timer(object):
+    """
+    Context manager recording the duration of its block into the Profiler.
+    """
+    def __init__(self, category, name):
+        self.category = category
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        Profiler.record(self.category, self.name, time.perf_counter() - self.start)
+
+
+class _NoOpTimer(object):
+    """
+    Shared do-nothing context manager used while profiling is disabled.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_OP_TIMER = _NoOpTimer()
+
+
+class Profiler(object):
+    """
+    Process-wide, opt-in profiler collecting duration histograms per (category, name), e.g.
+    ("api_method", "dqn-agent/policy.get_action"), ("graph_fn", "policy._graph_fn_get_action") or ("worker", "act").
+
+    Define-by-run API-methods and graph_fns as well as executor calls and worker phases (act, env_step, observe,
+    update, weight_sync) report here while `Profiler.enabled` is True. While disabled, instrumented code only
+    checks that one flag (or uses a shared no-op timer).
+    """
+    enabled = False
+
+    # Maps (category, name) to Histogram.
+    histograms = OrderedDict()
+
+    @staticmethod
+    def enable(reset=True):
+        """
+        Starts profiling.
+
+        Args:
+            reset (bool): Whether to drop all previously collected data.
+        """
+        if reset:
+            Profiler.reset()
+        Profiler.enabled = True
+
+    @staticmethod
+    def disable():
+        """
+        Stops profiling. Collected data is kept until `reset` or the next `enable`.
+        """
+        Profiler.enabled = False
+
+    @staticmethod
+    def reset():
+        Profiler.histograms = OrderedDict()
+
+    @staticmethod
+    def record(category, name, duration):
+        """
+        Records one duration.
+
+        Args:
+            category (str): The category, e.g. "api_method", "graph_fn" or "worker".
+            name (str): The name within the category.
+            duration (float): The duration in seconds.
+        """
+        key = (category, name)
+        histogram = Profiler.histograms.get(key)
+        if histogram is None:
+            histogram = Profiler.histograms[key] = Histogram()
+        histogram.add(duration)
+
+    @staticmethod
+    def timer(category, name):
+        """
+        Returns a context manager timing its block (a no-op one if profiling is disabled).
+
+        Args:
+            category (str): The category to record into.
+            name (str): The name to record under.
+        """
+        if Profiler.enabled is True:
+            return _Timer(category, name)
+        return _NO_OP_TIMER
+
+    @staticmethod
+    def get_stats():
+        """
+        Returns:
+            dict: Nested dict category -> name -> stats (see `Histogram.get_stats`).
+        """
+        stats = OrderedDict()
+        for (category, name), histogram in Profiler.histograms.items():
+            if category not in stats:
+                stats[category] = OrderedDict()
+            stats[category][name] = histogram.get_stats()
+        return stats
+
+    @staticmethod
+    def to_json(stats=None, path=None):
+        """
+        Exports profiling stats as JSON.
+
+        Args:
+            stats (Optional[dict]): Stats as returned by `get_stats` (e.g. the "profile" entry of a Worker's
+                results). Default: The current stats.
+            path (Optional[str]): File to write to. If None, only returns the JSON string.
+
+        Returns:
+            str: The JSON string.
+        """
+        ret = json.dumps(stats if stats is not None else Profiler.get_stats(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(ret)
+        return ret
+
+    @staticmethod
+    def to_csv(stats=None, path=None):
+        """
+        Exports profiling stats as CSV with one row per (category, name).
+
+        Args:
+            stats (Optional[dict]): Stats as returned by `get_stats`. Default: The current stats.
+            path (Optional[str]): File to write to. If None, only returns the CSV string.
+
+        Returns:
+            str: The CSV string.
+        """
+        stats = stats if stats is not None else Profiler.get_stats()
+        columns = ["count", "total", "mean", "min", "p50", "p99", "max"]
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["category", "name"] + columns)
+        for category, entries in stats.items():
+            for name, entry in entries.items():
+                writer.writerow([category, name] + [entry[column] for column in columns])
+        ret = out.getvalue()
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(ret)
+        return ret
@@ -21,9 +21,10 @@ from rlgraph import get_backend
 import numpy as np
 import copy
 
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 
 class PyTorchVariable(object):
@@ -124,9 +125,15 @@ def get_input_channels(shape):
         return shape[0]
 
 
-if get_backend() == "pytorch":
-    SMALL_NUMBER_TORCH = torch.tensor([1e-6])
-    LOG_SMALL_NUMBER = torch.log(SMALL_NUMBER_TORCH)
+def _define_torch_members():
+    """
+    Defines all members of this module that need torch at definition time. These are only defined on first access
+    (see `__getattr__` below), so that importing rlgraph does not import torch.
+
+    Returns:
+        dict: Member names mapped to the defined objects.
+    """
+    small_number_torch = torch.tensor([1e-6])
 
     class SamePaddedConv2d(torch.nn.Module):
         """
@@ -157,4 +164,22 @@ if get_backend() == "pytorch":
         def parameters(self):
             return self.layer.parameters()
 
+    # Importable (and picklable) as a module-level class.
+    SamePaddedConv2d.__qualname__ = "SamePaddedConv2d"
+
+    return dict(
+        SMALL_NUMBER_TORCH=small_number_torch,
+        LOG_SMALL_NUMBER=torch.log(small_number_torch),
+        SamePaddedConv2d=SamePaddedConv2d
+    )
+
+
+_TORCH_MEMBERS = ["SMALL_NUMBER_TORCH", "LOG_SMALL_NUMBER", "SamePaddedConv2d"]
+
 
+def __getattr__(name):
+    # Module-level `__getattr__` (PEP 562): Defines the torch-dependent members on first access.
+    if name in _TORCH_MEMBERS and get_backend() == "pytorch":
+        globals().update(_define_torch_members())
+        return globals()[name]
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
@@ -19,15 +19,18 @@ from __future__ import print_function
 
 import multiprocessing
 
+import numpy as np
+
 from rlgraph import get_backend
 from rlgraph.spaces.space import Space
 from rlgraph.spaces.containers import ContainerSpace
 from rlgraph.utils.rlgraph_errors import RLGraphError
 from rlgraph.utils.specifiable import Specifiable
 from rlgraph.utils.util import force_list, convert_dtype
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
 
 class SpecifiableServer(Specifiable):
@@ -36,12 +39,17 @@ class SpecifiableServer(Specifiable):
 
     This is useful - for example - to run RLgraph Environments (which are Specifiables) in a highly parallelized and
     in-graph fashion for faster Agent-Environment stepping.
+
+    By default, method calls and their return values are sent (pickled) through a pipe. With `shared_memory=True`,
+    return values of all methods whose outputs are fully described by `output_spaces` are instead written by the
+    server into preallocated shared NumPy ring buffers and only the ring-slot index is sent back through the pipe.
     """
 
     # Class instances get registered/deregistered here.
     INSTANCES = []
 
-    def __init__(self, specifiable_class, spec, output_spaces, shutdown_method=None):
+    def __init__(self, specifiable_class, spec, output_spaces, shutdown_method=None, batch_size=None,
+                 shared_memory=False, num_shared_memory_slots=2):
         """
         Args:
             specifiable_class (type): The class to use for constructing the Specifiable from spec. This class needs to be
@@ -53,6 +61,13 @@ class SpecifiableServer(Specifiable):
             shutdown_method (Optional[str]): An optional name of a shutdown method that will be called on the
                 Specifiable object before "server" shutdown to give the Specifiable a chance to clean up.
                 The Specifiable must implement this method.
+            batch_size (Optional[int]): If given, all returned values carry a leading (batch) axis of this size on top
+                of their Spaces' shapes (e.g. when serving a VectorEnv). Default: None.
+            shared_memory (bool): Whether to return values through shared memory buffers (instead of pickling them
+                through the pipe). Requires `output_spaces` to be a dict. Default: False.
+            num_shared_memory_slots (int): The number of ring slots per shared memory buffer, i.e. how many
+                consecutive calls of the same method can be written before the oldest slot gets overwritten.
+                Default: 2.
             #flatten_output_dicts (bool): Whether output dictionaries should be flattened to tuples and then
             #    returned.
         """
@@ -72,6 +87,16 @@ class SpecifiableServer(Specifiable):
         else:
             self.output_spaces = output_spaces
         self.shutdown_method = shutdown_method
+        self.batch_size = batch_size
+
+        if shared_memory is True and not isinstance(self.output_spaces, dict):
+            raise RLGraphError("SpecifiableServer with `shared_memory=True` requires `output_spaces` to be a dict!")
+        self.shared_memory = shared_memory
+        self.num_shared_memory_slots = num_shared_memory_slots
+        # Maps method names to lists of (raw shared array, dtype, shape) (one per return value) and to the
+        # respective NumPy views of these arrays (with the ring slot as 0th axis).
+        self.shared_buffers = {}
+        self.shared_buffer_views = {}
 
         # The process in which the Specifiable will run.
         self.process = None
@@ -130,7 +155,7 @@ class SpecifiableServer(Specifiable):
                 # Expecting a tensor.
                 elif space is not None:
                     dtypes.append(convert_dtype(space.dtype))
-                    shapes.append(space.shape)
+                    shapes.append(space.shape if self.batch_size is None else (self.batch_size,) + space.shape)
                     return_slots.append(i)
 
             if get_backend() == "tf":
@@ -139,13 +164,8 @@ class SpecifiableServer(Specifiable):
                 def py_call(*call_args):
                     call_args = [arg.decode('UTF-8') if isinstance(arg, bytes) else arg for arg in call_args]
                     try:
-                        self.out_pipe.send(call_args)
-                        received_results = self.out_pipe.recv()
-
-                        # If an error occurred, it'll be passed back through the pipe.
-                        if isinstance(received_results, Exception):
-                            raise received_results
-                        elif received_results is not None:
+                        received_results = self.send_and_receive(*call_args)
+                        if received_results is not None:
                             return received_results
 
                     except Exception as e:
@@ -169,12 +189,77 @@ class SpecifiableServer(Specifiable):
 
         return call
 
+    def send_and_receive(self, method_name, *args):
+        """
+        Calls a method on the Specifiable object in the server process and waits for its return values.
+
+        Args:
+            method_name (str): The name of the method to call.
+            *args (any): The args to pass to the method.
+
+        Returns:
+            any: The method's return value(s).
+        """
+        self.out_pipe.send([method_name] + list(args))
+        received_results = self.out_pipe.recv()
+
+        # If an error occurred, it'll be passed back through the pipe.
+        if isinstance(received_results, Exception):
+            raise received_results
+        # Return values were written into shared memory: Read (copy) them from the received slot.
+        elif method_name in self.shared_buffer_views:
+            results = [np.array(view[received_results]) for view in self.shared_buffer_views[method_name]]
+            return results[0] if len(results) == 1 else tuple(results)
+        return received_results
+
+    def create_shared_buffers(self):
+        """
+        Allocates one shared memory ring buffer per return value of each method in `self.output_spaces` whose
+        return values are all described by (non-container) Spaces. Other methods keep returning through the pipe.
+        """
+        self.shared_buffers = {}
+        for method_name, specs in self.output_spaces.items():
+            specs = force_list(specs)
+            if len(specs) == 0 or not all(isinstance(space, Space) and not isinstance(space, ContainerSpace)
+                                          for space in specs):
+                continue
+            buffers = []
+            for space in specs:
+                dtype = np.dtype(convert_dtype(space.dtype, to="np"))
+                shape = space.shape if self.batch_size is None else (self.batch_size,) + space.shape
+                size = self.num_shared_memory_slots * int(np.prod(shape)) * dtype.itemsize
+                buffers.append((multiprocessing.RawArray("b", size), dtype, shape))
+            self.shared_buffers[method_name] = buffers
+        self.shared_buffer_views = self.get_shared_buffer_views(self.shared_buffers, self.num_shared_memory_slots)
+
+    @staticmethod
+    def get_shared_buffer_views(shared_buffers, num_slots):
+        """
+        Args:
+            shared_buffers (Dict[str,list]): Maps method names to lists of (raw shared array, dtype, shape).
+            num_slots (int): The number of ring slots per buffer.
+
+        Returns:
+            Dict[str,List[np.ndarray]]: Maps method names to NumPy views (of shape [num_slots] + shape) of the raw
+                shared arrays.
+        """
+        return {
+            method_name: [
+                np.frombuffer(raw, dtype=dtype).reshape((num_slots,) + tuple(shape)) for raw, dtype, shape in buffers
+            ] for method_name, buffers in shared_buffers.items()
+        }
+
     def start_server(self):
         # Create the in- and out- pipes to communicate with the proxy-Specifiable.
         self.out_pipe, self.in_pipe = multiprocessing.Pipe()
+        if self.shared_memory is True:
+            self.create_shared_buffers()
         # Create and start the process passing it the spec to construct the desired Specifiable object..
         self.process = multiprocessing.Process(
-            target=self.run_server, args=(self.specifiable_class, self.spec, self.in_pipe, self.shutdown_method)
+            target=self.run_server, args=(
+                self.specifiable_class, self.spec, self.in_pipe, self.shutdown_method, self.shared_buffers,
+                self.num_shared_memory_slots
+            )
         )
         self.process.start()
 
@@ -193,8 +278,11 @@ class SpecifiableServer(Specifiable):
             pass
         self.process.join()
 
-    def run_server(self, class_, spec, in_pipe, shutdown_method=None):
+    def run_server(self, class_, spec, in_pipe, shutdown_method=None, shared_buffers=None, num_shared_memory_slots=2):
         proxy_object = None
+        shared_buffer_views = self.get_shared_buffer_views(shared_buffers or {}, num_shared_memory_slots)
+        # The next ring slot to write to per method.
+        next_slots = {method_name: 0 for method_name in shared_buffer_views}
         try:
 
             # Construct the Specifiable object.
@@ -220,8 +308,17 @@ class SpecifiableServer(Specifiable):
                 inputs = command[1:]
                 results = getattr(proxy_object, method_name)(*inputs)
 
+                # Write return values into the next ring slot and only send back the slot index.
+                if method_name in shared_buffer_views:
+                    views = shared_buffer_views[method_name]
+                    slot = next_slots[method_name]
+                    next_slots[method_name] = (slot + 1) % num_shared_memory_slots
+                    for view, result in zip(views, [results] if len(views) == 1 else results):
+                        view[slot] = result
+                    in_pipe.send(slot)
                 # Send return values back to caller.
-                in_pipe.send(results)
+                else:
+                    in_pipe.send(results)
 
         # If something happens during the construction and proxy run phase, pass the exception back through our pipe.
         except Exception as e:
@@ -236,7 +333,14 @@ class SpecifiableServer(Specifiable):
             in_pipe.send(e)
 
 
-if get_backend() == "tf":
+def _define_tf_members():
+    """
+    Defines all members of this module that need tensorflow at definition time. These are only defined on first
+    access (see `__getattr__` below), so that importing this module does not import tensorflow.
+
+    Returns:
+        dict: Member names mapped to the defined objects.
+    """
     class SpecifiableServerHook(tf.train.SessionRunHook):
         """
         A hook for a tf.MonitoredSession that takes care of automatically starting and stopping
@@ -266,3 +370,16 @@ if get_backend() == "tf":
             tp.map(lambda server: server.stop_server(), self.specifiable_buffer)
             tp.close()
             tp.join()
+
+    # Importable (and picklable) as a module-level class.
+    SpecifiableServerHook.__qualname__ = "SpecifiableServerHook"
+
+    return dict(SpecifiableServerHook=SpecifiableServerHook)
+
+
+def __getattr__(name):
+    # Module-level `__getattr__` (PEP 562): Defines the tensorflow-dependent members on first access.
+    if name == "SpecifiableServerHook" and get_backend() == "tf":
+        globals().update(_define_tf_members())
+        return globals()[name]
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
@@ -20,10 +20,11 @@ from __future__ import print_function
 import contextlib
 
 from rlgraph import get_backend
+from rlgraph.utils.lazy_import import lazy_import
 
 # TF specific scope/device utilities.
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 
     @contextlib.contextmanager
     def pin_global_variables(device):
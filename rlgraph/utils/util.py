@@ -26,11 +26,12 @@ import sys
 from rlgraph import get_backend
 from rlgraph.utils.define_by_run_ops import define_by_run_flatten
 from rlgraph.utils.rlgraph_errors import RLGraphError
+from rlgraph.utils.lazy_import import lazy_import
 
 if get_backend() == "tf":
-    import tensorflow as tf
+    tf = lazy_import("tensorflow")
 elif get_backend() == "pytorch":
-    import torch
+    torch = lazy_import("torch")
 
 # Some small floating point number. Can be used as a small epsilon for numerical stability purposes.
 SMALL_NUMBER = 1e-6
@@ -52,6 +53,18 @@ print_logging_handler.setFormatter(logging_formatter)
 print_logging_handler.setLevel(level=logging.INFO)
 root_logger.addHandler(print_logging_handler)
 
+# Python, numpy and string dtypes mapped to their numpy equivalents. Used by `convert_dtype` to resolve numpy targets
+# without touching the (lazily imported) backend.
+_NP_DTYPES = {
+    "bool": np.bool_, bool: np.bool_, np.bool_: np.bool_,
+    "float": np.float32, "float32": np.float32, float: np.float32, np.float32: np.float32,
+    "float64": np.float64, np.float64: np.float64,
+    "int": np.int32, "int32": np.int32, int: np.int32, np.int32: np.int32,
+    "int64": np.int64, np.int64: np.int64,
+    "uint8": np.uint8, np.uint8: np.uint8,
+    "int16": np.int16, np.int16: np.int16
+}
+
 
 # TODO: Consider making "to" non-optional: https://github.com/rlgraph/rlgraph/issues/34
 def convert_dtype(dtype, to="tf"):
@@ -67,6 +80,9 @@ def convert_dtype(dtype, to="tf"):
     Returns:
         TensorFlow, Numpy, pytorch or string, representing a data type (depending on `to` parameter).
     """
+    if to == "np" and isinstance(dtype, (str, type)) and dtype in _NP_DTYPES:
+        return _NP_DTYPES[dtype]
+
     # Bool: tensorflow.
     if get_backend() == "tf":
         if dtype in ["bool", bool, np.bool_, tf.bool]: